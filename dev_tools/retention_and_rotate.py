@@ -9,6 +9,7 @@ Features:
 - For `DB_BACKUP_DIR` it can compress uncompressed collected backup directories into tar.gz files and
   delete backups older than a configurable number of days or keep only the newest N archives.
 - For `doc_processor/logs` it can compress rotated logs and delete older compressed logs beyond retention.
+- With --snapshot it first takes an online (SQLite backup API) snapshot of the live database.
 
 Usage examples:
   # Dry-run report
@@ -17,6 +18,9 @@ Usage examples:
   # Compress uncompressed backup dirs, keep 5 newest, delete older than 90 days
   ./dev_tools/retention_and_rotate.py --compress-backups --keep 5 --delete-older-than 90 --confirm
 
+  # Take a fresh online snapshot, then keep the 5 newest
+  ./dev_tools/retention_and_rotate.py --snapshot --keep 5 --confirm
+
 This tool is intentionally conservative and prints planned actions unless --confirm is passed.
 """
 from __future__ import annotations
@@ -97,10 +101,13 @@ def load_env():
 def find_backups(backup_dir: Path):
     if not backup_dir.exists():
         return []
-    # consider both tar.gz files and collected_backup_* directories
+    # consider tar.gz files, collected_backup_* directories and online snapshots
+    # (<db>.backup.<timestamp>[.gz]); in-progress *.partial files are skipped
     items = []
     for p in backup_dir.iterdir():
-        if p.name.startswith('collected_backup_') or p.suffix in ('.gz', '.tgz', '.tar', '.zip'):
+        if p.name.endswith('.partial'):
+            continue
+        if p.name.startswith('collected_backup_') or '.backup.' in p.name or p.suffix in ('.gz', '.tgz', '.tar', '.zip'):
             items.append(p)
     # sort by mtime desc
     items.sort(key=lambda x: x.stat().st_mtime, reverse=True)
@@ -147,6 +154,7 @@ def main(argv: list[str] | None = None) -> int:
     p.add_argument('--keep', type=int, default=5, help='Number of newest backup archives to keep')
     p.add_argument('--delete-older-than', type=int, default=None, help='Delete backups older than DAYS')
     p.add_argument('--rotate-logs', action='store_true', help='Rotate/delete older compressed logs in logs dir')
+    p.add_argument('--snapshot', action='store_true', help='Take an online database snapshot before applying retention')
     p.add_argument('--confirm', action='store_true', help='Perform actions (default is dry-run)')
     args = p.parse_args(argv)
 
@@ -157,6 +165,14 @@ def main(argv: list[str] | None = None) -> int:
     dry_run = not args.confirm
     actions = []
 
+    if args.snapshot:
+        if dry_run:
+            actions.append(f'SNAPSHOT database -> {backup_dir}')
+        else:
+            from doc_processor.db_backup import online_backup
+            snap = online_backup(dest_dir=str(backup_dir))
+            actions.append(f"SNAPSHOTTED {snap['dest']} ({snap['size_bytes']} bytes, {snap['duration_seconds']}s)")
+
     backups = find_backups(backup_dir)
     # compress uncompressed dirs
     if args.compress_backups:
@@ -216,6 +216,12 @@ def create_app():
                     SHUTDOWN_EVENT.set()
                 except Exception:
                     pass
+                try:
+                    # End open SSE streams now rather than at their next heartbeat
+                    from .event_bus import hub
+                    hub.close()
+                except Exception:
+                    pass
                 try:
                     logging.shutdown()
                 except Exception:
@@ -253,6 +259,57 @@ def create_app():
     except Exception as e:
         logger.warning(f"Could not start batch cleanup on startup: {e}")
 
+    # Periodically move old exported batches into the cold-storage archive DB.
+    try:
+        if os.getenv('FAST_TEST_MODE', '0').lower() not in ('1', 'true', 't'):
+            from .db_archive import start_archive_scheduler
+            if start_archive_scheduler():
+                logger.info("Batch archive scheduler started")
+    except Exception as e:
+        logger.warning(f"Could not start batch archive scheduler: {e}")
+
+    # Pre-analyze files as they arrive in the intake folder.
+    try:
+        if os.getenv('FAST_TEST_MODE', '0').lower() not in ('1', 'true', 't'):
+            from .intake_watcher import start_intake_watcher
+            if start_intake_watcher():
+                logger.info("Intake watcher started")
+    except Exception as e:
+        logger.warning(f"Could not start intake watcher: {e}")
+
+    # Keep the cached DB diagnostics snapshot (and sqlite_stat1) fresh in the background.
+    try:
+        if os.getenv('FAST_TEST_MODE', '0').lower() not in ('1', 'true', 't'):
+            from .db_diagnostics import start_diagnostics_refresher
+            start_diagnostics_refresher()
+    except Exception as e:
+        logger.warning(f"Could not start DB diagnostics refresher: {e}")
+
+    # Adapt OCR/LLM concurrency to host load (and pause intake when memory is tight).
+    try:
+        if os.getenv('FAST_TEST_MODE', '0').lower() not in ('1', 'true', 't'):
+            from .governor import start_governor
+            if start_governor():
+                logger.info("Load governor started")
+    except Exception as e:
+        logger.warning(f"Could not start load governor: {e}")
+
+    # Queue resumes for batches whose processing run was cut off by a restart.
+    try:
+        if os.getenv('FAST_TEST_MODE', '0').lower() not in ('1', 'true', 't') and app_config.AUTO_RESUME_INTERRUPTED_BATCHES:
+            from .processing import schedule_interrupted_batch_resumes
+            schedule_interrupted_batch_resumes()
+    except Exception as e:
+        logger.warning(f"Could not schedule interrupted batch resumes: {e}")
+
+    # Resume queued/interrupted background jobs (handlers are registered by the blueprints above).
+    try:
+        if os.getenv('FAST_TEST_MODE', '0').lower() not in ('1', 'true', 't'):
+            from .job_queue import start_job_workers
+            start_job_workers()
+    except Exception as e:
+        logger.warning(f"Could not start job queue workers: {e}")
+
     logger.info("Flask application created and configured successfully")
     return app
 
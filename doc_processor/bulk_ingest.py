@@ -0,0 +1,413 @@
+"""
+Headless bulk ingestion for large paper backlogs.
+
+`process_batch()` and the UI work on whatever sits in INTAKE_DIR, one
+interactive-sized batch at a time. Backfilling years of scans needs a runner
+that works without Flask: `run_bulk_ingest` takes directory trees and/or file
+lists, splits them into shards of BULK_INGEST_BATCH_SIZE files and pushes
+each shard through the same stages as the UI:
+
+- detection (`DocumentTypeDetector.analyze_files`, cached, process pool);
+- single documents -> one batch via the staged normalize/OCR/AI pipeline;
+- batch scans -> one batch via the traditional page flow.
+
+Progress lives in a JSON manifest that is rewritten (atomically) after every
+shard step. Running again with the same manifest skips finished shards,
+continues unfinished ones in the batches they were assigned (the per-item
+checkpoints in `checkpoints` skip what was already done) and appends shards
+for files that were not known yet. While the load governor has paused intake
+(low memory) the runner waits before starting the next shard.
+
+With `distribute=True` the single documents of a shard are queued as
+per-document jobs (`processing.enqueue_batch_documents`) for worker processes
+(`python -m doc_processor.worker`) and the runner only waits for them: it
+starts no job threads of its own, and stops with the shard unfinished when
+no worker process has been alive for a while.
+
+Files are processed in place, like intake files: single-document PDFs are
+referenced where they are; images are moved to ARCHIVE_DIR/batch_<id>_images
+after conversion and batch-scan PDFs to ARCHIVE_DIR/batch_<id>_scans after
+their pages were extracted, so same-named files of different shards never meet. Shards never hold two
+files with the same name, since per-batch working files are named after it.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from .batch_guard import create_new_batch
+    from .checkpoints import get_checkpoints
+    from .config_manager import app_config
+    from .database import get_db_connection
+    from .document_detector import SUPPORTED_EXTENSIONS, DocumentAnalysis, get_detector
+    from .processing import _process_batch_traditional, _process_docs_into_fixed_batch_with_progress, enqueue_batch_documents
+    from .governor import intake_paused
+    from .job_queue import get_job, list_worker_processes
+    from .utils.pipeline import get_stage_stats
+except ImportError:
+    from batch_guard import create_new_batch
+    from checkpoints import get_checkpoints
+    from config_manager import app_config
+    from database import get_db_connection
+    from document_detector import SUPPORTED_EXTENSIONS, DocumentAnalysis, get_detector
+    from processing import _process_batch_traditional, _process_docs_into_fixed_batch_with_progress, enqueue_batch_documents
+    from governor import intake_paused
+    from job_queue import get_job, list_worker_processes
+    from utils.pipeline import get_stage_stats
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+PIPELINE_STAGES = ('normalize', 'ocr', 'ai')
+_PAUSE_POLL_SECONDS = 5.0
+_JOB_POLL_SECONDS = 1.0
+_NO_WORKER_GRACE_SECONDS = 120.0
+
+
+class NoWorkerProcessError(RuntimeError):
+    """Distributed document jobs are queued but no worker process is running."""
+
+
+@dataclass
+class IngestStats:
+    """Throughput counters for one `run_bulk_ingest` call."""
+    documents: int = 0
+    pages: int = 0
+    failed: int = 0
+    shards_done: int = 0
+    shards_total: int = 0
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    stage_items: Dict[str, int] = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_stage(self, name: str, seconds: float, items: int) -> None:
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+        self.stage_items[name] = self.stage_items.get(name, 0) + items
+
+    def as_dict(self) -> dict:
+        return {
+            'documents': self.documents,
+            'pages': self.pages,
+            'failed': self.failed,
+            'shards_done': self.shards_done,
+            'shards_total': self.shards_total,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'docs_per_second': round(self.docs_per_second, 3),
+            'pages_per_second': round(self.pages_per_second, 3),
+            'stages': {
+                name: {'seconds': round(seconds, 2), 'items': self.stage_items.get(name, 0)}
+                for name, seconds in self.stage_seconds.items()
+            },
+        }
+
+
+def discover_files(sources: Iterable[str], file_lists: Iterable[str] = ()) -> List[str]:
+    """Supported files under `sources` (directories are walked recursively) plus listed files.
+
+    A file list has one path per line; blank lines and `#` comments are
+    ignored. Paths are returned absolute, de-duplicated, in a stable order.
+    """
+    found: List[str] = []
+    for source in sources:
+        source = os.path.abspath(source)
+        if os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                found.extend(os.path.join(root, f) for f in sorted(files)
+                             if os.path.splitext(f)[1].lower() in SUPPORTED_EXTENSIONS)
+        elif os.path.splitext(source)[1].lower() in SUPPORTED_EXTENSIONS:
+            found.append(source)
+        else:
+            logger.warning(f"Skipping unsupported or missing source: {source}")
+    for list_path in file_lists:
+        with open(list_path, encoding='utf-8') as fh:
+            for line in fh:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    found.append(os.path.abspath(line))
+    return list(dict.fromkeys(found))
+
+
+def plan_shards(files: List[str], batch_size: int) -> List[List[str]]:
+    """Split files into shards of at most `batch_size`, with unique file names per shard."""
+    batch_size = max(1, int(batch_size))
+    shards: List[List[str]] = []
+    names: List[set] = []
+    first_open = 0
+    for path in files:
+        name = os.path.basename(path).lower()
+        for index in range(first_open, len(shards) + 1):
+            if index == len(shards):
+                shards.append([])
+                names.append(set())
+            if len(shards[index]) < batch_size and name not in names[index]:
+                shards[index].append(path)
+                names[index].add(name)
+                break
+        while first_open < len(shards) and len(shards[first_open]) >= batch_size:
+            first_open += 1
+    return shards
+
+
+def load_manifest(path: str) -> dict:
+    """The manifest at `path`, or a new empty one."""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported bulk ingest manifest version in {path}: {manifest.get('version')}")
+        return manifest
+    return {'version': MANIFEST_VERSION, 'created_at': datetime.now().isoformat(), 'shards': [], 'runs': []}
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    """Write the manifest atomically (a crash leaves the previous version)."""
+    manifest['updated_at'] = datetime.now().isoformat()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+def _new_shard(files: List[str]) -> dict:
+    return {
+        'files': files,
+        'status': 'pending',
+        'analyses': {},
+        'single_batch_id': None,
+        'scan_batch_id': None,
+        'single_done': False,
+        'scan_done': False,
+        'failed': {},
+    }
+
+
+def _run_finished(batch_id: int) -> bool:
+    """True when a batch's run completed (its checkpoints are gone but it has rows).
+
+    A run commits its checkpoint manifest before writing any row, so rows
+    without checkpoints can only mean the run finished.
+    """
+    if get_checkpoints(batch_id):
+        return False
+    conn = get_db_connection()
+    try:
+        return bool(
+            conn.execute("SELECT 1 FROM single_documents WHERE batch_id = ? LIMIT 1", (batch_id,)).fetchone()
+            or conn.execute("SELECT 1 FROM pages WHERE batch_id = ? LIMIT 1", (batch_id,)).fetchone()
+        )
+    finally:
+        conn.close()
+
+
+def _detect(shard: dict, stats: IngestStats, detect_workers: Optional[int]) -> None:
+    present = [p for p in shard['files'] if os.path.exists(p)]
+    for path in shard['files']:
+        if path not in present:
+            shard['failed'][path] = 'file missing before detection'
+    started = time.perf_counter()
+    analyses = get_detector().analyze_files(present, max_workers=detect_workers) if present else []
+    stats.add_stage('detect', time.perf_counter() - started, len(present))
+    for analysis in analyses:
+        shard['analyses'][analysis.file_path] = {
+            'strategy': analysis.processing_strategy,
+            'page_count': analysis.page_count,
+            'file_size_mb': analysis.file_size_mb,
+            'confidence': analysis.confidence,
+            'pdf_path': analysis.pdf_path,
+        }
+    shard['status'] = 'detected'
+
+
+def _single_documents(shard: dict, paths: List[str]) -> List[DocumentAnalysis]:
+    return [
+        DocumentAnalysis(
+            file_path=p,
+            file_size_mb=shard['analyses'][p]['file_size_mb'],
+            page_count=shard['analyses'][p]['page_count'],
+            processing_strategy='single_document',
+            confidence=shard['analyses'][p]['confidence'],
+            reasoning=['bulk ingest'],
+            pdf_path=shard['analyses'][p].get('pdf_path'),
+        )
+        for p in paths
+    ]
+
+
+def _ingest_singles(shard: dict, paths: List[str], stats: IngestStats, progress: Callable[[str], None]) -> None:
+    by_name = {os.path.basename(p): p for p in paths}
+    docs = _single_documents(shard, paths)
+    for event in _process_docs_into_fixed_batch_with_progress(docs, shard['single_batch_id']):
+        if event.get('document_complete'):
+            path = by_name.get(event.get('filename'))
+            stats.documents += 1
+            stats.pages += shard['analyses'].get(path, {}).get('page_count') or 0
+            progress(f"✓ {event.get('filename')}")
+        elif event.get('error'):
+            if not event.get('filename'):
+                raise RuntimeError(event['error'])
+            stats.failed += 1
+            path = by_name.get(event['filename'], event['filename'])
+            shard['failed'][path] = event['error']
+            progress(f"✗ {event['filename']}: {event['error']}")
+
+
+def _ingest_singles_distributed(shard: dict, paths: List[str], stats: IngestStats,
+                                progress: Callable[[str], None]) -> None:
+    """Queue the shard's single documents as per-document jobs and wait for the workers."""
+    batch_id = shard['single_batch_id']
+    pending = dict(zip(enqueue_batch_documents(_single_documents(shard, paths), batch_id), paths))
+    progress(f"queued {len(pending)} document job(s) for batch {batch_id}")
+    no_workers_since = None
+    while pending:
+        time.sleep(_JOB_POLL_SECONDS)
+        if list_worker_processes():
+            no_workers_since = None
+        elif no_workers_since is None:
+            no_workers_since = time.monotonic()
+        elif time.monotonic() - no_workers_since >= _NO_WORKER_GRACE_SECONDS:
+            # The jobs stay queued; re-running with the manifest waits for them again
+            raise NoWorkerProcessError(
+                f"no worker process for {int(_NO_WORKER_GRACE_SECONDS)}s; {len(pending)} document job(s) of batch "
+                f"{batch_id} still queued (start python -m doc_processor.worker and re-run to resume)")
+        for job_id, path in list(pending.items()):
+            job = get_job(job_id)
+            status = job['status'] if job else 'failed'
+            if status == 'succeeded':
+                del pending[job_id]
+                if not (job.get('result') or {}).get('skipped'):
+                    stats.documents += 1
+                    stats.pages += shard['analyses'][path]['page_count'] or 0
+                progress(f"✓ {os.path.basename(path)}")
+            elif status == 'failed':
+                del pending[job_id]
+                stats.failed += 1
+                error = (job or {}).get('last_error') or 'job missing'
+                shard['failed'][path] = error
+                progress(f"✗ {os.path.basename(path)}: {error}")
+
+
+def _ingest_scans(shard: dict, paths: List[str], stats: IngestStats, progress: Callable[[str], None]) -> None:
+    started = time.perf_counter()
+    ok = _process_batch_traditional(paths, into_batch_id=shard['scan_batch_id'])
+    stats.add_stage('batch_scan', time.perf_counter() - started, len(paths))
+    if not ok:
+        raise RuntimeError(f"batch scan processing failed for batch {shard['scan_batch_id']}")
+    stats.documents += len(paths)
+    stats.pages += sum(shard['analyses'][p]['page_count'] or 0 for p in paths)
+    progress(f"✓ {len(paths)} batch scan file(s) into batch {shard['scan_batch_id']}")
+
+
+def run_bulk_ingest(sources: Iterable[str], manifest_path: str, file_lists: Iterable[str] = (),
+                    batch_size: Optional[int] = None, detect_workers: Optional[int] = None,
+                    on_progress: Optional[Callable[[IngestStats, str], None]] = None,
+                    dry_run: bool = False, distribute: bool = False) -> dict:
+    """Ingest all supported files under `sources` / in `file_lists`, resumably.
+
+    `on_progress(stats, message)` is called after each document and shard.
+    `distribute` leaves single documents to worker processes (see module doc).
+    Returns the run report (IngestStats.as_dict plus shard/batch details).
+    A shard that fails is left unfinished in the manifest for the next run;
+    without worker processes a distributed run stops at the first such shard.
+    """
+    batch_size = batch_size or app_config.BULK_INGEST_BATCH_SIZE
+    manifest = load_manifest(manifest_path)
+    known = {p for shard in manifest['shards'] for p in shard['files']}
+    new_files = [p for p in discover_files(sources, file_lists) if p not in known]
+    manifest['shards'].extend(_new_shard(files) for files in plan_shards(new_files, batch_size))
+    pending = [(i, s) for i, s in enumerate(manifest['shards']) if s['status'] != 'done']
+
+    stats = IngestStats(shards_total=len(pending))
+    report = {'manifest': os.path.abspath(manifest_path), 'new_files': len(new_files),
+              'shards': [{'index': i, 'files': len(s['files'])} for i, s in pending]}
+    if dry_run:
+        return dict(report, **stats.as_dict())
+    save_manifest(manifest_path, manifest)
+    if distribute:
+        # Queued document jobs are for worker processes; don't start a job pool here
+        app_config.JOB_QUEUE_WORKERS = 0
+    logger.info(f"Bulk ingest: {len(new_files)} new file(s), {len(pending)} shard(s) to process")
+
+    stage_base = get_stage_stats()
+
+    def progress(message: str) -> None:
+        for name in PIPELINE_STAGES:
+            now = get_stage_stats().get(name, {})
+            base = stage_base.get(name, {})
+            stats.stage_seconds[name] = now.get('seconds', 0.0) - base.get('seconds', 0.0)
+            stats.stage_items[name] = int(now.get('items', 0) - base.get('items', 0))
+        if on_progress is not None:
+            on_progress(stats, message)
+
+    for index, shard in pending:
+        label = f"shard {index + 1}/{len(manifest['shards'])}"
+        if intake_paused():
+            progress(f"{label} waiting: intake paused (low memory)")
+            while intake_paused():
+                time.sleep(_PAUSE_POLL_SECONDS)
+        try:
+            if shard['status'] == 'pending':
+                _detect(shard, stats, detect_workers)
+                save_manifest(manifest_path, manifest)
+            singles = [p for p, a in shard['analyses'].items() if a['strategy'] == 'single_document']
+            scans = [p for p, a in shard['analyses'].items() if a['strategy'] != 'single_document']
+            ingest_singles = _ingest_singles_distributed if distribute else _ingest_singles
+            for kind, paths, ingest in (('single', singles, ingest_singles), ('scan', scans, _ingest_scans)):
+                if not paths or shard[f'{kind}_done']:
+                    continue
+                batch_id = shard[f'{kind}_batch_id']
+                if batch_id is None:
+                    status = 'processing' if kind == 'single' else app_config.STATUS_PENDING_VERIFICATION
+                    shard[f'{kind}_batch_id'] = create_new_batch(status)
+                    save_manifest(manifest_path, manifest)
+                elif _run_finished(batch_id):
+                    logger.info(f"{label}: batch {batch_id} already finished")
+                    shard[f'{kind}_done'] = True
+                    save_manifest(manifest_path, manifest)
+                    continue
+                ingest(shard, paths, stats, progress)
+                shard[f'{kind}_done'] = True
+                save_manifest(manifest_path, manifest)
+            shard['status'] = 'done'
+            shard.pop('error', None)
+            stats.shards_done += 1
+            save_manifest(manifest_path, manifest)
+            progress(f"{label} done (batches: {shard['single_batch_id']}, {shard['scan_batch_id']})")
+        except Exception as e:
+            logger.error(f"Bulk ingest {label} failed: {e}")
+            shard['error'] = str(e)
+            save_manifest(manifest_path, manifest)
+            progress(f"✗ {label} failed: {e}")
+            if isinstance(e, NoWorkerProcessError):
+                break  # every later shard would wait for workers too
+
+    progress('finished')
+    result = stats.as_dict()
+    manifest['runs'].append(dict(result, finished_at=datetime.now().isoformat()))
+    save_manifest(manifest_path, manifest)
+    report['shards'] = [
+        {'index': i, 'files': len(s['files']), 'status': s['status'], 'single_batch_id': s['single_batch_id'],
+         'scan_batch_id': s['scan_batch_id'], 'failed': len(s['failed']), 'error': s.get('error')}
+        for i, s in pending
+    ]
+    return dict(report, **result)
@@ -0,0 +1,141 @@
+"""
+Cooperative cancellation for long-running processing.
+
+Cancelling a smart-processing run used to only stop the consumer of its
+progress events: a document already in OCR or waiting on the LLM kept its
+worker thread and gate slot until it finished. Work now runs under a
+`CancellationToken`:
+
+- the token is made current with `use_token(...)` / `iterate_with_token(...)`
+  (a context variable, like the scheduler lane) and `utils.pipeline` hands
+  the caller's context to its stage threads, so deep code reaches it through
+  `current_token()` without threading it through every signature;
+- a token can be backed by an external flag (`check`, e.g. the smart token in
+  the shared status store, so a cancel request served by another worker
+  process is seen); the flag is polled at most every CANCEL_POLL_SECONDS;
+- code checks it between units of work (`check_cancelled()` between pages
+  and pipeline stages, while waiting for a scheduler slot) and blocking calls
+  go through `run_cancellable`, which stops waiting as soon as the token is
+  cancelled (LLM requests also stop reading their streamed response, which
+  closes the HTTP request).
+
+Cancellation raises `OperationCancelled`. Broad `except Exception` handlers
+deep in OCR/LLM helpers may turn it into an error result; the stage that
+called them re-checks the token afterwards.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+try:
+    from .exceptions import OperationCancelled
+except ImportError:
+    from exceptions import OperationCancelled
+
+CANCEL_POLL_SECONDS = 0.25
+
+_current: contextvars.ContextVar = contextvars.ContextVar('cancellation_token', default=None)
+
+
+class CancellationToken:
+    """Cancellation flag shared by the threads working on one operation."""
+
+    def __init__(self, check: Optional[Callable[[], bool]] = None, name: str = ''):
+        self.name = name
+        self._check = check
+        self._event = threading.Event()
+        self._checked_at = 0.0
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self._check is not None and time.monotonic() - self._checked_at >= CANCEL_POLL_SECONDS:
+            self._checked_at = time.monotonic()
+            try:
+                if self._check():
+                    self.cancel()
+            except Exception:
+                pass
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise OperationCancelled(f"{self.name or 'operation'} cancelled")
+
+
+def current_token() -> Optional[CancellationToken]:
+    return _current.get()
+
+
+def is_cancelled() -> bool:
+    token = _current.get()
+    return token is not None and token.cancelled
+
+
+def check_cancelled() -> None:
+    """Raise OperationCancelled if the current token was cancelled."""
+    token = _current.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def use_token(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """Make `token` current for the block."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def iterate_with_token(token: CancellationToken, iterable: Iterable[Any]) -> Iterator[Any]:
+    """Yield from `iterable` with `token` current while it produces each item
+    (never across our own yields; see `scheduler.iterate_in_lane`)."""
+    iterator = iter(iterable)
+    while True:
+        with use_token(token):
+            try:
+                item = next(iterator)
+            except StopIteration as stop:
+                return stop.value
+        yield item
+
+
+def run_cancellable(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking call, returning early with OperationCancelled if the current token is cancelled.
+
+    Without a current token this is a plain call. Otherwise `func` runs in a
+    daemon thread with the caller's context (so it can watch the token itself
+    and stop its own I/O); the caller stops waiting within CANCEL_POLL_SECONDS
+    of cancellation and the abandoned call's result is discarded.
+    """
+    token = _current.get()
+    if token is None:
+        return func(*args, **kwargs)
+    token.raise_if_cancelled()
+    done = threading.Event()
+    outcome: dict = {}
+
+    def _run():
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            done.set()
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(_run,), daemon=True,
+                     name=f"cancellable-{getattr(func, '__name__', 'call')}").start()
+    while not done.wait(CANCEL_POLL_SECONDS):
+        token.raise_if_cancelled()
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('result')
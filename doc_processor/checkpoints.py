@@ -0,0 +1,164 @@
+"""
+Stage checkpoints for batch processing, so interrupted batches can resume.
+
+A process that dies halfway through a batch used to leave it in `processing`
+with no record of what was finished; recovery meant manual scripts and OCR
+was often redone. The processing flows now record, in the
+`processing_checkpoints` table of the main database:
+
+- a run manifest per batch (item key `__batch__`, stage `started`) holding
+  the flow name and its input files;
+- per-document stages of the single-document pipeline (`normalized` with the
+  created row id, `ocr`, `persisted`) and per-page / per-file stages of the
+  traditional page flow (`ocr` per page, `archived` per file).
+
+Checkpoints that belong to a DB write are recorded on the same connection
+before its commit, so a checkpoint never claims work that was rolled back.
+A finished run deletes its checkpoints; a manifest that stays behind without
+recent activity marks a resumable batch (see `processing.resume_batch`).
+"""
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BATCH_KEY = '__batch__'
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def _get_db_connection() -> sqlite3.Connection:
+    try:
+        from .database import get_db_connection
+    except ImportError:
+        from database import get_db_connection
+    return get_db_connection()
+
+
+def _write(conn: Optional[sqlite3.Connection], sql: str, params: tuple) -> None:
+    """Run on the caller's connection (caller commits) or on a short-lived one."""
+    if conn is not None:
+        conn.execute(sql, params)
+        return
+    own = _get_db_connection()
+    try:
+        own.execute(sql, params)
+        own.commit()
+    finally:
+        own.close()
+
+
+def page_key(file_path: str, page_num: int) -> str:
+    return f"{file_path}#page={page_num}"
+
+
+def record_checkpoint(batch_id: int, item_key: str, stage: str, data: Optional[dict] = None,
+                      conn: Optional[sqlite3.Connection] = None) -> None:
+    """Mark `stage` done for one item of a batch (idempotent)."""
+    _write(conn, """
+        INSERT INTO processing_checkpoints (batch_id, item_key, stage, data, updated_at) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(batch_id, item_key, stage) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+    """, (batch_id, item_key, stage, json.dumps(data) if data is not None else None, time.time()))
+
+
+def get_checkpoints(batch_id: int, conn: Optional[sqlite3.Connection] = None) -> Dict[str, Dict[str, Any]]:
+    """{item_key: {stage: data}} for a batch."""
+    own = conn is None
+    conn = conn or _get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT item_key, stage, data FROM processing_checkpoints WHERE batch_id = ?", (batch_id,)
+        ).fetchall()
+    finally:
+        if own:
+            conn.close()
+    result: Dict[str, Dict[str, Any]] = {}
+    for item_key, stage, data in rows:
+        try:
+            value = json.loads(data) if data else {}
+        except ValueError:
+            value = {}
+        result.setdefault(item_key, {})[stage] = value
+    return result
+
+
+def start_batch_run(batch_id: int, flow: str, items: Iterable[dict], conn: Optional[sqlite3.Connection] = None) -> None:
+    """Record (or extend) the run manifest: which flow processes which input files.
+
+    Items are dicts with at least `file_path`; a batch that receives a second
+    set of files before finishing keeps the union.
+    """
+    existing = get_checkpoints(batch_id, conn).get(BATCH_KEY, {}).get('started') or {}
+    merged: Dict[str, dict] = {}
+    if existing.get('flow') == flow:
+        merged = {item['file_path']: item for item in existing.get('items', [])}
+    for item in items:
+        merged[item['file_path']] = item
+    record_checkpoint(batch_id, BATCH_KEY, 'started', {
+        'flow': flow,
+        'items': list(merged.values()),
+        'started_at': existing.get('started_at') or time.time(),
+    }, conn=conn)
+
+
+def finish_batch_run(batch_id: int, conn: Optional[sqlite3.Connection] = None) -> None:
+    """The run completed: its checkpoints are no longer needed."""
+    _write(conn, "DELETE FROM processing_checkpoints WHERE batch_id = ?", (batch_id,))
+
+
+def list_resumable_batches(stale_seconds: Optional[float] = None) -> List[dict]:
+    """Batches with an unfinished run and no checkpoint activity for `stale_seconds`.
+
+    The quiet period (BATCH_RESUME_STALE_SECONDS) keeps a batch that another
+    live process is still working on out of the list.
+    """
+    if stale_seconds is None:
+        stale_seconds = float(getattr(_config(), 'BATCH_RESUME_STALE_SECONDS', 300))
+    conn = _get_db_connection()
+    try:
+        runs = conn.execute("""
+            SELECT c.batch_id, c.data, b.status,
+                   (SELECT MAX(updated_at) FROM processing_checkpoints x WHERE x.batch_id = c.batch_id) AS last_activity,
+                   (SELECT COUNT(*) FROM processing_checkpoints x
+                     WHERE x.batch_id = c.batch_id AND x.stage IN ('persisted', 'archived')) AS items_done
+            FROM processing_checkpoints c
+            LEFT JOIN batches b ON b.id = c.batch_id
+            WHERE c.item_key = ? AND c.stage = 'started'
+            ORDER BY c.batch_id
+        """, (BATCH_KEY,)).fetchall()
+    finally:
+        conn.close()
+    now = time.time()
+    result = []
+    for batch_id, data, status, last_activity, items_done in runs:
+        if status is None:
+            # Batch deleted mid-run: nothing left to resume
+            finish_batch_run(batch_id)
+            continue
+        idle = now - (last_activity or 0)
+        if idle < stale_seconds:
+            continue
+        try:
+            manifest = json.loads(data) if data else {}
+        except ValueError:
+            manifest = {}
+        result.append({
+            'batch_id': batch_id,
+            'status': status,
+            'flow': manifest.get('flow'),
+            'items_total': len(manifest.get('items', [])),
+            'items_done': items_done,
+            'started_at': manifest.get('started_at'),
+            'last_activity': last_activity,
+            'idle_seconds': round(idle, 1),
+        })
+    return result
@@ -43,6 +43,28 @@ class AppConfig:
     # Persistent normalized PDF cache (for image->PDF conversions reused across runs)
     NORMALIZED_DIR: str = "normalized"
     NORMALIZED_CACHE_MAX_AGE_DAYS: int = 14
+    NORMALIZED_CACHE_MAX_BYTES: int = 2 * 1024 ** 3  # LRU byte budget for normalized PDFs (0 = unlimited)
+    NORMALIZED_CACHE_RECONCILE_HOURS: float = 12.0  # Index/directory reconcile interval (0 disables)
+    INTAKE_ANALYSIS_WORKERS: int = 1  # Processes used by analyze_intake_directory (1 = serial, 0 = one per CPU)
+    INTAKE_ANALYSIS_TIMEOUT_SECONDS: int = 180  # Per-file limit in parallel analysis before a batch_scan fallback
+    INTAKE_ANALYSIS_CACHE_ENABLED: bool = True  # Reuse per-file analyses from the SQLite intake_analysis_cache
+    PIPELINE_OCR_WORKERS: int = 1  # Threads in the OCR stage of single-document processing
+    PIPELINE_AI_WORKERS: int = 1  # Threads in the AI classification stage of single-document processing
+    PIPELINE_QUEUE_SIZE: int = 2  # Documents buffered between pipeline stages (back-pressure)
+    BULK_INGEST_BATCH_SIZE: int = 100  # Files per batch (shard) in dev_tools/bulk_ingest.py
+    SCHEDULER_OCR_SLOTS: int = 2  # Pages OCR'd at once per process; interactive work is served first
+    SCHEDULER_LLM_SLOTS: int = 1  # Concurrent LLM requests per process; interactive work is served first
+    GOVERNOR_ENABLED: bool = True  # Resize the OCR/LLM slots to host load; pause intake when memory is tight
+    GOVERNOR_INTERVAL_SECONDS: float = 10.0  # Seconds between load samples
+    GOVERNOR_OCR_MAX_SLOTS: int = 0  # Upper bound for OCR slots (0 = CPU count)
+    GOVERNOR_LLM_MAX_SLOTS: int = 2  # Upper bound for LLM slots
+    GOVERNOR_CPU_HIGH_PERCENT: float = 90.0  # CPU/load per core above this sheds an OCR slot
+    GOVERNOR_CPU_LOW_PERCENT: float = 60.0  # CPU/load per core below this (with OCR queued) adds one
+    GOVERNOR_MIN_FREE_MEMORY_PERCENT: float = 10.0  # Below this: one slot each and intake paused
+    GOVERNOR_LLM_LATENCY_HIGH_SECONDS: float = 30.0  # Average Ollama latency above this sheds an LLM slot
+    INTAKE_WATCH_ENABLED: bool = True  # Pre-analyze files as they land in INTAKE_DIR (inotify, polling fallback)
+    INTAKE_WATCH_SETTLE_SECONDS: float = 2.0  # Size/mtime must be stable this long before a file is processed
+    INTAKE_WATCH_POLL_SECONDS: float = 5.0  # Directory scan interval when inotify is unavailable
 
     # --- AI Service Configuration ---
     OLLAMA_HOST: Optional[str] = None
@@ -69,6 +91,45 @@ class AppConfig:
     OCR_RESCAN_DPI: int = 180  # Default DPI for rescan OCR rasterization
     OCR_RENDER_SCALE: float = 2.0  # Scale factor applied when rasterizing PDF pages for OCR (2.0 ~= 144 DPI if base 72)
     OCR_OVERLAY_TEXT_LIMIT: int = 2000  # Max characters of OCR text embedded per page (invisible layer)
+    DETECTOR_SAMPLE_DPI: int = 150  # DPI for in-memory page renders used by detector OSD/OCR sampling
+    DETECTOR_SAMPLE_MAX_PIXELS: int = 2000  # Cap on the long edge of detector sample renders (0 = no cap)
+    DETECTOR_SAMPLE_TOP_FRACTION: float = 1.0  # Fraction of each sampled page (from the top) to OCR
+    STRATEGY_MODEL_PATH: Optional[str] = None  # Learned strategy classifier (default: strategy_model.json beside DATABASE_PATH)
+    STRATEGY_MODEL_MIN_SAMPLES: int = 20  # Ground-truth files required before the classifier is trained
+    STRATEGY_MODEL_MIN_ACCURACY: float = 0.85  # Cross-validated accuracy required before the classifier is consulted
+    STRATEGY_MODEL_MIN_CONFIDENCE: float = 0.85  # Predictions below this probability still go to the LLM
+
+    # --- Document Text Storage ---
+    DOCUMENT_TEXT_COMPRESSION: bool = True  # zlib-compress OCR text / AI summaries stored in the document_text side table
+    DOCUMENT_TEXT_COMPRESS_MIN_BYTES: int = 512  # Texts shorter than this are stored uncompressed
+    DAL_CACHE_ENABLED: bool = True  # Memoize read-mostly DAL queries (invalidated by data_version + table counters)
+
+    # --- Cold Storage Archival ---
+    ARCHIVE_DATABASE_PATH: Optional[str] = None  # Archive SQLite file (default: <DATABASE_PATH stem>_archive.db)
+    ARCHIVE_BATCHES_AFTER_DAYS: int = 90  # Exported batches older than this move to the archive DB
+    ARCHIVE_JOB_INTERVAL_HOURS: float = 24.0  # Background archival cadence (0 disables the scheduler)
+
+    # --- File Fingerprints ---
+    FINGERPRINT_DB_PATH: Optional[str] = None  # Digest memo SQLite file (default: file_fingerprints.db beside DATABASE_PATH)
+    FINGERPRINT_MMAP_THRESHOLD_BYTES: int = 8 * 1024 * 1024  # Full digests of files at least this large are hashed via mmap
+    FINGERPRINT_DB_MAX_ENTRIES: int = 100000  # Oldest memoized digests are pruned beyond this count
+
+    # --- Background Job Queue ---
+    JOB_QUEUE_DB_PATH: Optional[str] = None  # Job queue SQLite file (default: jobs.db beside DATABASE_PATH)
+    JOB_QUEUE_WORKERS: int = 4  # Worker threads claiming queued jobs
+    JOB_QUEUE_POLL_SECONDS: float = 2.0  # Idle workers re-check the queue at least this often
+    JOB_QUEUE_LEASE_SECONDS: float = 60.0  # Claims not heartbeated within this window are reclaimed
+    JOB_QUEUE_RETRY_BASE_SECONDS: float = 5.0  # First retry delay; doubles per attempt (with jitter)
+    JOB_QUEUE_RETRY_MAX_SECONDS: float = 300.0  # Upper bound for the retry delay
+    JOB_QUEUE_CONCURRENCY: str = ""  # Per-type running limits, e.g. "batch.smart=1,export.batch=2"
+    JOB_QUEUE_RETENTION_DAYS: float = 7.0  # Finished jobs older than this are pruned (0 keeps them)
+    STATUS_STORE_DB_PATH: Optional[str] = None  # Shared progress/status SQLite file (default: status.db beside DATABASE_PATH)
+    STATUS_STORE_POLL_SECONDS: float = 0.25  # How quickly SSE/waiters notice status written by other processes
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment interval on idle SSE connections
+    SSE_REPLAY_EVENTS: int = 256  # Recent events kept per SSE topic for Last-Event-ID replay
+    SSE_SUBSCRIBER_QUEUE_SIZE: int = 1000  # Events buffered per SSE connection before it is dropped as too slow
+    AUTO_RESUME_INTERRUPTED_BATCHES: bool = True  # Queue resumes at startup for batches a previous process left mid-run
+    BATCH_RESUME_STALE_SECONDS: float = 300.0  # Checkpoint inactivity before an unfinished run counts as interrupted
 
     # --- Debugging and Feature Flags ---
     DEBUG_SKIP_OCR: bool = False
@@ -91,6 +152,10 @@ class AppConfig:
     # under $XDG_DATA_HOME or ~/.local/share/doc_processor/db_backups. This
     # keeps backup artifacts out of the repository by default.
     DB_BACKUP_DIR: Optional[str] = None
+    DB_BACKUP_PAGES_PER_STEP: int = 1024  # Pages copied per SQLite backup API step
+    DB_BACKUP_STEP_SLEEP_MS: int = 25  # Pause between backup steps so writers are not starved
+    DB_BACKUP_COMPRESS: bool = False  # gzip online snapshots after the consistency check
+    DB_DIAGNOSTICS_REFRESH_SECONDS: int = 300  # Background refresh of the cached /admin/db_diagnostics snapshot (0 disables)
 
     # --- Status Constants ---
     # These are application-level constants and are not meant to be configured
@@ -186,6 +251,28 @@ class AppConfig:
                 FILING_CABINET_DIR=validate_directory(get_env("FILING_CABINET_DIR", cls.FILING_CABINET_DIR), "FILING_CABINET"),
                 NORMALIZED_DIR=validate_directory(get_env("NORMALIZED_DIR", cls.NORMALIZED_DIR), "NORMALIZED"),
                 NORMALIZED_CACHE_MAX_AGE_DAYS=int(get_env("NORMALIZED_CACHE_MAX_AGE_DAYS", str(cls.NORMALIZED_CACHE_MAX_AGE_DAYS))),
+                NORMALIZED_CACHE_MAX_BYTES=int(get_env("NORMALIZED_CACHE_MAX_BYTES", str(cls.NORMALIZED_CACHE_MAX_BYTES))),
+                NORMALIZED_CACHE_RECONCILE_HOURS=float(get_env("NORMALIZED_CACHE_RECONCILE_HOURS", str(cls.NORMALIZED_CACHE_RECONCILE_HOURS))),
+                INTAKE_ANALYSIS_WORKERS=int(get_env("INTAKE_ANALYSIS_WORKERS", str(cls.INTAKE_ANALYSIS_WORKERS))),
+                INTAKE_ANALYSIS_TIMEOUT_SECONDS=int(get_env("INTAKE_ANALYSIS_TIMEOUT_SECONDS", str(cls.INTAKE_ANALYSIS_TIMEOUT_SECONDS))),
+                INTAKE_ANALYSIS_CACHE_ENABLED=get_env("INTAKE_ANALYSIS_CACHE_ENABLED", str(cls.INTAKE_ANALYSIS_CACHE_ENABLED)).lower() in ("true", "1", "t"),
+                PIPELINE_OCR_WORKERS=int(get_env("PIPELINE_OCR_WORKERS", str(cls.PIPELINE_OCR_WORKERS))),
+                PIPELINE_AI_WORKERS=int(get_env("PIPELINE_AI_WORKERS", str(cls.PIPELINE_AI_WORKERS))),
+                PIPELINE_QUEUE_SIZE=int(get_env("PIPELINE_QUEUE_SIZE", str(cls.PIPELINE_QUEUE_SIZE))),
+                BULK_INGEST_BATCH_SIZE=int(get_env("BULK_INGEST_BATCH_SIZE", str(cls.BULK_INGEST_BATCH_SIZE))),
+                SCHEDULER_OCR_SLOTS=int(get_env("SCHEDULER_OCR_SLOTS", str(cls.SCHEDULER_OCR_SLOTS))),
+                SCHEDULER_LLM_SLOTS=int(get_env("SCHEDULER_LLM_SLOTS", str(cls.SCHEDULER_LLM_SLOTS))),
+                GOVERNOR_ENABLED=get_env("GOVERNOR_ENABLED", str(cls.GOVERNOR_ENABLED)).lower() in ("true", "1", "t"),
+                GOVERNOR_INTERVAL_SECONDS=float(get_env("GOVERNOR_INTERVAL_SECONDS", str(cls.GOVERNOR_INTERVAL_SECONDS))),
+                GOVERNOR_OCR_MAX_SLOTS=int(get_env("GOVERNOR_OCR_MAX_SLOTS", str(cls.GOVERNOR_OCR_MAX_SLOTS))),
+                GOVERNOR_LLM_MAX_SLOTS=int(get_env("GOVERNOR_LLM_MAX_SLOTS", str(cls.GOVERNOR_LLM_MAX_SLOTS))),
+                GOVERNOR_CPU_HIGH_PERCENT=float(get_env("GOVERNOR_CPU_HIGH_PERCENT", str(cls.GOVERNOR_CPU_HIGH_PERCENT))),
+                GOVERNOR_CPU_LOW_PERCENT=float(get_env("GOVERNOR_CPU_LOW_PERCENT", str(cls.GOVERNOR_CPU_LOW_PERCENT))),
+                GOVERNOR_MIN_FREE_MEMORY_PERCENT=float(get_env("GOVERNOR_MIN_FREE_MEMORY_PERCENT", str(cls.GOVERNOR_MIN_FREE_MEMORY_PERCENT))),
+                GOVERNOR_LLM_LATENCY_HIGH_SECONDS=float(get_env("GOVERNOR_LLM_LATENCY_HIGH_SECONDS", str(cls.GOVERNOR_LLM_LATENCY_HIGH_SECONDS))),
+                INTAKE_WATCH_ENABLED=get_env("INTAKE_WATCH_ENABLED", str(cls.INTAKE_WATCH_ENABLED)).lower() in ("true", "1", "t"),
+                INTAKE_WATCH_SETTLE_SECONDS=float(get_env("INTAKE_WATCH_SETTLE_SECONDS", str(cls.INTAKE_WATCH_SETTLE_SECONDS))),
+                INTAKE_WATCH_POLL_SECONDS=float(get_env("INTAKE_WATCH_POLL_SECONDS", str(cls.INTAKE_WATCH_POLL_SECONDS))),
                 ARCHIVE_RETENTION_DAYS=archive_retention_days,
 
                 # AI Service Configuration
@@ -218,11 +305,46 @@ class AppConfig:
                 OCR_RESCAN_DPI=int(get_env("RESCAN_OCR_DPI", str(cls.OCR_RESCAN_DPI))),
                 OCR_RENDER_SCALE=float(get_env("OCR_RENDER_SCALE", str(cls.OCR_RENDER_SCALE))),
                 OCR_OVERLAY_TEXT_LIMIT=int(get_env("OCR_OVERLAY_TEXT_LIMIT", str(cls.OCR_OVERLAY_TEXT_LIMIT))),
+                DETECTOR_SAMPLE_DPI=int(get_env("DETECTOR_SAMPLE_DPI", str(cls.DETECTOR_SAMPLE_DPI))),
+                DETECTOR_SAMPLE_MAX_PIXELS=int(get_env("DETECTOR_SAMPLE_MAX_PIXELS", str(cls.DETECTOR_SAMPLE_MAX_PIXELS))),
+                DETECTOR_SAMPLE_TOP_FRACTION=float(get_env("DETECTOR_SAMPLE_TOP_FRACTION", str(cls.DETECTOR_SAMPLE_TOP_FRACTION))),
+                STRATEGY_MODEL_PATH=get_optional_env("STRATEGY_MODEL_PATH"),
+                STRATEGY_MODEL_MIN_SAMPLES=int(get_env("STRATEGY_MODEL_MIN_SAMPLES", str(cls.STRATEGY_MODEL_MIN_SAMPLES))),
+                STRATEGY_MODEL_MIN_ACCURACY=float(get_env("STRATEGY_MODEL_MIN_ACCURACY", str(cls.STRATEGY_MODEL_MIN_ACCURACY))),
+                STRATEGY_MODEL_MIN_CONFIDENCE=float(get_env("STRATEGY_MODEL_MIN_CONFIDENCE", str(cls.STRATEGY_MODEL_MIN_CONFIDENCE))),
+                DOCUMENT_TEXT_COMPRESSION=get_env("DOCUMENT_TEXT_COMPRESSION", str(cls.DOCUMENT_TEXT_COMPRESSION)).lower() in ("true", "1", "t"),
+                DOCUMENT_TEXT_COMPRESS_MIN_BYTES=int(get_env("DOCUMENT_TEXT_COMPRESS_MIN_BYTES", str(cls.DOCUMENT_TEXT_COMPRESS_MIN_BYTES))),
+                DAL_CACHE_ENABLED=get_env("DAL_CACHE_ENABLED", str(cls.DAL_CACHE_ENABLED)).lower() in ("true", "1", "t"),
+                ARCHIVE_DATABASE_PATH=get_optional_env("ARCHIVE_DATABASE_PATH"),
+                ARCHIVE_BATCHES_AFTER_DAYS=int(get_env("ARCHIVE_BATCHES_AFTER_DAYS", str(cls.ARCHIVE_BATCHES_AFTER_DAYS))),
+                ARCHIVE_JOB_INTERVAL_HOURS=float(get_env("ARCHIVE_JOB_INTERVAL_HOURS", str(cls.ARCHIVE_JOB_INTERVAL_HOURS))),
+                FINGERPRINT_DB_PATH=get_optional_env("FINGERPRINT_DB_PATH"),
+                FINGERPRINT_MMAP_THRESHOLD_BYTES=int(get_env("FINGERPRINT_MMAP_THRESHOLD_BYTES", str(cls.FINGERPRINT_MMAP_THRESHOLD_BYTES))),
+                FINGERPRINT_DB_MAX_ENTRIES=int(get_env("FINGERPRINT_DB_MAX_ENTRIES", str(cls.FINGERPRINT_DB_MAX_ENTRIES))),
+                JOB_QUEUE_DB_PATH=get_optional_env("JOB_QUEUE_DB_PATH"),
+                JOB_QUEUE_WORKERS=int(get_env("JOB_QUEUE_WORKERS", str(cls.JOB_QUEUE_WORKERS))),
+                JOB_QUEUE_POLL_SECONDS=float(get_env("JOB_QUEUE_POLL_SECONDS", str(cls.JOB_QUEUE_POLL_SECONDS))),
+                JOB_QUEUE_LEASE_SECONDS=float(get_env("JOB_QUEUE_LEASE_SECONDS", str(cls.JOB_QUEUE_LEASE_SECONDS))),
+                JOB_QUEUE_RETRY_BASE_SECONDS=float(get_env("JOB_QUEUE_RETRY_BASE_SECONDS", str(cls.JOB_QUEUE_RETRY_BASE_SECONDS))),
+                JOB_QUEUE_RETRY_MAX_SECONDS=float(get_env("JOB_QUEUE_RETRY_MAX_SECONDS", str(cls.JOB_QUEUE_RETRY_MAX_SECONDS))),
+                JOB_QUEUE_CONCURRENCY=get_env("JOB_QUEUE_CONCURRENCY", cls.JOB_QUEUE_CONCURRENCY),
+                JOB_QUEUE_RETENTION_DAYS=float(get_env("JOB_QUEUE_RETENTION_DAYS", str(cls.JOB_QUEUE_RETENTION_DAYS))),
+                STATUS_STORE_DB_PATH=get_optional_env("STATUS_STORE_DB_PATH"),
+                STATUS_STORE_POLL_SECONDS=float(get_env("STATUS_STORE_POLL_SECONDS", str(cls.STATUS_STORE_POLL_SECONDS))),
+                SSE_HEARTBEAT_SECONDS=float(get_env("SSE_HEARTBEAT_SECONDS", str(cls.SSE_HEARTBEAT_SECONDS))),
+                SSE_REPLAY_EVENTS=int(get_env("SSE_REPLAY_EVENTS", str(cls.SSE_REPLAY_EVENTS))),
+                SSE_SUBSCRIBER_QUEUE_SIZE=int(get_env("SSE_SUBSCRIBER_QUEUE_SIZE", str(cls.SSE_SUBSCRIBER_QUEUE_SIZE))),
+                AUTO_RESUME_INTERRUPTED_BATCHES=get_env("AUTO_RESUME_INTERRUPTED_BATCHES", str(cls.AUTO_RESUME_INTERRUPTED_BATCHES)).lower() in ("true", "1", "t"),
+                BATCH_RESUME_STALE_SECONDS=float(get_env("BATCH_RESUME_STALE_SECONDS", str(cls.BATCH_RESUME_STALE_SECONDS))),
                 # Network overrides (useful for tests/CI)
                 HOST=get_env("HOST", cls.HOST),
                 PORT=int(get_env("PORT", str(cls.PORT))),
                 # Backup dir can be optionally provided by env
                 DB_BACKUP_DIR=get_optional_env("DB_BACKUP_DIR"),
+                DB_BACKUP_PAGES_PER_STEP=int(get_env("DB_BACKUP_PAGES_PER_STEP", str(cls.DB_BACKUP_PAGES_PER_STEP))),
+                DB_BACKUP_STEP_SLEEP_MS=int(get_env("DB_BACKUP_STEP_SLEEP_MS", str(cls.DB_BACKUP_STEP_SLEEP_MS))),
+                DB_BACKUP_COMPRESS=get_env("DB_BACKUP_COMPRESS", str(cls.DB_BACKUP_COMPRESS)).lower() in ("true", "1", "t"),
+                DB_DIAGNOSTICS_REFRESH_SECONDS=int(get_env("DB_DIAGNOSTICS_REFRESH_SECONDS", str(cls.DB_DIAGNOSTICS_REFRESH_SECONDS))),
 
                 # Status Constants (these are not loaded from environment)
                 STATUS_PENDING_VERIFICATION=cls.STATUS_PENDING_VERIFICATION,
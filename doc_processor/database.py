@@ -126,6 +126,9 @@ import os
 import json
 import stat
 import time
+import zlib
+import threading
+import functools
 from collections import defaultdict
 import logging
 
@@ -162,22 +165,233 @@ def _gather_db_file_metadata(db_path: str) -> dict:
 
 _DB_LOGGED_ONCE = False
 
-# --- CATEGORY CACHE (active categories) ---
-_CATEGORY_CACHE = { 'data': None, 'loaded_at': 0 }
-_CATEGORY_CACHE_TTL = 60  # seconds
+# --- DAL READ CACHE ---
+# Memoizes read-mostly queries. Validity is decided by a long-lived probe
+# connection: `PRAGMA data_version` changes whenever any *other* connection
+# (any thread or process) commits, and per-table counters maintained by
+# triggers (dal_table_versions) tell us which tables actually changed. An
+# entry is reused only while the versions of the tables it depends on match
+# the snapshot taken when it was filled, so there is no TTL to tune.
+_DAL_VERSIONED_TABLES = ('batches', 'categories')
+# Tables written too often for a per-row trigger (every OCR/classification
+# update touches `pages`). Their version is data_version itself, so entries
+# depending on them are dropped on any commit to the database.
+_DAL_DATA_VERSION_TABLES = ('pages',)
+
+_DAL_CACHE_LOCK = threading.RLock()
+_DAL_CACHE = {
+    'db_path': None,
+    'pid': None,
+    'probe': None,
+    'data_version': None,
+    'schema_version': None,
+    'table_versions': {},
+    'entries': {},
+}
+_DAL_CACHE_STATS = defaultdict(lambda: {'hits': 0, 'misses': 0, 'bypassed': 0})
+
+
+def _dal_cache_enabled() -> bool:
+    try:
+        from .config_manager import app_config
+        return bool(getattr(app_config, 'DAL_CACHE_ENABLED', True))
+    except Exception:
+        return True
+
+
+def _dal_cache_refresh_versions() -> dict:
+    """Return current per-table versions, re-reading them only if data_version moved.
+
+    Must be called with _DAL_CACHE_LOCK held.
+    """
+    db_path = os.path.abspath(_resolve_db_path(quiet=True))
+    pid = os.getpid()
+    if _DAL_CACHE['db_path'] != db_path or _DAL_CACHE['pid'] != pid or _DAL_CACHE['probe'] is None:
+        # New database (tests swap DATABASE_PATH) or forked child: start over
+        try:
+            if _DAL_CACHE['probe'] is not None and _DAL_CACHE['pid'] == pid:
+                _DAL_CACHE['probe'].close()
+        except Exception:
+            pass
+        _DAL_CACHE.update({
+            'db_path': db_path, 'pid': pid, 'probe': None,
+            'data_version': None, 'schema_version': None, 'table_versions': {}, 'entries': {},
+        })
+        if not os.path.exists(db_path):
+            return {}
+        _DAL_CACHE['probe'] = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+
+    probe = _DAL_CACHE['probe']
+    data_version = probe.execute("PRAGMA data_version").fetchone()[0]
+    if data_version == _DAL_CACHE['data_version']:
+        return _DAL_CACHE['table_versions']
+
+    schema_version = probe.execute("PRAGMA schema_version").fetchone()[0]
+    if schema_version != _DAL_CACHE['schema_version']:
+        # DDL (dropped/recreated tables lose their triggers) - drop everything
+        _DAL_CACHE['entries'] = {}
+        _DAL_CACHE['schema_version'] = schema_version
+    try:
+        rows = probe.execute("SELECT table_name, version FROM dal_table_versions").fetchall()
+        versions = {r[0]: r[1] for r in rows}
+    except sqlite3.Error:
+        versions = {}
+    versions.update((t, data_version) for t in _DAL_DATA_VERSION_TABLES)
+    _DAL_CACHE['table_versions'] = versions
+    _DAL_CACHE['data_version'] = data_version
+    return versions
+
+
+def dal_cached(*tables):
+    """Decorator memoizing a DAL read function until one of `tables` is written.
+
+    Results are keyed by positional/keyword arguments. Lists are copied on the
+    way out so callers cannot mutate the cached value. Tables without a
+    version counter (older schema, raw test DBs) are never cached.
+    """
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _dal_cache_enabled():
+                return func(*args, **kwargs)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            stats = _DAL_CACHE_STATS[name]
+            try:
+                with _DAL_CACHE_LOCK:
+                    versions = _dal_cache_refresh_versions()
+                    snapshot = tuple(versions.get(t) for t in tables)
+                    if None in snapshot:
+                        stats['bypassed'] += 1
+                        snapshot = None
+                    else:
+                        entry = _DAL_CACHE['entries'].get(key)
+                        if entry is not None and entry[0] == snapshot:
+                            stats['hits'] += 1
+                            value = entry[1]
+                            return list(value) if isinstance(value, list) else value
+                        stats['misses'] += 1
+            except Exception as cache_err:
+                logging.getLogger(__name__).debug(f"DAL cache check failed for {name}: {cache_err}")
+                snapshot = None
+            value = func(*args, **kwargs)
+            if snapshot is not None:
+                with _DAL_CACHE_LOCK:
+                    # Only store if nothing was written while we were querying
+                    try:
+                        current = _dal_cache_refresh_versions()
+                        if tuple(current.get(t) for t in tables) == snapshot:
+                            _DAL_CACHE['entries'][key] = (snapshot, list(value) if isinstance(value, list) else value)
+                    except Exception:
+                        pass
+            return list(value) if isinstance(value, list) else value
+
+        return wrapper
+    return decorator
+
+
+def clear_dal_cache():
+    """Drop all memoized DAL results (stats are kept)."""
+    with _DAL_CACHE_LOCK:
+        _DAL_CACHE['entries'] = {}
+
+
+def get_dal_cache_stats() -> dict:
+    """Return hit/miss/bypass counters per cached function plus current entry count."""
+    with _DAL_CACHE_LOCK:
+        functions = {k: dict(v) for k, v in _DAL_CACHE_STATS.items()}
+        for v in functions.values():
+            lookups = v['hits'] + v['misses']
+            v['hit_rate'] = round(v['hits'] / lookups, 3) if lookups else None
+        return {
+            'db_path': _DAL_CACHE['db_path'],
+            'entries': len(_DAL_CACHE['entries']),
+            'table_versions': dict(_DAL_CACHE['table_versions']),
+            'functions': functions,
+        }
+
 
 def invalidate_category_cache():
-    _CATEGORY_CACHE['data'] = None
-    _CATEGORY_CACHE['loaded_at'] = 0
+    """Backward-compatible hook; category writes now invalidate via table versions."""
+    clear_dal_cache()
+
+
+# --- DOCUMENT TEXT SIDE TABLE ---
+# Large OCR text and AI summaries live in `document_text` rather than inline on
+# single_documents/pages so listing queries stay narrow. Owner types map to the
+# legacy table whose column still serves as a read fallback for rows written
+# before the move (or by tests that insert text directly).
+_DOCUMENT_TEXT_OWNERS = {
+    'single_document': 'single_documents',
+    'page': 'pages',
+}
+_DOCUMENT_TEXT_FIELDS = ('ocr_text', 'ai_summary')
+# Inline pages columns other than ocr_text (explicit so hydrated text does not collide with p.*)
+_PAGE_LIST_COLUMNS = (
+    'id', 'batch_id', 'source_filename', 'page_number', 'processed_image_path',
+    'ai_suggested_category', 'human_verified_category', 'status', 'rotation_angle',
+)
+
+
+def _encode_document_text(text: str) -> tuple[str, object]:
+    """Return (codec, body) for storage, compressing when configured and worthwhile."""
+    try:
+        from .config_manager import app_config
+        compress = getattr(app_config, 'DOCUMENT_TEXT_COMPRESSION', True)
+        min_bytes = int(getattr(app_config, 'DOCUMENT_TEXT_COMPRESS_MIN_BYTES', 512))
+    except Exception:
+        compress, min_bytes = True, 512
+    raw = text.encode('utf-8')
+    if compress and len(raw) >= min_bytes:
+        packed = zlib.compress(raw, 6)
+        if len(packed) < len(raw):
+            return 'zlib', sqlite3.Binary(packed)
+    return 'plain', text
+
+
+def _decode_document_text(codec, body):
+    """Inverse of _encode_document_text; also registered as SQL function document_text_decode()."""
+    if body is None:
+        return None
+    try:
+        if codec == 'zlib':
+            return zlib.decompress(bytes(body)).decode('utf-8')
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            return bytes(body).decode('utf-8')
+        return body
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to decode document_text body (codec={codec}): {e}")
+        return None
 
 
-def get_db_connection():
-    """Create and return a configured SQLite connection (logs rich context once).
+def document_text_sql(owner_type: str, field: str, table_ref: str | None = None) -> str:
+    """Return a SQL expression yielding the decoded text for each row of a query.
 
-    Prefers the centralized config_manager.AppConfig.DATABASE_PATH. Falls back to
-    the DATABASE_PATH environment variable for backward compatibility.
+    Use inside SELECT/WHERE clauses on connections from get_db_connection()
+    (which registers document_text_decode). Falls back to the legacy inline column.
+
+    Args:
+        owner_type (str): 'single_document' or 'page'.
+        field (str): 'ocr_text' or 'ai_summary'.
+        table_ref (str | None): Alias of the owner table in the query (defaults to the table name).
+    """
+    if owner_type not in _DOCUMENT_TEXT_OWNERS or field not in _DOCUMENT_TEXT_FIELDS:
+        raise ValueError(f"Unsupported document text reference: {owner_type}.{field}")
+    ref = table_ref or _DOCUMENT_TEXT_OWNERS[owner_type]
+    return (
+        f"COALESCE((SELECT document_text_decode(dt.codec, dt.body) FROM document_text dt "
+        f"WHERE dt.owner_type = '{owner_type}' AND dt.owner_id = {ref}.id AND dt.field = '{field}'), "
+        f"{ref}.{field})"
+    )
+
+
+def _resolve_db_path(quiet: bool = False) -> str:
+    """Resolve the active SQLite path (env override, then config, then test guards).
+
+    Shared by get_db_connection and the DAL read cache so both always agree on
+    which database file is current.
     """
-    global _DB_LOGGED_ONCE
     # Allow an explicit environment override to take precedence. This is important
     # for tests and environments that set DATABASE_PATH at runtime (e.g., pytest
     # fixtures or CI). We validate/ensure the directory exists before using it.
@@ -222,12 +436,25 @@ def get_db_connection():
                 else:
                     import tempfile
                     db_path = os.path.join(tempfile.gettempdir(), f'doc_processor_test_{os.getpid()}.db')
-                logging.getLogger(__name__).info(f"Overriding host-local DB path for test run, using: {db_path}")
+                if not quiet:
+                    logging.getLogger(__name__).info(f"Overriding host-local DB path for test run, using: {db_path}")
     except Exception:
         pass
 
     if not db_path:
         raise RuntimeError("Database path is not configured. Set in .env or via config_manager.")
+    return db_path
+
+
+
+def get_db_connection():
+    """Create and return a configured SQLite connection (logs rich context once).
+
+    Prefers the centralized config_manager.AppConfig.DATABASE_PATH. Falls back to
+    the DATABASE_PATH environment variable for backward compatibility.
+    """
+    global _DB_LOGGED_ONCE
+    db_path = _resolve_db_path()
 
     if not _DB_LOGGED_ONCE:
         # Structured, one-time metadata log (safe even if logger not configured yet)
@@ -274,15 +501,10 @@ def get_db_connection():
                     xdg_data = os.getenv('XDG_DATA_HOME') or _os.path.join(_os.path.expanduser('~'), '.local', 'share')
                     backup_root = _os.path.join(xdg_data, 'doc_processor', 'db_backups')
                 os.makedirs(backup_root, exist_ok=True)
-                import shutil
-                import datetime
-                # Use timezone-aware UTC timestamp to avoid naive datetime deprecation
-                # Use timezone-aware UTC timestamp
-                timestamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
-                src = db_path
-                dest = os.path.join(backup_root, f"documents.db.backup.{timestamp}")
-                shutil.copy2(src, dest)
-                logging.getLogger(__name__).warning(f"Backed up existing DB {src} -> {dest} before re-initialization")
+                # Online (page-stepped, consistency-checked) snapshot rather than a raw file copy
+                from .db_backup import online_backup
+                dest = online_backup(db_path=db_path, dest_dir=backup_root)['dest']
+                logging.getLogger(__name__).warning(f"Backed up existing DB {db_path} -> {dest} before re-initialization")
             except Exception as _bck_err:
                 logging.getLogger(__name__).warning(f"Failed to backup DB before new creation: {_bck_err}")
 
@@ -371,6 +593,12 @@ def get_db_connection():
     except Exception:
         logging.getLogger(__name__).debug("Failed to set PRAGMA busy_timeout, continuing")
 
+    # Decoder for document_text bodies so queries can select text via document_text_sql()
+    try:
+        conn.create_function('document_text_decode', 2, _decode_document_text, deterministic=True)
+    except Exception:
+        logging.getLogger(__name__).debug("Failed to register document_text_decode, continuing")
+
     # Lightweight on-demand schema ensures for legacy grouped workflow restoration.
     # We gate this behind a quick PRAGMA table_info check to avoid overhead on hot paths.
     try:
@@ -461,6 +689,37 @@ def get_db_connection():
         except Exception:
             pass
 
+        # Per-file intake analysis results keyed by content fingerprint + detector version
+        _ensure_table('intake_analysis_cache', """
+            CREATE TABLE IF NOT EXISTS intake_analysis_cache (
+                fingerprint TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                detector_version TEXT NOT NULL,
+                file_size INTEGER,
+                mtime_ns INTEGER,
+                analysis_json TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (fingerprint, file_name, detector_version)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_intake_analysis_cache_stat
+                ON intake_analysis_cache(file_name, file_size, mtime_ns);
+        """)
+
+        # Side table for large text blobs (OCR text, AI summaries); see document_text_sql()
+        _ensure_table('document_text', """
+            CREATE TABLE IF NOT EXISTS document_text (
+                owner_type TEXT NOT NULL,
+                owner_id INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                codec TEXT NOT NULL DEFAULT 'plain',
+                body BLOB,
+                char_count INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (owner_type, owner_id, field)
+            ) WITHOUT ROWID;
+        """)
+
         _ensure_table('document_tags', """
             CREATE TABLE IF NOT EXISTS document_tags (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -512,6 +771,18 @@ def get_db_connection():
             );
         """)
 
+        # Stage checkpoints of unfinished processing runs (see checkpoints.py)
+        _ensure_table('processing_checkpoints', """
+            CREATE TABLE IF NOT EXISTS processing_checkpoints (
+                batch_id INTEGER NOT NULL,
+                item_key TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                data TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (batch_id, item_key, stage)
+            );
+        """)
+
         # Legacy/grouped workflow tables
         _ensure_table('documents', """
             CREATE TABLE IF NOT EXISTS documents (
@@ -535,6 +806,40 @@ def get_db_connection():
                 FOREIGN KEY(page_id) REFERENCES pages(id) ON DELETE CASCADE
             );
         """)
+        # Per-table write counters backing the DAL read cache (see dal_cached)
+        _ensure_table('dal_table_versions', """
+            CREATE TABLE IF NOT EXISTS dal_table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        try:
+            existing_triggers = {r[0] for r in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_dal_version_%'"
+            ).fetchall()}
+            for tbl in _DAL_VERSIONED_TABLES:
+                wanted = [f"trg_dal_version_{tbl}_{op.lower()}" for op in ('INSERT', 'UPDATE', 'DELETE')]
+                if all(w in existing_triggers for w in wanted):
+                    continue
+                cursor.execute(f"PRAGMA table_info({tbl})")
+                if not cursor.fetchall():
+                    continue
+                for op in ('INSERT', 'UPDATE', 'DELETE'):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_dal_version_{tbl}_{op.lower()}
+                        AFTER {op} ON {tbl}
+                        BEGIN
+                            UPDATE dal_table_versions SET version = version + 1 WHERE table_name = '{tbl}';
+                        END;
+                    """)
+                cursor.execute("INSERT OR IGNORE INTO dal_table_versions (table_name, version) VALUES (?, 0)", (tbl,))
+            for tbl in _DAL_DATA_VERSION_TABLES:
+                # Drop the per-row triggers older schemas created for these tables
+                for op in ('INSERT', 'UPDATE', 'DELETE'):
+                    if f"trg_dal_version_{tbl}_{op.lower()}" in existing_triggers:
+                        cursor.execute(f"DROP TRIGGER trg_dal_version_{tbl}_{op.lower()}")
+        except Exception as trig_err:
+            logging.getLogger(__name__).debug(f"[schema-ensure] DAL version triggers unavailable: {trig_err}")
         # Emit post-creation warning if we just initialized a brand-new file
         if (not db_existed_before or pre_size == 0):
             try:
@@ -585,6 +890,7 @@ def get_db_connection():
         _ensure_column('single_documents', 'created_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
         _ensure_column('single_documents', 'final_filename', 'TEXT')
         _ensure_column('single_documents', 'processed_at', 'TIMESTAMP')
+        _ensure_column('batches', 'exported_at', 'TIMESTAMP')
         # Tag extraction additional fields
         _ensure_column('document_tags', 'extraction_confidence', 'REAL')
         _ensure_column('document_tags', 'llm_source', 'TEXT')
@@ -809,14 +1115,9 @@ def backup_and_delete_all_batches(confirm: bool = False, backup_root: str | None
 
     os.makedirs(backup_root, exist_ok=True)
 
-    import shutil, datetime
-    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
-    src = db_path
-    dest = os.path.join(backup_root, f"documents.db.backup.{timestamp}")
-    try:
-        shutil.copy2(src, dest)
-    except Exception as e:
-        raise RuntimeError(f"Failed to backup DB {src} -> {dest}: {e}")
+    from .db_backup import online_backup
+    # online_backup raises RuntimeError on failure, aborting before any rows are deleted
+    dest = online_backup(db_path=db_path, dest_dir=backup_root)['dest']
 
     deleted_counts = {}
     conn = get_db_connection()
@@ -825,7 +1126,7 @@ def backup_and_delete_all_batches(confirm: bool = False, backup_root: str | None
         # Use a transaction to perform deletes. If any table doesn't exist, ignore errors.
         tables = [
             'document_tags', 'document_pages', 'document_pages', 'documents',
-            'pages', 'single_documents', 'interaction_log', 'batches'
+            'document_text', 'pages', 'single_documents', 'interaction_log', 'batches'
         ]
         # Deduplicate
         seen = set()
@@ -872,11 +1173,13 @@ def get_pages_for_batch(batch_id):
 
     Returns:
         list: A list of sqlite3.Row objects, where each object represents a page.
-              Returns an empty list if no pages are found.
+              Returns an empty list if no pages are found. Rows do not include
+              ocr_text (stored in the document_text side table).
     """
     conn = get_db_connection()
+    # OCR text is intentionally omitted; use get_document_text('page', ...) when needed.
     pages = conn.execute(
-        "SELECT * FROM pages WHERE batch_id = ? ORDER BY source_filename, page_number",
+        f"SELECT {', '.join(_PAGE_LIST_COLUMNS)} FROM pages WHERE batch_id = ? ORDER BY source_filename, page_number",
         (batch_id,),
     ).fetchall()
     conn.close()
@@ -895,14 +1198,16 @@ def get_flagged_pages_for_batch(batch_id):
         list: A list of sqlite3.Row objects for the flagged pages.
     """
     conn = get_db_connection()
+    cols = ', '.join(_PAGE_LIST_COLUMNS)
     pages = conn.execute(
-        "SELECT * FROM pages WHERE batch_id = ? AND status = 'flagged' ORDER BY id",
+        f"SELECT {cols}, {document_text_sql('page', 'ocr_text')} AS ocr_text FROM pages WHERE batch_id = ? AND status = 'flagged' ORDER BY id",
         (batch_id,),
     ).fetchall()
     conn.close()
     return pages
 
 
+@dal_cached('pages')
 def get_all_unique_categories():
     """
     Fetches a sorted list of all unique, non-empty categories that have been
@@ -922,28 +1227,28 @@ def get_all_unique_categories():
     return [row["human_verified_category"] for row in results]
 
 def get_active_categories():
-    """Return list of active category names with simple cache.
+    """Return list of active category names (memoized until categories change).
 
-    On failure fall back to historical distinct categories (not cached) to avoid
-    masking structural issues. Cache TTL configurable via _CATEGORY_CACHE_TTL.
+    On failure fall back to historical distinct categories to avoid masking
+    structural issues.
     """
-    import time as _time
-    now = _time.time()
-    if _CATEGORY_CACHE['data'] is not None and (now - _CATEGORY_CACHE['loaded_at'] < _CATEGORY_CACHE_TTL):
-        return _CATEGORY_CACHE['data']
+    try:
+        return _get_active_category_names()
+    except Exception:
+        return get_all_unique_categories()
+
+
+@dal_cached('categories')
+def _get_active_category_names():
     conn = get_db_connection()
     try:
         rows = conn.execute("SELECT name FROM categories WHERE is_active = 1 ORDER BY name COLLATE NOCASE").fetchall()
-        data = [r["name"] for r in rows]
-        _CATEGORY_CACHE['data'] = data
-        _CATEGORY_CACHE['loaded_at'] = now
-        conn.close()
-        return data
-    except Exception:
+        return [r["name"] for r in rows]
+    finally:
         conn.close()
-        return get_all_unique_categories()
 
 
+@dal_cached('batches')
 def get_batch_by_id(batch_id):
     """
     Retrieves a single batch record by its primary key.
@@ -951,12 +1256,21 @@ def get_batch_by_id(batch_id):
     Args:
         batch_id (int): The unique identifier for the batch.
 
+    Batches moved to cold storage (`db_archive`) are returned from the archive
+    database as a dict with `archived=True`.
+
     Returns:
         sqlite3.Row: A single row object representing the batch, or None if not found.
     """
     conn = get_db_connection()
     batch = conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchone()
     conn.close()
+    if batch is None:
+        try:
+            from .db_archive import get_archived_batch
+        except ImportError:
+            from db_archive import get_archived_batch
+        batch = get_archived_batch(batch_id)
     return batch
 
 
@@ -1019,10 +1333,12 @@ def get_verified_pages_for_grouping(batch_id):
                      of page row objects belonging to that category.
     """
     conn = get_db_connection()
-    # This query selects all columns from the pages table (`p.*`) for pages that
-    # meet the criteria of being 'verified' and not yet grouped.
+    # This query selects the page columns (OCR text hydrated from the
+    # document_text side table) for pages that meet the criteria of being
+    # 'verified' and not yet grouped.
+    cols = ', '.join(f"p.{c}" for c in _PAGE_LIST_COLUMNS)
     pages = conn.execute(
-        "SELECT p.* FROM pages p LEFT JOIN document_pages dp ON p.id = dp.page_id WHERE p.batch_id = ? AND p.status = 'verified' AND dp.page_id IS NULL ORDER BY p.human_verified_category, p.source_filename, p.page_number",
+        f"SELECT {cols}, {document_text_sql('page', 'ocr_text', 'p')} AS ocr_text FROM pages p LEFT JOIN document_pages dp ON p.id = dp.page_id WHERE p.batch_id = ? AND p.status = 'verified' AND dp.page_id IS NULL ORDER BY p.human_verified_category, p.source_filename, p.page_number",
         (batch_id,),
     ).fetchall()
     conn.close()
@@ -1165,7 +1481,8 @@ def get_single_documents_for_batch(batch_id):
 
     NOTE: Intentionally excludes recently added optional columns (final_category,
     final_filename) so tests with minimal schemas (without migration) still pass.
-    Route layer hydrates those if present.
+    Route layer hydrates those if present. OCR text and AI summary are not
+    listed either; load them per document with get_single_document_text().
     """
     conn = get_db_connection()
     try:
@@ -1173,7 +1490,7 @@ def get_single_documents_for_batch(batch_id):
             """
             SELECT id, original_filename, original_pdf_path,
                    ai_suggested_category, ai_suggested_filename,
-                   ai_confidence, ai_summary, ocr_text, ocr_confidence_avg
+                   ai_confidence, ocr_confidence_avg
             FROM single_documents
             WHERE batch_id = ?
             ORDER BY id
@@ -1189,6 +1506,195 @@ def get_single_documents_for_batch(batch_id):
             conn.close()
 
 
+# --- DOCUMENT TEXT ACCESSORS ---
+# Lazy loaders for the document_text side table. Listing queries above no
+# longer carry OCR text / AI summaries; detail views fetch them on demand.
+
+def set_document_text(owner_type: str, owner_id: int, field: str, text, conn=None) -> bool:
+    """Store text for an owner row in document_text and clear the legacy inline column.
+
+    Args:
+        owner_type (str): 'single_document' or 'page'.
+        owner_id (int): Primary key of the owner row.
+        field (str): 'ocr_text' or 'ai_summary'.
+        text (str | None): New value; None removes the stored text.
+        conn (sqlite3.Connection | None): Existing connection to participate in the
+            caller's transaction. When omitted a connection is opened and committed.
+
+    Returns:
+        bool: True if the value was persisted (side table or legacy fallback).
+    """
+    if owner_type not in _DOCUMENT_TEXT_OWNERS or field not in _DOCUMENT_TEXT_FIELDS:
+        raise ValueError(f"Unsupported document text reference: {owner_type}.{field}")
+    table = _DOCUMENT_TEXT_OWNERS[owner_type]
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        try:
+            if text is None:
+                conn.execute(
+                    "DELETE FROM document_text WHERE owner_type = ? AND owner_id = ? AND field = ?",
+                    (owner_type, owner_id, field),
+                )
+            else:
+                codec, body = _encode_document_text(text)
+                conn.execute(
+                    """
+                    INSERT INTO document_text (owner_type, owner_id, field, codec, body, char_count, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(owner_type, owner_id, field) DO UPDATE SET
+                        codec = excluded.codec, body = excluded.body,
+                        char_count = excluded.char_count, updated_at = excluded.updated_at
+                    """,
+                    (owner_type, owner_id, field, codec, body, len(text)),
+                )
+            try:
+                conn.execute(f"UPDATE {table} SET {field} = NULL WHERE id = ?", (owner_id,))
+            except sqlite3.Error:
+                # Legacy column absent (new/minimal schema) - nothing to clear
+                pass
+        except sqlite3.Error as side_err:
+            # Side table unavailable: keep the value inline rather than lose it
+            logging.getLogger(__name__).debug(f"document_text write failed, using inline column: {side_err}")
+            conn.execute(f"UPDATE {table} SET {field} = ? WHERE id = ?", (text, owner_id))
+        if own_conn:
+            conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"Database error while storing {field} for {owner_type} {owner_id}: {e}")
+        return False
+    finally:
+        if own_conn and conn:
+            conn.close()
+
+
+def get_document_text(owner_type: str, owner_id: int, field: str, conn=None):
+    """Return stored text for an owner row (side table first, legacy column second).
+
+    Returns:
+        str | None: The decoded text, or None when nothing is stored.
+    """
+    if owner_type not in _DOCUMENT_TEXT_OWNERS or field not in _DOCUMENT_TEXT_FIELDS:
+        raise ValueError(f"Unsupported document text reference: {owner_type}.{field}")
+    table = _DOCUMENT_TEXT_OWNERS[owner_type]
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        try:
+            row = conn.execute(
+                "SELECT codec, body FROM document_text WHERE owner_type = ? AND owner_id = ? AND field = ?",
+                (owner_type, owner_id, field),
+            ).fetchone()
+            if row is not None:
+                return _decode_document_text(row[0], row[1])
+        except sqlite3.Error:
+            pass
+        try:
+            legacy = conn.execute(f"SELECT {field} FROM {table} WHERE id = ?", (owner_id,)).fetchone()
+            return legacy[0] if legacy else None
+        except sqlite3.Error:
+            return None
+    finally:
+        if own_conn and conn:
+            conn.close()
+
+
+def get_single_document_text(document_id: int) -> dict:
+    """Lazy-load the OCR text and AI summary for one single_documents row.
+
+    Returns:
+        dict: {'ocr_text': str | None, 'ai_summary': str | None}
+    """
+    conn = get_db_connection()
+    try:
+        return {
+            'ocr_text': get_document_text('single_document', document_id, 'ocr_text', conn=conn),
+            'ai_summary': get_document_text('single_document', document_id, 'ai_summary', conn=conn),
+        }
+    finally:
+        conn.close()
+
+
+def delete_document_text(owner_type: str, owner_ids, conn=None) -> int:
+    """Remove all stored text for the given owner ids. Returns rows deleted."""
+    ids = [int(i) for i in (owner_ids or [])]
+    if not ids:
+        return 0
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        placeholders = ','.join(['?'] * len(ids))
+        cur = conn.execute(
+            f"DELETE FROM document_text WHERE owner_type = ? AND owner_id IN ({placeholders})",
+            [owner_type, *ids],
+        )
+        if own_conn:
+            conn.commit()
+        return cur.rowcount or 0
+    except sqlite3.Error as e:
+        print(f"Database error while deleting document_text for {owner_type}: {e}")
+        return 0
+    finally:
+        if own_conn and conn:
+            conn.close()
+
+
+def migrate_document_text_to_side_table(chunk_size: int = 500) -> dict:
+    """Move inline ocr_text / ai_summary values into document_text.
+
+    Idempotent: only rows that still carry inline text are touched, and each
+    chunk is committed separately so a long migration does not hold the write
+    lock. Rows are walked once in id order, so a value that stays inline
+    (side table write failed; `set_document_text` keeps it) is not retried
+    in a loop but counted and logged. Run VACUUM afterwards to reclaim the
+    freed pages.
+
+    Returns:
+        dict: Mapping '<table>.<field>' -> number of rows moved.
+    """
+    moved = {}
+    conn = get_db_connection()
+    try:
+        for owner_type, table in _DOCUMENT_TEXT_OWNERS.items():
+            try:
+                cols = [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+            except sqlite3.Error:
+                cols = []
+            for field in _DOCUMENT_TEXT_FIELDS:
+                key = f"{table}.{field}"
+                moved[key] = 0
+                if field not in cols:
+                    continue
+                last_id = None
+                while True:
+                    rows = conn.execute(
+                        f"SELECT id, {field} FROM {table} WHERE {field} IS NOT NULL AND id > ? ORDER BY id LIMIT ?",
+                        (last_id if last_id is not None else -1, chunk_size),
+                    ).fetchall()
+                    if not rows:
+                        break
+                    with conn:
+                        for row_id, text in rows:
+                            set_document_text(owner_type, row_id, field, text, conn=conn)
+                    last_id = rows[-1][0]
+                    placeholders = ",".join("?" for _ in rows)
+                    kept = conn.execute(
+                        f"SELECT COUNT(*) FROM {table} WHERE id IN ({placeholders}) AND {field} IS NOT NULL",
+                        [row_id for row_id, _ in rows],
+                    ).fetchone()[0]
+                    moved[key] += len(rows) - kept
+                    if kept:
+                        logging.getLogger(__name__).warning(f"⚠️ {kept} {key} value(s) could not be moved and stay inline")
+                if moved[key]:
+                    logging.getLogger(__name__).info(f"📦 Moved {moved[key]} {key} values into document_text")
+        return moved
+    finally:
+        conn.close()
+
+
 def get_pages_for_document(document_id):
     """
     Retrieves all pages linked to a specific document, correctly ordered by their
@@ -1204,9 +1710,10 @@ def get_pages_for_document(document_id):
     # This query joins `pages` and `document_pages` to fetch the full details
     # of each page belonging to the specified document, sorted by the `sequence`
     # number stored in the junction table.
+    cols = ', '.join(f"p.{c}" for c in _PAGE_LIST_COLUMNS)
     pages = conn.execute(
-        """
-        SELECT p.*, dp.sequence
+        f"""
+        SELECT {cols}, {document_text_sql('page', 'ocr_text', 'p')} AS ocr_text, dp.sequence
         FROM pages p
         JOIN document_pages dp ON p.id = dp.page_id
         WHERE dp.document_id = ?
@@ -1218,6 +1725,7 @@ def get_pages_for_document(document_id):
     return pages
 
 
+@dal_cached('categories')
 def get_all_categories():
     """
     Fetches all category names from the dedicated 'categories' table.
@@ -1311,6 +1819,7 @@ def delete_page_by_id(page_id):
                 # Delete the database record. Because of `ON DELETE CASCADE` in the
                 # `document_pages` table, any links to this page will be auto-removed.
                 conn.execute("DELETE FROM pages WHERE id = ?", (page_id,))
+                delete_document_text('page', [page_id], conn=conn)
 
                 # After successfully deleting the DB record, delete the file.
                 if os.path.exists(image_path):
@@ -1530,10 +2039,11 @@ def update_document_final_filename(document_id, filename_base):
         if conn:
             conn.close()
 
-def log_detection_ground_truth(filename, predicted_strategy, actual_strategy, confidence, user_feedback=None):
+def log_detection_ground_truth(filename, predicted_strategy, actual_strategy, confidence, user_feedback=None, features=None):
     """
     Log ground truth data when user corrects or validates detection decisions.
-    This creates training data for improving LLM detection accuracy.
+    This creates training data for improving LLM detection accuracy and for the
+    learned strategy classifier (see strategy_classifier.train_strategy_classifier).
 
     Args:
         filename (str): Name of the file that was classified
@@ -1541,6 +2051,8 @@ def log_detection_ground_truth(filename, predicted_strategy, actual_strategy, co
         actual_strategy (str): What it actually was according to user
         confidence (float): System's confidence in the prediction (0.0 to 1.0)
         user_feedback (str, optional): User's comments about the decision
+        features (dict, optional): Classifier features; when omitted, training uses
+            the features logged with the latest detection decision for this filename
     """
     try:
         ground_truth_data = {
@@ -1551,6 +2063,8 @@ def log_detection_ground_truth(filename, predicted_strategy, actual_strategy, co
             "correct_prediction": predicted_strategy == actual_strategy,
             "user_feedback": user_feedback
         }
+        if features:
+            ground_truth_data["features"] = features
 
         log_interaction(
             batch_id=None,
@@ -1612,6 +2126,13 @@ def get_detection_training_data(limit=100):
         if conn:
             conn.close()
 
+def _learned_classifier_report():
+    try:
+        from .strategy_classifier import get_classifier_report
+        return get_classifier_report()
+    except Exception as e:
+        return {'available': False, 'error': str(e)}
+
 def get_detection_performance_analytics():
     """
     Get analytics on detection system performance for monitoring and improvement.
@@ -1663,7 +2184,8 @@ def get_detection_performance_analytics():
                 "heuristic_only_count": llm_usage[2] if llm_usage[2] else 0,
                 "llm_usage_rate": (llm_usage[1] / llm_usage[0]) if llm_usage[0] and llm_usage[0] > 0 else 0
             },
-            "recent_decisions": [dict(row) for row in recent_decisions]
+            "recent_decisions": [dict(row) for row in recent_decisions],
+            "learned_classifier": _learned_classifier_report(),
         }
 
     except sqlite3.Error as e:
@@ -1674,6 +2196,124 @@ def get_detection_performance_analytics():
             conn.close()
 
 
+
+# --- INTAKE ANALYSIS CACHE ---
+def get_cached_intake_analyses(keys, detector_version: str) -> dict:
+    """
+    Fetch cached per-file intake analyses.
+
+    Args:
+        keys (list[tuple[str, str]]): (fingerprint, file_name) pairs.
+        detector_version (str): Only entries produced by this detector version match.
+
+    Returns:
+        dict: (fingerprint, file_name) -> analysis dict (DocumentAnalysis fields).
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+    conn = None
+    found = {}
+    try:
+        conn = get_db_connection()
+        for start in range(0, len(keys), 400):
+            chunk = keys[start:start + 400]
+            where = " OR ".join(["(fingerprint = ? AND file_name = ?)"] * len(chunk))
+            params = [v for key in chunk for v in key]
+            rows = conn.execute(
+                f"SELECT fingerprint, file_name, analysis_json FROM intake_analysis_cache "
+                f"WHERE detector_version = ? AND ({where})",
+                (detector_version, *params),
+            ).fetchall()
+            for row in rows:
+                try:
+                    found[(row[0], row[1])] = json.loads(row[2])
+                except (TypeError, ValueError):
+                    continue
+        if found:
+            conn.executemany(
+                "UPDATE intake_analysis_cache SET last_used_at = CURRENT_TIMESTAMP "
+                "WHERE fingerprint = ? AND file_name = ? AND detector_version = ?",
+                [(fp, name, detector_version) for fp, name in found],
+            )
+            conn.commit()
+        return found
+    except sqlite3.Error as e:
+        logging.warning(f"Failed to read intake analysis cache: {e}")
+        return found
+    finally:
+        if conn:
+            conn.close()
+
+
+def store_intake_analyses(entries) -> int:
+    """
+    Upsert per-file intake analyses.
+
+    Args:
+        entries (list[dict]): Each with fingerprint, file_name, detector_version,
+            file_size, mtime_ns and analysis (JSON-serializable dict).
+
+    Returns:
+        int: Number of entries written.
+    """
+    entries = list(entries)
+    if not entries:
+        return 0
+    conn = None
+    try:
+        conn = get_db_connection()
+        conn.executemany(
+            """
+            INSERT INTO intake_analysis_cache
+                (fingerprint, file_name, detector_version, file_size, mtime_ns, analysis_json)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(fingerprint, file_name, detector_version) DO UPDATE SET
+                file_size = excluded.file_size,
+                mtime_ns = excluded.mtime_ns,
+                analysis_json = excluded.analysis_json,
+                created_at = CURRENT_TIMESTAMP,
+                last_used_at = CURRENT_TIMESTAMP
+            """,
+            [
+                (e['fingerprint'], e['file_name'], e['detector_version'], e.get('file_size'),
+                 e.get('mtime_ns'), json.dumps(e['analysis'], default=str))
+                for e in entries
+            ],
+        )
+        conn.commit()
+        return len(entries)
+    except sqlite3.Error as e:
+        logging.warning(f"Failed to store intake analyses: {e}")
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+def clear_intake_analysis_cache(detector_version: str | None = None) -> int:
+    """
+    Delete cached intake analyses (all, or only those of one detector version).
+
+    Returns:
+        int: Number of rows removed.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        if detector_version is None:
+            cur = conn.execute("DELETE FROM intake_analysis_cache")
+        else:
+            cur = conn.execute("DELETE FROM intake_analysis_cache WHERE detector_version = ?", (detector_version,))
+        conn.commit()
+        return cur.rowcount
+    except sqlite3.Error as e:
+        logging.error(f"Failed to clear intake analysis cache: {e}")
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
 # --- DOCUMENT TAGS UTILITIES ---
 def store_document_tags(document_id, extracted_tags, llm_source='ollama'):
     """
@@ -0,0 +1,419 @@
+"""
+Cold-storage archival of exported batches.
+
+Batches that reached STATUS_EXPORTED are never modified again, yet their
+pages, documents, tags, interaction logs and OCR text keep the hot
+`documents.db` large (slow VACUUM, bloated backups). `archive_exported_batches`
+moves such batches, once older than ARCHIVE_BATCHES_AFTER_DAYS, into a separate
+SQLite file. `archive_connection()` ATTACHes that file as schema `archive` so
+historical lookups and search can UNION both databases transparently: the
+app reads archived batches through `database.get_batch_by_id` (falls back to
+`get_archived_batch`), the batch control and audit pages
+(`list_archived_batches`, `get_archived_batch_documents`) and
+/api/search_documents (`search_documents`).
+
+Batch ids stay unique across both files because the main tables use
+AUTOINCREMENT (sqlite_sequence keeps the high-water mark after rows leave).
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generator, Optional
+
+from .config_manager import app_config
+from .database import get_db_connection, _resolve_db_path, document_text_sql
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA = 'archive'
+
+# Tables moved per batch, in copy order. Each entry: (table, WHERE clause on
+# main.<table> selecting rows that belong to batch ?).
+_ARCHIVE_TABLES = (
+    ('batches', "id = ?"),
+    ('single_documents', "batch_id = ?"),
+    ('pages', "batch_id = ?"),
+    ('documents', "batch_id = ?"),
+    ('document_pages', "document_id IN (SELECT id FROM main.documents WHERE batch_id = ?)"),
+    ('document_tags', "document_id IN (SELECT id FROM main.single_documents WHERE batch_id = ?)"),
+    ('interaction_log', "batch_id = ?"),
+    ('document_text', "(owner_type = 'single_document' AND owner_id IN (SELECT id FROM main.single_documents WHERE batch_id = ?))"),
+    ('document_text', "(owner_type = 'page' AND owner_id IN (SELECT id FROM main.pages WHERE batch_id = ?))"),
+)
+
+_archive_lock = threading.Lock()
+_scheduler_started = False
+
+
+def get_archive_db_path() -> str:
+    """Return the archive database path (ARCHIVE_DATABASE_PATH or <db>_archive.db next to the main DB)."""
+    configured = getattr(app_config, 'ARCHIVE_DATABASE_PATH', None)
+    if configured:
+        return configured
+    main_path = _resolve_db_path(quiet=True)
+    stem, ext = os.path.splitext(main_path)
+    return f"{stem}_archive{ext or '.db'}"
+
+
+def attach_archive(conn: sqlite3.Connection, create: bool = False) -> bool:
+    """ATTACH the archive database to `conn` as schema `archive`.
+
+    Args:
+        conn: Connection from get_db_connection().
+        create: Create the archive file if missing (archival job). Readers pass
+            False so a missing archive simply means "no history".
+
+    Returns:
+        bool: True if the archive is attached.
+    """
+    path = get_archive_db_path()
+    try:
+        attached = {r[1] for r in conn.execute("PRAGMA database_list").fetchall()}
+        if ARCHIVE_SCHEMA in attached:
+            return True
+        if not create and not os.path.exists(path):
+            return False
+        conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"Could not attach archive database {path}: {e}")
+        return False
+
+
+@contextmanager
+def archive_connection(create: bool = False) -> Generator[sqlite3.Connection, None, None]:
+    """Yield a main-DB connection with the archive attached when available.
+
+    Use `archive_attached(conn)` to check whether `archive.*` tables may be queried.
+    """
+    conn = get_db_connection()
+    try:
+        attach_archive(conn, create=create)
+        yield conn
+    finally:
+        conn.close()
+
+
+def archive_attached(conn: sqlite3.Connection) -> bool:
+    try:
+        return ARCHIVE_SCHEMA in {r[1] for r in conn.execute("PRAGMA database_list").fetchall()}
+    except sqlite3.Error:
+        return False
+
+
+def _table_columns(conn: sqlite3.Connection, schema: str, table: str) -> list:
+    return [(r[1], r[2]) for r in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+
+def _ensure_archive_table(conn: sqlite3.Connection, table: str) -> list:
+    """Create/extend archive.<table> to match main.<table>; return the shared column names."""
+    main_cols = _table_columns(conn, 'main', table)
+    if not main_cols:
+        return []
+    arch_cols = _table_columns(conn, ARCHIVE_SCHEMA, table)
+    if not arch_cols:
+        row = conn.execute(
+            "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        if not row or not row[0]:
+            return []
+        ddl = re.sub(
+            r'^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?["`\[]?\w+["`\]]?',
+            f'CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.{table}',
+            row[0],
+            count=1,
+            flags=re.IGNORECASE,
+        )
+        conn.execute(ddl)
+        arch_cols = _table_columns(conn, ARCHIVE_SCHEMA, table)
+    # Main schema evolves via ALTER TABLE ADD COLUMN; mirror new columns
+    arch_names = {c[0] for c in arch_cols}
+    for name, decl_type in main_cols:
+        if name not in arch_names:
+            conn.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN {name} {decl_type or ''}")
+    return [c[0] for c in main_cols]
+
+
+def find_archivable_batches(older_than_days: Optional[int] = None) -> list:
+    """Return ids of exported batches whose export (or start) time is older than the cutoff."""
+    days = getattr(app_config, 'ARCHIVE_BATCHES_AFTER_DAYS', 90) if older_than_days is None else older_than_days
+    conn = get_db_connection()
+    try:
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(batches)").fetchall()}
+        age_expr = "COALESCE(exported_at, start_time)" if 'exported_at' in cols else "start_time"
+        rows = conn.execute(
+            f"""
+            SELECT id FROM batches
+            WHERE status = ? AND {age_expr} IS NOT NULL
+              AND {age_expr} <= datetime('now', ?)
+            ORDER BY id
+            """,
+            (app_config.STATUS_EXPORTED, f'-{int(days)} days'),
+        ).fetchall()
+        return [r[0] for r in rows]
+    except sqlite3.Error as e:
+        logger.error(f"Failed to list archivable batches: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+def copy_batch_to_archive(conn: sqlite3.Connection, batch_id: int) -> dict:
+    """Copy one batch's rows from main into archive (main is left untouched).
+
+    Returns:
+        dict: table -> rows copied.
+    """
+    copied = {}
+    for table, where in _ARCHIVE_TABLES:
+        cols = _ensure_archive_table(conn, table)
+        if not cols:
+            continue
+        col_list = ', '.join(cols)
+        cur = conn.execute(
+            f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table} ({col_list}) SELECT {col_list} FROM main.{table} WHERE {where}",
+            (batch_id,),
+        )
+        copied[table] = copied.get(table, 0) + max(cur.rowcount, 0)
+    return copied
+
+
+def _missing_from_archive(conn: sqlite3.Connection, batch_id: int) -> list:
+    """Tables holding more rows of the batch in main than in archive."""
+    missing = []
+    for table, where in _ARCHIVE_TABLES:
+        if not _table_columns(conn, 'main', table):
+            continue
+        in_main = conn.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where}", (batch_id,)).fetchone()[0]
+        archive_where = where.replace('main.', f'{ARCHIVE_SCHEMA}.')
+        in_archive = conn.execute(f"SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.{table} WHERE {archive_where}",
+                                  (batch_id,)).fetchone()[0]
+        if in_archive < in_main:
+            missing.append(table)
+    return missing
+
+
+def delete_archived_batch(conn: sqlite3.Connection, batch_id: int) -> None:
+    """Delete a batch already copied to archive from main."""
+    # Children before parents so the id subqueries still resolve
+    for table, where in reversed(_ARCHIVE_TABLES):
+        if _table_columns(conn, 'main', table):
+            conn.execute(f"DELETE FROM main.{table} WHERE {where}", (batch_id,))
+
+
+def archive_exported_batches(older_than_days: Optional[int] = None, dry_run: bool = False, limit: Optional[int] = None) -> dict:
+    """Move old exported batches into the archive database.
+
+    SQLite does not commit a transaction spanning ATTACHed databases
+    atomically in WAL mode, so each batch is moved in two: the copy into
+    the archive is committed first, and the rows are deleted from main only
+    once the archive holds all of them. A crash in between leaves the batch
+    in both files (re-archiving replaces the copies), never in neither.
+
+    Args:
+        older_than_days: Age threshold (defaults to ARCHIVE_BATCHES_AFTER_DAYS).
+        dry_run: Only report which batches would be archived.
+        limit: Maximum number of batches to move in this run.
+
+    Returns:
+        dict: {'archive_path', 'candidates', 'archived', 'failed', 'rows_moved'}
+    """
+    candidates = find_archivable_batches(older_than_days)
+    if limit:
+        candidates = candidates[:limit]
+    result = {
+        'archive_path': get_archive_db_path(),
+        'candidates': candidates,
+        'archived': [],
+        'failed': [],
+        'rows_moved': {},
+    }
+    if dry_run or not candidates:
+        return result
+
+    with _archive_lock:
+        conn = get_db_connection()
+        try:
+            if not attach_archive(conn, create=True):
+                result['failed'] = list(candidates)
+                return result
+            for batch_id in candidates:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    moved = copy_batch_to_archive(conn, batch_id)
+                    conn.commit()
+                    # Verified inside the delete's write transaction, so no row can slip in between
+                    conn.execute("BEGIN IMMEDIATE")
+                    missing = _missing_from_archive(conn, batch_id)
+                    if missing:
+                        raise sqlite3.DatabaseError(f"archive copy incomplete for {', '.join(missing)}")
+                    delete_archived_batch(conn, batch_id)
+                    conn.commit()
+                    result['archived'].append(batch_id)
+                    for table, count in moved.items():
+                        result['rows_moved'][table] = result['rows_moved'].get(table, 0) + count
+                    logger.info(f"🗄️ Archived batch {batch_id}: {moved}")
+                except sqlite3.Error as e:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass
+                    result['failed'].append(batch_id)
+                    logger.error(f"Failed to archive batch {batch_id}: {e}")
+        finally:
+            conn.close()
+    return result
+
+
+def get_archived_batch(batch_id: int) -> Optional[dict]:
+    """Return an archived batch with document/page counts, or None if not archived."""
+    with archive_connection() as conn:
+        if not archive_attached(conn):
+            return None
+        try:
+            row = conn.execute(f"SELECT * FROM {ARCHIVE_SCHEMA}.batches WHERE id = ?", (batch_id,)).fetchone()
+            if not row:
+                return None
+            batch = dict(row)
+            for table, key in (('single_documents', 'single_document_count'), ('pages', 'page_count')):
+                try:
+                    batch[key] = conn.execute(
+                        f"SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.{table} WHERE batch_id = ?", (batch_id,)
+                    ).fetchone()[0]
+                except sqlite3.Error:
+                    batch[key] = 0
+            batch['archived'] = True
+            return batch
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read archived batch {batch_id}: {e}")
+            return None
+
+
+def list_archived_batches() -> list:
+    """Archived batches, newest first, with their document counts ([] without an archive)."""
+    with archive_connection() as conn:
+        if not archive_attached(conn):
+            return []
+        try:
+            tables = {r[0] for r in conn.execute(
+                f"SELECT name FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table'"
+            ).fetchall()}
+            if 'batches' not in tables:
+                return []
+            doc_count = (f"(SELECT COUNT(*) FROM {ARCHIVE_SCHEMA}.documents d WHERE d.batch_id = b.id)"
+                         if 'documents' in tables else "0")
+            rows = conn.execute(
+                f"SELECT b.*, {doc_count} AS document_count FROM {ARCHIVE_SCHEMA}.batches b ORDER BY b.id DESC"
+            ).fetchall()
+            return [dict(r, archived=True) for r in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to list archived batches: {e}")
+            return []
+
+
+def get_archived_batch_documents(batch_id: int) -> list:
+    """Grouped documents of an archived batch (rows of archive.documents)."""
+    with archive_connection() as conn:
+        if not archive_attached(conn):
+            return []
+        try:
+            rows = conn.execute(
+                f"SELECT * FROM {ARCHIVE_SCHEMA}.documents WHERE batch_id = ? ORDER BY id", (batch_id,)
+            ).fetchall()
+            return [dict(r) for r in rows]
+        except sqlite3.Error as e:
+            logger.debug(f"No archived documents for batch {batch_id}: {e}")
+            return []
+
+
+def search_documents(term: str, include_archive: bool = True, include_ocr: bool = False, limit: int = 50) -> list:
+    """Search single documents by filename/category (optionally OCR text) across main and archive.
+
+    Returns:
+        list[dict]: rows with id, batch_id, original_filename, final_filename,
+        category and an `archived` flag, newest first.
+    """
+    pattern = f"%{term}%"
+
+    def _select(schema: str, archived: int) -> str:
+        conds = [
+            "sd.original_filename LIKE ?",
+            "sd.final_filename LIKE ?",
+            "COALESCE(sd.final_category, sd.ai_suggested_category) LIKE ?",
+        ]
+        if include_ocr:
+            text_expr = document_text_sql('single_document', 'ocr_text', 'sd').replace(
+                'FROM document_text dt', f'FROM {schema}.document_text dt'
+            )
+            conds.append(f"{text_expr} LIKE ?")
+        return (
+            f"SELECT sd.id, sd.batch_id, sd.original_filename, sd.final_filename, "
+            f"COALESCE(sd.final_category, sd.ai_suggested_category) AS category, {archived} AS archived "
+            f"FROM {schema}.single_documents sd WHERE " + " OR ".join(conds)
+        )
+
+    per_select = 4 if include_ocr else 3
+    with archive_connection() as conn:
+        parts = [_select('main', 0)]
+        params = [pattern] * per_select
+        if include_archive and archive_attached(conn):
+            try:
+                has_docs = conn.execute(
+                    f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = 'single_documents'"
+                ).fetchone()
+                has_text = conn.execute(
+                    f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = 'document_text'"
+                ).fetchone()
+            except sqlite3.Error:
+                has_docs = has_text = None
+            if has_docs and (has_text or not include_ocr):
+                parts.append(_select(ARCHIVE_SCHEMA, 1))
+                params += [pattern] * per_select
+        sql = " UNION ALL ".join(parts) + " ORDER BY id DESC LIMIT ?"
+        try:
+            rows = conn.execute(sql, (*params, limit)).fetchall()
+            return [dict(r) for r in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Document search failed: {e}")
+            return []
+
+
+def start_archive_scheduler() -> bool:
+    """Start the daemon thread that runs archive_exported_batches periodically.
+
+    Disabled when ARCHIVE_JOB_INTERVAL_HOURS <= 0. Exits when SHUTDOWN_EVENT is set.
+    """
+    global _scheduler_started
+    interval_hours = float(getattr(app_config, 'ARCHIVE_JOB_INTERVAL_HOURS', 24) or 0)
+    if _scheduler_started or interval_hours <= 0:
+        return False
+    _scheduler_started = True
+
+    def _loop():
+        from .config_manager import SHUTDOWN_EVENT
+        # Give startup a head start before touching the DB
+        if SHUTDOWN_EVENT is not None and SHUTDOWN_EVENT.wait(60):
+            return
+        while True:
+            try:
+                started = time.time()
+                res = archive_exported_batches()
+                if res['archived'] or res['failed']:
+                    logger.info(
+                        f"🗄️ Archive job moved {len(res['archived'])} batch(es), {len(res['failed'])} failed "
+                        f"in {time.time() - started:.1f}s"
+                    )
+            except Exception as e:
+                logger.warning(f"Archive job error: {e}")
+            if SHUTDOWN_EVENT is None:
+                time.sleep(interval_hours * 3600)
+            elif SHUTDOWN_EVENT.wait(interval_hours * 3600):
+                logger.info("Archive scheduler detected shutdown event; exiting")
+                return
+
+    threading.Thread(target=_loop, daemon=True, name='BatchArchiveScheduler').start()
+    return True
@@ -0,0 +1,220 @@
+"""
+Online database backups built on the SQLite backup API.
+
+`shutil.copy2` of a live WAL-mode database can capture a torn snapshot (the
+-wal file is not copied atomically with the main file) and holds the disk for
+the whole copy. `sqlite3.Connection.backup` instead copies a consistent
+snapshot page by page; between steps we sleep so request handlers and the
+processing pipeline keep getting the write lock. If a writer modifies the
+source mid-backup SQLite restarts the copy, so the result is always a
+point-in-time image.
+
+Each snapshot is written to `<name>.partial`, checked with `PRAGMA quick_check`,
+optionally gzip-compressed and only then renamed into place, so a file named
+`documents.db.backup.<timestamp>[.gz]` is always complete.
+"""
+import datetime
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from .config_manager import app_config
+
+logger = logging.getLogger(__name__)
+
+_backup_lock = threading.Lock()
+_status_lock = threading.Lock()
+_BACKUP_STATUS = {
+    'state': 'idle',  # idle | running | verifying | compressing | completed | failed
+    'started_at': None,
+    'finished_at': None,
+    'pages_total': 0,
+    'pages_done': 0,
+    'percent': 0.0,
+    'dest': None,
+    'size_bytes': None,
+    'error': None,
+}
+
+
+def _update_status(**fields) -> None:
+    with _status_lock:
+        _BACKUP_STATUS.update(fields)
+
+
+def get_backup_status() -> dict:
+    """Return a snapshot of the current/last backup's progress."""
+    with _status_lock:
+        return dict(_BACKUP_STATUS)
+
+
+def default_backup_dir() -> str:
+    """Resolve the backup directory (env DB_BACKUP_DIR, config, then XDG default)."""
+    backup_root = os.getenv('DB_BACKUP_DIR') or getattr(app_config, 'DB_BACKUP_DIR', None)
+    if not backup_root:
+        xdg_data = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        backup_root = os.path.join(xdg_data, 'doc_processor', 'db_backups')
+    return backup_root
+
+
+def online_backup(
+    db_path: Optional[str] = None,
+    dest_dir: Optional[str] = None,
+    compress: Optional[bool] = None,
+    pages_per_step: Optional[int] = None,
+    step_sleep_ms: Optional[int] = None,
+    verify: bool = True,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """Take a consistent snapshot of a live SQLite database.
+
+    Args:
+        db_path: Source database (defaults to the active DATABASE_PATH).
+        dest_dir: Output directory (defaults to DB_BACKUP_DIR).
+        compress: gzip the snapshot (defaults to DB_BACKUP_COMPRESS).
+        pages_per_step: Pages copied per backup step (DB_BACKUP_PAGES_PER_STEP).
+        step_sleep_ms: Pause between steps so writers are not starved (DB_BACKUP_STEP_SLEEP_MS).
+        verify: Run PRAGMA quick_check on the snapshot before publishing it.
+        progress_callback: Optional callable(pages_done, pages_total).
+
+    Returns:
+        dict: {'success', 'dest', 'size_bytes', 'pages', 'duration_seconds', 'compressed', 'integrity'}
+
+    Raises:
+        RuntimeError: If the copy or the consistency check fails.
+    """
+    with _backup_lock:
+        return _online_backup_locked(
+            db_path=db_path, dest_dir=dest_dir, compress=compress, pages_per_step=pages_per_step,
+            step_sleep_ms=step_sleep_ms, verify=verify, progress_callback=progress_callback,
+        )
+
+
+def _online_backup_locked(
+    db_path: Optional[str] = None,
+    dest_dir: Optional[str] = None,
+    compress: Optional[bool] = None,
+    pages_per_step: Optional[int] = None,
+    step_sleep_ms: Optional[int] = None,
+    verify: bool = True,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """online_backup with _backup_lock already held by the caller."""
+    if db_path is None:
+        from .database import _resolve_db_path
+        db_path = _resolve_db_path(quiet=True)
+    dest_dir = dest_dir or default_backup_dir()
+    compress = getattr(app_config, 'DB_BACKUP_COMPRESS', False) if compress is None else compress
+    pages_per_step = pages_per_step or getattr(app_config, 'DB_BACKUP_PAGES_PER_STEP', 1024)
+    if step_sleep_ms is None:
+        step_sleep_ms = getattr(app_config, 'DB_BACKUP_STEP_SLEEP_MS', 25)
+
+    os.makedirs(dest_dir, exist_ok=True)
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    base_name = f"{os.path.basename(db_path)}.backup.{timestamp}"
+    snapshot_path = os.path.join(dest_dir, base_name)
+    final_path = snapshot_path + ('.gz' if compress else '')
+    partial_path = snapshot_path + '.partial'
+
+    started = time.time()
+    _update_status(
+        state='running', started_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        finished_at=None, pages_total=0, pages_done=0, percent=0.0,
+        dest=final_path, size_bytes=None, error=None,
+    )
+
+    def _progress(status, remaining, total):
+        done = max(total - remaining, 0)
+        _update_status(pages_total=total, pages_done=done, percent=round(100.0 * done / total, 1) if total else 100.0)
+        if progress_callback:
+            try:
+                progress_callback(done, total)
+            except Exception:
+                pass
+        if remaining and step_sleep_ms > 0:
+            time.sleep(step_sleep_ms / 1000.0)
+
+    src = dst = None
+    try:
+        src = sqlite3.connect(db_path, timeout=30)
+        dst = sqlite3.connect(partial_path)
+        src.backup(dst, pages=max(int(pages_per_step), 1), progress=_progress)
+        # Snapshot is a standalone file; rollback journal keeps it single-file
+        dst.execute("PRAGMA journal_mode=DELETE")
+        integrity = 'skipped'
+        if verify:
+            _update_status(state='verifying')
+            integrity = dst.execute("PRAGMA quick_check").fetchone()[0]
+            if integrity != 'ok':
+                raise RuntimeError(f"Backup consistency check failed: {integrity}")
+        page_count = dst.execute("PRAGMA page_count").fetchone()[0]
+        dst.close()
+        dst = None
+
+        if compress:
+            _update_status(state='compressing')
+            with open(partial_path, 'rb') as fin, gzip.open(final_path + '.partial', 'wb') as fout:
+                shutil.copyfileobj(fin, fout, 1024 * 1024)
+            os.remove(partial_path)
+            os.replace(final_path + '.partial', final_path)
+        else:
+            os.replace(partial_path, final_path)
+
+        result = {
+            'success': True,
+            'dest': final_path,
+            'size_bytes': os.path.getsize(final_path),
+            'pages': page_count,
+            'duration_seconds': round(time.time() - started, 3),
+            'compressed': bool(compress),
+            'integrity': integrity,
+        }
+        _update_status(
+            state='completed', size_bytes=result['size_bytes'], percent=100.0,
+            finished_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        )
+        logger.info(f"💾 Online backup {db_path} -> {final_path} ({page_count} pages, {result['duration_seconds']}s)")
+        return result
+    except Exception as e:
+        _update_status(state='failed', error=str(e), finished_at=datetime.datetime.now(datetime.timezone.utc).isoformat())
+        for leftover in (partial_path, final_path + '.partial'):
+            try:
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            except OSError:
+                pass
+        raise RuntimeError(f"Failed to back up database {db_path}: {e}") from e
+    finally:
+        for c in (dst, src):
+            if c is not None:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+
+
+def start_backup_async(**kwargs) -> bool:
+    """Run online_backup in a daemon thread. Returns False if one is already running."""
+    # Take the lock here, not in the thread, so concurrent callers cannot both start one
+    if not _backup_lock.acquire(blocking=False):
+        return False
+
+    def _run():
+        try:
+            _online_backup_locked(**kwargs)
+        except Exception as e:
+            logger.error(f"Background database backup failed: {e}")
+        finally:
+            _backup_lock.release()
+
+    try:
+        threading.Thread(target=_run, daemon=True, name='OnlineDatabaseBackup').start()
+    except Exception:
+        _backup_lock.release()
+        raise
+    return True
@@ -0,0 +1,318 @@
+"""
+Cheap SQLite diagnostics for the admin pages.
+
+The old `/admin/db_diagnostics` handler ran `SELECT COUNT(*)` on every table and
+SHA-256 hashed the database file on each request, which is O(database size).
+This collector only reads metadata:
+
+- row estimates from `sqlite_stat1` (maintained by ANALYZE / PRAGMA optimize),
+  falling back to `MAX(rowid)` (a single b-tree seek) for tables not analysed;
+- per-table and per-index page counts, unused bytes and fragmentation from the
+  `dbstat` virtual table (when SQLite was compiled with it);
+- free-list size, page size and the current `-wal` file size.
+
+Snapshots are cached and refreshed by a background thread, so page loads never
+touch more than the cache. The `dbstat` scan reads every page of the database,
+so only an admin refresh (or the first snapshot) runs it; background refreshes
+reuse the last scan's numbers, and `PRAGMA optimize` runs at most every few
+hours. `vacuum_advice` summarises when `/admin/database/vacuum` is worth running.
+"""
+import datetime
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from .config_manager import app_config
+
+logger = logging.getLogger(__name__)
+
+# Vacuum recommendation thresholds
+_FREE_RATIO_VACUUM = 0.20  # > 20% of pages on the free-list
+_FRAGMENTATION_VACUUM = 0.50  # > 50% of a large table's pages out of order
+_FRAGMENTATION_MIN_PAGES = 256
+_WAL_CHECKPOINT_BYTES = 64 * 1024 * 1024
+_OPTIMIZE_INTERVAL_SECONDS = 6 * 3600
+
+_snapshot_lock = threading.Lock()
+_snapshot: Optional[dict] = None
+# Last dbstat scan: {'db_path', 'usage', 'collected_at'}
+_last_btree_usage: Optional[dict] = None
+_refresher_started = False
+
+
+def _dbstat_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("SELECT 1 FROM dbstat LIMIT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _stat1_rows(conn: sqlite3.Connection) -> dict:
+    """Map table/index name -> sqlite_stat1 'stat' string (empty if never analysed)."""
+    try:
+        has_stat = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).fetchone()
+        if not has_stat:
+            return {}
+        return {(r[0], r[1]): r[2] for r in conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()}
+    except sqlite3.Error:
+        return {}
+
+
+def _btree_usage(conn: sqlite3.Connection) -> dict:
+    """Return name -> {'pages', 'bytes', 'unused_bytes', 'fragmentation'} from dbstat.
+
+    Fragmentation is the share of pages whose page number does not directly
+    follow the previous page of the same b-tree (dbstat yields pages in b-tree
+    traversal order), i.e. how far a sequential scan is from sequential I/O.
+    """
+    usage = {}
+    last_page = {}
+    jumps = {}
+    for name, pageno, pgsize, unused in conn.execute("SELECT name, pageno, pgsize, unused FROM dbstat"):
+        u = usage.get(name)
+        if u is None:
+            u = usage[name] = {'pages': 0, 'bytes': 0, 'unused_bytes': 0}
+            jumps[name] = 0
+        else:
+            if pageno != last_page[name] + 1:
+                jumps[name] += 1
+        last_page[name] = pageno
+        u['pages'] += 1
+        u['bytes'] += pgsize or 0
+        u['unused_bytes'] += unused or 0
+    for name, u in usage.items():
+        u['fragmentation'] = round(jumps[name] / (u['pages'] - 1), 3) if u['pages'] > 1 else 0.0
+    return usage
+
+
+def collect_db_diagnostics(db_path: Optional[str] = None, scan_btrees: bool = True) -> dict:
+    """Collect a diagnostics snapshot without scanning table contents.
+
+    Args:
+        db_path: Database to inspect (default: the active database).
+        scan_btrees: Read page usage from `dbstat`. When False the numbers of
+            the last scan of the same database are reported instead.
+
+    Returns:
+        dict: path/size/mtime/wal metadata, 'tables' and 'indexes' lists,
+        free-list stats, 'vacuum_advice' and 'warnings'.
+    """
+    started = time.time()
+    if db_path is None:
+        from .database import _resolve_db_path
+        db_path = _resolve_db_path(quiet=True)
+    db_path = os.path.abspath(db_path)
+    exists = os.path.exists(db_path)
+    wal_path = db_path + '-wal'
+    snapshot = {
+        'db_path': db_path,
+        'exists': exists,
+        'size_bytes': os.path.getsize(db_path) if exists else 0,
+        'mtime_iso': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(os.path.getmtime(db_path))) if exists else None,
+        'wal_size_bytes': os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+        'page_size': None,
+        'page_count': None,
+        'freelist_count': None,
+        'free_ratio': None,
+        'dbstat_available': False,
+        'btree_usage_collected_at': None,
+        'stats_analyzed': False,
+        'tables': [],
+        'indexes': [],
+        'vacuum_advice': {'recommended': False, 'reasons': [], 'reclaimable_bytes': 0},
+        'warnings': [],
+        'collected_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'duration_ms': None,
+    }
+    if not exists:
+        snapshot['warnings'].append('Database file does not exist.')
+        return snapshot
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=5)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        snapshot.update(
+            page_size=page_size,
+            page_count=page_count,
+            freelist_count=freelist,
+            free_ratio=round(freelist / page_count, 3) if page_count else 0.0,
+        )
+
+        schema = conn.execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE type IN ('table', 'index') ORDER BY name"
+        ).fetchall()
+        stat1 = _stat1_rows(conn)
+        snapshot['stats_analyzed'] = bool(stat1)
+        usage = {}
+        if scan_btrees:
+            if _dbstat_available(conn):
+                usage = _btree_usage(conn)
+                _remember_btree_usage(db_path, usage, snapshot['collected_at'])
+                snapshot.update(dbstat_available=True, btree_usage_collected_at=snapshot['collected_at'])
+        else:
+            last = _last_btree_usage
+            if last and last['db_path'] == db_path:
+                usage = last['usage']
+                snapshot.update(dbstat_available=True, btree_usage_collected_at=last['collected_at'])
+
+        for obj_type, name, tbl_name, sql in schema:
+            u = usage.get(name, {})
+            if obj_type == 'table':
+                rows, source = None, None
+                stat = stat1.get((name, None))
+                if stat is None:
+                    # Any index entry of an analysed table also carries the row count
+                    stat = next((s for (t, _i), s in stat1.items() if t == name), None)
+                if stat:
+                    rows, source = int(stat.split()[0]), 'sqlite_stat1'
+                elif not (sql or '').upper().rstrip().endswith('WITHOUT ROWID') and not name.startswith('sqlite_'):
+                    try:
+                        rows, source = conn.execute(f'SELECT MAX(rowid) FROM "{name}"').fetchone()[0] or 0, 'max_rowid'
+                    except sqlite3.Error:
+                        pass
+                snapshot['tables'].append({
+                    'name': name,
+                    'rows': rows,
+                    'rows_source': source,
+                    'pages': u.get('pages'),
+                    'bytes': u.get('bytes'),
+                    'unused_bytes': u.get('unused_bytes'),
+                    'fragmentation': u.get('fragmentation'),
+                })
+            else:
+                stat = stat1.get((tbl_name, name))
+                selectivity = None
+                if stat:
+                    parts = [int(p) for p in stat.split() if p.isdigit()]
+                    # stat = "<rows> <avg rows per distinct first-column value> ..."
+                    if len(parts) >= 2 and parts[0]:
+                        selectivity = round(parts[1] / parts[0], 4)
+                snapshot['indexes'].append({
+                    'name': name,
+                    'table': tbl_name,
+                    'auto': sql is None,
+                    'stat': stat,
+                    'selectivity': selectivity,
+                    'low_selectivity': selectivity is not None and selectivity > 0.1,
+                    'pages': u.get('pages'),
+                    'bytes': u.get('bytes'),
+                    'unused_bytes': u.get('unused_bytes'),
+                })
+
+        advice = snapshot['vacuum_advice']
+        free_bytes = freelist * page_size
+        unused_total = sum((t.get('unused_bytes') or 0) for t in snapshot['tables'] + snapshot['indexes'])
+        advice['reclaimable_bytes'] = free_bytes + unused_total
+        if snapshot['free_ratio'] and snapshot['free_ratio'] > _FREE_RATIO_VACUUM:
+            advice['reasons'].append(f"{snapshot['free_ratio']:.0%} of pages are on the free-list ({free_bytes} bytes).")
+        for t in snapshot['tables']:
+            if (t['pages'] or 0) >= _FRAGMENTATION_MIN_PAGES and (t['fragmentation'] or 0) > _FRAGMENTATION_VACUUM:
+                advice['reasons'].append(f"Table {t['name']} is {t['fragmentation']:.0%} fragmented ({t['pages']} pages).")
+        advice['recommended'] = bool(advice['reasons'])
+        if snapshot['wal_size_bytes'] > _WAL_CHECKPOINT_BYTES:
+            snapshot['warnings'].append(
+                f"WAL file is {snapshot['wal_size_bytes']} bytes; a long-lived reader may be blocking checkpoints."
+            )
+        if not stat1:
+            snapshot['warnings'].append('No sqlite_stat1 statistics yet; row counts are MAX(rowid) upper bounds.')
+    except sqlite3.Error as e:
+        logger.warning(f"DB diagnostics collection failed for {db_path}: {e}")
+        snapshot['warnings'].append(f'Diagnostics incomplete: {e}')
+    finally:
+        conn.close()
+
+    table_names = {t['name'] for t in snapshot['tables']}
+    expected_core = {'batches', 'single_documents'}
+    if not expected_core.issubset(table_names):
+        snapshot['warnings'].append('Missing core tables: ' + ', '.join(sorted(expected_core - table_names)))
+    # Minimal schema heuristic: fewer than 6 tables typically indicates fresh DB
+    if len(table_names) < 6:
+        snapshot['warnings'].append('Database appears MINIMAL / freshly initialized (fewer than 6 tables).')
+    if 'pages' not in table_names:
+        snapshot['warnings'].append('No pages table found – legacy grouped workflow will not function fully.')
+    snapshot['duration_ms'] = round((time.time() - started) * 1000, 1)
+    return snapshot
+
+
+def _remember_btree_usage(db_path: str, usage: dict, collected_at: str) -> None:
+    global _last_btree_usage
+    with _snapshot_lock:
+        _last_btree_usage = {'db_path': db_path, 'usage': usage, 'collected_at': collected_at}
+
+
+def refresh_db_diagnostics(optimize: bool = False, scan_btrees: bool = True) -> dict:
+    """Collect a fresh snapshot and cache it.
+
+    Args:
+        optimize: Run `PRAGMA optimize` first so sqlite_stat1 stays current
+            (only re-analyses tables whose statistics are stale).
+        scan_btrees: Passed to `collect_db_diagnostics`.
+    """
+    global _snapshot
+    if optimize:
+        try:
+            from .database import get_db_connection
+            conn = get_db_connection()
+            try:
+                conn.execute("PRAGMA optimize")
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.debug(f"PRAGMA optimize skipped: {e}")
+    snap = collect_db_diagnostics(scan_btrees=scan_btrees)
+    with _snapshot_lock:
+        _snapshot = snap
+    return snap
+
+
+def get_db_diagnostics(refresh: bool = False) -> dict:
+    """Return the cached diagnostics snapshot, collecting one on first use or when refresh=True.
+
+    The first request also scans dbstat if no earlier collection has.
+    """
+    with _snapshot_lock:
+        snap = _snapshot
+        scanned = _last_btree_usage is not None
+    if refresh or snap is None or not scanned:
+        return refresh_db_diagnostics()
+    return snap
+
+
+def start_diagnostics_refresher() -> bool:
+    """Refresh the cached snapshot every DB_DIAGNOSTICS_REFRESH_SECONDS in a daemon thread.
+
+    Background refreshes skip the dbstat scan and run `PRAGMA optimize` at most
+    every _OPTIMIZE_INTERVAL_SECONDS.
+    """
+    global _refresher_started
+    interval = int(getattr(app_config, 'DB_DIAGNOSTICS_REFRESH_SECONDS', 300) or 0)
+    if _refresher_started or interval <= 0:
+        return False
+    _refresher_started = True
+
+    def _loop():
+        from .config_manager import SHUTDOWN_EVENT
+        last_optimize = None
+        while True:
+            try:
+                optimize = last_optimize is None or time.monotonic() - last_optimize >= _OPTIMIZE_INTERVAL_SECONDS
+                if optimize:
+                    last_optimize = time.monotonic()
+                refresh_db_diagnostics(optimize=optimize, scan_btrees=False)
+            except Exception as e:
+                logger.warning(f"DB diagnostics refresh failed: {e}")
+            if SHUTDOWN_EVENT is None:
+                time.sleep(interval)
+            elif SHUTDOWN_EVENT.wait(interval):
+                return
+
+    threading.Thread(target=_loop, daemon=True, name='DbDiagnosticsRefresher').start()
+    return True
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Move old exported batches into the cold-storage archive database.
+
+Exported batches are immutable, but their pages, documents, tags, logs and
+OCR text keep the hot database large. This script moves every batch in
+STATUS_EXPORTED older than the threshold into ARCHIVE_DATABASE_PATH (one
+transaction per batch). Archived batches stay searchable through
+`db_archive.search_documents` / `get_archived_batch`.
+
+Usage:
+  python dev_tools/archive_exported_batches.py [--days 90] [--dry-run] [--limit N] [--vacuum]
+"""
+
+import argparse
+import logging
+import sys
+import os
+
+# Add the parent directory to the path to import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from doc_processor.database import get_db_connection
+from doc_processor.db_archive import archive_exported_batches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Archive old exported batches into the archive database')
+    parser.add_argument('--days', type=int, default=None, help='Age threshold (default: ARCHIVE_BATCHES_AFTER_DAYS)')
+    parser.add_argument('--dry-run', action='store_true', help='Only list batches that would be archived')
+    parser.add_argument('--limit', type=int, default=None, help='Maximum batches to move in this run')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM the main database afterwards')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        result = archive_exported_batches(older_than_days=args.days, dry_run=args.dry_run, limit=args.limit)
+    except Exception as e:
+        print(f"Error archiving batches: {e}")
+        return 1
+
+    print(f"Archive database: {result['archive_path']}")
+    if args.dry_run:
+        print(f"Would archive {len(result['candidates'])} batch(es): {result['candidates']}")
+        return 0
+
+    print(f"✓ Archived {len(result['archived'])} batch(es): {result['archived']}")
+    for table, count in result['rows_moved'].items():
+        print(f"  {table}: {count} row(s)")
+    if result['failed']:
+        print(f"✗ Failed: {result['failed']}")
+
+    if args.vacuum and result['archived']:
+        conn = get_db_connection()
+        try:
+            conn.execute("VACUUM")
+            print("✓ VACUUM complete")
+        finally:
+            conn.close()
+    return 1 if result['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
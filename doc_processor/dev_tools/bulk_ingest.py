@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Bulk-ingest a directory tree or file list without the web UI.
+
+Files are sharded into batches and run through the normal detection, OCR and
+AI stages; progress is kept in a manifest so an interrupted run can simply be
+started again. Live and final throughput (docs/s, pages/s, per-stage time)
+is printed.
+
+Usage:
+  python dev_tools/bulk_ingest.py PATH [PATH ...] [--file-list FILE] [--manifest FILE]
+      [--batch-size N] [--detect-workers N] [--ocr-workers N] [--ai-workers N]
+      [--report-seconds S] [--distribute] [--dry-run]
+
+With --distribute, single documents are queued as per-document jobs for
+worker processes (python -m doc_processor.worker) instead of being processed
+here.
+"""
+
+import argparse
+import logging
+import sys
+import os
+import time
+
+# Add the parent directory to the path to import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from doc_processor.bulk_ingest import run_bulk_ingest
+from doc_processor.config_manager import app_config
+from doc_processor.governor import start_governor
+from doc_processor.job_queue import list_worker_processes
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+def _print_summary(report: dict) -> None:
+    print(f"\nIngested {report['documents']} document(s), {report['pages']} page(s) "
+          f"in {_format_duration(report['elapsed_seconds'])}: "
+          f"{report['docs_per_second']:.2f} docs/s, {report['pages_per_second']:.2f} pages/s")
+    print(f"Shards: {report['shards_done']}/{report['shards_total']} done; {report['failed']} document(s) failed")
+    if report['stages']:
+        print(f"{'stage':<12}{'busy s':>10}{'items':>8}{'s/item':>9}")
+        for name, stage in report['stages'].items():
+            per_item = stage['seconds'] / stage['items'] if stage['items'] else 0.0
+            print(f"{name:<12}{stage['seconds']:>10.1f}{stage['items']:>8}{per_item:>9.2f}")
+        print("(busy time is summed over a stage's workers; stages overlap)")
+    for shard in report['shards']:
+        if shard.get('error') or shard.get('failed'):
+            print(f"  shard {shard['index'] + 1}: {shard.get('error') or ''} {shard['failed']} failed file(s)")
+    print(f"Manifest: {report['manifest']}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Bulk-ingest documents into batches without the web UI')
+    parser.add_argument('paths', nargs='*', help='Directories (walked recursively) and/or files')
+    parser.add_argument('--file-list', action='append', default=[], help='File with one path per line (repeatable)')
+    parser.add_argument('--manifest', default='bulk_ingest_manifest.json', help='Progress manifest (re-run to resume)')
+    parser.add_argument('--batch-size', type=int, default=None, help='Files per batch (default: BULK_INGEST_BATCH_SIZE)')
+    parser.add_argument('--detect-workers', type=int, default=None, help='Detection processes (default: INTAKE_ANALYSIS_WORKERS)')
+    parser.add_argument('--ocr-workers', type=int, default=None, help='OCR stage threads (default: PIPELINE_OCR_WORKERS)')
+    parser.add_argument('--ai-workers', type=int, default=None, help='AI stage threads (default: PIPELINE_AI_WORKERS)')
+    parser.add_argument('--report-seconds', type=float, default=10.0, help='Interval between live throughput lines')
+    parser.add_argument('--distribute', action='store_true',
+                        help='Queue single documents as jobs for worker processes (python -m doc_processor.worker)')
+    parser.add_argument('--dry-run', action='store_true', help='Only show how new files would be sharded')
+    args = parser.parse_args()
+
+    if not args.paths and not args.file_list and not os.path.exists(args.manifest):
+        parser.error('give at least one path or --file-list (or an existing --manifest to resume)')
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.ocr_workers:
+        app_config.PIPELINE_OCR_WORKERS = args.ocr_workers
+    if args.ai_workers:
+        app_config.PIPELINE_AI_WORKERS = args.ai_workers
+    if not args.dry_run:
+        start_governor()
+    if args.distribute and not args.dry_run and not list_worker_processes():
+        print("No worker process is running yet; start one (python -m doc_processor.worker) within 2 minutes "
+              "or the run stops with the documents still queued")
+
+    last_report = 0.0
+
+    def on_progress(stats, message: str) -> None:
+        nonlocal last_report
+        if message.startswith('✗'):
+            print(message)
+        if time.monotonic() - last_report < args.report_seconds and message != 'finished':
+            return
+        last_report = time.monotonic()
+        print(f"[{_format_duration(stats.elapsed)}] shards {stats.shards_done}/{stats.shards_total} | "
+              f"{stats.documents} docs, {stats.pages} pages | "
+              f"{stats.docs_per_second:.2f} docs/s, {stats.pages_per_second:.2f} pages/s | {stats.failed} failed")
+
+    try:
+        report = run_bulk_ingest(args.paths, args.manifest, file_lists=args.file_list, batch_size=args.batch_size,
+                                 detect_workers=args.detect_workers, on_progress=on_progress, dry_run=args.dry_run,
+                                 distribute=args.distribute)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; re-run with --manifest {args.manifest} to resume")
+        return 130
+    except Exception as e:
+        print(f"Error during bulk ingest: {e}")
+        return 1
+
+    if args.dry_run:
+        print(f"{report['new_files']} new file(s); {len(report['shards'])} shard(s) to process:")
+        for shard in report['shards']:
+            print(f"  shard {shard['index'] + 1}: {shard['files']} file(s)")
+        return 0
+
+    _print_summary(report)
+    return 1 if any(s.get('error') for s in report['shards']) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Move inline OCR text / AI summaries into the document_text side table.
+
+Older databases store `ocr_text` and `ai_summary` directly on
+`single_documents` and `pages`, which makes every listing query drag the full
+text along. This script copies those values into `document_text` (zlib
+compressed when DOCUMENT_TEXT_COMPRESSION is enabled) and clears the inline
+columns. It is idempotent and commits in chunks, so it can be re-run or
+interrupted safely.
+
+Usage:
+  python dev_tools/migrate_document_text.py [--chunk-size 500] [--vacuum]
+"""
+
+import argparse
+import logging
+import sys
+import os
+
+# Add the parent directory to the path to import our modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from doc_processor.database import get_db_connection, migrate_document_text_to_side_table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Move inline OCR text / AI summaries into document_text')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Rows committed per chunk')
+    parser.add_argument('--vacuum', action='store_true', help='VACUUM afterwards to reclaim freed pages')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        moved = migrate_document_text_to_side_table(chunk_size=args.chunk_size)
+    except Exception as e:
+        print(f"Error migrating document text: {e}")
+        return 1
+
+    for key, count in moved.items():
+        print(f"✓ {key}: moved {count} value(s)")
+
+    if args.vacuum:
+        conn = get_db_connection()
+        try:
+            conn.execute("VACUUM")
+            print("✓ VACUUM complete")
+        finally:
+            conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
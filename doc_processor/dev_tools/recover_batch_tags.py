@@ -44,6 +44,10 @@ if PROJECT_ROOT not in sys.path:
 
 from config_manager import app_config  # type: ignore
 from llm_utils import extract_document_tags  # type: ignore
+try:
+    from database import get_document_text, set_document_text  # type: ignore
+except ImportError:
+    from doc_processor.database import get_document_text, set_document_text  # type: ignore
 
 # Support both invocation styles:
 # 1. python dev_tools/recover_batch_tags.py (with PROJECT_ROOT on sys.path)
@@ -72,10 +76,9 @@ except Exception:
 
 
 def ensure_ocr_text(conn: sqlite3.Connection, doc_id: int, original_pdf: str) -> Optional[str]:
-    cur = conn.cursor()
-    row = cur.execute("SELECT ocr_text FROM single_documents WHERE id=?", (doc_id,)).fetchone()
-    if row and row[0]:
-        return row[0]
+    existing = get_document_text('single_document', doc_id, 'ocr_text', conn=conn)
+    if existing:
+        return existing
     if not original_pdf or not os.path.exists(original_pdf):
         logging.warning(f"Doc {doc_id}: original PDF missing, cannot OCR")
         return None
@@ -101,7 +104,7 @@ def ensure_ocr_text(conn: sqlite3.Connection, doc_id: int, original_pdf: str) ->
         from io import BytesIO
         with Image.open(BytesIO(img_bytes)) as im:
             text = pytesseract.image_to_string(im) or ''
-        cur.execute("UPDATE single_documents SET ocr_text=? WHERE id=?", (text, doc_id))
+        set_document_text('single_document', doc_id, 'ocr_text', text, conn=conn)
         conn.commit()
         return text
     except Exception as e:
@@ -215,7 +218,7 @@ def main():
     cur = conn.cursor()
 
     # Fetch documents for batch
-    cur.execute("SELECT id, original_pdf_path, searchable_pdf_path, final_category, final_filename, ai_suggested_category, ai_suggested_filename, ocr_text FROM single_documents WHERE batch_id=?", (args.batch,))
+    cur.execute("SELECT id, original_pdf_path, searchable_pdf_path, final_category, final_filename, ai_suggested_category, ai_suggested_filename FROM single_documents WHERE batch_id=?", (args.batch,))
     docs = cur.fetchall()
     if not docs:
         logging.error(f"No single_documents rows found for batch {args.batch}")
@@ -226,7 +229,8 @@ def main():
     processed = 0
 
     for doc in docs:
-        doc_id, original_pdf, searchable_pdf, final_cat, final_fn, ai_cat, ai_fn, ocr_text = doc
+        doc_id, original_pdf, searchable_pdf, final_cat, final_fn, ai_cat, ai_fn = doc
+        ocr_text = get_document_text('single_document', doc_id, 'ocr_text', conn=conn)
         display_name = final_fn or ai_fn or f"document_{doc_id}"
         category = final_cat or ai_cat or 'Uncategorized'
         filename_base = display_name
@@ -255,9 +259,10 @@ def main():
 
         # Regenerate markdown with updated tag list and AI metadata
         # Re-fetch AI metadata in case of schema updates
-        detail = cur.execute("SELECT ai_confidence, ai_summary, final_category, final_filename, ai_suggested_category, ai_suggested_filename FROM single_documents WHERE id=?", (doc_id,)).fetchone()
+        detail = cur.execute("SELECT ai_confidence, final_category, final_filename, ai_suggested_category, ai_suggested_filename FROM single_documents WHERE id=?", (doc_id,)).fetchone()
         if detail:
-            ai_conf, ai_summary, final_cat2, final_fn2, ai_cat2, ai_fn2 = detail
+            ai_conf, final_cat2, final_fn2, ai_cat2, ai_fn2 = detail
+            ai_summary = get_document_text('single_document', doc_id, 'ai_summary', conn=conn)
         else:
             ai_conf = ai_summary = final_cat2 = final_fn2 = ai_cat2 = ai_fn2 = None
         # Determine final naming again
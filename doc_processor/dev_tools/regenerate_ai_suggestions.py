@@ -13,7 +13,7 @@ import logging
 # Add the parent directory to the path to import our modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from doc_processor.database import get_db_connection
+from doc_processor.database import get_db_connection, document_text_sql, set_document_text
 from doc_processor.processing import _get_ai_suggestions_for_document
 
 def regenerate_ai_suggestions_for_batch(batch_id: int):
@@ -27,8 +27,9 @@ def regenerate_ai_suggestions_for_batch(batch_id: int):
 
     try:
         # Get all documents in the batch
-        cursor.execute("""
-            SELECT id, original_filename, ocr_text, page_count, file_size_bytes
+        cursor.execute(f"""
+            SELECT id, original_filename, {document_text_sql('single_document', 'ocr_text')},
+                   page_count, file_size_bytes
             FROM single_documents
             WHERE batch_id = ?
         """, (batch_id,))
@@ -56,10 +57,10 @@ def regenerate_ai_suggestions_for_batch(batch_id: int):
                 UPDATE single_documents SET
                     ai_suggested_category = ?,
                     ai_suggested_filename = ?,
-                    ai_confidence = ?,
-                    ai_summary = ?
+                    ai_confidence = ?
                 WHERE id = ?
-            """, (ai_category, ai_filename, ai_confidence, ai_summary, doc_id))
+            """, (ai_category, ai_filename, ai_confidence, doc_id))
+            set_document_text('single_document', doc_id, 'ai_summary', ai_summary, conn=conn)
 
             print(f"  ✓ Category: {ai_category}")
             print(f"  ✓ Filename: {ai_filename}")
@@ -33,6 +33,16 @@ try:
 except ImportError:
     # Fallback to absolute imports (when run directly)
     from llm_utils import get_ai_document_type_analysis
+try:
+    from .normalized_cache import get_normalized_cache, start_normalized_cache_maintenance
+    from .file_fingerprint import fingerprint as file_fingerprint
+    from .strategy_classifier import extract_features, predict_strategy, model_version
+    from .utils.image_pdf import write_image_pdf
+except ImportError:
+    from normalized_cache import get_normalized_cache, start_normalized_cache_maintenance
+    from file_fingerprint import fingerprint as file_fingerprint
+    from strategy_classifier import extract_features, predict_strategy, model_version
+    from utils.image_pdf import write_image_pdf
 """
 Document type detection and processing strategy selection.
 
@@ -44,14 +54,16 @@ conservative to avoid misclassification that would require reprocessing.
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import logging
 from dataclasses import dataclass
 import fitz
 from PIL import Image
-import threading
 import time
 
+# Intake file types the detector (and the processing flows) accept
+SUPPORTED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg')
+
 @dataclass
 class DocumentAnalysis:
     """Results of document analysis for processing strategy determination."""
@@ -103,6 +115,10 @@ class DocumentTypeDetector:
         r'archive.*\d{4}',        # archive_2024_q1.pdf
     ]
 
+    # Bump whenever heuristics/thresholds/prompts change so cached per-file
+    # analyses from older logic are not reused.
+    ANALYSIS_VERSION = "2"
+
     def __init__(self, use_llm_for_ambiguous=True):
         self.logger = logging.getLogger(__name__)
         self.use_llm_for_ambiguous = use_llm_for_ambiguous
@@ -111,76 +127,14 @@ class DocumentTypeDetector:
     _cleanup_started = False
 
     def _start_normalized_cleanup_once(self):
+        """Start the normalized-cache reconcile thread (LRU budget, orphan adoption, expiry) once per process."""
         if DocumentTypeDetector._cleanup_started:
             return
         DocumentTypeDetector._cleanup_started = True
-
-        def _cleanup_loop():
-            """Background thread that periodically purges old normalized PDFs."""
-            sleep_interval = 60 * 5  # 5 minutes between checks when idle
-            while True:
-                try:
-                    # Obtain SHUTDOWN_EVENT and app_config robustly to support both
-                    # package-import and direct-script import contexts used in tests.
-                    shutdown_event = None
-                    app_cfg = None
-                    try:
-                        from .config_manager import SHUTDOWN_EVENT as shutdown_event, app_config as app_cfg
-                    except Exception:
-                        try:
-                            from config_manager import SHUTDOWN_EVENT as shutdown_event, app_config as app_cfg
-                        except Exception:
-                            import sys
-                            cm = sys.modules.get('doc_processor.config_manager') or sys.modules.get('config_manager')
-                            if cm is not None:
-                                shutdown_event = getattr(cm, 'SHUTDOWN_EVENT', None)
-                                app_cfg = getattr(cm, 'app_config', None)
-
-                    root = app_cfg.NORMALIZED_DIR if app_cfg is not None else None
-                    max_age_days = getattr(app_cfg, 'NORMALIZED_CACHE_MAX_AGE_DAYS', 14) if app_cfg is not None else 14
-
-                    if not root or not os.path.isdir(root):
-                        # Wait in smaller increments and bail out if shutdown requested
-                        waited = 0
-                        while waited < 3600:
-                            if shutdown_event is not None and shutdown_event.is_set():
-                                return
-                            time.sleep(sleep_interval)
-                            waited += sleep_interval
-                        continue
-
-                    cutoff = time.time() - (max_age_days * 86400)
-                    removed = 0
-                    for fname in os.listdir(root):
-                        if not fname.lower().endswith('.pdf'):
-                            continue
-                        fpath = os.path.join(root, fname)
-                        try:
-                            st = os.stat(fpath)
-                            if st.st_mtime < cutoff:
-                                os.remove(fpath)
-                                removed += 1
-                        except OSError:
-                            continue
-                    if removed:
-                        self.logger.info(f"Normalized cache cleanup removed {removed} stale PDFs (>{max_age_days}d)")
-
-                except Exception as e:
-                    try:
-                        self.logger.warning(f"Normalized cache cleanup error: {e}")
-                    except Exception:
-                        pass
-
-                # Sleep up to 12 hours but check for shutdown periodically
-                total_sleep = 43200
-                slept = 0
-                while slept < total_sleep:
-                    if shutdown_event is not None and shutdown_event.is_set():
-                        return
-                    time.sleep(sleep_interval)
-                    slept += sleep_interval
-
-        threading.Thread(target=_cleanup_loop, daemon=True, name='NormalizedCacheCleanup').start()
+        try:
+            start_normalized_cache_maintenance()
+        except Exception as e:
+            self.logger.warning(f"Normalized cache maintenance not started: {e}")
 
     def _convert_image_to_pdf(self, image_path: str) -> str:
         """Convert image file to a cached normalized PDF.
@@ -222,29 +176,20 @@ class DocumentTypeDetector:
                 self.logger.warning(f"Normalize skipped - image missing: {image_path}")
                 return image_path
 
-            # Hash image contents for stable identity
-            import hashlib
-            h = hashlib.sha256()
-            with open(image_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    h.update(chunk)
-            digest = h.hexdigest()  # 64 hex chars
-            pdf_name = f"img_{digest[:16]}.pdf"  # shorten name while preserving uniqueness
-            pdf_path = os.path.join(norm_root, pdf_name)
-            if os.path.exists(pdf_path):
-                self.logger.debug(f"Reusing cached normalized PDF for {image_path} -> {pdf_path}")
-                return pdf_path
-            # Perform conversion
-            with Image.open(image_path) as img:
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    base = Image.new('RGB', img.size, (255, 255, 255))  # type: ignore[arg-type]
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    base.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = base
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                img.save(pdf_path, 'PDF', resolution=150.0, quality=95)
+            # Indexed lookup: unchanged sources are found by (path, size, mtime)
+            # without re-hashing; new ones are identified by content hash
+            cache = get_normalized_cache(norm_root)
+            cache_key, cached_pdf = cache.lookup(image_path)
+            if cached_pdf:
+                self.logger.debug(f"Reusing cached normalized PDF for {image_path} -> {cached_pdf}")
+                return cached_pdf
+            pdf_path = cache.path_for(cache_key)
+            # Perform conversion (JPEG bytes are embedded without re-encoding)
+            write_image_pdf(image_path, pdf_path)
+            try:
+                cache.record(cache_key, image_path, pdf_path)
+            except Exception as e:
+                self.logger.warning(f"Normalized cache index update failed for {pdf_path}: {e}")
             self.logger.info(f"Normalized image cached: {image_path} -> {pdf_path}")
             return pdf_path
         except Exception as e:
@@ -363,7 +308,6 @@ class DocumentTypeDetector:
                             if not page_text or len(page_text.strip()) < 50:
                                 self.logger.debug(f"📄 No embedded text on page {page_idx+1}, attempting OCR...")
                                 try:
-                                    from pdf2image import convert_from_path
                                     import pytesseract
                                     try:
                                         from .config_manager import app_config
@@ -371,11 +315,10 @@ class DocumentTypeDetector:
                                         from config_manager import app_config
 
                                     if not app_config.DEBUG_SKIP_OCR:
-                                        # Convert specific page to image and run OCR
-                                        pages = convert_from_path(file_path, first_page=page_idx+1, last_page=page_idx+1, dpi=150)
-                                        if pages:
-                                            page_img = pages[0]
-
+                                        # Render the page straight from the already-open document
+                                        # (no poppler subprocess / re-parse per sampled page)
+                                        page_img = self._render_sample_image(page)
+                                        if page_img is not None:
                                             # Apply auto-rotation detection for better OCR
                                             try:
                                                 osd = pytesseract.image_to_osd(page_img, output_type=pytesseract.Output.DICT)
@@ -476,11 +419,24 @@ class DocumentTypeDetector:
                 strategy = "batch_scan"
                 reasoning.append(f"Defaulting to batch scan (score: {single_doc_score} vs {batch_doc_score})")
 
+            # Learned classifier (trained from detection ground truth) is consulted
+            # before the LLM; a confident prediction settles the file locally
+            features = extract_features(page_count, file_size_mb, filename_hint, content_hint,
+                                        single_doc_score, batch_doc_score, content_sample)
+            learned = None
+            try:
+                learned = predict_strategy(features)
+            except Exception as clf_e:
+                self.logger.debug(f"Strategy classifier unavailable: {clf_e}")
+            if learned:
+                strategy, confidence = learned
+                reasoning.append(f"🧮 LEARNED CLASSIFIER: {strategy} (confidence: {confidence:.0%})")
+
             # LLM analysis (if enabled and content available)
             llm_analysis = None
             self.logger.info(f"LLM check for {os.path.basename(file_path)}: use_llm={self.use_llm_for_ambiguous}, content_len={len(content_sample.strip()) if content_sample else 0}")
 
-            if self.use_llm_for_ambiguous and content_sample.strip():
+            if self.use_llm_for_ambiguous and content_sample.strip() and not learned:
                 self.logger.info(f"🤖 Starting LLM analysis for {os.path.basename(file_path)} (content: {len(content_sample)} chars)")
                 try:
                     llm_analysis = get_ai_document_type_analysis(
@@ -504,7 +460,9 @@ class DocumentTypeDetector:
                     self.logger.error(f"💥 LLM analysis failed for {os.path.basename(file_path)}: {llm_e}")
                     reasoning.append(f"🤖 LLM ANALYSIS: Failed - {str(llm_e)}")
             else:
-                if not self.use_llm_for_ambiguous:
+                if learned:
+                    skip_reason = "settled by learned classifier"
+                elif not self.use_llm_for_ambiguous:
                     skip_reason = "LLM analysis disabled"
                 else:
                     skip_reason = "no usable content (embedded text + OCR both failed/insufficient)"
@@ -538,6 +496,8 @@ class DocumentTypeDetector:
                     "final_strategy": strategy,
                     "final_confidence": confidence,
                     "llm_used": bool(llm_analysis),
+                    "classifier_used": bool(learned),
+                    "features": features,
                     "llm_analysis": llm_analysis,
                     "reasoning": reasoning
                 }
@@ -567,6 +527,35 @@ class DocumentTypeDetector:
                 pdf_path=file_path  # Use original path even in error case
             )
 
+    def _render_sample_image(self, page) -> Optional["Image.Image"]:
+        """Render a page of an open fitz document to an in-memory grayscale image for OSD/OCR.
+
+        Rendered at DETECTOR_SAMPLE_DPI, capped at DETECTOR_SAMPLE_MAX_PIXELS on the
+        long edge, and optionally cropped to the top DETECTOR_SAMPLE_TOP_FRACTION of
+        the page (headers carry most of the classification signal).
+        """
+        try:
+            from .config_manager import app_config
+        except ImportError:
+            from config_manager import app_config
+        dpi = float(getattr(app_config, 'DETECTOR_SAMPLE_DPI', 150) or 150)
+        top_fraction = float(getattr(app_config, 'DETECTOR_SAMPLE_TOP_FRACTION', 1.0) or 1.0)
+        max_pixels = int(getattr(app_config, 'DETECTOR_SAMPLE_MAX_PIXELS', 2000) or 0)
+        try:
+            rect = page.rect
+            clip = rect
+            if 0 < top_fraction < 1:
+                clip = fitz.Rect(rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * top_fraction)
+            zoom = dpi / 72.0
+            longest = max(clip.width, clip.height) * zoom
+            if max_pixels and longest > max_pixels:
+                zoom *= max_pixels / longest
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, colorspace=fitz.csGRAY, alpha=False)
+            return Image.frombytes('L', (pix.width, pix.height), pix.samples)
+        except Exception as e:
+            self.logger.debug(f"Could not render sample image for page {getattr(page, 'number', '?')}: {e}")
+            return None
+
     def _analyze_filename(self, filename: str) -> Optional[str]:
         """Analyze filename patterns for document type hints."""
         filename_lower = filename.lower()
@@ -622,35 +611,84 @@ class DocumentTypeDetector:
 
         return None
 
-    def analyze_intake_directory(self, intake_dir: str) -> List[DocumentAnalysis]:
+    def analyze_intake_directory(self, intake_dir: str, max_workers: Optional[int] = None,
+                                 use_cache: Optional[bool] = None,
+                                 on_result: Optional[Callable[[DocumentAnalysis, int, int, bool], None]] = None) -> List[DocumentAnalysis]:
         """
         Analyze all supported files (PDFs and images) in intake directory and return processing strategies.
 
+        Files are analyzed in filename order. With more than one worker
+        (INTAKE_ANALYSIS_WORKERS or `max_workers`) they are spread over a process
+        pool; results are returned in the same order and are identical to the
+        serial path, since each worker runs the same `_analyze_file`.
+
+        Unless disabled (INTAKE_ANALYSIS_CACHE_ENABLED / `use_cache`), results are
+        looked up per file in the SQLite intake_analysis_cache by content
+        fingerprint + detector version, so only new or changed files are analyzed.
+
+        `on_result(analysis, completed, total, cached)` is called as each file
+        finishes (cache hits first, then fresh results in completion order), so
+        callers can stream progress before the whole directory is done.
+
         Returns list of DocumentAnalysis objects for preview/confirmation.
         """
         if not os.path.exists(intake_dir):
             self.logger.error(f"Intake directory does not exist: {intake_dir}")
             return []
 
-        # Supported file extensions
-        supported_extensions = ['.pdf', '.png', '.jpg', '.jpeg']
-
         supported_files = []
-        for f in os.listdir(intake_dir):
+        for f in sorted(os.listdir(intake_dir)):
             file_ext = os.path.splitext(f)[1].lower()
-            if file_ext in supported_extensions:
+            if file_ext in SUPPORTED_EXTENSIONS:
                 supported_files.append(os.path.join(intake_dir, f))
 
         self.logger.info(f"Found {len(supported_files)} supported files in {intake_dir}")
+        return self.analyze_files(supported_files, max_workers=max_workers, use_cache=use_cache, on_result=on_result)
 
-        analyses = []
-        for file_path in supported_files:
-            if file_path.lower().endswith('.pdf'):
-                analysis = self.analyze_pdf(file_path)
-            else:
-                # For image files, analyze as converted PDF
-                analysis = self.analyze_image_file(file_path)
-            analyses.append(analysis)
+    def analyze_files(self, supported_files: List[str], max_workers: Optional[int] = None,
+                      use_cache: Optional[bool] = None,
+                      on_result: Optional[Callable[[DocumentAnalysis, int, int, bool], None]] = None) -> List[DocumentAnalysis]:
+        """Analyze an explicit list of supported files (see `analyze_intake_directory`).
+
+        Results come back in the order of `supported_files`.
+        """
+        if use_cache is None:
+            use_cache = self._analysis_cache_enabled()
+        cached, file_keys = self._load_cached_analyses(supported_files) if use_cache else ({}, {})
+        to_analyze = [p for p in supported_files if p not in cached]
+        if cached:
+            self.logger.info(f"Reusing {len(cached)} cached analyses; analyzing {len(to_analyze)} new/changed files")
+
+        completed = 0
+
+        def _emit(analysis: DocumentAnalysis, was_cached: bool) -> None:
+            nonlocal completed
+            completed += 1
+            if use_cache and not was_cached:
+                # Persist as we go so an interrupted run keeps its progress
+                self._store_cached_analyses([analysis], file_keys)
+            if on_result is not None:
+                try:
+                    on_result(analysis, completed, len(supported_files), was_cached)
+                except Exception as e:
+                    self.logger.debug(f"on_result callback failed: {e}")
+
+        for path in supported_files:
+            if path in cached:
+                _emit(cached[path], True)
+
+        workers, timeout = self._analysis_pool_settings(max_workers)
+        if workers > 1 and len(to_analyze) > 1:
+            fresh = self._analyze_files_parallel(to_analyze, min(workers, len(to_analyze)), timeout,
+                                                 on_result=lambda a: _emit(a, False))
+        else:
+            fresh = []
+            for file_path in to_analyze:
+                fresh.append(self._analyze_file(file_path))
+                _emit(fresh[-1], False)
+
+        fresh_by_path = dict(zip(to_analyze, fresh))
+        analyses = [cached.get(p) or fresh_by_path[p] for p in supported_files]
 
         # Summary logging
         single_count = sum(1 for a in analyses if a.processing_strategy == "single_document")
@@ -660,6 +698,211 @@ class DocumentTypeDetector:
 
         return analyses
 
+    def _analyze_file(self, file_path: str) -> DocumentAnalysis:
+        """Analyze one intake file (PDF directly, images via analyze_image_file)."""
+        if file_path.lower().endswith('.pdf'):
+            return self.analyze_pdf(file_path)
+        # For image files, analyze as converted PDF
+        return self.analyze_image_file(file_path)
+
+    # --- Persistent per-file analysis cache ---
+    @property
+    def analysis_cache_version(self) -> str:
+        """Cache key component: heuristics version plus whether the LLM may be consulted."""
+        return f"{self.ANALYSIS_VERSION}:{'llm' if self.use_llm_for_ambiguous else 'heuristic'}:{model_version()}"
+
+    def _analysis_cache_enabled(self) -> bool:
+        try:
+            from .config_manager import app_config
+        except ImportError:
+            from config_manager import app_config
+        return bool(getattr(app_config, 'INTAKE_ANALYSIS_CACHE_ENABLED', True))
+
+    def _file_fingerprint(self, file_path: str) -> Optional[tuple]:
+        """Return (fingerprint, file_name, size, mtime_ns) for a file, or None if unreadable.
+
+        The SHA-256 of the content comes from the shared fingerprint service,
+        so an unchanged folder is not re-read.
+        """
+        try:
+            st = os.stat(file_path)
+            fingerprint = file_fingerprint(file_path, 'full', st=st)
+            return fingerprint, os.path.basename(file_path), st.st_size, st.st_mtime_ns
+        except OSError as e:
+            self.logger.debug(f"Could not fingerprint {file_path}: {e}")
+            return None
+
+    def _load_cached_analyses(self, files: List[str]) -> tuple[dict, dict]:
+        """Return ({path: DocumentAnalysis} cache hits, {path: fingerprint tuple})."""
+        try:
+            from .database import get_cached_intake_analyses
+        except ImportError:
+            from database import get_cached_intake_analyses
+        file_keys = {}
+        for path in files:
+            key = self._file_fingerprint(path)
+            if key:
+                file_keys[path] = key
+        try:
+            rows = get_cached_intake_analyses([k[:2] for k in file_keys.values()], self.analysis_cache_version)
+        except Exception as e:
+            self.logger.warning(f"Intake analysis cache unavailable: {e}")
+            return {}, file_keys
+        hits = {}
+        for path, key in file_keys.items():
+            data = rows.get(key[:2])
+            if not data:
+                continue
+            try:
+                old_path = data.get('file_path')
+                data['file_path'] = path
+                pdf_path = data.get('pdf_path')
+                if pdf_path == old_path:
+                    data['pdf_path'] = path
+                elif pdf_path and not os.path.exists(pdf_path):
+                    continue  # converted working PDF is gone; re-analyze to regenerate it
+                hits[path] = DocumentAnalysis(**data)
+            except TypeError:
+                continue  # stored fields no longer match the dataclass
+        return hits, file_keys
+
+    def _store_cached_analyses(self, analyses: List[DocumentAnalysis], file_keys: dict) -> None:
+        """Persist successful analyses; fallbacks (errors, timeouts, missing files) are not cached."""
+        try:
+            from .database import store_intake_analyses
+        except ImportError:
+            from database import store_intake_analyses
+        from dataclasses import asdict
+        entries = []
+        for analysis in analyses:
+            key = file_keys.get(analysis.file_path)
+            reasons = analysis.reasoning or []
+            first = str(reasons[0]) if reasons else ''
+            if not key or first == 'file_missing' or first.startswith(('Analysis error', 'Analysis timed out')):
+                continue
+            fingerprint, name, size, mtime_ns = key
+            entries.append({
+                'fingerprint': fingerprint,
+                'file_name': name,
+                'detector_version': self.analysis_cache_version,
+                'file_size': size,
+                'mtime_ns': mtime_ns,
+                'analysis': asdict(analysis),
+            })
+        try:
+            store_intake_analyses(entries)
+        except Exception as e:
+            self.logger.warning(f"Failed to persist intake analyses: {e}")
+
+    def preanalyze_file(self, file_path: str) -> Optional[DocumentAnalysis]:
+        """Analyze one intake file ahead of time and store it in the per-file cache.
+
+        Images are normalized to PDF as part of analyze_image_file. Returns the
+        cached or fresh analysis, or None if the file cannot be fingerprinted.
+        """
+        hits, file_keys = self._load_cached_analyses([file_path])
+        if file_path in hits:
+            return hits[file_path]
+        if file_path not in file_keys:
+            return None
+        analysis = self._analyze_file(file_path)
+        self._store_cached_analyses([analysis], file_keys)
+        return analysis
+
+    def _analysis_pool_settings(self, max_workers: Optional[int]) -> tuple[int, float]:
+        """Resolve (worker count, per-file timeout seconds); 0 workers means one per CPU."""
+        try:
+            from .config_manager import app_config
+        except ImportError:
+            from config_manager import app_config
+        workers = max_workers if max_workers is not None else getattr(app_config, 'INTAKE_ANALYSIS_WORKERS', 1)
+        if not workers or workers < 0:
+            workers = os.cpu_count() or 1
+        timeout = float(getattr(app_config, 'INTAKE_ANALYSIS_TIMEOUT_SECONDS', 180) or 0)
+        return int(workers), timeout
+
+    def _fallback_analysis(self, file_path: str, reason: str) -> DocumentAnalysis:
+        """Conservative batch_scan result for a file the worker pool could not analyze."""
+        try:
+            file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        except OSError:
+            file_size_mb = 0.0
+        return DocumentAnalysis(
+            file_path=file_path,
+            file_size_mb=file_size_mb,
+            page_count=0,
+            processing_strategy="batch_scan",  # Safe fallback
+            confidence=0.0,
+            reasoning=[reason, "Defaulting to batch scan for safety"],
+            detected_rotation=0,
+            pdf_path=file_path,
+        )
+
+    def _analyze_files_parallel(self, files: List[str], workers: int, timeout: float,
+                                on_result: Optional[Callable[[DocumentAnalysis], None]] = None) -> List[DocumentAnalysis]:
+        """Analyze `files` on a spawn-based process pool, preserving input order.
+
+        At most `workers` files are in flight, so a file's timeout clock starts
+        when it is actually dispatched. A worker stuck past the timeout cannot be
+        interrupted individually: its file gets a batch_scan fallback, the worker
+        is counted as busy until the abandoned call returns, and once every
+        worker is stuck the pool is terminated and recreated.
+        """
+        import collections
+        import multiprocessing
+
+        ctx = multiprocessing.get_context('spawn')  # fork is unsafe with the app's background threads
+
+        def _new_pool():
+            return ctx.Pool(processes=workers, initializer=_init_analysis_worker,
+                            initargs=(self.use_llm_for_ambiguous,))
+
+        self.logger.info(f"Analyzing {len(files)} files on {workers} worker processes")
+        results: List[Optional[DocumentAnalysis]] = [None] * len(files)
+        pool = _new_pool()
+        try:
+            pending = collections.deque(range(len(files)))
+            in_flight = {}  # index -> (AsyncResult, dispatched_at)
+            abandoned = []  # AsyncResults of timed-out files still occupying a worker
+            while pending or in_flight:
+                abandoned = [r for r in abandoned if not r.ready()]
+                stuck = len(abandoned)
+                while pending and len(in_flight) < workers - stuck:
+                    idx = pending.popleft()
+                    in_flight[idx] = (pool.apply_async(_analyze_file_in_worker, (files[idx],)), time.monotonic())
+                for idx, (async_result, dispatched_at) in list(in_flight.items()):
+                    if async_result.ready():
+                        try:
+                            results[idx] = async_result.get()
+                        except Exception as e:
+                            self.logger.error(f"Worker failed analyzing {files[idx]}: {e}")
+                            results[idx] = self._fallback_analysis(files[idx], f"Analysis error: {e}")
+                        del in_flight[idx]
+                        if on_result is not None:
+                            on_result(results[idx])
+                    elif timeout and time.monotonic() - dispatched_at > timeout:
+                        self.logger.warning(f"Analysis of {files[idx]} exceeded {timeout:.0f}s; using batch_scan fallback")
+                        results[idx] = self._fallback_analysis(files[idx], f"Analysis timed out after {timeout:.0f}s")
+                        del in_flight[idx]
+                        abandoned.append(async_result)
+                        stuck += 1
+                        if on_result is not None:
+                            on_result(results[idx])
+                if stuck >= workers:
+                    # Every worker is wedged on an abandoned file; start over with a fresh pool
+                    pool.terminate()
+                    pool = _new_pool()
+                    abandoned = []
+                    # Tasks still queued behind the wedged workers are re-dispatched
+                    pending.extendleft(sorted(in_flight, reverse=True))
+                    in_flight.clear()
+                if in_flight:
+                    time.sleep(0.05)
+        finally:
+            pool.terminate()
+            pool.join()
+        return results
+
     def analyze_image_file(self, file_path: str) -> DocumentAnalysis:
         """
         Analyze an image file (PNG, JPG, JPEG) for processing strategy.
@@ -885,6 +1128,20 @@ class DocumentTypeDetector:
             self.logger.error(f"Error in rotation detection for {image_path}: {e}")
             return 0, 0.0, ""
 
+_worker_detector: Optional[DocumentTypeDetector] = None
+
+
+def _init_analysis_worker(use_llm_for_ambiguous: bool) -> None:
+    """Process-pool initializer: one detector per worker, without the cleanup thread."""
+    global _worker_detector
+    DocumentTypeDetector._cleanup_started = True  # parent process owns normalized-cache cleanup
+    _worker_detector = DocumentTypeDetector(use_llm_for_ambiguous=use_llm_for_ambiguous)
+
+
+def _analyze_file_in_worker(file_path: str) -> DocumentAnalysis:
+    return _worker_detector._analyze_file(file_path)
+
+
 def get_detector(use_llm_for_ambiguous: bool = True) -> DocumentTypeDetector:
     """
     Factory function to get document type detector instance.
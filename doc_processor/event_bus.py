@@ -0,0 +1,361 @@
+"""
+In-process event bus for long-running background runs streamed over SSE.
+
+A run (e.g. one intake analysis) publishes JSON-serializable payloads as work
+completes. Any number of SSE clients can subscribe to the same run: each
+subscriber replays the events published so far and then blocks on a condition
+variable for new ones, so late joiners see the full progress and nobody has
+to poll files or race on lock files to find out whether work is in progress.
+
+`hub` is the topic-based publish/subscribe side for long-lived progress
+streams. Producers publish typed events to a topic; every event gets a
+process-wide sequence id and is kept in a short per-topic replay buffer, so a
+reconnecting EventSource sending `Last-Event-ID` gets what it missed. Each SSE
+connection blocks on its own queue (heartbeats come from the blocking get's
+timeout), so idle connections cost no CPU however many tabs are open.
+`relay_status_namespace` feeds the hub from the shared status store with one
+watcher thread per process, whichever process wrote the status.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EventRun:
+    """Append-only event log for one background run."""
+
+    def __init__(self, key: str, total: Optional[int] = None):
+        self.key = key
+        self.run_id = uuid.uuid4().hex[:12]
+        self.total = total
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = False
+        self._events = []
+        self._cond = threading.Condition()
+
+    def publish(self, payload: dict) -> None:
+        with self._cond:
+            self._events.append(payload)
+            self._cond.notify_all()
+
+    def finish(self, payload: Optional[dict] = None) -> None:
+        """Publish the final payload (if any) and wake all subscribers."""
+        with self._cond:
+            if payload is not None:
+                self._events.append(payload)
+            self.done = True
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the run finishes (or `timeout` elapses); returns `done`."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.done, timeout)
+
+    def subscribe(self, keepalive_seconds: float = 15.0, max_wait_seconds: Optional[float] = None,
+                  start_index: int = 0) -> Iterator[Optional[dict]]:
+        """Yield every event of the run from `start_index` (replaying history first).
+
+        Yields None whenever `keepalive_seconds` pass without an event so SSE
+        handlers can emit a keep-alive comment. Ends when the run finishes or
+        `max_wait_seconds` elapse without the run completing.
+        """
+        index = max(0, start_index)
+        deadline = time.monotonic() + max_wait_seconds if max_wait_seconds else None
+        while True:
+            with self._cond:
+                if index >= len(self._events) and not self.done:
+                    self._cond.wait(keepalive_seconds)
+                batch = self._events[index:]
+                index += len(batch)
+                finished = self.done and index >= len(self._events)
+            for payload in batch:
+                yield payload
+            if finished:
+                return
+            if not batch:
+                if deadline is not None and time.monotonic() > deadline:
+                    return
+                yield None
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                'key': self.key,
+                'run_id': self.run_id,
+                'total': self.total,
+                'events': len(self._events),
+                'done': self.done,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+
+_runs: Dict[str, EventRun] = {}
+_runs_lock = threading.Lock()
+
+
+def parse_run_event_id(value: Optional[str], run: EventRun) -> int:
+    """Index to resume `run` from, given a `Last-Event-ID` of the form `<run_id>:<index>`."""
+    run_id, _, index = (value or '').partition(':')
+    if run_id != run.run_id:
+        return 0
+    try:
+        return int(index) + 1
+    except ValueError:
+        return 0
+
+
+def get_active_run(key: str) -> Optional[EventRun]:
+    """Return the unfinished run registered under `key`, if any."""
+    with _runs_lock:
+        run = _runs.get(key)
+        return run if run is not None and not run.done else None
+
+
+def get_or_start_run(key: str, target: Callable[[EventRun], None], total: Optional[int] = None) -> Tuple[EventRun, bool]:
+    """Join the active run for `key` or start `target(run)` in a daemon thread.
+
+    The target must call `run.finish(...)`; if it raises, the run is finished
+    with an error payload so subscribers are not left waiting.
+
+    Returns:
+        (run, started): `started` is False when an existing run was joined.
+    """
+    with _runs_lock:
+        run = _runs.get(key)
+        if run is not None and not run.done:
+            return run, False
+        run = EventRun(key, total=total)
+        _runs[key] = run
+
+    def _runner():
+        try:
+            target(run)
+        except Exception as e:
+            logger.error(f"Background run {key} failed: {e}")
+            run.finish({'error': str(e), 'success': False})
+        finally:
+            if not run.done:
+                run.finish()
+
+    threading.Thread(target=_runner, daemon=True, name=f'EventRun-{key}').start()
+    return run, True
+
+
+@dataclass
+class HubEvent:
+    """One published event; `id` is unique and increasing within the process."""
+    id: int
+    topic: str
+    type: str
+    data: Any
+    ts: float = field(default_factory=time.time)
+
+
+_CLOSED = object()
+
+
+class Subscription:
+    """A subscriber's queue on one topic. Registered on creation; close() (or `with`) detaches it."""
+
+    def __init__(self, hub: 'EventHub', topic: str, queue_size: int):
+        self.hub = hub
+        self.topic = topic
+        self.lagged = False
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+
+    def _offer(self, item: Any) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Too slow to keep up: end the stream; the client reconnects with Last-Event-ID
+            self.lagged = True
+
+    def events(self, heartbeat_seconds: float = 15.0) -> Iterator[Optional[HubEvent]]:
+        """Block for events; yield None after `heartbeat_seconds` of silence. Ends on close/lag."""
+        try:
+            while not self.lagged:
+                try:
+                    item = self._queue.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    yield None
+                    continue
+                if item is _CLOSED:
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.hub._unsubscribe(self)
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class EventHub:
+    """In-process topic pub/sub with sequence ids and a bounded replay buffer per topic."""
+
+    def __init__(self, replay_size: Optional[int] = None, queue_size: Optional[int] = None):
+        self._replay_size = replay_size
+        self._queue_size = queue_size
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._buffers: Dict[str, Deque[HubEvent]] = {}
+        self._subscribers: Dict[str, List[Subscription]] = {}
+
+    def _setting(self, explicit: Optional[int], name: str, default: int) -> int:
+        if explicit is not None:
+            return explicit
+        try:
+            from .config_manager import app_config
+        except ImportError:
+            from config_manager import app_config
+        return int(getattr(app_config, name, default) or default)
+
+    def publish(self, topic: str, event_type: str, data: Any) -> HubEvent:
+        """Record `data` under the next sequence id and hand it to every subscriber of `topic`."""
+        with self._lock:
+            self._seq += 1
+            event = HubEvent(self._seq, topic, event_type, data)
+            buffer = self._buffers.get(topic)
+            if buffer is None:
+                buffer = self._buffers[topic] = deque(maxlen=self._setting(self._replay_size, 'SSE_REPLAY_EVENTS', 256))
+            buffer.append(event)
+            subs = self._subscribers.get(topic)
+            if subs:
+                for sub in subs:
+                    sub._offer(event)
+                # Lagging subscribers are dropped (their stream ends once drained)
+                subs[:] = [sub for sub in subs if not sub.lagged]
+        return event
+
+    def subscribe(self, topic: str, last_event_id: Optional[int] = None) -> Subscription:
+        """Attach a subscriber; events after `last_event_id` still in the replay buffer are queued first."""
+        sub = Subscription(self, topic, self._setting(self._queue_size, 'SSE_SUBSCRIBER_QUEUE_SIZE', 1000))
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._buffers.get(topic, ()):
+                    if event.id > last_event_id:
+                        sub._offer(event)
+            self._subscribers.setdefault(topic, []).append(sub)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(sub.topic)
+            if subs and sub in subs:
+                subs.remove(sub)
+
+    def close(self, topic: Optional[str] = None) -> None:
+        """End the streams of a topic's subscribers (all topics when None), e.g. on shutdown."""
+        with self._lock:
+            topics = [topic] if topic is not None else list(self._subscribers)
+            for name in topics:
+                for sub in self._subscribers.get(name, ()):
+                    sub._offer(_CLOSED)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'last_event_id': self._seq,
+                'topics': {name: len(subs) for name, subs in self._subscribers.items() if subs},
+            }
+
+
+hub = EventHub()
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """`Last-Event-ID` header (or query value) as a hub sequence id, if it is one."""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def format_sse(data: Any, event_id: Optional[Any] = None, event_type: Optional[str] = None) -> str:
+    """Render one SSE frame. Leave `event_type` unset for clients listening with `onmessage`."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event_type:
+        lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def status_topic(namespace: str) -> str:
+    return f'status:{namespace}'
+
+
+_relays: Dict[str, threading.Thread] = {}
+_relays_lock = threading.Lock()
+
+
+def relay_status_namespace(namespace: str) -> str:
+    """Publish changes of a status-store namespace to the hub; returns the topic.
+
+    Starts (once per process) a watcher that publishes a `status` event
+    `{'key', 'value'}` per changed entry (value None when removed), so SSE
+    clients see status written by any worker process without polling it
+    themselves.
+    """
+    topic = status_topic(namespace)
+    with _relays_lock:
+        thread = _relays.get(namespace)
+        if thread is not None and thread.is_alive():
+            return topic
+        try:
+            from . import status_store
+        except ImportError:
+            import status_store
+        ready = threading.Event()
+
+        def _watch():
+            try:
+                from .config_manager import SHUTDOWN_EVENT
+            except ImportError:
+                from config_manager import SHUTDOWN_EVENT
+            last: Dict[str, dict] = {}
+            seq = None
+            while not (SHUTDOWN_EVENT is not None and SHUTDOWN_EVENT.is_set()):
+                try:
+                    if seq is None:
+                        seq = status_store.current_seq()
+                        last = status_store.list_status(namespace)
+                        ready.set()
+                        continue
+                    new_seq = status_store.wait_for_change(seq, 1.0)
+                    if new_seq == seq:
+                        continue
+                    seq = new_seq
+                    current = status_store.list_status(namespace)
+                    for key in set(last) | set(current):
+                        if last.get(key) != current.get(key):
+                            hub.publish(topic, 'status', {'key': key, 'value': current.get(key)})
+                    last = current
+                except Exception as e:
+                    logger.warning(f"Status relay for {namespace} failed: {e}")
+                    ready.set()
+                    time.sleep(1.0)
+
+        thread = threading.Thread(target=_watch, daemon=True, name=f'StatusRelay-{namespace}')
+        _relays[namespace] = thread
+        thread.start()
+    # Return once the baseline is taken so callers' later writes are seen as changes
+    ready.wait(5.0)
+    return topic
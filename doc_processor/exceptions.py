@@ -37,4 +37,8 @@ class ValidationError(DocProcessorError):
 
 class ExportError(DocProcessorError):
     """Raised when there is an error during document export."""
-    pass
\ No newline at end of file
+    pass
+
+class OperationCancelled(DocProcessorError):
+    """Raised when the current operation's cancellation token was cancelled."""
+    pass
@@ -0,0 +1,224 @@
+"""
+Shared, memoized file fingerprints.
+
+Several subsystems identify files by content: the OCR cache signature in
+`create_searchable_pdf`, copy de-duplication (`_files_identical`), the
+normalized image->PDF cache and the per-file intake analysis cache. Each used
+to hash the same files again with its own scheme.
+
+`fingerprint(path, mode)` returns a SHA-256 hex digest and memoizes it keyed
+by `(st_dev, st_ino, st_size, st_mtime_ns)`, first in process memory and then
+in a small SQLite table (`FINGERPRINT_DB_PATH`, default `file_fingerprints.db`
+next to the main database), so an unchanged file is hashed once across runs
+and worker processes. Two digests are available:
+
+- ``'full'``: SHA-256 of the whole content. Files of at least
+  FINGERPRINT_MMAP_THRESHOLD_BYTES are hashed through mmap, which avoids
+  copying the file into Python buffers chunk by chunk.
+- ``'fast'``: SHA-256 of the size plus the first and last 64 KiB. It is good
+  enough for change detection, but not for de-duplication.
+
+Files modified within the last two seconds are hashed but not memoized. Their
+mtime may not yet be distinguishable from a follow-up write of the same size.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+FAST_SAMPLE_BYTES = 64 * 1024
+_RACY_SECONDS = 2.0
+_MEMO_LIMIT = 4096
+_PRUNE_EVERY = 1000
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS file_fingerprints (
+        st_dev INTEGER NOT NULL,
+        st_ino INTEGER NOT NULL,
+        st_size INTEGER NOT NULL,
+        st_mtime_ns INTEGER NOT NULL,
+        mode TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        path TEXT,
+        hashed_at REAL NOT NULL,
+        PRIMARY KEY (st_dev, st_ino, st_size, st_mtime_ns, mode)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_file_fingerprints_hashed_at ON file_fingerprints(hashed_at);
+"""
+
+_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_memo_lock = threading.Lock()
+_schema_ready = set()
+_inserts = 0
+_stats = {'memo_hits': 0, 'db_hits': 0, 'hashed': 0, 'hashed_bytes': 0}
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def get_fingerprint_db_path() -> str:
+    """FINGERPRINT_DB_PATH, or `file_fingerprints.db` next to the main database."""
+    configured = getattr(_config(), 'FINGERPRINT_DB_PATH', None) or os.getenv('FINGERPRINT_DB_PATH')
+    if configured:
+        return os.path.abspath(configured)
+    try:
+        from .database import _resolve_db_path
+    except ImportError:
+        from database import _resolve_db_path
+    return os.path.join(os.path.dirname(os.path.abspath(_resolve_db_path(quiet=True))), 'file_fingerprints.db')
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    try:
+        db_path = get_fingerprint_db_path()
+        fresh = not os.path.exists(db_path)
+        conn = sqlite3.connect(db_path, timeout=10)
+        if fresh or db_path not in _schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _schema_ready.add(db_path)
+        return conn
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Fingerprint store unavailable: {e}")
+        return None
+
+
+def _hash_full(path: str, size: int) -> str:
+    h = hashlib.sha256()
+    threshold = int(getattr(_config(), 'FINGERPRINT_MMAP_THRESHOLD_BYTES', 8 * 1024 * 1024) or 0)
+    with open(path, 'rb') as f:
+        if threshold and size >= threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+        else:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def _hash_fast(path: str, size: int) -> str:
+    h = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        h.update(f.read(FAST_SAMPLE_BYTES))
+        if size > 2 * FAST_SAMPLE_BYTES:
+            f.seek(-FAST_SAMPLE_BYTES, os.SEEK_END)
+            h.update(f.read(FAST_SAMPLE_BYTES))
+        elif size > FAST_SAMPLE_BYTES:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def fingerprint(path: str, mode: str = 'full', st: Optional[os.stat_result] = None) -> str:
+    """Return the SHA-256 fingerprint of a file, hashing it only if it changed.
+
+    Args:
+        path: File to fingerprint.
+        mode: 'full' (whole content) or 'fast' (size + first/last 64 KiB).
+        st: Optional os.stat result the caller already has.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: For an unknown mode.
+    """
+    global _inserts
+    if mode not in ('full', 'fast'):
+        raise ValueError(f"Unknown fingerprint mode: {mode}")
+    st = st or os.stat(path)
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, mode)
+    with _memo_lock:
+        digest = _memo.get(key)
+        if digest is not None:
+            _memo.move_to_end(key)
+            _stats['memo_hits'] += 1
+            return digest
+
+    racy = time.time() - st.st_mtime_ns / 1e9 < _RACY_SECONDS
+    conn = None if racy else _connect()
+    try:
+        if conn is not None:
+            try:
+                row = conn.execute(
+                    "SELECT digest FROM file_fingerprints WHERE st_dev = ? AND st_ino = ? AND st_size = ? "
+                    "AND st_mtime_ns = ? AND mode = ?",
+                    key,
+                ).fetchone()
+                if row:
+                    digest = row[0]
+                    with _memo_lock:
+                        _stats['db_hits'] += 1
+            except sqlite3.Error as e:
+                logger.debug(f"Fingerprint lookup failed for {path}: {e}")
+
+        if digest is None:
+            digest = _hash_full(path, st.st_size) if mode == 'full' else _hash_fast(path, st.st_size)
+            with _memo_lock:
+                _stats['hashed'] += 1
+                _stats['hashed_bytes'] += st.st_size if mode == 'full' else min(st.st_size, 2 * FAST_SAMPLE_BYTES)
+            if conn is not None:
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO file_fingerprints "
+                        "(st_dev, st_ino, st_size, st_mtime_ns, mode, digest, path, hashed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (*key, digest, os.path.abspath(path), time.time()),
+                    )
+                    with _memo_lock:
+                        _inserts += 1
+                        prune = _inserts % _PRUNE_EVERY == 0
+                    if prune:
+                        _prune(conn)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    logger.debug(f"Fingerprint store failed for {path}: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+    if not racy:
+        with _memo_lock:
+            _memo[key] = digest
+            if len(_memo) > _MEMO_LIMIT:
+                _memo.popitem(last=False)
+    return digest
+
+
+def _prune(conn: sqlite3.Connection) -> None:
+    """Keep the store at FINGERPRINT_DB_MAX_ENTRIES by dropping the oldest digests."""
+    limit = int(getattr(_config(), 'FINGERPRINT_DB_MAX_ENTRIES', 100000) or 0)
+    if not limit:
+        return
+    count = conn.execute("SELECT COUNT(*) FROM file_fingerprints").fetchone()[0]
+    if count > limit:
+        conn.execute(
+            "DELETE FROM file_fingerprints WHERE hashed_at <= "
+            "(SELECT hashed_at FROM file_fingerprints ORDER BY hashed_at LIMIT 1 OFFSET ?)",
+            (count - limit - 1,),
+        )
+
+
+def files_identical(a: str, b: str) -> bool:
+    """True if two existing files have identical content (same inode, or same size and full digest)."""
+    sa, sb = os.stat(a), os.stat(b)
+    if (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino):
+        return True
+    if sa.st_size != sb.st_size:
+        return False
+    return fingerprint(a, 'full', st=sa) == fingerprint(b, 'full', st=sb)
+
+
+def get_fingerprint_stats() -> dict:
+    """Process-local memo/store hit counters."""
+    with _memo_lock:
+        return dict(_stats, memo_entries=len(_memo))
@@ -0,0 +1,246 @@
+"""
+Adaptive OCR/LLM concurrency driven by host load.
+
+Fixed slot counts either leave the machine idle at night or push it into
+swap during the day. The governor samples the host every
+GOVERNOR_INTERVAL_SECONDS and resizes the scheduler gates (`ocr_gate`,
+`llm_gate`) one step at a time, within 1..GOVERNOR_*_MAX_SLOTS:
+
+- CPU utilization or load average per core above GOVERNOR_CPU_HIGH_PERCENT
+  shrinks OCR; both comfortably below GOVERNOR_CPU_LOW_PERCENT grows it while
+  OCR work is queued;
+- Ollama latency (an average of recent real requests) above
+  GOVERNOR_LLM_LATENCY_HIGH_SECONDS shrinks LLM; fast responses with LLM work
+  queued grow it;
+- available memory below GOVERNOR_MIN_FREE_MEMORY_PERCENT drops both gates to
+  one slot and pauses intake (the intake watcher and the bulk ingest runner
+  hold new files) until memory recovers with some headroom.
+
+psutil is used when installed; otherwise /proc and os.getloadavg (Linux).
+Signals that cannot be read are ignored. The latest sample, limits and recent
+decisions are reported by `get_governor_status` (/admin/api/system_health).
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+try:
+    import psutil  # type: ignore
+except ImportError:  # optional dependency
+    psutil = None
+
+try:
+    from .config_manager import app_config
+    from .scheduler import llm_gate, ocr_gate
+except ImportError:
+    from config_manager import app_config
+    from scheduler import llm_gate, ocr_gate
+
+logger = logging.getLogger(__name__)
+
+_LATENCY_WINDOW = 20
+_MEMORY_RESUME_FACTOR = 1.5
+
+_state_lock = threading.Lock()
+_llm_latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+_decisions: Deque[dict] = deque(maxlen=50)
+_last_sample: Optional[dict] = None
+_intake_paused = False
+_started = False
+_prev_cpu_times: Optional[Tuple[float, float]] = None
+
+
+def record_llm_latency(seconds: float) -> None:
+    """Called after each real Ollama request."""
+    with _state_lock:
+        _llm_latencies.append(seconds)
+
+
+def intake_paused() -> bool:
+    """True while the governor holds intake because memory is tight."""
+    return _intake_paused
+
+
+def _read_proc_cpu() -> Optional[Tuple[float, float]]:
+    try:
+        with open('/proc/stat') as fh:
+            fields = [float(v) for v in fh.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0.0)
+    return sum(fields), idle
+
+
+def _cpu_percent() -> Optional[float]:
+    """Utilization since the previous call (None on the first call without psutil)."""
+    global _prev_cpu_times
+    if psutil is not None:
+        return float(psutil.cpu_percent(interval=None))
+    current = _read_proc_cpu()
+    previous, _prev_cpu_times = _prev_cpu_times, current
+    if current is None or previous is None or current[0] <= previous[0]:
+        return None
+    total, idle = current[0] - previous[0], current[1] - previous[1]
+    return round(100.0 * (1.0 - idle / total), 1)
+
+
+def _memory_available_percent() -> Optional[float]:
+    if psutil is not None:
+        vm = psutil.virtual_memory()
+        return round(100.0 * vm.available / vm.total, 1)
+    info: Dict[str, float] = {}
+    try:
+        with open('/proc/meminfo') as fh:
+            for line in fh:
+                key, _, rest = line.partition(':')
+                info[key] = float(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    if not info.get('MemTotal') or 'MemAvailable' not in info:
+        return None
+    return round(100.0 * info['MemAvailable'] / info['MemTotal'], 1)
+
+
+def sample() -> dict:
+    """Current host signals; unreadable ones are None."""
+    try:
+        load_per_cpu = round(os.getloadavg()[0] / (os.cpu_count() or 1) * 100.0, 1)
+    except (AttributeError, OSError):
+        load_per_cpu = None
+    with _state_lock:
+        latencies = list(_llm_latencies)
+    return {
+        'ts': time.time(),
+        'cpu_percent': _cpu_percent(),
+        'load_percent_per_cpu': load_per_cpu,
+        'memory_available_percent': _memory_available_percent(),
+        'ollama_latency_seconds': round(sum(latencies) / len(latencies), 2) if latencies else None,
+        'ocr_waiting': ocr_gate.waiting(),
+        'llm_waiting': llm_gate.waiting(),
+    }
+
+
+def _max_slots(setting: str, fallback: int) -> int:
+    value = int(getattr(app_config, setting, 0) or 0)
+    return max(1, value if value > 0 else fallback)
+
+
+def decide(signals: dict, ocr: int, llm: int, paused: bool) -> Tuple[int, int, bool, List[str]]:
+    """New (ocr_slots, llm_slots, intake_paused) for a sample, with the reasons."""
+    reasons: List[str] = []
+    ocr_max = _max_slots('GOVERNOR_OCR_MAX_SLOTS', os.cpu_count() or 1)
+    llm_max = _max_slots('GOVERNOR_LLM_MAX_SLOTS', 1)
+    cpu_high = float(app_config.GOVERNOR_CPU_HIGH_PERCENT)
+    cpu_low = float(app_config.GOVERNOR_CPU_LOW_PERCENT)
+    min_free = float(app_config.GOVERNOR_MIN_FREE_MEMORY_PERCENT)
+    latency_high = float(app_config.GOVERNOR_LLM_LATENCY_HIGH_SECONDS)
+
+    memory = signals.get('memory_available_percent')
+    if memory is not None and memory < min_free:
+        if ocr > 1 or llm > 1 or not paused:
+            reasons.append(f"memory available {memory}% < {min_free}%: minimum concurrency, intake paused")
+        return 1, 1, True, reasons
+    if paused and (memory is None or memory >= min_free * _MEMORY_RESUME_FACTOR):
+        paused = False
+        reasons.append(f"memory recovered ({memory}%): intake resumed")
+
+    busy = [v for v in (signals.get('cpu_percent'), signals.get('load_percent_per_cpu')) if v is not None]
+    if busy and max(busy) > cpu_high and ocr > 1:
+        ocr -= 1
+        reasons.append(f"CPU/load {max(busy)}% > {cpu_high}%: OCR slots -> {ocr}")
+    elif busy and max(busy) < cpu_low and signals.get('ocr_waiting') and ocr < ocr_max:
+        ocr += 1
+        reasons.append(f"CPU/load {max(busy)}% < {cpu_low}% with OCR queued: OCR slots -> {ocr}")
+    elif ocr > ocr_max:
+        ocr = ocr_max
+        reasons.append(f"OCR slots capped at {ocr_max}")
+
+    latency = signals.get('ollama_latency_seconds')
+    if latency is not None and latency > latency_high and llm > 1:
+        llm -= 1
+        reasons.append(f"Ollama latency {latency}s > {latency_high}s: LLM slots -> {llm}")
+    elif (latency is None or latency < latency_high / 2) and signals.get('llm_waiting') and llm < llm_max:
+        llm += 1
+        reasons.append(f"Ollama responsive with LLM queued: LLM slots -> {llm}")
+    elif llm > llm_max:
+        llm = llm_max
+        reasons.append(f"LLM slots capped at {llm_max}")
+    return ocr, llm, paused, reasons
+
+
+def govern_once() -> dict:
+    """Take a sample, apply the decision to the gates and return it."""
+    global _last_sample, _intake_paused
+    signals = sample()
+    ocr, llm, paused, reasons = decide(signals, ocr_gate.slots, llm_gate.slots, _intake_paused)
+    ocr_gate.set_limit(ocr)
+    llm_gate.set_limit(llm)
+    with _state_lock:
+        _last_sample = signals
+        if paused != _intake_paused:
+            logger.warning(f"Governor: intake {'paused' if paused else 'resumed'}")
+        _intake_paused = paused
+        if reasons:
+            _decisions.append({'ts': signals['ts'], 'ocr_slots': ocr, 'llm_slots': llm,
+                               'intake_paused': paused, 'reasons': reasons})
+    for reason in reasons:
+        logger.info(f"Governor: {reason}")
+    return {'ocr_slots': ocr, 'llm_slots': llm, 'intake_paused': paused, 'reasons': reasons}
+
+
+def start_governor() -> bool:
+    """Run `govern_once` every GOVERNOR_INTERVAL_SECONDS in a daemon thread (GOVERNOR_ENABLED)."""
+    global _started
+    interval = float(getattr(app_config, 'GOVERNOR_INTERVAL_SECONDS', 10) or 0)
+    if _started or not getattr(app_config, 'GOVERNOR_ENABLED', True) or interval <= 0:
+        return False
+    _started = True
+
+    def _loop():
+        try:
+            from .config_manager import SHUTDOWN_EVENT
+        except ImportError:
+            from config_manager import SHUTDOWN_EVENT
+        _cpu_percent()  # prime the CPU delta
+        while True:
+            if SHUTDOWN_EVENT is None:
+                time.sleep(interval)
+            elif SHUTDOWN_EVENT.wait(interval):
+                return
+            try:
+                govern_once()
+            except Exception as e:
+                logger.warning(f"Governor iteration failed: {e}")
+
+    threading.Thread(target=_loop, daemon=True, name='LoadGovernor').start()
+    return True
+
+
+def pipeline_workers(kind: str, configured: int) -> int:
+    """Threads for a pipeline stage ('ocr' or 'llm').
+
+    While the governor runs, enough threads for its ceiling; the gate, not the
+    thread count, then decides how many work at once.
+    """
+    if not _started:
+        return configured
+    if kind == 'ocr':
+        return max(configured, _max_slots('GOVERNOR_OCR_MAX_SLOTS', os.cpu_count() or 1))
+    return max(configured, _max_slots('GOVERNOR_LLM_MAX_SLOTS', 1))
+
+
+def get_governor_status() -> dict:
+    """Running flag, latest sample, current limits and recent decisions."""
+    with _state_lock:
+        return {
+            'running': _started,
+            'backend': 'psutil' if psutil is not None else 'procfs',
+            'sample': _last_sample,
+            'ocr_slots': ocr_gate.slots,
+            'llm_slots': llm_gate.slots,
+            'intake_paused': _intake_paused,
+            'decisions': list(_decisions)[-10:],
+        }
@@ -0,0 +1,280 @@
+"""
+Intake watch daemon.
+
+Watches INTAKE_DIR and pre-analyzes files as they arrive, so the analysis is
+already in the per-file intake_analysis_cache (and the assembled
+`intake_analysis_cache.pkl` result set is rebuilt) by the time an operator
+opens /analyze_intake.
+
+Change notification uses Linux inotify through libc (no extra dependency);
+other platforms, or kernels where inotify is unavailable, fall back to polling
+the directory every INTAKE_WATCH_POLL_SECONDS. Either way a file is only
+processed once its size and mtime have been stable for
+INTAKE_WATCH_SETTLE_SECONDS, which skips scanners/copies still writing it.
+Settled files wait while the load governor has paused intake (low memory).
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from .config_manager import app_config
+from .governor import intake_paused
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg')
+
+# inotify(7) constants
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+_watcher: Optional["IntakeWatcher"] = None
+_watcher_lock = threading.Lock()
+
+
+class _Inotify:
+    """Minimal non-blocking inotify wrapper for one directory."""
+
+    def __init__(self, path: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_MODIFY | _IN_DELETE | _IN_MOVED_FROM
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f'inotify_add_watch failed for {path}')
+
+    def read(self, timeout: float) -> Tuple[Set[str], Set[str]]:
+        """Wait up to `timeout` seconds; return (changed names, removed names)."""
+        changed, removed = set(), set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, removed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, removed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+            offset += length
+            if not name:
+                continue
+            if mask & (_IN_DELETE | _IN_MOVED_FROM):
+                removed.add(name)
+            else:
+                changed.add(name)
+        return changed, removed
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class IntakeWatcher:
+    """Debounced watcher that pre-analyzes intake files into the analysis cache.
+
+    Args:
+        intake_dir: Directory to watch.
+        settle_seconds: How long size/mtime must be unchanged before processing.
+        poll_seconds: Directory scan interval when inotify is unavailable.
+        use_inotify: Try inotify first (Linux only).
+        rebuild_result_set: Re-assemble intake_analysis_cache.pkl after a burst of changes.
+    """
+
+    def __init__(self, intake_dir: str, settle_seconds: float = 2.0, poll_seconds: float = 5.0,
+                 use_inotify: bool = True, rebuild_result_set: bool = True):
+        self.intake_dir = intake_dir
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.rebuild_result_set = rebuild_result_set
+        self._inotify = None
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify(intake_dir)
+            except Exception as e:
+                logger.info(f"inotify unavailable for {intake_dir} ({e}); polling every {poll_seconds}s")
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._dirty = False
+        self._detector = None
+        self._stop = threading.Event()
+        self.stats = {'mode': 'inotify' if self._inotify else 'polling', 'preanalyzed': 0,
+                      'failed': 0, 'rebuilds': 0, 'last_event_at': None}
+        # Whatever is already in the intake folder is pre-analyzed on start
+        for name in self._list_supported():
+            self._pending[name] = ((-1, -1), time.monotonic())
+
+    def _list_supported(self) -> Set[str]:
+        try:
+            return {n for n in os.listdir(self.intake_dir)
+                    if not n.startswith('.') and os.path.splitext(n)[1].lower() in SUPPORTED_EXTENSIONS}
+        except OSError:
+            return set()
+
+    def _scan_changes(self) -> Tuple[Set[str], Set[str]]:
+        """Polling fallback: diff (size, mtime_ns) of the directory against the last scan."""
+        current = {}
+        for name in self._list_supported():
+            try:
+                st = os.stat(os.path.join(self.intake_dir, name))
+                current[name] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+        changed = {n for n, sig in current.items() if self._snapshot.get(n) != sig}
+        removed = set(self._snapshot) - set(current)
+        self._snapshot = current
+        return changed, removed
+
+    def _get_detector(self):
+        if self._detector is None:
+            from .document_detector import get_detector
+            self._detector = get_detector(use_llm_for_ambiguous=True)
+        return self._detector
+
+    def poll_once(self, timeout: float = 0.0) -> int:
+        """Collect change notifications, then process files that have settled.
+
+        Returns:
+            int: Number of files pre-analyzed in this step.
+        """
+        if self._inotify is not None:
+            changed, removed = self._inotify.read(timeout)
+        else:
+            if timeout:
+                self._stop.wait(timeout)
+            changed, removed = self._scan_changes()
+        now = time.monotonic()
+        for name in changed:
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS and not name.startswith('.'):
+                self._pending[name] = ((-1, -1), now)
+                self.stats['last_event_at'] = time.time()
+        for name in removed:
+            self._pending.pop(name, None)
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                self._dirty = True
+
+        processed = 0
+        if intake_paused():
+            # Keep collecting events; settled files wait for memory to recover
+            return processed
+        for name, (last_sig, since) in list(self._pending.items()):
+            path = os.path.join(self.intake_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._pending[name]
+                continue
+            sig = (st.st_size, st.st_mtime_ns)
+            if sig != last_sig or st.st_size == 0:
+                self._pending[name] = (sig, now)  # still being written; restart the settle clock
+                continue
+            if now - since < self.settle_seconds:
+                continue
+            del self._pending[name]
+            try:
+                if self._get_detector().preanalyze_file(path) is not None:
+                    self.stats['preanalyzed'] += 1
+                    processed += 1
+                    self._dirty = True
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.warning(f"Intake pre-analysis failed for {name}: {e}")
+
+        if self._dirty and not self._pending and self.rebuild_result_set:
+            self._dirty = False
+            self._rebuild_result_set()
+        return processed
+
+    def _rebuild_result_set(self):
+        """Re-assemble intake_analysis_cache.pkl from the per-file cache (cheap: all hits).
+
+        Runs as the shared intake analysis run, so SSE clients connecting
+        meanwhile join it instead of starting a second analysis.
+        """
+        try:
+            from .routes.intake import start_shared_intake_analysis, select_tmp_dir
+        except Exception as e:
+            logger.debug(f"Intake result-set rebuild unavailable: {e}")
+            return
+        lock_file = os.path.join(select_tmp_dir(), 'intake_analysis_in_progress.lock')
+        if os.path.exists(lock_file):
+            self._dirty = True  # an analysis is already running; try again after it finishes
+            return
+        run, started = start_shared_intake_analysis(self.intake_dir)
+        if not started:
+            self._dirty = True
+            return
+        # Wait for completion; the worker writes the pkl and removes the lock file
+        for _event in run.subscribe(keepalive_seconds=self.poll_seconds):
+            if self._stop.is_set():
+                break
+        self.stats['rebuilds'] += 1
+
+    def run(self, shutdown_event: Optional[threading.Event] = None):
+        """Loop until stop() or the shutdown event is set."""
+        logger.info(f"Intake watcher running on {self.intake_dir} ({self.stats['mode']})")
+        wait = 0.5 if self._inotify is not None else self.poll_seconds
+        try:
+            while not self._stop.is_set() and not (shutdown_event is not None and shutdown_event.is_set()):
+                try:
+                    # Wake up often while files are settling so they are processed promptly
+                    self.poll_once(min(wait, self.settle_seconds) if self._pending else wait)
+                except Exception as e:
+                    logger.warning(f"Intake watcher iteration failed: {e}")
+                    self._stop.wait(self.poll_seconds)
+        finally:
+            if self._inotify is not None:
+                self._inotify.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_intake_watcher() -> bool:
+    """Start the intake watcher daemon thread (INTAKE_WATCH_ENABLED)."""
+    global _watcher
+    if not getattr(app_config, 'INTAKE_WATCH_ENABLED', True):
+        return False
+    intake_dir = getattr(app_config, 'INTAKE_DIR', None)
+    if not intake_dir or not os.path.isdir(intake_dir):
+        return False
+    with _watcher_lock:
+        if _watcher is not None:
+            return False
+        _watcher = IntakeWatcher(
+            intake_dir,
+            settle_seconds=float(getattr(app_config, 'INTAKE_WATCH_SETTLE_SECONDS', 2.0)),
+            poll_seconds=float(getattr(app_config, 'INTAKE_WATCH_POLL_SECONDS', 5.0)),
+        )
+    from .config_manager import SHUTDOWN_EVENT
+    threading.Thread(target=_watcher.run, args=(SHUTDOWN_EVENT,), daemon=True, name='IntakeWatcher').start()
+    return True
+
+
+def get_intake_watcher_status() -> Optional[dict]:
+    """Counters for the running watcher, or None if it is not running."""
+    watcher = _watcher
+    if watcher is None:
+        return None
+    return dict(watcher.stats, intake_dir=watcher.intake_dir, pending=len(watcher._pending))
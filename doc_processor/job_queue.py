@@ -0,0 +1,614 @@
+"""
+Durable SQLite-backed job queue for long-running work.
+
+Request handlers used to start bare `threading.Thread`s for batch processing,
+smart processing and exports: no concurrency limit, no persistence, and a
+restart silently dropped in-flight work. They now `enqueue_job(...)` and
+return; a small pool of worker threads claims jobs from the `jobs` table
+(`JOB_QUEUE_DB_PATH`, default `jobs.db` beside the main database):
+
+- **Leases / heartbeats**: a claimed job holds a lease of
+  JOB_QUEUE_LEASE_SECONDS that the pool renews while the handler runs. A job
+  whose lease expires (its process died) is claimed again by the next worker,
+  in this or any other process sharing the database.
+- **Retries**: a handler that raises is retried up to its `max_attempts` with
+  exponential backoff (JOB_QUEUE_RETRY_BASE_SECONDS doubling, capped at
+  JOB_QUEUE_RETRY_MAX_SECONDS); then the job is marked `failed`.
+- **Idempotency keys**: enqueueing a key that already has a queued or
+  running job returns that job instead of adding a duplicate.
+- **Per-type concurrency**: each job type has a limit on concurrently running
+  jobs (counted in the database, so it holds across processes), overridable
+  with JOB_QUEUE_CONCURRENCY (`type=n,type=n`).
+
+Handlers are registered with `register_job_handler(job_type, func)` at import
+time of the module that owns the work, and receive a `Job` (payload dict plus
+`heartbeat()`). Workers only claim job types registered in their process.
+
+Workers can also run outside the web app: `python -m doc_processor.worker`
+(see `worker`) starts a pool in its own process, optionally several. With
+JOB_QUEUE_WORKERS=0 the web app only enqueues. Every process with a pool
+keeps a row in `job_workers` fresh while it heartbeats, so
+`get_job_queue_status` can list the live worker processes.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_type TEXT NOT NULL,
+        payload TEXT NOT NULL DEFAULT '{}',
+        idempotency_key TEXT,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        run_after REAL NOT NULL,
+        lease_owner TEXT,
+        lease_expires REAL,
+        heartbeat_at REAL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        last_error TEXT,
+        result TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_idempotency_active
+        ON jobs(idempotency_key) WHERE idempotency_key IS NOT NULL AND status IN ('queued', 'running');
+    CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after);
+    CREATE TABLE IF NOT EXISTS job_workers (
+        owner TEXT PRIMARY KEY,
+        host TEXT NOT NULL,
+        pid INTEGER NOT NULL,
+        threads INTEGER NOT NULL,
+        job_types TEXT,
+        started_at REAL NOT NULL,
+        heartbeat_at REAL NOT NULL
+    );
+"""
+
+
+@dataclass
+class JobHandler:
+    func: Callable[["Job"], Any]
+    concurrency: int = 1
+    max_attempts: int = 3
+
+
+class Job:
+    """A claimed job as seen by its handler."""
+
+    def __init__(self, row: sqlite3.Row, owner: str, db_path: Optional[str] = None):
+        self.id = row['id']
+        self.job_type = row['job_type']
+        self.idempotency_key = row['idempotency_key']
+        self.attempts = row['attempts']
+        self.max_attempts = row['max_attempts']
+        self.owner = owner
+        # Queue DB the job was claimed from; its outcome is recorded there even
+        # if JOB_QUEUE_DB_PATH changes while it runs
+        self.db_path = db_path
+        try:
+            self.payload: Dict[str, Any] = json.loads(row['payload'] or '{}')
+        except ValueError:
+            self.payload = {}
+
+    def heartbeat(self) -> bool:
+        """Extend the lease now (the worker pool also does this periodically)."""
+        return _renew_leases([self.id], self.owner, self.db_path) == 1
+
+
+_handlers: Dict[str, JobHandler] = {}
+_schema_ready = set()
+_wakeup = threading.Condition()
+_pool_lock = threading.Lock()
+# worker thread -> its stop flag (set by stop_job_workers)
+_workers: Dict[threading.Thread, threading.Event] = {}
+_heartbeat_thread: Optional[threading.Thread] = None
+_running: Dict[int, Job] = {}
+_running_lock = threading.Lock()
+# Job types this process's pool claims (None: every registered type)
+_claim_types: Optional[List[str]] = None
+_pool_started_at: Optional[float] = None
+_owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+_stats = {'claimed': 0, 'succeeded': 0, 'retried': 0, 'failed': 0, 'lease_lost': 0}
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def _shutdown_event():
+    try:
+        from .config_manager import SHUTDOWN_EVENT
+    except ImportError:
+        from config_manager import SHUTDOWN_EVENT
+    return SHUTDOWN_EVENT
+
+
+def get_job_db_path() -> str:
+    """JOB_QUEUE_DB_PATH, or `jobs.db` next to the main database."""
+    configured = getattr(_config(), 'JOB_QUEUE_DB_PATH', None) or os.getenv('JOB_QUEUE_DB_PATH')
+    if configured:
+        return os.path.abspath(configured)
+    try:
+        from .database import _resolve_db_path
+    except ImportError:
+        from database import _resolve_db_path
+    return os.path.join(os.path.dirname(os.path.abspath(_resolve_db_path(quiet=True))), 'jobs.db')
+
+
+def _connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    db_path = db_path or get_job_db_path()
+    fresh = not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if fresh or db_path not in _schema_ready:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _schema_ready.add(db_path)
+    return conn
+
+
+def _lease_seconds() -> float:
+    return float(getattr(_config(), 'JOB_QUEUE_LEASE_SECONDS', 60.0) or 60.0)
+
+
+def _concurrency_limits() -> Dict[str, int]:
+    limits = {job_type: handler.concurrency for job_type, handler in _handlers.items()}
+    raw = getattr(_config(), 'JOB_QUEUE_CONCURRENCY', '') or ''
+    for part in raw.split(','):
+        job_type, _, value = part.partition('=')
+        if job_type.strip() in limits and value.strip().isdigit():
+            limits[job_type.strip()] = int(value)
+    return limits
+
+
+def register_job_handler(job_type: str, func: Callable[[Job], Any], concurrency: int = 1, max_attempts: int = 3) -> None:
+    """Register the function that runs jobs of `job_type` in this process."""
+    _handlers[job_type] = JobHandler(func=func, concurrency=max(1, int(concurrency)), max_attempts=max(1, int(max_attempts)))
+
+
+def registered_job_types() -> List[str]:
+    return sorted(_handlers)
+
+
+def enqueue_job(job_type: str, payload: Optional[dict] = None, idempotency_key: Optional[str] = None,
+                max_attempts: Optional[int] = None, delay_seconds: float = 0.0) -> int:
+    """Persist a job and wake the workers.
+
+    Returns:
+        int: The new job id, or the id of the queued/running job that already
+        holds `idempotency_key`.
+    """
+    handler = _handlers.get(job_type)
+    attempts = max_attempts or (handler.max_attempts if handler else 3)
+    now = time.time()
+    conn = _connect()
+    try:
+        try:
+            cur = conn.execute(
+                "INSERT INTO jobs (job_type, payload, idempotency_key, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_type, json.dumps(payload or {}), idempotency_key, attempts, now + max(0.0, delay_seconds), now),
+            )
+            job_id = cur.lastrowid
+            logger.info(f"Enqueued job {job_id} ({job_type}){f' key={idempotency_key}' if idempotency_key else ''}")
+        except sqlite3.IntegrityError:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE idempotency_key = ? AND status IN ('queued', 'running')",
+                (idempotency_key,),
+            ).fetchone()
+            if row is None:
+                raise
+            job_id = row['id']
+            logger.info(f"Job {job_id} ({job_type}) already active for key {idempotency_key}")
+    finally:
+        conn.close()
+    start_job_workers()
+    with _wakeup:
+        _wakeup.notify_all()
+    return job_id
+
+
+def claim_job(job_types: Optional[List[str]] = None) -> Optional[Job]:
+    """Atomically lease the next runnable job whose type is under its concurrency limit."""
+    limits = _concurrency_limits()
+    if job_types is not None:
+        limits = {t: n for t, n in limits.items() if t in job_types}
+    if not limits:
+        return None
+    now = time.time()
+    db_path = get_job_db_path()
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # Jobs whose worker died on their last allowed attempt are not retried again
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', finished_at = ?, lease_owner = NULL, "
+            "last_error = COALESCE(last_error, 'lease expired') "
+            "WHERE status = 'running' AND lease_expires <= ? AND attempts >= max_attempts",
+            (now, now),
+        )
+        running = dict(conn.execute(
+            "SELECT job_type, COUNT(*) FROM jobs WHERE status = 'running' AND lease_expires > ? GROUP BY job_type",
+            (now,),
+        ).fetchall())
+        eligible = [t for t, limit in limits.items() if running.get(t, 0) < limit]
+        row = None
+        if eligible:
+            marks = ','.join('?' * len(eligible))
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE job_type IN ({marks}) AND "
+                "((status = 'queued' AND run_after <= ?) OR (status = 'running' AND lease_expires <= ?)) "
+                "ORDER BY run_after, id LIMIT 1",
+                (*eligible, now, now),
+            ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        if row['status'] == 'running':
+            logger.warning(f"Reclaiming job {row['id']} ({row['job_type']}) after its lease expired (owner {row['lease_owner']})")
+        conn.execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+            "heartbeat_at = ?, started_at = ? WHERE id = ?",
+            (_owner, now + _lease_seconds(), now, now, row['id']),
+        )
+        conn.execute("COMMIT")
+        claimed = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+        _stats['claimed'] += 1
+        return Job(claimed, _owner, db_path)
+    except sqlite3.Error:
+        try:
+            conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            pass
+        raise
+    finally:
+        conn.close()
+
+
+def _renew_leases(job_ids: List[int], owner: str, db_path: Optional[str] = None) -> int:
+    if not job_ids:
+        return 0
+    now = time.time()
+    conn = _connect(db_path)
+    try:
+        marks = ','.join('?' * len(job_ids))
+        cur = conn.execute(
+            f"UPDATE jobs SET lease_expires = ?, heartbeat_at = ? WHERE id IN ({marks}) "
+            "AND status = 'running' AND lease_owner = ?",
+            (now + _lease_seconds(), now, *job_ids, owner),
+        )
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def complete_job(job: Job, result: Any = None) -> None:
+    """Mark a job succeeded (no-op with a warning if its lease was lost)."""
+    conn = _connect(job.db_path)
+    try:
+        try:
+            result_text = json.dumps(result) if result is not None else None
+        except (TypeError, ValueError):
+            result_text = json.dumps(str(result))
+        cur = conn.execute(
+            "UPDATE jobs SET status = 'succeeded', result = ?, finished_at = ?, lease_owner = NULL, "
+            "lease_expires = NULL WHERE id = ? AND lease_owner = ?",
+            (result_text, time.time(), job.id, job.owner),
+        )
+        if cur.rowcount:
+            _stats['succeeded'] += 1
+        else:
+            _stats['lease_lost'] += 1
+            logger.warning(f"Job {job.id} finished after losing its lease; result discarded")
+    finally:
+        conn.close()
+
+
+def fail_job(job: Job, error: str) -> str:
+    """Re-queue a failed job with backoff, or mark it failed when out of attempts.
+
+    Returns:
+        str: The job's new status ('queued' or 'failed').
+    """
+    cfg = _config()
+    now = time.time()
+    if job.attempts < job.max_attempts:
+        base = float(getattr(cfg, 'JOB_QUEUE_RETRY_BASE_SECONDS', 5.0) or 0.0)
+        cap = float(getattr(cfg, 'JOB_QUEUE_RETRY_MAX_SECONDS', 300.0) or 0.0)
+        delay = min(cap, base * (2 ** (job.attempts - 1))) * random.uniform(0.8, 1.2)
+        status, run_after = 'queued', now + delay
+        _stats['retried'] += 1
+        logger.warning(f"Job {job.id} ({job.job_type}) attempt {job.attempts}/{job.max_attempts} failed: {error}; retrying in {delay:.1f}s")
+    else:
+        status, run_after = 'failed', now
+        _stats['failed'] += 1
+        logger.error(f"Job {job.id} ({job.job_type}) failed after {job.attempts} attempt(s): {error}")
+    conn = _connect(job.db_path)
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL, "
+            "finished_at = CASE WHEN ? = 'failed' THEN ? ELSE NULL END WHERE id = ? AND lease_owner = ?",
+            (status, run_after, str(error)[:2000], status, now, job.id, job.owner),
+        )
+    finally:
+        conn.close()
+    return status
+
+
+def run_job(job: Job) -> None:
+    """Run a claimed job's handler and record the outcome."""
+    handler = _handlers.get(job.job_type)
+    if handler is None:
+        fail_job(job, f"No handler registered for job type {job.job_type}")
+        return
+    with _running_lock:
+        _running[job.id] = job
+    try:
+        result = handler.func(job)
+    except Exception as e:
+        logger.exception(f"Job {job.id} ({job.job_type}) raised")
+        fail_job(job, f"{type(e).__name__}: {e}")
+    else:
+        complete_job(job, result)
+    finally:
+        with _running_lock:
+            _running.pop(job.id, None)
+        with _wakeup:
+            _wakeup.notify_all()  # a concurrency slot is free again
+
+
+def _worker_loop(stop: threading.Event):
+    shutdown = _shutdown_event()
+    poll = float(getattr(_config(), 'JOB_QUEUE_POLL_SECONDS', 2.0) or 2.0)
+    while not shutdown.is_set() and not stop.is_set():
+        try:
+            job = claim_job(_claim_types if _claim_types is not None else list(_handlers))
+        except Exception as e:
+            logger.warning(f"Job claim failed: {e}")
+            job = None
+        if job is None:
+            with _wakeup:
+                _wakeup.wait(poll)
+            continue
+        run_job(job)
+
+
+def prune_finished_jobs(older_than_days: Optional[float] = None) -> int:
+    """Delete succeeded/failed jobs finished more than JOB_QUEUE_RETENTION_DAYS ago."""
+    days = older_than_days if older_than_days is not None else float(getattr(_config(), 'JOB_QUEUE_RETENTION_DAYS', 7.0) or 0.0)
+    if days <= 0:
+        return 0
+    conn = _connect()
+    try:
+        cur = conn.execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+            (time.time() - days * 86400.0,),
+        )
+        return cur.rowcount
+    finally:
+        conn.close()
+
+
+def _register_worker() -> None:
+    """Insert or refresh this process's `job_workers` row."""
+    with _pool_lock:
+        threads = sum(1 for t in _workers if t.is_alive())
+    if not threads:
+        return  # pool stopped; the heartbeat only finishes off running jobs
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT INTO job_workers (owner, host, pid, threads, job_types, started_at, heartbeat_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(owner) DO UPDATE SET threads = excluded.threads, "
+            "job_types = excluded.job_types, heartbeat_at = excluded.heartbeat_at",
+            (_owner, socket.gethostname(), os.getpid(), threads,
+             ','.join(_claim_types) if _claim_types is not None else None, _pool_started_at or now, now),
+        )
+    finally:
+        conn.close()
+
+
+def _unregister_worker() -> None:
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM job_workers WHERE owner = ?", (_owner,))
+    finally:
+        conn.close()
+
+
+def list_worker_processes() -> List[dict]:
+    """Processes running a job pool whose heartbeat is within JOB_QUEUE_LEASE_SECONDS.
+
+    Rows of processes that stopped heartbeating longer ago than that are
+    dropped.
+    """
+    cutoff = time.time() - _lease_seconds()
+    conn = _connect()
+    try:
+        conn.execute("DELETE FROM job_workers WHERE heartbeat_at < ?", (cutoff,))
+        rows = conn.execute("SELECT * FROM job_workers ORDER BY started_at").fetchall()
+        return [dict(r, current=r['owner'] == _owner) for r in rows]
+    finally:
+        conn.close()
+
+
+def _heartbeat_loop():
+    shutdown = _shutdown_event()
+    last_prune = 0.0
+    while not shutdown.wait(max(1.0, _lease_seconds() / 3.0)):
+        with _running_lock:
+            by_db: Dict[Optional[str], List[int]] = {}
+            for job in _running.values():
+                by_db.setdefault(job.db_path, []).append(job.id)
+        try:
+            _register_worker()
+            lost = sum(len(ids) - _renew_leases(ids, _owner, db_path) for db_path, ids in by_db.items())
+            if lost:
+                logger.warning(f"Lost the lease on {lost} running job(s)")
+            if time.monotonic() - last_prune > 3600:
+                last_prune = time.monotonic()
+                prune_finished_jobs()
+        except Exception as e:
+            logger.debug(f"Job heartbeat failed: {e}")
+
+
+def start_job_workers(count: Optional[int] = None, job_types: Optional[List[str]] = None) -> bool:
+    """Start (or top up) the worker threads and the lease heartbeat thread.
+
+    Called at app startup so jobs left over from a previous run resume, and
+    lazily by `enqueue_job`; `count` defaults to JOB_QUEUE_WORKERS, where 0
+    leaves jobs to separate worker processes. `job_types` limits what this
+    process claims. Returns True if any thread was started.
+    """
+    global _heartbeat_thread, _claim_types, _pool_started_at
+    if _shutdown_event().is_set():
+        return False
+    if count is None:
+        count = int(getattr(_config(), 'JOB_QUEUE_WORKERS', 4) or 0)
+    if job_types is not None:
+        _claim_types = list(job_types)
+    if count <= 0:
+        return False
+    started = False
+    with _pool_lock:
+        for t in [t for t in _workers if not t.is_alive()]:
+            del _workers[t]
+        while len(_workers) < count:
+            stop = threading.Event()
+            t = threading.Thread(target=_worker_loop, args=(stop,), daemon=True, name=f'JobWorker-{len(_workers) + 1}')
+            t.start()
+            _workers[t] = stop
+            started = True
+        if _heartbeat_thread is None or not _heartbeat_thread.is_alive():
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, daemon=True, name='JobHeartbeat')
+            _heartbeat_thread.start()
+            started = True
+    if started:
+        _pool_started_at = _pool_started_at or time.time()
+        try:
+            _register_worker()
+        except sqlite3.Error as e:
+            logger.debug(f"Could not register job worker process: {e}")
+    return started
+
+
+def jobs_run_in_process() -> bool:
+    """True when this process has (or will start on enqueue) job worker threads."""
+    with _pool_lock:
+        if any(t.is_alive() for t in _workers):
+            return True
+    return int(getattr(_config(), 'JOB_QUEUE_WORKERS', 4) or 0) > 0
+
+
+def stop_job_workers(timeout: float = 10.0) -> None:
+    """Stop the current worker threads after their current job.
+
+    Waits up to `timeout` seconds; a worker still busy after that exits once
+    its job returns. The heartbeat keeps renewing leases until then.
+    """
+    with _pool_lock:
+        workers = list(_workers.items())
+        _workers.clear()
+    for _, stop in workers:
+        stop.set()
+    with _wakeup:
+        _wakeup.notify_all()
+    deadline = time.monotonic() + timeout
+    for t, _ in workers:
+        t.join(max(0.0, deadline - time.monotonic()))
+    try:
+        _unregister_worker()
+    except sqlite3.Error as e:
+        logger.debug(f"Could not unregister job worker process: {e}")
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    for key in ('payload', 'result'):
+        if job.get(key):
+            try:
+                job[key] = json.loads(job[key])
+            except ValueError:
+                pass
+    return job
+
+
+def get_job(job_id: int) -> Optional[dict]:
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def find_active_jobs(payload_key: str, value: Any, exclude_types: Iterable[str] = ()) -> List[dict]:
+    """Queued or running jobs whose payload `payload_key` equals `value` (compared as text)."""
+    excluded = set(exclude_types)
+    conn = _connect()
+    try:
+        rows = conn.execute("SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY id").fetchall()
+    finally:
+        conn.close()
+    jobs = [_row_to_dict(r) for r in rows if r['job_type'] not in excluded]
+    return [j for j in jobs if isinstance(j.get('payload'), dict) and str(j['payload'].get(payload_key)) == str(value)]
+
+
+def list_jobs(status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50) -> List[dict]:
+    clauses, params = [], []
+    if status:
+        clauses.append("status = ?")
+        params.append(status)
+    if job_type:
+        clauses.append("job_type = ?")
+        params.append(job_type)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = _connect()
+    try:
+        rows = conn.execute(f"SELECT * FROM jobs {where} ORDER BY id DESC LIMIT ?", (*params, int(limit))).fetchall()
+        return [_row_to_dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def get_job_queue_status() -> dict:
+    """Counts per job type and status, configured limits and process-local counters."""
+    conn = _connect()
+    try:
+        counts: Dict[str, Dict[str, int]] = {}
+        for job_type, status, n in conn.execute("SELECT job_type, status, COUNT(*) FROM jobs GROUP BY job_type, status"):
+            counts.setdefault(job_type, {})[status] = n
+    finally:
+        conn.close()
+    with _pool_lock:
+        alive = sum(1 for t in _workers if t.is_alive())
+    with _running_lock:
+        running_here = sorted(_running)
+    return {
+        'db_path': get_job_db_path(),
+        'owner': _owner,
+        'workers': alive,
+        'running_here': running_here,
+        'concurrency': _concurrency_limits(),
+        'worker_processes': list_worker_processes(),
+        'counts': counts,
+        'stats': dict(_stats),
+    }
@@ -1,13 +1,20 @@
 import logging
 import os
 import re
+import time
 from typing import Optional, Dict, List
 
 try:
+    from .cancellation import current_token, run_cancellable
     from .config_manager import app_config
+    from .governor import record_llm_latency
+    from .scheduler import llm_gate
 except ImportError:
     # Handle direct script execution
+    from cancellation import current_token, run_cancellable
     from config_manager import app_config
+    from governor import record_llm_latency
+    from scheduler import llm_gate
 
 
 def extract_document_tags(ocr_text: str, document_name: str = "") -> Optional[Dict[str, List[str]]]:
@@ -342,6 +349,18 @@ def _query_ollama(prompt: str, timeout: int = 45, context_window: int = 4096, ta
         logging.error(f"❌ Ollama not configured - OLLAMA_HOST={app_config.OLLAMA_HOST}, OLLAMA_MODEL={app_config.OLLAMA_MODEL}")
         return None
 
+    # Interactive requests (rescans from the UI) are served before background batches
+    # A cancelled run (see cancellation) stops waiting for the slot or the response
+    with llm_gate.slot():
+        started = time.perf_counter()
+        result = run_cancellable(_send_ollama_request, prompt, timeout, context_window, task_name)
+        # Feeds the load governor's view of Ollama latency
+        record_llm_latency(time.perf_counter() - started)
+        return result
+
+
+def _send_ollama_request(prompt: str, timeout: int, context_window: int, task_name: str) -> Optional[str]:
+    """One chat request (HTTP /api/generate fallback) to the configured Ollama model."""
     try:
         import ollama
         import requests
@@ -364,10 +383,22 @@ def _query_ollama(prompt: str, timeout: int = 45, context_window: int = 4096, ta
         logging.info(f"🌐 Sending {task_name} request to Ollama model {app_config.OLLAMA_MODEL} (timeout: {timeout}s) num_gpu={num_gpu_val}")
         logging.debug(f"🌐 Request options: {options}")
 
+        token = current_token()
+
         # First attempt: use the Python client library (preferred)
         try:
             client = ollama.Client(host=app_config.OLLAMA_HOST)
             messages = [{'role': 'user', 'content': prompt}]
+            if token is not None:
+                # Cancellable run: stream, so a cancel closes the request between chunks
+                result = _stream_ollama_chat(client, messages, options, token)
+                if result is None:
+                    logging.info(f"🛑 Ollama {task_name} request cancelled; connection closed")
+                    return None
+                if not result:
+                    raise ValueError('Empty response from ollama.Client.chat stream')
+                logging.info(f"✅ Ollama (client) {task_name} response received: {len(result)} characters")
+                return result
             response = client.chat(
                 model=app_config.OLLAMA_MODEL,
                 messages=messages,
@@ -393,6 +424,8 @@ def _query_ollama(prompt: str, timeout: int = 45, context_window: int = 4096, ta
             logging.debug("⚠️ Client exception traceback:", exc_info=True)
 
         # Fallback: call the HTTP /api/generate endpoint with the same options
+        if token is not None and token.cancelled:
+            return None
         try:
             payload = {
                 'model': app_config.OLLAMA_MODEL,
@@ -423,3 +456,21 @@ def _query_ollama(prompt: str, timeout: int = 45, context_window: int = 4096, ta
         logging.debug(f"💥 Full traceback: {traceback.format_exc()}")
         return None
 
+
+def _stream_ollama_chat(client, messages: List[dict], options: dict, token) -> Optional[str]:
+    """Chat response text read chunk by chunk; None once `token` is cancelled (closes the stream)."""
+    stream = client.chat(model=app_config.OLLAMA_MODEL, messages=messages, options=options, stream=True)
+    parts: List[str] = []
+    try:
+        for chunk in stream:
+            if token.cancelled:
+                return None
+            msg = getattr(chunk, 'message', None)
+            content = getattr(msg, 'content', None) if msg is not None else None
+            if isinstance(content, str):
+                parts.append(content)
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+    return ''.join(parts).strip()
@@ -0,0 +1,323 @@
+"""
+Size-bounded, indexed cache of normalized (image -> PDF) conversions.
+
+`DocumentTypeDetector._convert_image_to_pdf` stores each converted image as
+`NORMALIZED_DIR/img_<sha256[:16]>.pdf`. Previously every lookup re-hashed the
+whole source image and a 12-hourly sweep deleted files by age only, so the
+directory could grow without bound between sweeps.
+
+A small SQLite index (`.normalized_index.sqlite3`, kept next to the files so
+purging the directory also drops it) now maps each cache key to its file,
+size and last access time, plus the (path, size, mtime) signature of the
+source it was produced from:
+
+- lookups for an unchanged source are a single primary-key/index probe plus
+  one stat of the cached PDF (no hashing);
+- every insert enforces NORMALIZED_CACHE_MAX_BYTES by evicting least-recently
+  used entries;
+- `reconcile()` (run by a background thread every
+  NORMALIZED_CACHE_RECONCILE_HOURS) adopts orphaned `img_*.pdf` files, drops
+  index rows whose file vanished, expires entries unused for
+  NORMALIZED_CACHE_MAX_AGE_DAYS and re-applies the byte budget.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+try:
+    from .file_fingerprint import fingerprint
+except ImportError:
+    from file_fingerprint import fingerprint
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = '.normalized_index.sqlite3'
+_CACHE_FILE_RE = re.compile(r'^img_([0-9a-f]{16})\.pdf$')
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS normalized_cache (
+        cache_key TEXT PRIMARY KEY,
+        file_name TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL DEFAULT 0,
+        source_path TEXT,
+        source_size INTEGER,
+        source_mtime_ns INTEGER,
+        created_at REAL NOT NULL,
+        last_access REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_normalized_cache_source
+        ON normalized_cache(source_path, source_size, source_mtime_ns);
+    CREATE INDEX IF NOT EXISTS idx_normalized_cache_last_access
+        ON normalized_cache(last_access);
+"""
+
+_caches = {}
+_caches_lock = threading.Lock()
+_maintenance_started = False
+
+
+class NormalizedCache:
+    """Indexed normalized-PDF cache rooted at one directory.
+
+    Args:
+        root: Cache directory (NORMALIZED_DIR).
+        max_bytes: Total size budget for cached PDFs; 0 disables the limit.
+        max_age_days: Entries not accessed for this long are removed by reconcile(); 0 disables.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 0, max_age_days: float = 0):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max(int(max_bytes or 0), 0)
+        self.max_age_days = max(float(max_age_days or 0), 0.0)
+        self.index_path = os.path.join(self.root, INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self.stats = {'hits': 0, 'misses': 0, 'hashed': 0, 'evicted': 0, 'evicted_bytes': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(self.root, exist_ok=True)
+        # The directory may have been purged (dev_tools/purge_normalized_cache.py)
+        fresh = not os.path.exists(self.index_path)
+        conn = sqlite3.connect(self.index_path, timeout=10)
+        if fresh or not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def path_for(self, cache_key: str) -> str:
+        return os.path.join(self.root, f"img_{cache_key}.pdf")
+
+    def lookup(self, source_path: str) -> Tuple[str, Optional[str]]:
+        """Find the cached PDF for a source image.
+
+        Returns:
+            (cache_key, pdf_path): pdf_path is None on a miss; the key is what
+            `record()` expects after converting.
+        """
+        st = os.stat(source_path)
+        source_path = os.path.abspath(source_path)
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT cache_key, file_name FROM normalized_cache "
+                "WHERE source_path = ? AND source_size = ? AND source_mtime_ns = ? LIMIT 1",
+                (source_path, st.st_size, st.st_mtime_ns),
+            ).fetchone()
+            if row is None:
+                # Unknown source (or changed): identify it by content
+                self.stats['hashed'] += 1
+                cache_key = fingerprint(source_path, 'full', st=st)[:16]
+                row = conn.execute(
+                    "SELECT cache_key, file_name FROM normalized_cache WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+                if row is None:
+                    self.stats['misses'] += 1
+                    return cache_key, None
+            cache_key, file_name = row
+            pdf_path = os.path.join(self.root, file_name)
+            if not os.path.exists(pdf_path):
+                conn.execute("DELETE FROM normalized_cache WHERE cache_key = ?", (cache_key,))
+                conn.commit()
+                self.stats['misses'] += 1
+                return cache_key, None
+            conn.execute(
+                "UPDATE normalized_cache SET last_access = ?, source_path = ?, source_size = ?, source_mtime_ns = ? "
+                "WHERE cache_key = ?",
+                (now, source_path, st.st_size, st.st_mtime_ns, cache_key),
+            )
+            conn.commit()
+            self.stats['hits'] += 1
+            return cache_key, pdf_path
+        finally:
+            conn.close()
+
+    def record(self, cache_key: str, source_path: str, pdf_path: str) -> None:
+        """Index a freshly converted PDF, then evict LRU entries over the byte budget."""
+        st = os.stat(source_path)
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                """
+                INSERT INTO normalized_cache
+                    (cache_key, file_name, size_bytes, source_path, source_size, source_mtime_ns, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    file_name = excluded.file_name,
+                    size_bytes = excluded.size_bytes,
+                    source_path = excluded.source_path,
+                    source_size = excluded.source_size,
+                    source_mtime_ns = excluded.source_mtime_ns,
+                    last_access = excluded.last_access
+                """,
+                (cache_key, os.path.basename(pdf_path), os.path.getsize(pdf_path), os.path.abspath(source_path),
+                 st.st_size, st.st_mtime_ns, now, now),
+            )
+            conn.commit()
+            if self.max_bytes:
+                self._evict_over_budget(conn, keep=cache_key)
+        finally:
+            conn.close()
+
+    def _remove_entries(self, conn: sqlite3.Connection, rows) -> int:
+        freed = 0
+        for cache_key, file_name, size_bytes in rows:
+            try:
+                os.remove(os.path.join(self.root, file_name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove normalized PDF {file_name}: {e}")
+                continue
+            conn.execute("DELETE FROM normalized_cache WHERE cache_key = ?", (cache_key,))
+            freed += size_bytes or 0
+            self.stats['evicted'] += 1
+        self.stats['evicted_bytes'] += freed
+        conn.commit()
+        return freed
+
+    def _evict_over_budget(self, conn: sqlite3.Connection, keep: Optional[str] = None) -> int:
+        """Delete least-recently used entries until the total size fits max_bytes."""
+        with self._lock:
+            total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM normalized_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            victims = []
+            excess = total - self.max_bytes
+            for cache_key, file_name, size_bytes in conn.execute(
+                "SELECT cache_key, file_name, size_bytes FROM normalized_cache ORDER BY last_access"
+            ):
+                if excess <= 0:
+                    break
+                if cache_key == keep:
+                    continue
+                victims.append((cache_key, file_name, size_bytes))
+                excess -= size_bytes or 0
+            freed = self._remove_entries(conn, victims)
+            if freed:
+                logger.info(f"Normalized cache evicted {len(victims)} PDFs ({freed} bytes) to stay under {self.max_bytes} bytes")
+            return freed
+
+    def reconcile(self) -> dict:
+        """Bring the index and the directory back in sync and apply age/size limits.
+
+        Returns:
+            dict: {'adopted', 'dropped', 'expired', 'evicted_bytes', 'entries', 'total_bytes'}
+        """
+        result = {'adopted': 0, 'dropped': 0, 'expired': 0, 'evicted_bytes': 0}
+        if not os.path.isdir(self.root):
+            return dict(result, entries=0, total_bytes=0)
+        conn = self._connect()
+        try:
+            indexed = {r[0]: r[1] for r in conn.execute("SELECT cache_key, file_name FROM normalized_cache")}
+            on_disk = {}
+            for name in os.listdir(self.root):
+                m = _CACHE_FILE_RE.match(name)
+                if m:
+                    on_disk[m.group(1)] = name
+            # Orphaned files (written before the index existed, or by a crashed
+            # process): adopt them with their mtime as last access
+            for cache_key, name in on_disk.items():
+                if cache_key in indexed:
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO normalized_cache (cache_key, file_name, size_bytes, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (cache_key, name, st.st_size, st.st_mtime, st.st_mtime),
+                )
+                result['adopted'] += 1
+            # Index rows whose file is gone
+            missing = [k for k, name in indexed.items() if not os.path.exists(os.path.join(self.root, name))]
+            for cache_key in missing:
+                conn.execute("DELETE FROM normalized_cache WHERE cache_key = ?", (cache_key,))
+            result['dropped'] = len(missing)
+            conn.commit()
+
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                stale = conn.execute(
+                    "SELECT cache_key, file_name, size_bytes FROM normalized_cache WHERE last_access < ?", (cutoff,)
+                ).fetchall()
+                self._remove_entries(conn, stale)
+                result['expired'] = len(stale)
+            if self.max_bytes:
+                result['evicted_bytes'] = self._evict_over_budget(conn)
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM normalized_cache"
+            ).fetchone()
+            result.update(entries=entries, total_bytes=total)
+        finally:
+            conn.close()
+        if result['adopted'] or result['dropped'] or result['expired'] or result['evicted_bytes']:
+            logger.info(f"Normalized cache reconcile: {result}")
+        return result
+
+    def status(self) -> dict:
+        """Entry count, total bytes and hit/miss/eviction counters."""
+        conn = self._connect()
+        try:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM normalized_cache"
+            ).fetchone()
+        finally:
+            conn.close()
+        return dict(self.stats, root=self.root, entries=entries, total_bytes=total, max_bytes=self.max_bytes)
+
+
+def get_normalized_cache(root: Optional[str] = None) -> NormalizedCache:
+    """Return the process-wide cache for `root` (defaults to NORMALIZED_DIR), configured from app_config."""
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    root = os.path.abspath(root or getattr(app_config, 'NORMALIZED_DIR', None) or 'normalized')
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = _caches[root] = NormalizedCache(
+                root,
+                max_bytes=int(getattr(app_config, 'NORMALIZED_CACHE_MAX_BYTES', 0) or 0),
+                max_age_days=float(getattr(app_config, 'NORMALIZED_CACHE_MAX_AGE_DAYS', 14) or 0),
+            )
+        return cache
+
+
+def start_normalized_cache_maintenance() -> bool:
+    """Run reconcile() on NORMALIZED_DIR every NORMALIZED_CACHE_RECONCILE_HOURS in a daemon thread."""
+    global _maintenance_started
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    interval_hours = float(getattr(app_config, 'NORMALIZED_CACHE_RECONCILE_HOURS', 12.0) or 0)
+    if _maintenance_started or interval_hours <= 0:
+        return False
+    _maintenance_started = True
+
+    def _loop():
+        try:
+            from .config_manager import SHUTDOWN_EVENT
+        except ImportError:
+            from config_manager import SHUTDOWN_EVENT
+        while True:
+            try:
+                get_normalized_cache().reconcile()
+            except Exception as e:
+                logger.warning(f"Normalized cache reconcile failed: {e}")
+            if SHUTDOWN_EVENT is None:
+                time.sleep(interval_hours * 3600)
+            elif SHUTDOWN_EVENT.wait(interval_hours * 3600):
+                return
+
+    threading.Thread(target=_loop, daemon=True, name='NormalizedCacheMaintenance').start()
+    return True
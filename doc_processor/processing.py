@@ -54,32 +54,25 @@ def safe_move(src, dst):
 
 # --- FILE HASH / DEDUP HELPERS ---
 def _file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
-    """Compute SHA-256 hash of a file (streamed) and return hex digest.
+    """Return the SHA-256 hex digest of a file via the shared fingerprint service.
 
-    Uses a 1MB chunk size (tunable) to balance speed and memory. Caller should
-    ensure path exists. Any exception propagates to allow caller to decide on
-    fallback behavior.
+    Unchanged files (same device, inode, size and mtime) are not re-read.
+    `chunk_size` is kept for backward compatibility and ignored. Any exception
+    propagates to allow caller to decide on fallback behavior.
     """
-    import hashlib
-    h = hashlib.sha256()
-    with open(path, 'rb') as f:
-        for chunk in iter(lambda: f.read(chunk_size), b''):
-            h.update(chunk)
-    return h.hexdigest()
+    return fingerprint(path, 'full')
 
 def _files_identical(a: str, b: str) -> bool:
     """Return True if two existing files are byte-identical.
 
-    Fast path: compare size; if different -> False.
-    Slow path: compare SHA-256 (streamed). Any hashing error returns False (so
-    caller will proceed with copy to be safe).
+    Fast path: same inode or different size. Slow path: compare memoized
+    SHA-256 digests. Any hashing error returns False (so caller will proceed
+    with copy to be safe).
     """
     try:
         if not (os.path.exists(a) and os.path.exists(b)):
             return False
-        if os.path.getsize(a) != os.path.getsize(b):
-            return False
-        return _file_sha256(a) == _file_sha256(b)
+        return files_identical(a, b)
     except Exception:
         return False
 
@@ -152,14 +145,8 @@ def convert_image_to_pdf(image_path: str, output_pdf_path: str) -> str:
         if _PIL_Image is None:
             raise FileProcessingError("Pillow is not available to convert images to PDF")
 
-        # Open the image using the locally-imported PIL.Image
-        with _PIL_Image.open(image_path) as img:
-            # Convert to RGB if necessary (required for PDF)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Save as PDF
-            img.save(output_pdf_path, "PDF", resolution=150.0)
+        # Embed the image as the page (JPEG bytes pass through without re-encoding)
+        write_image_pdf(image_path, output_pdf_path)
 
         # Verify the PDF was created successfully
         if not os.path.exists(output_pdf_path):
@@ -303,10 +290,20 @@ else:
 from .config_manager import app_config
 from .exceptions import FileProcessingError
 from .security import sanitize_filename
-from .database import get_all_categories, log_interaction, store_document_tags
+from .database import (get_all_categories, log_interaction, store_document_tags, document_text_sql, set_document_text,
+                       get_document_text, delete_document_text)
 from .llm_utils import _query_ollama, extract_document_tags
 from .batch_guard import get_or_create_processing_batch
 from .document_detector import get_detector, DocumentAnalysis
+from .file_fingerprint import fingerprint, files_identical
+from .utils.image_pdf import write_image_pdf, page_source_image
+from .utils.pipeline import Stage, run_pipeline
+from .checkpoints import (BATCH_KEY, record_checkpoint, get_checkpoints, start_batch_run, finish_batch_run,
+                          page_key, list_resumable_batches)
+from .job_queue import enqueue_job, find_active_jobs, register_job_handler
+from .scheduler import ocr_gate
+from .cancellation import OperationCancelled, check_cancelled, is_cancelled
+from .governor import pipeline_workers
 
 # --- PDF MANIPULATION FUNCTIONS ---
 def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id: Optional[int] = None, forced_rotation: Optional[int] = None) -> tuple[str, float, str]:
@@ -320,22 +317,24 @@ def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id:
     Returns (ocr_text, avg_confidence, status_message)
     """
     try:
-        # Utility to compute a deterministic source signature (size + mtime + sha1 head)
+        # Utility to compute a deterministic source signature (size + mtime + fast fingerprint)
         def _compute_signature(path: str) -> str:
             try:
-                import hashlib
-                import os
                 st = os.stat(path)
-                size = st.st_size
-                mtime = int(st.st_mtime)
-                h = hashlib.sha1()
-                with open(path, 'rb') as f:
-                    h.update(f.read(1024 * 64))  # first 64KB is enough for change detection
-                return f"{size}-{mtime}-{h.hexdigest()}"
+                return f"{st.st_size}-{int(st.st_mtime)}-{fingerprint(path, 'fast', st=st)}"
             except Exception as sig_e:
                 logging.debug(f"Signature computation failed for {path}: {sig_e}")
                 return ""
 
+        def _signature_matches(cached_sig: str) -> bool:
+            if cached_sig == source_signature:
+                return True
+            # Signatures written before the shared fingerprint service ended in a
+            # 40-char SHA-1 of the first 64KB; accept them when size and mtime
+            # still match instead of re-running OCR for every legacy document.
+            head, _, digest = (cached_sig or '').rpartition('-')
+            return len(digest) == 40 and head == source_signature.rpartition('-')[0]
+
         source_signature = _compute_signature(original_pdf_path) if os.path.exists(original_pdf_path) else ""
 
         # 1. Cache + signature check
@@ -344,26 +343,27 @@ def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id:
                 with database_connection() as conn:
                     cur = conn.cursor()
                     # Attempt to read optional signature column; fallback if absent
+                    text_expr = document_text_sql('single_document', 'ocr_text')
                     try:
-                        cur.execute("""
-                            SELECT ocr_text, ocr_confidence_avg, searchable_pdf_path, ocr_source_signature
+                        cur.execute(f"""
+                            SELECT {text_expr}, ocr_confidence_avg, searchable_pdf_path, ocr_source_signature
                             FROM single_documents
-                            WHERE id=? AND ocr_text IS NOT NULL AND searchable_pdf_path IS NOT NULL
+                            WHERE id=? AND {text_expr} IS NOT NULL AND searchable_pdf_path IS NOT NULL
                         """, (document_id,))
                         row = cur.fetchone()
                         has_sig = True
                     except Exception:
                         has_sig = False
-                        cur.execute("""
-                            SELECT ocr_text, ocr_confidence_avg, searchable_pdf_path
+                        cur.execute(f"""
+                            SELECT {text_expr}, ocr_confidence_avg, searchable_pdf_path
                             FROM single_documents
-                            WHERE id=? AND ocr_text IS NOT NULL AND searchable_pdf_path IS NOT NULL
+                            WHERE id=? AND {text_expr} IS NOT NULL AND searchable_pdf_path IS NOT NULL
                         """, (document_id,))
                         row = cur.fetchone()
                 if row:
                     if has_sig:
                         cached_text, cached_conf, cached_path, cached_sig = row
-                        sig_matches = bool(cached_sig) and cached_sig == source_signature
+                        sig_matches = bool(cached_sig) and _signature_matches(cached_sig)
                     else:
                         cached_text, cached_conf, cached_path = row
                         sig_matches = True  # legacy rows without signature accepted
@@ -398,7 +398,7 @@ def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id:
                         row = cur.fetchone()
                         if row:
                             cached_path, cached_sig = row
-                            if cached_path and os.path.exists(cached_path) and cached_sig == source_signature:
+                            if cached_path and os.path.exists(cached_path) and cached_sig and _signature_matches(cached_sig):
                                 if cached_path != output_path:
                                     try:
                                         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -445,18 +445,30 @@ def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id:
         # Prepare output document with original page images + invisible text layer
         with fitz.open() as out_doc:
             for page_index, page in enumerate(pdf_doc):
+                if is_cancelled():
+                    # Nothing is written: the output is only saved after the last page
+                    pdf_doc.close()
+                    return "", 0.0, "cancelled"
                 try:
-                    # Render page to image (medium resolution balancing quality and speed)
-                    scale = getattr(app_config, 'OCR_RENDER_SCALE', 2.0) or 2.0
-                    pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))  # scale * 72 dpi
-                    img_bytes = pix.tobytes("png")
+                    # Image pages (converted JPG/PNG intake) are OCR'd from the embedded
+                    # source pixels and re-embedded as-is; other pages are rendered
+                    img_bytes = page_source_image(pdf_doc, page)
+                    if img_bytes is None:
+                        # Render page to image (medium resolution balancing quality and speed)
+                        scale = getattr(app_config, 'OCR_RENDER_SCALE', 2.0) or 2.0
+                        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale))  # scale * 72 dpi
+                        img_bytes = pix.tobytes("png")
+                        rect = fitz.Rect(0, 0, pix.width, pix.height)
+                    else:
+                        rect = page.rect
                     pil_img = Image.open(BytesIO(img_bytes))
                     # Optional forced rotation
                     if forced_rotation:
                         pil_img = pil_img.rotate(forced_rotation, expand=True)
                     # Tesseract OCR
                     try:
-                        data = pytesseract.image_to_data(pil_img, output_type=pytesseract.Output.DICT)
+                        with ocr_gate.slot():
+                            data = pytesseract.image_to_data(pil_img, output_type=pytesseract.Output.DICT)
                         words = data.get("text", [])
                         confs = data.get("conf", [])
                         # Filter noise
@@ -470,8 +482,6 @@ def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id:
                         logging.warning(f"Tesseract failed on page {page_index}: {t_err}")
                         ocr_text_parts.append("")
                     # Embed image + invisible text
-                    img_pdf = fitz.open("png", img_bytes)
-                    rect = img_pdf[0].rect
                     pdf_page = _doc_new_page(out_doc, width=rect.width, height=rect.height)
                     pdf_page.insert_image(rect, stream=img_bytes)
                     # Add an invisible overlay chunk (truncate for safety)
@@ -508,16 +518,17 @@ def create_searchable_pdf(original_pdf_path: str, output_path: str, document_id:
                     try:
                         c2.execute("""
                             UPDATE single_documents
-                            SET ocr_text=?, ocr_confidence_avg=?, searchable_pdf_path=?, ocr_source_signature=?
+                            SET ocr_confidence_avg=?, searchable_pdf_path=?, ocr_source_signature=?
                             WHERE id=?
-                        """, (full_text, avg_conf, output_path, source_signature, document_id))
+                        """, (avg_conf, output_path, source_signature, document_id))
                     except Exception:
                         # Fallback without signature (legacy schema)
                         c2.execute("""
                             UPDATE single_documents
-                            SET ocr_text=?, ocr_confidence_avg=?, searchable_pdf_path=?
+                            SET ocr_confidence_avg=?, searchable_pdf_path=?
                             WHERE id=?
-                        """, (full_text, avg_conf, output_path, document_id))
+                        """, (avg_conf, output_path, document_id))
+                    set_document_text('single_document', document_id, 'ocr_text', full_text, conn=conn)
                     conn.commit()
             except Exception as persist_e:
                 logging.debug(f"Failed to persist OCR results: {persist_e}")
@@ -787,7 +798,7 @@ def _process_single_page_from_file(
 
             try:
                 # Open the image once and perform all operations in memory
-                with Image.open(image_path) as img:
+                with Image.open(image_path) as img, ocr_gate.slot():
                     # 1. Get orientation and determine rotation
                     try:
                         osd = pytesseract.image_to_osd(
@@ -819,17 +830,17 @@ def _process_single_page_from_file(
             # Persist page row in the database
             try:
                 cursor.execute(
-                    "INSERT INTO pages (batch_id, source_filename, page_number, processed_image_path, ocr_text, status, rotation_angle) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    "INSERT INTO pages (batch_id, source_filename, page_number, processed_image_path, status, rotation_angle) VALUES (?, ?, ?, ?, ?, ?)",
                     (
                         batch_id,
                         source_filename,
                         page_num,
                         image_path,
-                        ocr_text,
                         app_config.STATUS_PENDING_VERIFICATION,
                         rotation,
                     ),
                 )
+                set_document_text('page', cursor.lastrowid, 'ocr_text', ocr_text, conn=cursor.connection)
             except Exception as db_e:
                 logging.error(f"    - Failed to insert page record into DB: {db_e}")
                 # Attempt to remove orphaned image if present
@@ -1343,134 +1354,8 @@ def _process_single_documents_as_batch(single_docs: List[DocumentAnalysis]) -> O
             searchable_dir = os.path.join(batch_dir, "searchable_pdfs")
             os.makedirs(searchable_dir, exist_ok=True)
 
-            # Process each single document with improved workflow
-            total_documents_processed = 0
-            for analysis in single_docs:
-                try:
-                    filename = os.path.basename(analysis.file_path)
-                    base_name = os.path.splitext(filename)[0]
-                    logging.info(f"Processing {filename} with improved single document workflow...")
-
-                    # Handle image files - prefer early normalized PDF from analysis if available
-                    if is_image_file(analysis.file_path):
-                        batch_wip_dir = os.path.join(app_config.WIP_DIR, str(batch_id))
-                        original_pdfs_dir = os.path.join(batch_wip_dir, "original_pdfs")
-                        os.makedirs(original_pdfs_dir, exist_ok=True)
-                        normalized_pdf_candidate = getattr(analysis, 'pdf_path', None)
-                        target_pdf_path = os.path.join(original_pdfs_dir, f"{base_name}.pdf")
-                        if normalized_pdf_candidate and normalized_pdf_candidate.lower().endswith('.pdf') and os.path.exists(normalized_pdf_candidate):
-                            try:
-                                if normalized_pdf_candidate != target_pdf_path:
-                                    # Skip copy if identical already exists
-                                    if os.path.exists(target_pdf_path) and _files_identical(normalized_pdf_candidate, target_pdf_path):
-                                        logging.info(f"♻ Skipping copy (identical) normalized PDF for image {filename}")
-                                    else:
-                                        import shutil
-                                        shutil.copy2(normalized_pdf_candidate, target_pdf_path)
-                                logging.info(f"♻ Reusing normalized PDF for image {filename} -> {target_pdf_path}")
-                            except Exception as reuse_e:
-                                logging.warning(f"Failed to reuse normalized PDF for {filename}: {reuse_e}; falling back to fresh conversion")
-                                convert_image_to_pdf(analysis.file_path, target_pdf_path)
-                        else:
-                            logging.info(f"Converting image file {filename} to PDF (no reusable normalized version)")
-                            convert_image_to_pdf(analysis.file_path, target_pdf_path)
-                        # Archive original image (only once, after we have a PDF secured)
-                        try:
-                            archive_dir = os.path.join(app_config.ARCHIVE_DIR, f"batch_{batch_id}_images")
-                            os.makedirs(archive_dir, exist_ok=True)
-                            archived_image_path = os.path.join(archive_dir, filename)
-                            if os.path.exists(analysis.file_path):  # may have been moved already
-                                safe_move(analysis.file_path, archived_image_path)
-                        except Exception as arch_e:
-                            logging.warning(f"Archiving original image failed for {filename}: {arch_e}")
-                        pdf_path_for_processing = target_pdf_path
-                        pdf_filename = f"{base_name}.pdf"
-                    else:
-                        pdf_path_for_processing = analysis.file_path
-                        pdf_filename = filename
-
-                    # --- Pre-OCR Rotation Normalization ---
-                    try:
-                        forced_rotation = _lookup_forced_rotation(os.path.basename(pdf_filename))
-                        if forced_rotation and forced_rotation % 360 in (90, 180, 270):
-                            import fitz  # PyMuPDF already in requirements
-                            doc_pre = fitz.open(pdf_path_for_processing)
-                            # Avoid double rotate: if first page already rotated to desired angle, skip
-                            already = (doc_pre[0].rotation if doc_pre.page_count else 0)
-                            if already != forced_rotation:
-                                for pg in doc_pre:
-                                    pg.set_rotation((pg.rotation + forced_rotation) % 360)
-                                # Overwrite original path (safe because earlier steps archived originals for images)
-                                doc_pre.save(pdf_path_for_processing, incremental=False, deflate=True)
-                                logging.info(f"Applied pre-OCR rotation {forced_rotation}° to {pdf_filename}")
-                            doc_pre.close()
-                    except Exception as pre_rot_err:
-                        logging.warning(f"Pre-OCR rotation normalization failed for {pdf_filename}: {pre_rot_err}")
-
-                    # Step 1: Insert document first with basic info (no OCR yet)
-                    # Use the existing processing batch (created earlier) and insert the single_document row
-                    os.makedirs(app_config.ARCHIVE_DIR, exist_ok=True)
-                    batch_image_dir = os.path.join(app_config.PROCESSED_DIR, str(batch_id))
-
-                    try:
-                        logging.info(f"Attempting INSERT single_documents for file={pdf_filename} batch={batch_id} path={pdf_path_for_processing}")
-                        cursor.execute("""
-                            INSERT INTO single_documents (
-                                batch_id, original_filename, original_pdf_path,
-                                page_count, file_size_bytes, status
-                            ) VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
-                            batch_id, pdf_filename, pdf_path_for_processing,
-                            analysis.page_count, int(analysis.file_size_mb * 1024 * 1024),
-                            "processing"
-                        ))
-                        doc_id = cursor.lastrowid
-                        conn.commit()  # Commit immediately to save progress
-                        logging.info(f"Inserted single_documents id={doc_id} for file={pdf_filename} (batch={batch_id})")
-                    except Exception as ins_err:
-                        # Log detailed error and continue processing other files
-                        logging.error(f"Failed to INSERT single_documents for {pdf_filename}: {ins_err}")
-                        import traceback
-                        logging.debug(traceback.format_exc())
-                        # Attempt to rollback to keep connection usable
-                        try:
-                            conn.rollback()
-                        except Exception:
-                            pass
-                        # skip to next document
-                        continue
-
-                    # Step 2: Create searchable PDF with OCR (with caching)
-                    searchable_pdf_path = os.path.join(searchable_dir, f"{base_name}_searchable.pdf")
-                    # After normalization, forced_rotation should be 0 for OCR creation to avoid re-rotating
-                    ocr_text, ocr_confidence, ocr_status = create_searchable_pdf(
-                        pdf_path_for_processing, searchable_pdf_path, doc_id, forced_rotation=0
-                    )
-
-                    if ocr_status != "success" and not ocr_status.startswith("success"):
-                        logging.error(f"Failed to create searchable PDF for {filename}: {ocr_status}")
-                        continue
-
-                    # Step 3: Get AI suggestions (with caching)
-                    ai_category, ai_filename, ai_confidence, ai_summary = _get_ai_suggestions_for_document(
-                        ocr_text, filename, analysis.page_count, analysis.file_size_mb, doc_id
-                    )
-
-                    # Step 4: Update document with AI analysis results
-                    cursor.execute("""
-                        UPDATE single_documents SET
-                            ai_suggested_category = ?, ai_suggested_filename = ?,
-                            ai_confidence = ?, ai_summary = ?, status = ?
-                        WHERE id = ?
-                    """, (ai_category, ai_filename, ai_confidence, ai_summary, "ready_for_manipulation", doc_id))
-                    conn.commit()  # Commit AI results immediately
-
-                    total_documents_processed += 1
-                    logging.info(f"✓ Processed {filename} - Category: {ai_category}, Name: {ai_filename}")
-
-                except Exception as e:
-                    logging.error(f"Error processing {analysis.file_path}: {e}")
-                    continue
+            # Convert, OCR and classify documents in overlapping stages (no progress consumer here)
+            total_documents_processed = _drain(_pipeline_documents_into_batch(single_docs, batch_id, conn, searchable_dir))
 
             conn.commit()
 
@@ -1494,6 +1379,7 @@ def _process_single_documents_as_batch(single_docs: List[DocumentAnalysis]) -> O
                 "UPDATE batches SET status = ? WHERE id = ?",
                 (app_config.STATUS_READY_FOR_MANIPULATION, batch_id)
             )
+            finish_batch_run(batch_id, conn=conn)
             conn.commit()
 
             logging.info(f"✓ Successfully created batch {batch_id} with {total_documents_processed} documents ready for manipulation")
@@ -1504,6 +1390,307 @@ def _process_single_documents_as_batch(single_docs: List[DocumentAnalysis]) -> O
         return None
 
 
+def _drain(generator) -> Any:
+    """Run a progress generator to completion, discarding its events; return its return value."""
+    while True:
+        try:
+            next(generator)
+        except StopIteration as done:
+            return done.value
+
+
+def _document_pipeline_stages(batch_id: int, searchable_dir: str) -> List[Stage]:
+    """normalize -> OCR -> AI stages for `_pipeline_documents_into_batch`.
+
+    Each stage opens its own DB connections (the OCR and AI caches already do);
+    the final AI-results write happens on the consumer's connection.
+    """
+    def normalize(item: Dict[str, Any], emit) -> Optional[Dict[str, Any]]:
+        check_cancelled()
+        analysis, filename, base_name = item['analysis'], item['filename'], item['base_name']
+        position = {'document_number': item['document_number'], 'total_documents': item['total_documents']}
+        emit({'document_start': True, 'filename': filename, **position})
+        logging.info(f"Processing {filename} with improved single document workflow...")
+
+        # Interrupted run: the PDF and its row already exist, continue with OCR
+        resumed = item.get('normalized')
+        if resumed and os.path.exists(resumed.get('pdf_path') or ''):
+            with database_connection() as conn:
+                row_exists = conn.execute("SELECT 1 FROM single_documents WHERE id = ?", (resumed.get('doc_id'),)).fetchone()
+            if row_exists:
+                emit({'message': f'Resuming {filename} from checkpoint', **position})
+                item.update(pdf_path=resumed['pdf_path'], pdf_filename=resumed['pdf_filename'], doc_id=resumed['doc_id'])
+                return item
+
+        # Handle image files - convert to PDF first
+        if is_image_file(analysis.file_path):
+            batch_wip_dir = os.path.join(app_config.WIP_DIR, str(batch_id))
+            original_pdfs_dir = os.path.join(batch_wip_dir, "original_pdfs")
+            os.makedirs(original_pdfs_dir, exist_ok=True)
+            normalized_pdf_candidate = getattr(analysis, 'pdf_path', None)
+            target_pdf_path = os.path.join(original_pdfs_dir, f"{base_name}.pdf")
+            if not os.path.exists(analysis.file_path) and os.path.exists(target_pdf_path):
+                # Converted and archived before an interruption
+                emit({'message': f'Reusing converted image {filename}', **position})
+            elif normalized_pdf_candidate and normalized_pdf_candidate.lower().endswith('.pdf') and os.path.exists(normalized_pdf_candidate):
+                emit({'message': f'Reusing normalized image {filename} as PDF...', **position})
+                try:
+                    if normalized_pdf_candidate != target_pdf_path:
+                        if os.path.exists(target_pdf_path) and _files_identical(normalized_pdf_candidate, target_pdf_path):
+                            logging.info(f"♻ Skipping copy (identical) normalized PDF for image {filename}")
+                        else:
+                            shutil.copy2(normalized_pdf_candidate, target_pdf_path)
+                    logging.info(f"♻ Reusing normalized PDF for image {filename} -> {target_pdf_path}")
+                except Exception as reuse_e:
+                    logging.warning(f"Reuse failed for {filename}: {reuse_e}; converting fresh")
+                    convert_image_to_pdf(analysis.file_path, target_pdf_path)
+            else:
+                emit({'message': f'Converting image {filename} to PDF...', **position})
+                convert_image_to_pdf(analysis.file_path, target_pdf_path)
+            # Archive original image safely
+            try:
+                archive_dir = os.path.join(app_config.ARCHIVE_DIR, f"batch_{batch_id}_images")
+                os.makedirs(archive_dir, exist_ok=True)
+                archived_image_path = os.path.join(archive_dir, filename)
+                if os.path.exists(analysis.file_path):
+                    safe_move(analysis.file_path, archived_image_path)
+            except Exception as arch_e:
+                logging.warning(f"Archiving original image failed for {filename}: {arch_e}")
+            pdf_path, pdf_filename = target_pdf_path, f"{base_name}.pdf"
+            emit({'message': f'✓ Image ready as PDF {pdf_filename}', **position})
+        else:
+            pdf_path, pdf_filename = analysis.file_path, filename
+
+        # Insert the document row first (no OCR yet) so later stages can cache against its id
+        try:
+            with database_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO single_documents (
+                        batch_id, original_filename, original_pdf_path,
+                        page_count, file_size_bytes, status
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    batch_id, pdf_filename, pdf_path,
+                    analysis.page_count, int(analysis.file_size_mb * 1024 * 1024),
+                    "processing"
+                ))
+                doc_id = cursor.lastrowid
+                record_checkpoint(batch_id, item['key'], 'normalized',
+                                  {'doc_id': doc_id, 'pdf_path': pdf_path, 'pdf_filename': pdf_filename}, conn=conn)
+                conn.commit()
+            logging.info(f"Inserted single_documents id={doc_id} for file={pdf_filename} (batch={batch_id})")
+        except Exception as ins_err:
+            logging.error(f"Failed to INSERT single_documents for {pdf_filename} into batch {batch_id}: {ins_err}")
+            emit({'error': f'Failed to create DB row for {pdf_filename}: {ins_err}', 'filename': pdf_filename, **position})
+            return None
+        item.update(pdf_path=pdf_path, pdf_filename=pdf_filename, doc_id=doc_id)
+        return item
+
+    def ocr(item: Dict[str, Any], emit) -> Optional[Dict[str, Any]]:
+        searchable_pdf_path = os.path.join(searchable_dir, f"{item['base_name']}_searchable.pdf")
+        forced_rotation = _lookup_forced_rotation(os.path.basename(item['pdf_filename']))
+        ocr_text, _ocr_confidence, ocr_status = create_searchable_pdf(
+            item['pdf_path'], searchable_pdf_path, item['doc_id'], forced_rotation=forced_rotation
+        )
+        check_cancelled()
+        if ocr_status != "success" and not ocr_status.startswith("success"):
+            logging.error(f"Failed to create searchable PDF for {item['filename']}: {ocr_status}")
+            emit({
+                'error': f"Failed to create searchable PDF: {ocr_status}",
+                'filename': item['filename'],
+                'document_number': item['document_number'],
+                'total_documents': item['total_documents']
+            })
+            return None
+        record_checkpoint(batch_id, item['key'], 'ocr', {'searchable_pdf': searchable_pdf_path})
+        item['ocr_text'] = ocr_text
+        return item
+
+    def ai(item: Dict[str, Any], emit) -> Dict[str, Any]:
+        analysis = item['analysis']
+        item['ai'] = _get_ai_suggestions_for_document(
+            item['ocr_text'], item['filename'], analysis.page_count, analysis.file_size_mb, item['doc_id']
+        )
+        # A cancelled LLM call comes back as the fallback suggestion; don't persist it
+        check_cancelled()
+        return item
+
+    queue_size = getattr(app_config, 'PIPELINE_QUEUE_SIZE', 2)
+    return [
+        Stage('normalize', normalize, queue_size=queue_size),
+        Stage('ocr', ocr, workers=pipeline_workers('ocr', getattr(app_config, 'PIPELINE_OCR_WORKERS', 1)),
+              queue_size=queue_size),
+        Stage('ai', ai, workers=pipeline_workers('llm', getattr(app_config, 'PIPELINE_AI_WORKERS', 1)),
+              queue_size=queue_size),
+    ]
+
+
+def _manifest_item(analysis: DocumentAnalysis) -> dict:
+    return {'file_path': analysis.file_path, 'file_size_mb': analysis.file_size_mb,
+            'page_count': analysis.page_count, 'pdf_path': analysis.pdf_path}
+
+
+def _analysis_from_manifest(item: dict, reason: str) -> DocumentAnalysis:
+    return DocumentAnalysis(
+        file_path=item['file_path'],
+        file_size_mb=item.get('file_size_mb') or 0.0,
+        page_count=item.get('page_count') or 0,
+        processing_strategy='single_document',
+        confidence=1.0,
+        reasoning=[reason],
+        pdf_path=item.get('pdf_path'),
+    )
+
+
+def _pipeline_documents_into_batch(docs: List[DocumentAnalysis], batch_id: int, conn: sqlite3.Connection,
+                                   searchable_dir: str, flow: str = 'single_documents'):
+    """Process `docs` into `batch_id` through the staged pipeline, yielding progress events.
+
+    Conversion, OCR and AI classification run as overlapping stages (see
+    `utils.pipeline`), so document N+1 is OCR'd while document N waits on the
+    LLM. Events keep the shape the serial loop produced ('document_start',
+    'message', 'error', 'document_complete'), but with several documents in
+    flight their events may interleave. Returns the number of completed
+    documents (use `yield from`).
+
+    Each document's stages are checkpointed (see `checkpoints`): running the
+    same documents into the same batch again after an interruption skips
+    documents already persisted and reuses converted PDFs / created rows.
+
+    When the current cancellation token is cancelled the stages stop at their
+    next check, documents not yet persisted are discarded
+    (`_discard_unfinished_documents`) and OperationCancelled is raised;
+    completed documents stay in the batch.
+    """
+    total = len(docs)
+    start_batch_run(batch_id, flow, [_manifest_item(a) for a in docs], conn=conn)
+    conn.commit()
+    done = get_checkpoints(batch_id, conn)
+    persisted = [a for a in docs if 'persisted' in done.get(a.file_path, {})]
+    if persisted:
+        logging.info(f"Batch {batch_id}: {len(persisted)} document(s) already processed before an interruption")
+        yield {'message': f'Skipping {len(persisted)} document(s) already processed'}
+    items = (
+        {
+            'analysis': analysis,
+            'key': analysis.file_path,
+            'normalized': done.get(analysis.file_path, {}).get('normalized'),
+            'filename': os.path.basename(analysis.file_path),
+            'base_name': os.path.splitext(os.path.basename(analysis.file_path))[0],
+            'document_number': i,
+            'total_documents': total,
+        }
+        for i, analysis in enumerate(docs, 1)
+        if 'persisted' not in done.get(analysis.file_path, {})
+    )
+    cursor = conn.cursor()
+    completed = len(persisted)
+    cancelled = False
+    pipeline = run_pipeline(items, _document_pipeline_stages(batch_id, searchable_dir))
+    try:
+        for kind, value in pipeline:
+            if not cancelled and (is_cancelled() or (kind == 'error' and isinstance(value[2], OperationCancelled))):
+                cancelled = True
+                logging.info(f"Batch {batch_id}: cancellation requested, waiting for in-flight documents to stop")
+            if cancelled:
+                continue  # drain: remaining items fail fast at their next stage check
+            if kind == 'event':
+                yield value
+                continue
+            if kind == 'error':
+                item, stage, e = value
+                item = item or {}
+                logging.error(f"Error processing {getattr(item.get('analysis'), 'file_path', '?')} ({stage}): {e}")
+                yield {
+                    'error': f"Error processing document: {e}",
+                    'filename': item.get('filename'),
+                    'document_number': item.get('document_number', 0),
+                    'total_documents': total
+                }
+                continue
+            item = value
+            try:
+                ai_category, ai_filename, ai_confidence, ai_summary = item['ai']
+                cursor.execute("""
+                    UPDATE single_documents SET
+                        ai_suggested_category = ?, ai_suggested_filename = ?,
+                        ai_confidence = ?, status = ?
+                    WHERE id = ?
+                """, (ai_category, ai_filename, ai_confidence, "ready_for_manipulation", item['doc_id']))
+                set_document_text('single_document', item['doc_id'], 'ai_summary', ai_summary, conn=conn)
+                record_checkpoint(batch_id, item['key'], 'persisted', conn=conn)
+                conn.commit()  # Commit AI results immediately
+            except Exception as e:
+                logging.error(f"Error saving AI results for {item['filename']}: {e}")
+                yield {'error': f"Error processing document: {e}", 'filename': item['filename'],
+                       'document_number': item['document_number'], 'total_documents': total}
+                continue
+            completed += 1
+            logging.info(f"✓ Processed {item['filename']} - Category: {ai_category}, Name: {ai_filename}")
+            yield {
+                'document_complete': True,
+                'filename': item['filename'],
+                'category': ai_category,
+                'ai_name': ai_filename,
+                'confidence': ai_confidence,
+                'document_number': item['document_number'],
+                'total_documents': total,
+                'documents_completed': completed
+            }
+    except GeneratorExit:
+        # The consumer stopped reading on cancellation: let in-flight documents
+        # stop at their next stage check, then undo them as below
+        if is_cancelled():
+            for _ in pipeline:
+                pass
+            _discard_unfinished_documents(batch_id, conn, searchable_dir)
+        raise
+    if cancelled:
+        _discard_unfinished_documents(batch_id, conn, searchable_dir)
+        raise OperationCancelled(f"processing of batch {batch_id} cancelled after {completed} document(s)")
+    return completed
+
+
+def _discard_unfinished_documents(batch_id: int, conn: sqlite3.Connection, searchable_dir: str) -> int:
+    """Undo the partial work of a cancelled pipeline run; returns the number of documents discarded.
+
+    Rows and searchable PDFs of documents that were not persisted are removed
+    and converted images go back to where they were picked up. The run's
+    checkpoints are cleared, so a cancelled batch is not resumed automatically.
+    """
+    discarded = 0
+    for key, stages in get_checkpoints(batch_id, conn).items():
+        if key == BATCH_KEY or 'persisted' in stages or not stages.get('normalized'):
+            continue
+        normalized = stages['normalized']
+        base_name = os.path.splitext(os.path.basename(key))[0]
+        try:
+            doc_id = normalized.get('doc_id')
+            conn.execute("DELETE FROM single_documents WHERE id = ?", (doc_id,))
+            if doc_id is not None:
+                delete_document_text('single_document', [doc_id], conn=conn)
+            searchable_pdf = os.path.join(searchable_dir, f"{base_name}_searchable.pdf")
+            if os.path.exists(searchable_pdf):
+                os.remove(searchable_pdf)
+            pdf_path = normalized.get('pdf_path')
+            archived_image = os.path.join(app_config.ARCHIVE_DIR, f"batch_{batch_id}_images", os.path.basename(key))
+            if is_image_file(key) and pdf_path and pdf_path != key:
+                if not os.path.exists(key) and os.path.exists(archived_image):
+                    safe_move(archived_image, key)
+                if os.path.exists(pdf_path):
+                    os.remove(pdf_path)
+            discarded += 1
+        except Exception as e:
+            logging.warning(f"Batch {batch_id}: could not discard unfinished document {key}: {e}")
+    if conn.execute("SELECT 1 FROM single_documents WHERE batch_id = ? LIMIT 1", (batch_id,)).fetchone():
+        conn.execute("UPDATE batches SET status = ? WHERE id = ?", (app_config.STATUS_READY_FOR_MANIPULATION, batch_id))
+    finish_batch_run(batch_id, conn=conn)
+    conn.commit()
+    logging.info(f"Batch {batch_id}: discarded {discarded} unfinished document(s) after cancellation")
+    return discarded
+
+
 def _process_single_documents_as_batch_with_progress(single_docs: List[DocumentAnalysis]):
     """
     Process multiple single documents using the improved workflow with progress tracking.
@@ -1536,151 +1723,8 @@ def _process_single_documents_as_batch_with_progress(single_docs: List[DocumentA
             searchable_dir = os.path.join(batch_dir, "searchable_pdfs")
             os.makedirs(searchable_dir, exist_ok=True)
 
-            # Process each single document with improved workflow
-            total_documents_processed = 0
-            for i, analysis in enumerate(single_docs, 1):
-                filename = os.path.basename(analysis.file_path)
-                base_name = os.path.splitext(filename)[0]
-
-                try:
-                    # Signal document processing start
-                    yield {
-                        'document_start': True,
-                        'filename': filename,
-                        'document_number': i,
-                        'total_documents': len(single_docs)
-                    }
-
-                    logging.info(f"Processing {filename} with improved single document workflow...")
-
-                    # Handle image files - convert to PDF first
-                    if is_image_file(analysis.file_path):
-                        batch_wip_dir = os.path.join(app_config.WIP_DIR, str(batch_id))
-                        original_pdfs_dir = os.path.join(batch_wip_dir, "original_pdfs")
-                        os.makedirs(original_pdfs_dir, exist_ok=True)
-                        normalized_pdf_candidate = getattr(analysis, 'pdf_path', None)
-                        target_pdf_path = os.path.join(original_pdfs_dir, f"{base_name}.pdf")
-                        action_msg = 'Reusing normalized' if (normalized_pdf_candidate and os.path.exists(normalized_pdf_candidate)) else 'Converting'
-                        yield {'message': f'{action_msg} image {filename} to PDF...', 'document_number': i, 'total_documents': len(single_docs)}
-                        if normalized_pdf_candidate and normalized_pdf_candidate.lower().endswith('.pdf') and os.path.exists(normalized_pdf_candidate):
-                            try:
-                                if normalized_pdf_candidate != target_pdf_path:
-                                    if os.path.exists(target_pdf_path) and _files_identical(normalized_pdf_candidate, target_pdf_path):
-                                        logging.info(f"♻ Skipping copy (identical) normalized PDF for image {filename}")
-                                    else:
-                                        import shutil
-                                        shutil.copy2(normalized_pdf_candidate, target_pdf_path)
-                                logging.info(f"♻ Reusing normalized PDF for image {filename} -> {target_pdf_path}")
-                            except Exception as reuse_e:
-                                logging.warning(f"Reuse failed for {filename}: {reuse_e}; converting fresh")
-                                convert_image_to_pdf(analysis.file_path, target_pdf_path)
-                        else:
-                            convert_image_to_pdf(analysis.file_path, target_pdf_path)
-                        # Archive original image safely
-                        try:
-                            archive_dir = os.path.join(app_config.ARCHIVE_DIR, f"batch_{batch_id}_images")
-                            os.makedirs(archive_dir, exist_ok=True)
-                            archived_image_path = os.path.join(archive_dir, filename)
-                            if os.path.exists(analysis.file_path):
-                                safe_move(analysis.file_path, archived_image_path)
-                        except Exception as arch_e:
-                            logging.warning(f"Archiving original image failed for {filename}: {arch_e}")
-                        pdf_path_for_processing = target_pdf_path
-                        pdf_filename = f"{base_name}.pdf"
-                        yield {'message': f'✓ Image ready as PDF {pdf_filename}', 'document_number': i, 'total_documents': len(single_docs)}
-                    else:
-                        pdf_path_for_processing = analysis.file_path
-                        pdf_filename = filename
-
-                    # Step 1: Insert document first with basic info (no OCR yet)
-                    try:
-                        logging.info(f"Attempting INSERT single_documents (fixed batch) for file={pdf_filename} batch={batch_id} path={pdf_path_for_processing}")
-                        cursor.execute("""
-                            INSERT INTO single_documents (
-                                batch_id, original_filename, original_pdf_path,
-                                page_count, file_size_bytes, status
-                            ) VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
-                            batch_id, pdf_filename, pdf_path_for_processing,
-                            analysis.page_count, int(analysis.file_size_mb * 1024 * 1024),
-                            "processing"
-                        ))
-                        doc_id = cursor.lastrowid
-                        conn.commit()  # Commit immediately to save progress
-                        logging.info(f"Inserted single_documents id={doc_id} for file={pdf_filename} (batch={batch_id})")
-                    except Exception as ins_err:
-                        logging.error(f"Failed to INSERT single_documents for {pdf_filename}: {ins_err}")
-                        import traceback
-                        logging.debug(traceback.format_exc())
-                        try:
-                            conn.rollback()
-                        except Exception:
-                            pass
-                        yield {
-                            'error': f'Failed to create DB row for {pdf_filename}: {ins_err}',
-                            'filename': pdf_filename,
-                            'document_number': i,
-                            'total_documents': len(single_docs)
-                        }
-                        continue
-
-                    # Step 2: Create searchable PDF with OCR (with caching)
-                    searchable_pdf_path = os.path.join(searchable_dir, f"{base_name}_searchable.pdf")
-                    forced_rotation = _lookup_forced_rotation(os.path.basename(pdf_filename))
-                    ocr_text, ocr_confidence, ocr_status = create_searchable_pdf(
-                        pdf_path_for_processing, searchable_pdf_path, doc_id, forced_rotation=forced_rotation
-                    )
-
-                    if ocr_status != "success" and not ocr_status.startswith("success"):
-                        error_msg = f"Failed to create searchable PDF: {ocr_status}"
-                        logging.error(f"Failed to create searchable PDF for {filename}: {ocr_status}")
-                        yield {
-                            'error': error_msg,
-                            'filename': filename,
-                            'document_number': i,
-                            'total_documents': len(single_docs)
-                        }
-                        continue
-
-                    # Step 3: Get AI suggestions (with caching)
-                    ai_category, ai_filename, ai_confidence, ai_summary = _get_ai_suggestions_for_document(
-                        ocr_text, filename, analysis.page_count, analysis.file_size_mb, doc_id
-                    )
-
-                    # Step 4: Update document with AI analysis results
-                    cursor.execute("""
-                        UPDATE single_documents SET
-                            ai_suggested_category = ?, ai_suggested_filename = ?,
-                            ai_confidence = ?, ai_summary = ?, status = ?
-                        WHERE id = ?
-                    """, (ai_category, ai_filename, ai_confidence, ai_summary, "ready_for_manipulation", doc_id))
-                    conn.commit()  # Commit AI results immediately
-
-                    total_documents_processed += 1
-                    logging.info(f"✓ Processed {filename} - Category: {ai_category}, Name: {ai_filename}")
-
-                    # Signal document completion
-                    yield {
-                        'document_complete': True,
-                        'filename': filename,
-                        'category': ai_category,
-                        'ai_name': ai_filename,
-                        'confidence': ai_confidence,
-                        'document_number': i,
-                        'total_documents': len(single_docs),
-                        'documents_completed': total_documents_processed
-                    }
-
-                except Exception as e:
-                    error_msg = f"Error processing document: {str(e)}"
-                    logging.error(f"Error processing {analysis.file_path}: {e}")
-                    yield {
-                        'error': error_msg,
-                        'filename': filename,
-                        'document_number': i,
-                        'total_documents': len(single_docs)
-                    }
-                    continue
+            # Convert, OCR and classify documents in overlapping stages
+            total_documents_processed = yield from _pipeline_documents_into_batch(single_docs, batch_id, conn, searchable_dir)
 
             conn.commit()
 
@@ -1704,10 +1748,14 @@ def _process_single_documents_as_batch_with_progress(single_docs: List[DocumentA
                 "UPDATE batches SET status = ? WHERE id = ?",
                 (app_config.STATUS_READY_FOR_MANIPULATION, batch_id)
             )
+            finish_batch_run(batch_id, conn=conn)
             conn.commit()
 
             logging.info(f"✓ Successfully created batch {batch_id} with {total_documents_processed} documents ready for manipulation")
 
+    except OperationCancelled as e:
+        logging.info(f"Single documents processing cancelled: {e}")
+        yield {'cancelled': True, 'message': 'Processing cancelled', 'complete': True}
     except Exception as e:
         logging.error(f"Error creating single documents batch: {e}")
         yield {
@@ -1735,106 +1783,7 @@ def _process_docs_into_fixed_batch_with_progress(docs: List[DocumentAnalysis], b
             batch_dir = os.path.join(app_config.PROCESSED_DIR, str(batch_id))
             searchable_dir = os.path.join(batch_dir, "searchable_pdfs")
             os.makedirs(searchable_dir, exist_ok=True)
-            total_documents_processed = 0
-            for i, analysis in enumerate(docs, 1):
-                filename = os.path.basename(analysis.file_path)
-                base_name = os.path.splitext(filename)[0]
-                try:
-                    yield {'document_start': True, 'filename': filename, 'document_number': i, 'total_documents': len(docs)}
-                    if is_image_file(analysis.file_path):
-                        batch_wip_dir = os.path.join(app_config.WIP_DIR, str(batch_id))
-                        original_pdfs_dir = os.path.join(batch_wip_dir, "original_pdfs")
-                        os.makedirs(original_pdfs_dir, exist_ok=True)
-                        normalized_pdf_candidate = getattr(analysis, 'pdf_path', None)
-                        target_pdf_path = os.path.join(original_pdfs_dir, f"{base_name}.pdf")
-                        if normalized_pdf_candidate and normalized_pdf_candidate.lower().endswith('.pdf') and os.path.exists(normalized_pdf_candidate):
-                            yield {'message': f'Reusing normalized image PDF {filename}...', 'document_number': i, 'total_documents': len(docs)}
-                            try:
-                                if normalized_pdf_candidate != target_pdf_path:
-                                    if os.path.exists(target_pdf_path) and _files_identical(normalized_pdf_candidate, target_pdf_path):
-                                        logging.info(f"♻ Skipping copy (identical) normalized PDF for image {filename}")
-                                    else:
-                                        import shutil
-                                        shutil.copy2(normalized_pdf_candidate, target_pdf_path)
-                                logging.info(f"♻ Reused normalized PDF for image {filename}")
-                            except Exception as reuse_e:
-                                logging.warning(f"Reuse failed for {filename}: {reuse_e}; converting freshly")
-                                convert_image_to_pdf(analysis.file_path, target_pdf_path)
-                        else:
-                            yield {'message': f'Converting image {filename} to PDF...', 'document_number': i, 'total_documents': len(docs)}
-                            convert_image_to_pdf(analysis.file_path, target_pdf_path)
-                        # Archive original image once
-                        try:
-                            archive_dir = os.path.join(app_config.ARCHIVE_DIR, f"batch_{batch_id}_images")
-                            os.makedirs(archive_dir, exist_ok=True)
-                            archived_image_path = os.path.join(archive_dir, filename)
-                            if os.path.exists(analysis.file_path):
-                                safe_move(analysis.file_path, archived_image_path)
-                        except Exception as arch_e:
-                            logging.warning(f"Archiving original image failed for {filename}: {arch_e}")
-                        pdf_path_for_processing = target_pdf_path
-                        pdf_filename = f"{base_name}.pdf"
-                        yield {'message': f'✓ Image ready as PDF {pdf_filename}', 'document_number': i, 'total_documents': len(docs)}
-                    else:
-                        pdf_path_for_processing = analysis.file_path
-                        pdf_filename = filename
-                    try:
-                        cursor.execute("""
-                            INSERT INTO single_documents (
-                                batch_id, original_filename, original_pdf_path,
-                                page_count, file_size_bytes, status
-                            ) VALUES (?, ?, ?, ?, ?, ?)
-                        """, (
-                            batch_id, pdf_filename, pdf_path_for_processing,
-                            analysis.page_count, int(analysis.file_size_mb * 1024 * 1024),
-                            "processing"
-                        ))
-                        doc_id = cursor.lastrowid
-                        conn.commit()
-                        logging.info(f"Inserted single_documents id={doc_id} for file={pdf_filename} (fixed batch={batch_id})")
-                    except Exception as ins_err:
-                        logging.error(f"Failed to INSERT single_documents for {pdf_filename} into fixed batch {batch_id}: {ins_err}")
-                        import traceback
-                        logging.debug(traceback.format_exc())
-                        try:
-                            conn.rollback()
-                        except Exception:
-                            pass
-                        yield {'error': f'Failed to create DB row for {pdf_filename}: {ins_err}', 'filename': filename, 'document_number': i, 'total_documents': len(docs)}
-                        continue
-                    searchable_pdf_path = os.path.join(searchable_dir, f"{base_name}_searchable.pdf")
-                    forced_rotation = _lookup_forced_rotation(os.path.basename(pdf_filename))
-                    ocr_text, ocr_confidence, ocr_status = create_searchable_pdf(
-                        pdf_path_for_processing, searchable_pdf_path, doc_id, forced_rotation=forced_rotation
-                    )
-                    if ocr_status != "success" and not ocr_status.startswith("success"):
-                        yield {'error': f'Failed to create searchable PDF: {ocr_status}', 'filename': filename, 'document_number': i, 'total_documents': len(docs)}
-                        continue
-                    ai_category, ai_filename, ai_confidence, ai_summary = _get_ai_suggestions_for_document(
-                        ocr_text, filename, analysis.page_count, analysis.file_size_mb, doc_id
-                    )
-                    cursor.execute("""
-                        UPDATE single_documents SET
-                            ai_suggested_category = ?, ai_suggested_filename = ?,
-                            ai_confidence = ?, ai_summary = ?, status = ?
-                        WHERE id = ?
-                    """, (ai_category, ai_filename, ai_confidence, ai_summary, "ready_for_manipulation", doc_id))
-                    conn.commit()
-                    total_documents_processed += 1
-                    yield {
-                        'document_complete': True,
-                        'filename': filename,
-                        'category': ai_category,
-                        'ai_name': ai_filename,
-                        'confidence': ai_confidence,
-                        'document_number': i,
-                        'total_documents': len(docs),
-                        'documents_completed': total_documents_processed
-                    }
-                except Exception as e:
-                    logging.error(f"Error processing {analysis.file_path}: {e}")
-                    yield {'error': f'Error processing document: {e}', 'filename': filename, 'document_number': i, 'total_documents': len(docs)}
-                    continue
+            total_documents_processed = yield from _pipeline_documents_into_batch(docs, batch_id, conn, searchable_dir)
             conn.commit()
             safe_log_interaction(
                 batch_id=batch_id,
@@ -1850,8 +1799,12 @@ def _process_docs_into_fixed_batch_with_progress(docs: List[DocumentAnalysis], b
                 notes=f"Fixed batch workflow - {total_documents_processed} documents ready"
             )
             cursor.execute("UPDATE batches SET status = ? WHERE id = ?", (app_config.STATUS_READY_FOR_MANIPULATION, batch_id))
+            finish_batch_run(batch_id, conn=conn)
             conn.commit()
             logging.info(f"✓ Fixed batch {batch_id} processed {total_documents_processed} documents")
+    except OperationCancelled as e:
+        logging.info(f"Fixed batch {batch_id} processing cancelled: {e}")
+        yield {'cancelled': True, 'message': 'Processing cancelled', 'complete': True}
     except Exception as e:
         logging.error(f"Error in fixed batch processing: {e}")
         yield {'error': f'Fixed batch processing failed: {e}', 'filename': None, 'document_number': 0, 'total_documents': len(docs)}
@@ -1978,7 +1931,7 @@ def _detect_best_rotation(image_path: str) -> tuple[int, float, str]:
         best_text = ""
         results = {}
 
-        with Image.open(image_path) as img:
+        with Image.open(image_path) as img, ocr_gate.slot():
             reader = EasyOCRSingleton.get_reader()
 
             for rotation in rotations_to_test:
@@ -2070,8 +2023,9 @@ def _get_ai_suggestions_for_document(ocr_text: str, filename: str, page_count: i
         if document_id:
             with database_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT ai_suggested_category, ai_suggested_filename, ai_confidence, ai_summary
+                cursor.execute(f"""
+                    SELECT ai_suggested_category, ai_suggested_filename, ai_confidence,
+                           {document_text_sql('single_document', 'ai_summary')}
                     FROM single_documents
                     WHERE id = ? AND ai_suggested_category IS NOT NULL
                 """, (document_id,))
@@ -2085,11 +2039,8 @@ def _get_ai_suggestions_for_document(ocr_text: str, filename: str, page_count: i
         # No cache found, proceed with LLM analysis
         logging.info(f"🤖 Generating new AI analysis for document: {filename}")
 
-        # Get available categories from database
-        with database_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM categories ORDER BY name")
-            categories = [row[0] for row in cursor.fetchall()]
+        # Get available categories from database (memoized in the DAL)
+        categories = get_all_categories()
 
         if not categories:
             categories = ["Uncategorized"]
@@ -2173,9 +2124,10 @@ Respond in this exact JSON format:
                                 cursor.execute("""
                                     UPDATE single_documents SET
                                         ai_suggested_category = ?, ai_suggested_filename = ?,
-                                        ai_confidence = ?, ai_summary = ?
+                                        ai_confidence = ?
                                     WHERE id = ?
-                                """, (result[0], result[1], result[2], result[3], document_id))
+                                """, (result[0], result[1], result[2], document_id))
+                                set_document_text('single_document', document_id, 'ai_summary', result[3], conn=conn)
                                 conn.commit()
                                 logging.info(f"💾 Cached AI analysis for document {document_id}")
                         except Exception as cache_error:
@@ -2208,7 +2160,7 @@ Respond in this exact JSON format:
 
 
 
-def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
+def _process_batch_traditional(pdf_files_paths: List[str], into_batch_id: Optional[int] = None) -> bool:
     """
     Traditional batch processing workflow for files identified as batch scans.
 
@@ -2217,6 +2169,9 @@ def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
 
     Args:
         pdf_files_paths: List of absolute paths to PDF files to process as batch scan
+        into_batch_id: Process into this existing batch instead of creating one.
+            If it has an interrupted run, pages and files already checkpointed
+            are skipped
 
     Returns:
         bool: True if batch processing was successful, False otherwise
@@ -2250,46 +2205,64 @@ def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
     try:
         with database_connection() as conn:
             cursor = conn.cursor()
-            # Create a new batch record for batch scan processing
-            # Create a new batch for this traditional batch scan using helper
-            from .batch_guard import create_new_batch
-            batch_id = create_new_batch(app_config.STATUS_PENDING_VERIFICATION)
-            logging.info(f"Created new batch scan batch with ID: {batch_id}")
+            if into_batch_id is not None:
+                batch_id = into_batch_id
+                logging.info(f"Processing batch scan files into batch {batch_id}")
+            else:
+                # Create a new batch for this traditional batch scan using helper
+                from .batch_guard import create_new_batch
+                batch_id = create_new_batch(app_config.STATUS_PENDING_VERIFICATION)
+                logging.info(f"Created new batch scan batch with ID: {batch_id}")
 
-            log_interaction(
-                batch_id=batch_id,
-                document_id=None,
-                user_id=get_current_user_id(),
-                event_type="status_change",
-                step="pending_verification",
-                content=f"Batch scan batch {batch_id} created.",
-                notes=None
-            )
+                log_interaction(
+                    batch_id=batch_id,
+                    document_id=None,
+                    user_id=get_current_user_id(),
+                    event_type="status_change",
+                    step="pending_verification",
+                    content=f"Batch scan batch {batch_id} created.",
+                    notes=None
+                )
+            start_batch_run(batch_id, 'traditional', [{'file_path': p} for p in pdf_files_paths], conn=conn)
+            conn.commit()
+            done = get_checkpoints(batch_id, conn)
 
-            os.makedirs(app_config.ARCHIVE_DIR, exist_ok=True)
+            # Per-batch, like converted images: same-named scans of other batches must not overwrite these
+            archive_dir = os.path.join(app_config.ARCHIVE_DIR, f"batch_{batch_id}_scans")
+            os.makedirs(archive_dir, exist_ok=True)
             batch_image_dir = os.path.join(app_config.PROCESSED_DIR, str(batch_id))
             os.makedirs(batch_image_dir, exist_ok=True)
 
             # Process only the specified PDF files (batch scan strategy)
             for file_path in pdf_files_paths:
                 filename = os.path.basename(file_path)
-                logging.info(f"Processing batch scan file: {filename}")
-                sanitized_filename = sanitize_filename(filename)
-
-                # Convert PDF to individual page images (traditional workflow)
-                images = convert_from_path(
-                    file_path,
-                    dpi=300,
-                    output_folder=batch_image_dir,
-                    fmt="png",
-                    output_file=f"{sanitized_filename}_page",
-                    thread_count=4,
-                )
-                image_files = sorted([img.filename for img in images])
+                archive_path = os.path.join(archive_dir, filename)
+                file_done = done.get(file_path, {})
+                if 'archived' in file_done or (file_done and not os.path.exists(file_path) and os.path.exists(archive_path)):
+                    logging.info(f"Skipping {filename}: already processed and archived")
+                    continue
+                if 'ocr' in file_done:
+                    logging.info(f"Pages of {filename} already processed; archiving")
+                else:
+                    logging.info(f"Processing batch scan file: {filename}")
+                    sanitized_filename = sanitize_filename(filename)
+
+                    # Convert PDF to individual page images (traditional workflow)
+                    images = convert_from_path(
+                        file_path,
+                        dpi=300,
+                        output_folder=batch_image_dir,
+                        fmt="png",
+                        output_file=f"{sanitized_filename}_page",
+                        thread_count=4,
+                    )
+                    image_files = sorted([img.filename for img in images])
 
-                # Process each page individually with OCR
-                for i, image_path in enumerate(image_files):
-                    if batch_id is not None:
+                    # Process each page individually with OCR
+                    for i, image_path in enumerate(image_files):
+                        key = page_key(file_path, i + 1)
+                        if 'ocr' in done.get(key, {}):
+                            continue  # Page row was committed before an interruption
                         _process_single_page_from_file(
                             cursor=cursor,
                             image_path=str(image_path),
@@ -2297,14 +2270,18 @@ def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
                             source_filename=filename,
                             page_num=i + 1
                         )
+                        record_checkpoint(batch_id, key, 'ocr', conn=conn)
+                        conn.commit()  # Page row and checkpoint together: a resume skips exactly these
 
-                conn.commit()  # Commit after each PDF is fully processed
-                logging.info(f"✓ Processed {len(images)} pages from {filename}")
+                    record_checkpoint(batch_id, file_path, 'ocr', {'pages': len(images)}, conn=conn)
+                    conn.commit()  # Commit after each PDF is fully processed
+                    logging.info(f"✓ Processed {len(images)} pages from {filename}")
 
                 # Archive the original file - ONLY after successful processing
                 try:
-                    archive_path = os.path.join(app_config.ARCHIVE_DIR, filename)
                     safe_move(file_path, archive_path)
+                    record_checkpoint(batch_id, file_path, 'archived', conn=conn)
+                    conn.commit()
                     logging.info(f"✓ Archived original to {archive_path}")
                 except OSError as move_e:
                     logging.error(f"✗ CRITICAL: Failed to archive {filename}: {move_e}")
@@ -2313,8 +2290,10 @@ def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
 
             # AI Classification for all pages in the batch
             logging.info("--- AI Classification for Batch Scan Pages ---")
+            # Pages classified before an interruption keep their category
             cursor.execute(
-                "SELECT id, ocr_text FROM pages WHERE batch_id = ?", (batch_id,)
+                f"SELECT id, {document_text_sql('page', 'ocr_text')} AS ocr_text FROM pages "
+                "WHERE batch_id = ? AND ai_suggested_category IS NULL", (batch_id,)
             )
             pages_to_classify = cursor.fetchall()
 
@@ -2333,7 +2312,9 @@ def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
                     content=f"AI classified page {page['id']} as '{ai_category}'",
                     notes=None
                 )
+                conn.commit()
 
+            finish_batch_run(batch_id, conn=conn)
             conn.commit()
             logging.info(f"✓ Traditional batch processing complete for batch {batch_id}")
             return True
@@ -2353,6 +2334,178 @@ def _process_batch_traditional(pdf_files_paths: List[str]) -> bool:
         return False
 
 
+def resume_batch(batch_id: int) -> bool:
+    """Continue an interrupted processing run from its checkpoints.
+
+    Dispatches on the flow recorded in the run manifest; work that was already
+    checkpointed (converted PDFs, created rows, OCR'd pages, archived files)
+    is not redone. Returns True when the run completed.
+    """
+    manifest = get_checkpoints(batch_id).get(BATCH_KEY, {}).get('started')
+    if not manifest:
+        logging.info(f"Batch {batch_id} has no unfinished run to resume")
+        return False
+    items = manifest.get('items') or []
+    flow = manifest.get('flow')
+    logging.info(f"Resuming batch {batch_id} ({flow}, {len(items)} file(s))")
+    if flow == 'traditional':
+        return _process_batch_traditional([item['file_path'] for item in items], into_batch_id=batch_id)
+    if flow == DOCUMENT_JOBS_FLOW:
+        # Per-document jobs: queue the unfinished ones again (active jobs are not duplicated)
+        done = get_checkpoints(batch_id)
+        _enqueue_document_jobs(batch_id, [i['file_path'] for i in items if not _document_job_done(done.get(i['file_path'], {}))])
+        _finish_document_jobs_run(batch_id)
+        return True
+    if flow == 'single_documents':
+        docs = [_analysis_from_manifest(item, 'resumed from checkpoint') for item in items]
+        for event in _process_docs_into_fixed_batch_with_progress(docs, batch_id):
+            if event.get('error') and not event.get('filename'):
+                logging.error(f"Resume of batch {batch_id} failed: {event['error']}")
+                return False
+        return True
+    logging.error(f"Batch {batch_id}: unknown processing flow '{flow}' in checkpoint")
+    return False
+
+
+def batch_jobs_in_flight(batch_id: int) -> List[dict]:
+    """Queued or running jobs, other than resumes, working on `batch_id`.
+
+    A `batch.*` job whose process died is reclaimed when its lease expires and
+    runs the batch again itself, so a resume must not be scheduled alongside it.
+    """
+    return find_active_jobs('batch_id', batch_id, exclude_types=('processing.resume_batch',))
+
+
+def _resume_batch_job(job) -> None:
+    """Job handler: resume a batch unless it finished or became active meanwhile."""
+    batch_id = int(job.payload['batch_id'])
+    if not any(run['batch_id'] == batch_id for run in list_resumable_batches()):
+        logging.info(f"Batch {batch_id} no longer needs resuming")
+        return
+    held = batch_jobs_in_flight(batch_id)
+    if held:
+        logging.info(f"Batch {batch_id} is held by job {held[0]['id']} ({held[0]['job_type']}); not resuming")
+        return
+    if not resume_batch(batch_id):
+        raise RuntimeError(f"Resuming batch {batch_id} did not complete")
+
+
+register_job_handler('processing.resume_batch', _resume_batch_job)
+
+
+DOCUMENT_JOBS_FLOW = 'document_jobs'
+
+
+def enqueue_batch_documents(docs: List[DocumentAnalysis], batch_id: int) -> List[int]:
+    """Queue one `processing.document` job per document instead of processing the batch in-line.
+
+    Any number of worker processes (`python -m doc_processor.worker`) then
+    convert, OCR and classify the documents of the batch in parallel; the job
+    that persists the last one marks the batch ready for manipulation. The
+    run manifest is recorded first, so the run is resumable like the others.
+    Returns the job ids.
+    """
+    start_batch_run(batch_id, DOCUMENT_JOBS_FLOW, [_manifest_item(a) for a in docs])
+    return _enqueue_document_jobs(batch_id, [a.file_path for a in docs])
+
+
+def _enqueue_document_jobs(batch_id: int, file_paths: List[str]) -> List[int]:
+    return [
+        enqueue_job('processing.document', {'batch_id': batch_id, 'file_path': path},
+                    idempotency_key=f'processing.document:{batch_id}:{path}')
+        for path in file_paths
+    ]
+
+
+def _document_job_done(stages: dict) -> bool:
+    # 'failed' is recorded when a document's job runs out of attempts
+    return 'persisted' in stages or 'failed' in stages
+
+
+def _finish_document_jobs_run(batch_id: int) -> bool:
+    """Mark a per-document run's batch ready once all its documents are done.
+
+    Called by every document job; only the one that sees the run complete
+    (under a write lock, so two processes cannot both) finishes it. Documents
+    whose job failed for good do not hold the batch back, as in the in-line
+    flow.
+    """
+    with database_connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        done = get_checkpoints(batch_id, conn)
+        manifest = done.get(BATCH_KEY, {}).get('started') or {}
+        items = manifest.get('items') or []
+        if manifest.get('flow') != DOCUMENT_JOBS_FLOW or not all(_document_job_done(done.get(i['file_path'], {})) for i in items):
+            conn.rollback()
+            return False
+        conn.execute("UPDATE batches SET status = ? WHERE id = ?", (app_config.STATUS_READY_FOR_MANIPULATION, batch_id))
+        finish_batch_run(batch_id, conn=conn)
+        conn.commit()
+    logging.info(f"✓ Batch {batch_id}: all {len(items)} document job(s) done, ready for manipulation")
+    return True
+
+
+def _process_document_job(job) -> dict:
+    """Job handler: one document of a batch queued by `enqueue_batch_documents`."""
+    batch_id, file_path = int(job.payload['batch_id']), job.payload['file_path']
+    done = get_checkpoints(batch_id)
+    manifest = done.get(BATCH_KEY, {}).get('started') or {}
+    item = next((i for i in manifest.get('items') or [] if i['file_path'] == file_path), None)
+    if item is None or _document_job_done(done.get(file_path, {})):
+        logging.info(f"Batch {batch_id}: {os.path.basename(file_path)} already processed")
+        _finish_document_jobs_run(batch_id)
+        return {'batch_id': batch_id, 'skipped': True}
+    searchable_dir = os.path.join(app_config.PROCESSED_DIR, str(batch_id), "searchable_pdfs")
+    os.makedirs(searchable_dir, exist_ok=True)
+    errors = []
+    with database_connection() as conn:
+        docs = [_analysis_from_manifest(item, 'document job')]
+        for event in _pipeline_documents_into_batch(docs, batch_id, conn, searchable_dir, flow=DOCUMENT_JOBS_FLOW):
+            if event.get('error'):
+                errors.append(event['error'])
+    if errors:
+        if job.attempts >= job.max_attempts:
+            record_checkpoint(batch_id, file_path, 'failed', {'error': errors[-1]})
+            _finish_document_jobs_run(batch_id)
+        # Otherwise retried by the queue; checkpoints let the retry continue where this one stopped
+        raise RuntimeError('; '.join(errors))
+    _finish_document_jobs_run(batch_id)
+    return {'batch_id': batch_id, 'file_path': file_path}
+
+
+register_job_handler('processing.document', _process_document_job, concurrency=os.cpu_count() or 4)
+
+
+def enqueue_batch_resume(batch_id: int, delay_seconds: float = 0) -> int:
+    """Queue a resume job for a batch (one per batch while queued)."""
+    return enqueue_job('processing.resume_batch', {'batch_id': batch_id},
+                       idempotency_key=f'processing.resume_batch:{batch_id}', delay_seconds=delay_seconds)
+
+
+def schedule_interrupted_batch_resumes() -> List[int]:
+    """At startup: queue resume jobs for runs left unfinished by a previous process.
+
+    Runs that were active only moments ago are delayed until they have been
+    quiet for BATCH_RESUME_STALE_SECONDS (another live process may own them);
+    batches a queued or running job still holds are left to that job, and
+    failed batches are left for a manual resume.
+    """
+    stale = float(app_config.BATCH_RESUME_STALE_SECONDS)
+    scheduled = []
+    for run in list_resumable_batches(stale_seconds=0):
+        if run['status'] == app_config.STATUS_FAILED:
+            continue
+        held = batch_jobs_in_flight(run['batch_id'])
+        if held:
+            logging.info(f"Not resuming batch {run['batch_id']}: job {held[0]['id']} ({held[0]['job_type']}) holds it")
+            continue
+        enqueue_batch_resume(run['batch_id'], delay_seconds=max(0.0, stale - run['idle_seconds']))
+        scheduled.append(run['batch_id'])
+    if scheduled:
+        logging.info(f"Scheduled resume of interrupted batches: {scheduled}")
+    return scheduled
+
+
 def rerun_ocr_on_page(page_id: int, rotation_angle: int) -> bool:
     """
     Re-runs the OCR process on a single page, applying a specified rotation.
@@ -2396,7 +2549,7 @@ def rerun_ocr_on_page(page_id: int, rotation_angle: int) -> bool:
 
             new_ocr_text = ""
             try:
-                with Image.open(image_path) as img:
+                with Image.open(image_path) as img, ocr_gate.slot():
                     # Rotate only in-memory for OCR extraction; preserve original stored orientation
                     working_image = img.rotate(-rotation_angle, expand=True) if rotation_angle else img
                     logging.info(f"  - Applied in-memory rotation (not saved) for OCR: {rotation_angle} degrees")
@@ -2408,9 +2561,10 @@ def rerun_ocr_on_page(page_id: int, rotation_angle: int) -> bool:
                 return False
 
             cursor.execute(
-                "UPDATE pages SET ocr_text = ?, rotation_angle = ? WHERE id = ?",
-                (new_ocr_text, rotation_angle, page_id),
+                "UPDATE pages SET rotation_angle = ? WHERE id = ?",
+                (rotation_angle, page_id),
             )
+            set_document_text('page', page_id, 'ocr_text', new_ocr_text, conn=conn)
             conn.commit()
             # Log human correction event
             log_interaction(
@@ -2766,9 +2920,13 @@ def verify_no_file_loss() -> dict:
             intake_pdfs = [f for f in os.listdir(app_config.INTAKE_DIR) if f.lower().endswith('.pdf')]
             report["intake_files"] = intake_pdfs
 
-        # Check archive directory
+        # Check archive directory (recursively: batch scans are archived per batch)
         if os.path.exists(app_config.ARCHIVE_DIR):
-            archive_pdfs = [f for f in os.listdir(app_config.ARCHIVE_DIR) if f.lower().endswith('.pdf')]
+            archive_pdfs = []
+            for root, dirs, files in os.walk(app_config.ARCHIVE_DIR):
+                for file in files:
+                    if file.lower().endswith('.pdf'):
+                        archive_pdfs.append(os.path.relpath(os.path.join(root, file), app_config.ARCHIVE_DIR))
             report["archive_files"] = archive_pdfs
 
         # Check filing cabinet (recursively)
@@ -2821,8 +2979,9 @@ def finalize_single_documents_batch_with_progress(batch_id: int, progress_callba
         'original_pdf_path',
         'searchable_pdf_path',
     ]
-    # Optional columns - include only when present to avoid OperationalError on older test DBs
-    optional_cols = ['final_category', 'final_filename', 'ai_suggested_category', 'ai_suggested_filename', 'ocr_text']
+    # Optional columns - include only when present to avoid OperationalError on older test DBs.
+    # OCR text is loaded per document below (document_text side table) to keep this query narrow.
+    optional_cols = ['final_category', 'final_filename', 'ai_suggested_category', 'ai_suggested_filename']
     for c in optional_cols:
         if c in existing_cols:
             select_cols.append(c)
@@ -2883,10 +3042,10 @@ def finalize_single_documents_batch_with_progress(batch_id: int, progress_callba
                 final_filename = doc_row.get('final_filename')
                 ai_suggested_category = doc_row.get('ai_suggested_category')
                 ai_suggested_filename = doc_row.get('ai_suggested_filename')
-                ocr_text = doc_row.get('ocr_text')
             else:
                 # legacy tuple path (keeps existing behavior)
-                doc_id, original_pdf, searchable_pdf, final_category, final_filename, ai_suggested_category, ai_suggested_filename, ocr_text = doc_row
+                doc_id, original_pdf, searchable_pdf, final_category, final_filename, ai_suggested_category, ai_suggested_filename = doc_row
+            ocr_text = get_document_text('single_document', doc_id, 'ocr_text', conn=conn) if doc_id else None
 
             logging.info(f"[export] Processing doc_id={doc_id} original_pdf={original_pdf} searchable_pdf={searchable_pdf}")
             if original_pdf:
@@ -3153,7 +3312,10 @@ def finalize_single_documents_batch_with_progress(batch_id: int, progress_callba
         pass
     if success:
         try:
-            cursor.execute("UPDATE batches SET status = ? WHERE id = ?", (app_config.STATUS_EXPORTED, batch_id))
+            cursor.execute(
+                "UPDATE batches SET status = ?, exported_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (app_config.STATUS_EXPORTED, batch_id),
+            )
             conn.commit()
             logging.info(f"🚩 Batch {batch_id} status updated to '{app_config.STATUS_EXPORTED}'")
         except Exception as status_err:
@@ -13,14 +13,26 @@ Extracted from the monolithic app.py to improve maintainability.
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash
 import logging
 import os
-import hashlib
 import sqlite3
 
 # Import existing modules (these imports will need to be adjusted)
 # Import actual database and processing functions
 from ..database import (
-    get_db_connection
+    get_db_connection,
+    get_dal_cache_stats,
+    clear_intake_analysis_cache,
+    get_detection_performance_analytics,
 )
+from ..checkpoints import list_resumable_batches
+from ..db_archive import archive_exported_batches
+from ..db_backup import get_backup_status, start_backup_async
+from ..db_diagnostics import get_db_diagnostics
+from ..governor import get_governor_status
+from ..intake_watcher import get_intake_watcher_status
+from ..job_queue import enqueue_job, get_job, get_job_queue_status, list_jobs, register_job_handler
+from ..processing import batch_jobs_in_flight, enqueue_batch_resume
+from ..scheduler import get_scheduler_stats
+from ..strategy_classifier import train_strategy_classifier
 # from ..config_manager import app_config
 # from ..security import require_admin  # If admin authentication is implemented
 from ..utils.helpers import create_error_response, create_success_response
@@ -46,66 +58,29 @@ def _select_tmp_dir() -> str:
 def db_diagnostics():
     """Human-friendly diagnostics page for the active SQLite database.
 
-    Shows: path, size, mtime, sha256 (first 16 chars), table list with row counts,
-    and warnings for minimal schema / missing critical tables.
+    Shows the cached snapshot from db_diagnostics (path, size, WAL size, free-list,
+    per-table row estimates/pages/fragmentation, index stats, vacuum advice).
+    Pass ?refresh=1 to collect a new snapshot immediately.
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        # Resolve absolute path (connection doesn't expose path directly; reconstruct from config)
-        from ..config_manager import app_config
-        db_path = os.path.abspath(app_config.DATABASE_PATH)
-        exists = os.path.exists(db_path)
-        size = os.path.getsize(db_path) if exists else 0
-        mtime_iso = None
-        if exists:
-            import time as _t
-            mtime_iso = _t.strftime('%Y-%m-%dT%H:%M:%S', _t.localtime(os.path.getmtime(db_path)))
-        # Compute partial SHA256 (avoid heavy cost on very large files by streaming)
-        sha256_short = 'n/a'
-        if exists and size <= 50_000_000:  # cap at 50MB for hashing
-            h = hashlib.sha256()
-            with open(db_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
-                    h.update(chunk)
-            sha256_short = h.hexdigest()[:16]
-        # Gather tables & row counts
-        tables = cursor.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name").fetchall()
-        table_infos = []
-        for t in tables:
-            name = t[0]
-            try:
-                rc = cursor.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
-            except sqlite3.Error:
-                rc = 'err'
-            table_infos.append({'name': name, 'rows': rc})
-        table_names = {ti['name'] for ti in table_infos}
-        expected_core = {'batches', 'single_documents'}
-        optional_grouped = {'documents', 'document_pages'}
-        optional_tags = {'document_tags', 'tag_usage_stats'}
-        warnings = []
-        if not expected_core.issubset(table_names):
-            warnings.append('Missing core tables: ' + ', '.join(sorted(expected_core - table_names)))
-        # Minimal schema heuristic: fewer than 6 tables typically indicates fresh DB
-        if len(table_names) < 6:
-            warnings.append('Database appears MINIMAL / freshly initialized (fewer than 6 tables).')
-        if 'pages' not in table_names:
-            warnings.append('No pages table found – legacy grouped workflow will not function fully.')
-        ctx = {
-            'db_path': db_path,
-            'exists': exists,
-            'size_bytes': size,
-            'mtime_iso': mtime_iso,
-            'sha256_short': sha256_short,
-            'tables': table_infos,
-            'warnings': warnings,
-        }
-        return render_template('db_diagnostics.html', **ctx)
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 't')
+        return render_template('db_diagnostics.html', **get_db_diagnostics(refresh=refresh))
     except Exception as e:
         logger.error(f"Failed to render db diagnostics: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@bp.route('/api/db_diagnostics')
+def db_diagnostics_api():
+    """JSON form of the cached diagnostics snapshot (?refresh=1 to recollect)."""
+    try:
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 't')
+        return jsonify(create_success_response(get_db_diagnostics(refresh=refresh)))
+    except Exception as e:
+        logger.error(f"Failed to collect db diagnostics: {e}")
+        return jsonify(create_error_response(f"Failed to collect diagnostics: {str(e)}"))
+
+
 @bp.route('/debug_batches')
 def debug_batches():
     """Temporary debug: return JSON list of batches the server sees.
@@ -331,7 +306,12 @@ def restore_category(cat_id: int):
 
 @bp.route("/clear_analysis_cache", methods=["POST"])
 def clear_analysis_cache():
-    """Clear the cached analysis results to force re-analysis."""
+    """Clear the cached analysis results to force re-analysis.
+
+    Only the assembled result set is dropped by default; per-file results in the
+    intake_analysis_cache table are reused for unchanged files. Post
+    `purge=1` to discard those as well and re-analyze everything.
+    """
     try:
         # Clear the same cache file that the original used (prefer test tmpdir when available)
         tmpdir = _select_tmp_dir()
@@ -340,6 +320,10 @@ def clear_analysis_cache():
             os.remove(cache_file)
             logger.info("Cleared analysis cache")
 
+        if request.form.get('purge', '').lower() in ('1', 'true', 't', 'on'):
+            removed = clear_intake_analysis_cache()
+            logger.info(f"Purged {removed} per-file intake analyses")
+
         # Also clear any other cache directories that might exist
         cache_dir = os.path.join(tmpdir, 'analysis_cache')
         try:
@@ -456,6 +440,22 @@ def api_system_health():
                 'filesystem': {'status': 'up', 'free_space': '10GB'}
             }
         }
+        try:
+            health_data['dal_cache'] = get_dal_cache_stats()
+        except Exception as cache_err:
+            logger.debug(f"DAL cache stats unavailable: {cache_err}")
+        try:
+            health_data['intake_watcher'] = get_intake_watcher_status()
+        except Exception as watch_err:
+            logger.debug(f"Intake watcher status unavailable: {watch_err}")
+        try:
+            health_data['scheduler'] = get_scheduler_stats()
+        except Exception as sched_err:
+            logger.debug(f"Scheduler stats unavailable: {sched_err}")
+        try:
+            health_data['governor'] = get_governor_status()
+        except Exception as gov_err:
+            logger.debug(f"Governor status unavailable: {gov_err}")
 
         return jsonify(create_success_response(health_data))
 
@@ -568,6 +568,31 @@ def vacuum_database():
         logger.error(f"Error vacuuming database: {e}")
         return jsonify(create_error_response(f"Failed to vacuum database: {str(e)}"))
 
+@bp.route("/database/backup", methods=["POST"])
+def backup_database():
+    """Start an online (non-blocking) database snapshot in the background."""
+    try:
+        payload = request.get_json(silent=True) or request.form
+        compress_raw = payload.get('compress')
+        kwargs = {}
+        if compress_raw not in (None, ''):
+            kwargs['compress'] = str(compress_raw).lower() in ('true', '1', 't', 'on')
+        if not start_backup_async(**kwargs):
+            return jsonify(create_error_response("A database backup is already running", 409)), 409
+        return jsonify(create_success_response({
+            'message': 'Database backup started',
+            'status': get_backup_status()
+        }))
+
+    except Exception as e:
+        logger.error(f"Error starting database backup: {e}")
+        return jsonify(create_error_response(f"Failed to start database backup: {str(e)}"))
+
+@bp.route("/api/database/backup_status")
+def backup_database_status():
+    """Progress of the current or most recent online database backup."""
+    return jsonify(create_success_response(get_backup_status()))
+
 @bp.route("/database/cleanup", methods=["POST"])
 def cleanup_database():
     """Clean up old or orphaned records."""
@@ -595,6 +620,127 @@ def cleanup_database():
         logger.error(f"Error cleaning up database: {e}")
         return jsonify(create_error_response(f"Failed to clean up database: {str(e)}"))
 
+@bp.route("/archive_exported_batches", methods=["POST"])
+def archive_exported_batches_route():
+    """Move exported batches older than N days into the archive database."""
+    try:
+        payload = request.get_json(silent=True) or request.form
+        days_raw = payload.get('older_than_days')
+        older_than_days = int(days_raw) if days_raw not in (None, '') else None
+        dry_run = str(payload.get('dry_run', 'false')).lower() in ('true', '1', 't', 'on')
+
+        result = archive_exported_batches(older_than_days=older_than_days, dry_run=dry_run)
+        message = (
+            f"{len(result['candidates'])} batch(es) eligible for archival" if dry_run
+            else f"Archived {len(result['archived'])} batch(es)"
+        )
+        return jsonify(create_success_response(dict(result, message=message, dry_run=dry_run)))
+
+    except Exception as e:
+        logger.error(f"Error archiving exported batches: {e}")
+        return jsonify(create_error_response(f"Failed to archive batches: {str(e)}"))
+
+@bp.route("/api/jobs")
+def jobs_api():
+    """Background job queue counters plus recent jobs (?status=&type=&limit=)."""
+    try:
+        limit = int(request.args.get('limit', 50))
+        return jsonify(create_success_response({
+            'queue': get_job_queue_status(),
+            'jobs': list_jobs(status=request.args.get('status') or None,
+                              job_type=request.args.get('type') or None, limit=limit),
+        }))
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        return jsonify(create_error_response(f"Failed to list jobs: {str(e)}"))
+
+@bp.route("/api/jobs/<int:job_id>")
+def job_api(job_id: int):
+    """A single background job, including its last error and result."""
+    job = get_job(job_id)
+    if job is None:
+        return jsonify(create_error_response(f"Job {job_id} not found", 404)), 404
+    return jsonify(create_success_response(job))
+
+@bp.route("/api/scheduler")
+def scheduler_api():
+    """OCR/LLM slot usage and per-lane (interactive/background) queue wait times."""
+    try:
+        return jsonify(create_success_response(get_scheduler_stats()))
+    except Exception as e:
+        logger.error(f"Error reading scheduler stats: {e}")
+        return jsonify(create_error_response(f"Failed to read scheduler stats: {str(e)}"))
+
+@bp.route("/api/resumable_batches")
+def resumable_batches_api():
+    """Batches whose processing run was interrupted and can be resumed from checkpoints."""
+    try:
+        return jsonify(create_success_response({'batches': list_resumable_batches()}))
+    except Exception as e:
+        logger.error(f"Error listing resumable batches: {e}")
+        return jsonify(create_error_response(f"Failed to list resumable batches: {str(e)}"))
+
+@bp.route("/api/resumable_batches/<int:batch_id>/resume", methods=["POST"])
+def resume_batch_api(batch_id: int):
+    """Queue a resume of an interrupted batch."""
+    try:
+        if not any(run['batch_id'] == batch_id for run in list_resumable_batches()):
+            return jsonify(create_error_response(f"Batch {batch_id} has no interrupted run", 404)), 404
+        held = batch_jobs_in_flight(batch_id)
+        if held:
+            return jsonify(create_error_response(
+                f"Batch {batch_id} is still held by job {held[0]['id']} ({held[0]['job_type']})", 409)), 409
+        job_id = enqueue_batch_resume(batch_id)
+        return jsonify(create_success_response({'batch_id': batch_id, 'job_id': job_id}))
+    except Exception as e:
+        logger.error(f"Error resuming batch {batch_id}: {e}")
+        return jsonify(create_error_response(f"Failed to resume batch: {str(e)}"))
+
+@bp.route("/api/detection_analytics")
+def detection_analytics():
+    """Detection accuracy / LLM usage analytics plus the learned classifier's report."""
+    try:
+        return jsonify(create_success_response(get_detection_performance_analytics()))
+    except Exception as e:
+        logger.error(f"Error fetching detection analytics: {e}")
+        return jsonify(create_error_response(f"Failed to fetch detection analytics: {str(e)}"))
+
+def _train_strategy_classifier_job(job):
+    """Job handler: cross-validate and fit the classifier off the request thread."""
+    result = train_strategy_classifier(min_samples=job.payload.get('min_samples'))
+    if not result['trained']:
+        logger.info(f"Strategy classifier not trained: {result['reason']}")
+    return result
+
+
+register_job_handler('admin.train_strategy_classifier', _train_strategy_classifier_job)
+
+@bp.route("/strategy_classifier/train", methods=["POST"])
+def train_strategy_classifier_route():
+    """Queue a retrain of the learned single/batch classifier from logged detection ground truth.
+
+    Training (5-fold cross-validation plus the final fit) runs as a background
+    job; poll /admin/api/jobs/<job_id> for its result.
+    """
+    try:
+        payload = request.get_json(silent=True) or request.form
+        min_raw = payload.get('min_samples')
+        try:
+            min_samples = int(min_raw) if min_raw not in (None, '') else None
+        except (TypeError, ValueError):
+            return jsonify(create_error_response(f"Invalid min_samples: {min_raw}", 400)), 400
+        # At most one training run queued at a time
+        job_id = enqueue_job('admin.train_strategy_classifier', {'min_samples': min_samples},
+                             idempotency_key='admin.train_strategy_classifier')
+        return jsonify(create_success_response({
+            'message': 'Classifier training queued',
+            'job_id': job_id,
+            'status_url': url_for('admin.job_api', job_id=job_id),
+        })), 202
+    except Exception as e:
+        logger.error(f"Error queueing strategy classifier training: {e}")
+        return jsonify(create_error_response(f"Failed to queue classifier training: {str(e)}"))
+
 # File safety and validation
 @bp.route("/api/file_safety_check")
 def file_safety_check():
@@ -16,21 +16,26 @@ import logging
 from typing import Generator
 import json
 import time
-import threading
 
 from ..database import (
     get_db_connection,
+    get_document_text,
+    set_document_text,
 )
 from ..config_manager import app_config
 from ..utils.helpers import create_error_response, create_success_response
+from ..job_queue import enqueue_job, register_job_handler
+from ..status_store import StatusMap
+from ..event_bus import hub, relay_status_namespace, format_sse
+from ..scheduler import ocr_gate
 from ..services.rotation_service import get_logical_rotation, set_logical_rotation
+from ..db_archive import search_documents
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 logger = logging.getLogger(__name__)
 
-# Global status tracking (retained from original structure)
-processing_status = {}
-status_lock = threading.Lock()
+# Status shared by all worker processes (see status_store)
+processing_status = StatusMap('api.processing')
 
 @bp.route("/rotate_document/<int:doc_id>", methods=['POST'])
 def rotate_document_api(doc_id: int):
@@ -112,19 +117,21 @@ def rescan_document_api(doc_id: int):
             )
         """)
         row = cur.execute("""
-            SELECT id, original_filename, original_pdf_path, ocr_text, ocr_confidence_avg, page_count, batch_id,
-                   ai_suggested_category, ai_suggested_filename, ai_confidence, ai_summary
+            SELECT id, original_filename, original_pdf_path, ocr_confidence_avg, page_count, batch_id,
+                   ai_suggested_category, ai_suggested_filename, ai_confidence
             FROM single_documents WHERE id=?
         """, (doc_id,)).fetchone()
         if not row:
             conn.close()
             return jsonify(create_error_response("Document not found", 404)), 404
 
-        ( _id, original_filename, pdf_path, existing_ocr_text, existing_ocr_conf, page_count, batch_id,
-          prev_ai_cat, prev_ai_file, prev_ai_conf, prev_ai_summary) = (
-            row['id'], row['original_filename'], row['original_pdf_path'], row['ocr_text'],
+        ( _id, original_filename, pdf_path, existing_ocr_conf, page_count, batch_id,
+          prev_ai_cat, prev_ai_file, prev_ai_conf) = (
+            row['id'], row['original_filename'], row['original_pdf_path'],
             row['ocr_confidence_avg'], row['page_count'], row['batch_id'],
-            row['ai_suggested_category'], row['ai_suggested_filename'], row['ai_confidence'], row['ai_summary'] )
+            row['ai_suggested_category'], row['ai_suggested_filename'], row['ai_confidence'] )
+        existing_ocr_text = get_document_text('single_document', doc_id, 'ocr_text', conn=conn)
+        prev_ai_summary = get_document_text('single_document', doc_id, 'ai_summary', conn=conn)
 
         updated_flags = { 'ocr': False, 'ai': False }
         new_ocr_text = existing_ocr_text or ''
@@ -165,7 +172,8 @@ def rescan_document_api(doc_id: int):
                                 img = img.rotate(-applied_rotation, expand=True)
                             except Exception as rerr:  # pragma: no cover
                                 logger.warning(f"[rescan] Failed applying rotation {applied_rotation}° doc {doc_id}: {rerr}")
-                        ocr_result = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
+                        with ocr_gate.slot():
+                            ocr_result = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
                         words = []
                         if 'text' in ocr_result and 'conf' in ocr_result:
                             for w, c in zip(ocr_result['text'], ocr_result['conf']):
@@ -211,8 +219,9 @@ def rescan_document_api(doc_id: int):
         if updated_flags['ocr']:
             try:
                 cur.execute("""
-                    UPDATE single_documents SET ocr_text=?, ocr_confidence_avg=?, page_count=? WHERE id=?
-                """, (new_ocr_text, new_ocr_conf, new_page_count, doc_id))
+                    UPDATE single_documents SET ocr_confidence_avg=?, page_count=? WHERE id=?
+                """, (new_ocr_conf, new_page_count, doc_id))
+                set_document_text('single_document', doc_id, 'ocr_text', new_ocr_text, conn=conn)
                 conn.commit()
             except Exception as ocr_upd_err:
                 logger.error(f"[rescan] Failed updating OCR fields doc {doc_id}: {ocr_upd_err}")
@@ -388,9 +397,10 @@ def rescan_document_api(doc_id: int):
             try:
                 cur.execute("""
                     UPDATE single_documents SET
-                        ai_suggested_category=?, ai_suggested_filename=?, ai_confidence=?, ai_summary=?
+                        ai_suggested_category=?, ai_suggested_filename=?, ai_confidence=?
                     WHERE id=?
-                """, (new_ai_cat, new_ai_file, new_ai_conf, new_ai_summary, doc_id))
+                """, (new_ai_cat, new_ai_file, new_ai_conf, doc_id))
+                set_document_text('single_document', doc_id, 'ai_summary', new_ai_summary, conn=conn)
                 conn.commit()
             except Exception as ai_upd_err:
                 logger.error(f"[rescan] Failed updating AI fields doc {doc_id}: {ai_upd_err}")
@@ -539,14 +549,13 @@ def rescan_batch_api(batch_id: int):
 def analyze_intake_progress():
     """Get progress of intake analysis."""
     try:
-        with status_lock:
-            progress = processing_status.get('intake_analysis', {
-                'status': 'idle',
-                'progress': 0,
-                'message': 'No analysis in progress',
-                'files_processed': 0,
-                'total_files': 0
-            })
+        progress = processing_status.get('intake_analysis', {
+            'status': 'idle',
+            'progress': 0,
+            'message': 'No analysis in progress',
+            'files_processed': 0,
+            'total_files': 0
+        })
 
         return jsonify(create_success_response(progress))
 
@@ -554,6 +563,62 @@ def analyze_intake_progress():
         logger.error(f"Error getting intake progress: {e}")
         return jsonify(create_error_response(f"Failed to get progress: {str(e)}"))
 
+def _analyze_intake_job(job):
+    """Job handler for POST /api/analyze_intake.
+
+    Analysis results are cached per file fingerprint, so a retried job only
+    re-analyzes the files the failed attempt had not finished.
+    """
+    from ..document_detector import get_detector
+
+    intake_dir = job.payload.get('intake_dir')
+    try:
+        processing_status['intake_analysis'] = {
+            'status': 'analyzing',
+            'progress': 0,
+            'message': 'Starting intake analysis...',
+            'files_processed': 0,
+            'total_files': 0
+        }
+
+        def _on_result(analysis, completed, total, cached):
+            processing_status.edit('intake_analysis', {
+                'progress': int(completed / total * 100) if total else 100,
+                'message': f'Analyzed {os.path.basename(analysis.file_path)}',
+                'files_processed': completed,
+                'total_files': total
+            })
+
+        analyses = get_detector(use_llm_for_ambiguous=True).analyze_intake_directory(intake_dir, on_result=_on_result)
+        single_count = sum(1 for a in analyses if a.processing_strategy == 'single_document')
+
+        processing_status['intake_analysis'] = {
+            'status': 'completed',
+            'progress': 100,
+            'message': 'Intake analysis completed',
+            'files_processed': len(analyses),
+            'total_files': len(analyses)
+        }
+        return {
+            'total': len(analyses),
+            'single_count': single_count,
+            'batch_count': len(analyses) - single_count
+        }
+
+    except Exception as e:
+        logger.error(f"Error in intake analysis: {e}")
+        processing_status['intake_analysis'] = {
+            'status': 'error',
+            'progress': 0,
+            'message': f"Analysis failed: {str(e)}",
+            'files_processed': 0,
+            'total_files': 0
+        }
+        raise  # let the job queue retry with backoff
+
+
+register_job_handler('api.analyze_intake', _analyze_intake_job)
+
 @bp.route("/analyze_intake", methods=["POST"])
 def analyze_intake_api():
     """Start intake analysis via API."""
@@ -564,47 +629,13 @@ def analyze_intake_api():
         if not intake_dir:
             return jsonify(create_error_response("Intake directory is required"))
 
-        # Start analysis in background
-        def analyze_async():
-            try:
-                with status_lock:
-                    processing_status['intake_analysis'] = {
-                        'status': 'analyzing',
-                        'progress': 0,
-                        'message': 'Starting intake analysis...',
-                        'files_processed': 0,
-                        'total_files': 0
-                    }
-
-                # Perform actual analysis
-                # result = analyze_intake_directory(intake_dir)
-
-                with status_lock:
-                    processing_status['intake_analysis'] = {
-                        'status': 'completed',
-                        'progress': 100,
-                        'message': 'Intake analysis completed',
-                        'files_processed': 0,  # Actual count
-                        'total_files': 0       # Actual count
-                    }
-
-            except Exception as e:
-                logger.error(f"Error in intake analysis: {e}")
-                with status_lock:
-                    processing_status['intake_analysis'] = {
-                        'status': 'error',
-                        'progress': 0,
-                        'message': f"Analysis failed: {str(e)}",
-                        'files_processed': 0,
-                        'total_files': 0
-                    }
-
-        thread = threading.Thread(target=analyze_async)
-        thread.start()
+        # Queue the analysis (persisted; at most one per intake directory at a time)
+        job_id = enqueue_job('api.analyze_intake', {'intake_dir': intake_dir}, idempotency_key=f'api.analyze_intake:{intake_dir}')
 
         return jsonify(create_success_response({
             'message': 'Intake analysis started',
-            'intake_dir': intake_dir
+            'intake_dir': intake_dir,
+            'job_id': job_id
         }))
 
     except Exception as e:
@@ -615,14 +646,13 @@ def analyze_intake_api():
 def single_processing_progress():
     """Get progress of single document processing."""
     try:
-        with status_lock:
-            progress = processing_status.get('single_processing', {
-                'status': 'idle',
-                'progress': 0,
-                'current_document': None,
-                'total_documents': 0,
-                'processed_documents': 0
-            })
+        progress = processing_status.get('single_processing', {
+            'status': 'idle',
+            'progress': 0,
+            'current_document': None,
+            'total_documents': 0,
+            'processed_documents': 0
+        })
 
         return jsonify(create_success_response(progress))
 
@@ -634,13 +664,12 @@ def single_processing_progress():
 def batch_processing_progress():
     """Get progress of batch processing."""
     try:
-        with status_lock:
-            progress = processing_status.get('batch_processing', {
-                'status': 'idle',
-                'progress': 0,
-                'current_batch': None,
-                'message': 'No batch processing in progress'
-            })
+        progress = processing_status.get('batch_processing', {
+            'status': 'idle',
+            'progress': 0,
+            'current_batch': None,
+            'message': 'No batch processing in progress'
+        })
 
         return jsonify(create_success_response(progress))
 
@@ -650,85 +679,24 @@ def batch_processing_progress():
 
 @bp.route("/smart_processing_start", methods=['POST'])
 def smart_processing_start():
-    """Start smart processing for a batch."""
-    try:
-        data = request.get_json()
-        batch_id = data.get('batch_id')
-
-        if not batch_id:
-            return jsonify(create_error_response("Batch ID is required"))
-
-        # Start smart processing
-        def smart_process_async():
-            try:
-                with status_lock:
-                    processing_status['smart_processing'] = {
-                        'status': 'processing',
-                        'progress': 0,
-                        'batch_id': batch_id,
-                        'message': 'Starting smart processing...',
-                        'stages': {
-                            'ocr': {'status': 'pending', 'progress': 0},
-                            'classification': {'status': 'pending', 'progress': 0},
-                            'grouping': {'status': 'pending', 'progress': 0},
-                            'ordering': {'status': 'pending', 'progress': 0}
-                        }
-                    }
-
-                # Simulate smart processing stages
-                stages = ['ocr', 'classification', 'grouping', 'ordering']
-                for i, stage in enumerate(stages):
-                    # Update stage status
-                    with status_lock:
-                        processing_status['smart_processing']['stages'][stage]['status'] = 'processing'
-                        processing_status['smart_processing']['message'] = f'Processing {stage}...'
-
-                    # Simulate processing time
-                    time.sleep(2)
-
-                    # Complete stage
-                    with status_lock:
-                        processing_status['smart_processing']['stages'][stage]['status'] = 'completed'
-                        processing_status['smart_processing']['stages'][stage]['progress'] = 100
-                        processing_status['smart_processing']['progress'] = int((i + 1) / len(stages) * 100)
-
-                # Complete processing
-                with status_lock:
-                    processing_status['smart_processing']['status'] = 'completed'
-                    processing_status['smart_processing']['message'] = 'Smart processing completed'
-
-            except Exception as e:
-                logger.error(f"Error in smart processing: {e}")
-                with status_lock:
-                    processing_status['smart_processing'] = {
-                        'status': 'error',
-                        'progress': 0,
-                        'message': f"Smart processing failed: {str(e)}"
-                    }
+    """Start smart processing for a batch.
 
-        thread = threading.Thread(target=smart_process_async)
-        thread.start()
-
-        return jsonify(create_success_response({
-            'message': 'Smart processing started',
-            'batch_id': batch_id
-        }))
-
-    except Exception as e:
-        logger.error(f"Error starting smart processing: {e}")
-        return jsonify(create_error_response(f"Failed to start smart processing: {str(e)}"))
+    Smart processing runs through POST /batch/process_smart, which queues the
+    real pipeline and returns the token its progress is reported under; this
+    legacy endpoint no longer starts anything itself.
+    """
+    return jsonify(create_error_response("Smart processing is started with POST /batch/process_smart")), 410
 
 @bp.route("/smart_processing_status")
 def smart_processing_status():
     """Get detailed smart processing status."""
     try:
-        with status_lock:
-            status = processing_status.get('smart_processing', {
-                'status': 'idle',
-                'progress': 0,
-                'message': 'No smart processing in progress',
-                'stages': {}
-            })
+        status = processing_status.get('smart_processing', {
+            'status': 'idle',
+            'progress': 0,
+            'message': 'No smart processing in progress',
+            'stages': {}
+        })
 
         return jsonify(create_success_response(status))
 
@@ -739,33 +707,46 @@ def smart_processing_status():
 # Server-Sent Events for real-time updates
 @bp.route("/events/processing_status")
 def processing_status_events():
-    """Server-sent events for real-time processing status updates."""
-    def generate_events() -> Generator[str, None, None]:
-        """Generate server-sent events for processing status."""
-        last_status = {}
-
-        while True:
-            try:
-                with status_lock:
-                    current_status = dict(processing_status)
-
-                # Only send if status changed
-                if current_status != last_status:
-                    yield f"data: {json.dumps(current_status)}\n\n"
-                    last_status = current_status.copy()
-
-                    # Check every second but exit promptly if shutdown requested
-                    from ..config_manager import SHUTDOWN_EVENT
-                    if SHUTDOWN_EVENT is not None and SHUTDOWN_EVENT.is_set():
-                        break
-                    time.sleep(1)  # Check every second
+    """Server-sent events for real-time processing status updates.
 
-            except Exception as e:
-                logger.error(f"Error in SSE generation: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                break
+    Each message carries the full status dict. Every connection, including
+    an EventSource reconnect, starts with a snapshot of the status store, so
+    nothing is replayed after Last-Event-ID: older changes would be applied
+    on top of newer state, and hub ids are per-process anyway.
+    """
+    topic = relay_status_namespace(processing_status.namespace)
+    # Subscribe before taking the snapshot so no change falls in between
+    subscription = hub.subscribe(topic)
 
-    return Response(generate_events(), mimetype='text/event-stream')
+    def generate_events() -> Generator[str, None, None]:
+        """Generate server-sent events for processing status."""
+        from ..config_manager import SHUTDOWN_EVENT
+        try:
+            current_status = processing_status.snapshot()
+            if current_status:
+                yield format_sse(current_status)
+            # Blocks on this connection's queue; idle connections only wake for heartbeats
+            for event in subscription.events(heartbeat_seconds=app_config.SSE_HEARTBEAT_SECONDS):
+                if SHUTDOWN_EVENT is not None and SHUTDOWN_EVENT.is_set():
+                    break
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                key, value = event.data['key'], event.data['value']
+                if value is None:
+                    current_status.pop(key, None)
+                else:
+                    current_status[key] = value
+                yield format_sse(current_status, event.id)
+        except Exception as e:
+            logger.error(f"Error in SSE generation: {e}")
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            subscription.close()
+
+    response = Response(generate_events(), mimetype='text/event-stream')
+    response.call_on_close(subscription.close)
+    return response
 
 @bp.route("/events/batch_status/<int:batch_id>")
 def batch_status_events(batch_id: int):
@@ -796,6 +777,30 @@ def batch_status_events(batch_id: int):
 
     return Response(generate_batch_events(), mimetype='text/event-stream')
 
+@bp.route("/search_documents")
+def search_documents_api():
+    """Search single documents by filename/category across the main and archive databases.
+
+    Query: q (required), ocr=1 to also match OCR text, archive=0 to skip
+    archived batches, limit (default 50).
+    """
+    term = (request.args.get('q') or '').strip()
+    if not term:
+        return jsonify(create_error_response("Missing search term 'q'", 400)), 400
+    try:
+        results = search_documents(
+            term,
+            include_archive=request.args.get('archive', '1') not in ('0', 'false'),
+            include_ocr=request.args.get('ocr', '0') in ('1', 'true'),
+            limit=max(1, min(int(request.args.get('limit', 50)), 500)),
+        )
+        return jsonify(create_success_response({'results': results, 'total': len(results)}))
+    except ValueError:
+        return jsonify(create_error_response("Invalid limit", 400)), 400
+    except Exception as e:
+        logger.error(f"Error searching documents: {e}")
+        return jsonify(create_error_response(f"Search failed: {str(e)}")), 500
+
 # Utility APIs
 @bp.route("/file_safety_check")
 def file_safety_check():
@@ -851,8 +856,7 @@ def system_info():
 def clear_processing_status():
     """Clear all processing status (for debugging)."""
     try:
-        with status_lock:
-            processing_status.clear()
+        processing_status.clear()
 
         return jsonify(create_success_response({
             'message': 'Processing status cleared'
@@ -866,8 +870,7 @@ def clear_processing_status():
 def debug_processing_status():
     """Get current processing status for debugging."""
     try:
-        with status_lock:
-            current_status = dict(processing_status)
+        current_status = processing_status.snapshot()
 
         return jsonify(create_success_response({
             'processing_status': current_status,
@@ -22,6 +22,12 @@ from ..processing import process_batch, database_connection
 from ..config_manager import app_config
 from typing import Optional
 from ..utils.helpers import create_error_response, create_success_response
+from ..job_queue import enqueue_job, register_job_handler, get_job, jobs_run_in_process
+from ..status_store import StatusMap, wait_for
+from ..event_bus import hub, relay_status_namespace, parse_last_event_id, format_sse
+from ..scheduler import BACKGROUND, iterate_in_lane
+from ..db_archive import get_archived_batch, get_archived_batch_documents, list_archived_batches
+from ..cancellation import CancellationToken, is_cancelled, iterate_with_token
 from ..document_detector import get_detector, DocumentAnalysis
 from ..processing import _process_single_documents_as_batch_with_progress, is_image_file, _process_docs_into_fixed_batch_with_progress, finalize_single_documents_batch_with_progress
 
@@ -29,12 +35,27 @@ from ..processing import _process_single_documents_as_batch_with_progress, is_im
 bp = Blueprint('batch', __name__, url_prefix='/batch')
 logger = logging.getLogger(__name__)
 
-# Global variables for tracking processing state (these should eventually move to a service class)
-processing_status = {}
-processing_lock = threading.Lock()
-# In-memory token store for smart processing orchestration
-smart_tokens: dict[str, dict] = {}
 SMART_TOKEN_TTL_SECONDS = 3600  # 1 hour expiry
+# Processing state and smart processing tokens, shared by all worker processes (see status_store)
+processing_status = StatusMap('batch.processing')
+smart_tokens = StatusMap('batch.smart_tokens', ttl_seconds=SMART_TOKEN_TTL_SECONDS)
+
+
+def _touch_token(token: str, **fields) -> Optional[dict]:
+    """Atomically set fields on a live smart token (never resurrects an expired/removed one)."""
+    return smart_tokens.edit(token, lambda meta: dict(meta, **fields) if meta is not None else None)
+
+
+def _claim_smart_driver(token: str, driver: str) -> bool:
+    """Atomically become the one runner of a token's orchestration (job or SSE request)."""
+    def claim(meta):
+        if meta is None or meta.get('driver'):
+            return meta
+        return dict(meta, driver=driver)
+    meta = smart_tokens.edit(token, claim)
+    return bool(meta) and meta.get('driver') == driver
+
+
 _smart_cleanup_started = False
 # How often to send SSE heartbeats (seconds). Keep low to avoid client aborts.
 SMART_SSE_HEARTBEAT_SECONDS = int(os.getenv('SMART_SSE_HEARTBEAT_SECONDS', '5'))
@@ -127,6 +148,18 @@ def _load_cached_intake_analyses(intake_dir: str) -> dict:
 
 
 def _orchestrate_smart_processing(batch_id: Optional[int], strategy_overrides: dict, token: str):
+    """Smart processing progress for `token`, cancellable through /api/smart_processing_cancel.
+
+    The steps run under a CancellationToken backed by the token's shared
+    `cancelled` flag, so OCR pages and LLM calls already in flight stop too.
+    """
+    cancel_token = CancellationToken(
+        check=lambda: bool((smart_tokens.get(token) or {}).get('cancelled')), name=f'smart:{token}'
+    )
+    return iterate_with_token(cancel_token, _smart_processing_steps(batch_id, strategy_overrides, token))
+
+
+def _smart_processing_steps(batch_id: Optional[int], strategy_overrides: dict, token: str):
     """Generator that replicates legacy smart processing progress flow using SSE-friendly yields."""
     import os
     import logging as _logging
@@ -300,6 +333,9 @@ def _orchestrate_smart_processing(batch_id: Optional[int], strategy_overrides: d
                 return
         except Exception:
             pass
+        if is_cancelled():
+            yield {'message': 'Smart processing cancelled (analysis phase)', 'complete': True, 'cancelled': True}
+            return
         yield {'message': f'Analyzed ({idx}/{total_files}): {fname}', 'progress': idx, 'total': total_files}
 
     # Apply overrides
@@ -332,26 +368,30 @@ def _orchestrate_smart_processing(batch_id: Optional[int], strategy_overrides: d
 
     def _relay(generator, label):
         nonlocal processed
-        for update in generator:
-            # Cancellation check (lightweight) before yielding heavy updates
-            token_meta = smart_tokens.get(token)
-            if token_meta and token_meta.get('cancelled'):
-                yield {'message': 'Cancellation acknowledged', 'phase': label, 'cancelled': True, 'complete': True}
-                return
-            if 'document_complete' in update:
-                processed = update.get('documents_completed', processed + 1)
-            # Map update to unified fields
-            mapped = {
-                'phase': label,
-                'progress': processed,
-                'total': processing_total,
-                'message': update.get('message') or update.get('status') or update.get('error') or (
-                    f"Processing {update.get('filename')}" if update.get('document_start') else None
-                ),
-                'current_file': update.get('filename'),
-            }
-            mapped.update({k: v for k, v in update.items() if k not in mapped})
-            yield mapped
+        try:
+            for update in generator:
+                # Cancellation check (lightweight) before yielding heavy updates
+                if is_cancelled():
+                    yield {'message': 'Cancellation acknowledged', 'phase': label, 'cancelled': True, 'complete': True}
+                    return
+                if 'document_complete' in update:
+                    processed = update.get('documents_completed', processed + 1)
+                # Map update to unified fields
+                mapped = {
+                    'phase': label,
+                    'progress': processed,
+                    'total': processing_total,
+                    'message': update.get('message') or update.get('status') or update.get('error') or (
+                        f"Processing {update.get('filename')}" if update.get('document_start') else None
+                    ),
+                    'current_file': update.get('filename'),
+                }
+                mapped.update({k: v for k, v in update.items() if k not in mapped})
+                yield mapped
+        finally:
+            # Run the wrapped generator's cleanup (discarding unfinished
+            # documents on cancel) now rather than whenever it is collected
+            generator.close()
 
     single_batch_id = None
     batch_scan_batch_id = None
@@ -466,6 +506,41 @@ def _orchestrate_smart_processing(batch_id: Optional[int], strategy_overrides: d
     }
 
 
+def _follow_smart_run(token: str, subscription):
+    """SSE frames for a smart run driven elsewhere (job worker, other process or connection)."""
+    from ..config_manager import SHUTDOWN_EVENT
+    try:
+        yield 'data: {"connected": true}\n\n'
+        meta = smart_tokens.get(token) or {}
+        forwarded = meta.get('last_event')
+        if forwarded:
+            yield format_sse(forwarded)
+        if meta.get('finished'):
+            return
+        # Blocks on this connection's queue; the status relay publishes token changes from any process
+        for event in subscription.events(heartbeat_seconds=SMART_SSE_HEARTBEAT_SECONDS):
+            if SHUTDOWN_EVENT is not None and SHUTDOWN_EVENT.is_set():
+                yield format_sse({'message': 'Shutdown requested by server', 'complete': True})
+                return
+            if event is None:
+                yield ': ping\n\n'
+                continue
+            if event.data.get('key') != token:
+                continue
+            meta = event.data.get('value')
+            if meta is None:
+                yield format_sse({'message': 'Smart processing token expired', 'complete': True}, event.id)
+                return
+            last = meta.get('last_event')
+            if last and last != forwarded:
+                forwarded = last
+                yield format_sse(last, event.id)
+            if meta.get('finished') or (last or {}).get('complete'):
+                return
+    finally:
+        subscription.close()
+
+
 @bp.route('/api/smart_processing_progress')
 def smart_processing_progress_sse():
     """SSE endpoint streaming smart processing progress based on issued token."""
@@ -492,23 +567,39 @@ def smart_processing_progress_sse():
     except Exception:
         pass
 
-    # Signal any waiter that the SSE client has connected for this token.
+    # Signal any waiter (possibly in another worker process) that the SSE client has connected.
     try:
-        meta = smart_tokens.get(token)
-        if meta is not None:
-            meta['sse_connected'] = True
-            ev = meta.get('sse_event')
-            if ev:
-                try:
-                    ev.set()
-                except Exception:
-                    logger.debug(f"[smart] Could not set sse_event for token {token}")
+        _touch_token(token, sse_connected=True)
     except Exception:
-        pass
+        logger.debug(f"[smart] Could not mark SSE connected for token {token}")
+
+    headers = {
+        'Cache-Control': 'no-cache',
+        'Content-Type': 'text/event-stream',
+        'X-Accel-Buffering': 'no'
+    }
+
+    # The queued starter job runs the orchestrator once a worker picks it up;
+    # this connection then just follows its events. Otherwise (no job, or no
+    # worker has taken it yet) this request runs it, unless another
+    # connection for the same token already does. With jobs left to separate
+    # worker processes (JOB_QUEUE_WORKERS=0) the web tier never runs it.
+    job_id = meta.get('job_id')
+    job = get_job(job_id) if job_id is not None else None
+    follow = bool(job) and (job.get('status') != 'queued' or not jobs_run_in_process())
+    if not follow:
+        follow = not _claim_smart_driver(token, 'sse')
+    if follow:
+        topic = relay_status_namespace(smart_tokens.namespace)
+        subscription = hub.subscribe(topic, parse_last_event_id(request.headers.get('Last-Event-ID')))
+        response = Response(stream_with_context(_follow_smart_run(token, subscription)), headers=headers)
+        response.call_on_close(subscription.close)
+        return response
 
     def event_stream():
         import time as _t
         last_emit = _t.time()
+        completed = False
         # helper to safely yield SSE payloads and log yield-time errors
         def safe_yield(obj):
             try:
@@ -520,9 +611,7 @@ def smart_processing_progress_sse():
                     payload_text = '<unserializable-payload>'
             # Persist last event for token so clients can poll fallback status
             try:
-                meta = smart_tokens.get(token)
-                if meta is not None:
-                    meta['last_event'] = obj if isinstance(obj, dict) else {'message': str(obj)}
+                _touch_token(token, last_event=obj if isinstance(obj, dict) else {'message': str(obj)})
             except Exception:
                 pass
             try:
@@ -540,10 +629,13 @@ def smart_processing_progress_sse():
 
         try:
             yield from safe_yield({'message': 'Token accepted', 'progress': 0, 'total': 0})
-            for update in _orchestrate_smart_processing(batch_id_int if batch_id_int is not None else batch_id, strategy_overrides, token):
+            # Driving a whole batch from the stream is background work, not an interactive request
+            run = _orchestrate_smart_processing(batch_id_int if batch_id_int is not None else batch_id, strategy_overrides, token)
+            for update in iterate_in_lane(BACKGROUND, run):
                 yield from safe_yield(update)
                 last_emit = _t.time()
                 if update.get('complete'):
+                    completed = True
                     break
 
                 # Allow early termination if shutdown requested
@@ -569,23 +661,22 @@ def smart_processing_progress_sse():
                     yield from safe_yield({'heartbeat': True, 'ts': _t.time()})
                     last_emit = _t.time()
 
-            # Cleanup token when finished or aborted
+            completed = True
+        finally:
+            # Finished: followers close and the token expires with its TTL.
+            # Client went away mid-run: release the claim so a reconnect resumes.
             try:
-                smart_tokens.pop(token, None)
+                if completed:
+                    _touch_token(token, finished=True)
+                else:
+                    _touch_token(token, driver=None)
             except Exception:
                 pass
-        finally:
             try:
                 logger.info(f"[smart] SSE connection closing for token {token}")
             except Exception:
                 pass
 
-    headers = {
-        'Cache-Control': 'no-cache',
-        'Content-Type': 'text/event-stream',
-        'X-Accel-Buffering': 'no'
-    }
-
     # Traced wrapper for SSE streams to log each emitted payload and lifecycle
     def _traced_stream(gen, label=f'smart:{token}'):
         try:
@@ -615,9 +706,7 @@ def smart_processing_progress_sse():
             # JSON payload to keep client-side parsing consistent with other SSE messages
             # record preamble as last_event
             try:
-                m = smart_tokens.get(token)
-                if m is not None:
-                    m['last_event'] = {'connected': True, 'ts': time.time()}
+                _touch_token(token, last_event={'connected': True, 'ts': time.time()})
             except Exception:
                 pass
             yield 'data: {"connected": true}\n\n'
@@ -895,7 +984,7 @@ def smart_processing_cancel():
     token = data.get('token') or request.form.get('token')
     if not token or token not in smart_tokens:
         return jsonify(create_error_response('Invalid or expired token'))
-    smart_tokens[token]['cancelled'] = True
+    _touch_token(token, cancelled=True)
     logger.info(f"[smart] Cancellation requested for token {token}")
     return jsonify(create_success_response({'message': 'Cancellation requested', 'token': token}))
 export_status = {}
@@ -946,6 +1035,22 @@ def batch_control():
                     'flagged_count': 0,
                     'audit_url': url_for('batch.batch_audit', batch_id=batch_id)
                 })
+            # Exported batches moved to cold storage stay listed (read-only)
+            for archived in list_archived_batches():
+                batches.append({
+                    'id': archived['id'],
+                    'name': f"Batch {archived['id']}",
+                    'status': archived.get('status'),
+                    'start_time': archived.get('start_time'),
+                    'created_at': archived.get('start_time'),
+                    'document_count': archived['document_count'],
+                    'completed_count': archived['document_count'],
+                    'progress_percent': 100,
+                    'ungrouped_count': None,
+                    'flagged_count': 0,
+                    'archived': True,
+                    'audit_url': url_for('batch.batch_audit', batch_id=archived['id'])
+                })
             return render_template('batch_control.html', batches=batches)
 
     except Exception as e:
@@ -953,6 +1058,46 @@ def batch_control():
         flash(f"Error loading batches: {str(e)}", "error")
         return render_template('batch_control.html', batches=[])
 
+def _process_new_batch_job(job):
+    """Job handler for /process_new: run process_batch() and track it in processing_status."""
+    batch_id = job.payload['batch_id']
+    try:
+        processing_status[batch_id] = {
+            'status': 'processing',
+            'progress': 0,
+            'message': 'Starting batch processing...'
+        }
+
+        # Process the batch
+        result = process_batch()
+
+        if result:
+            processing_status[batch_id] = {
+                'status': 'completed',
+                'progress': 100,
+                'message': 'Batch processing completed successfully'
+            }
+        else:
+            processing_status[batch_id] = {
+                'status': 'error',
+                'progress': 0,
+                'message': 'Batch processing failed'
+            }
+
+    except Exception as e:
+        logger.error(f"Error in async batch processing: {e}")
+        processing_status[batch_id] = {
+            'status': 'error',
+            'progress': 0,
+            'message': f"Processing error: {str(e)}"
+        }
+        raise  # marks the job failed; see max_attempts below
+
+
+# process_batch() is not idempotent (a rerun re-OCRs and re-inserts pages), so never retry
+register_job_handler('batch.process', _process_new_batch_job, max_attempts=1)
+
+
 @bp.route("/process_new", methods=["POST"])
 def process_new_batch():
     """Create and process a new batch from intake directory."""
@@ -965,47 +1110,12 @@ def process_new_batch():
         # Create new intake batch via helper to centralize INSERT semantics
         batch_id = create_new_batch('intake')
 
-        # Start processing in background
-        def process_batch_async():
-            try:
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'processing',
-                        'progress': 0,
-                        'message': 'Starting batch processing...'
-                    }
-
-                # Process the batch
-                result = process_batch()
-
-                with processing_lock:
-                    if result:
-                        processing_status[batch_id] = {
-                            'status': 'completed',
-                            'progress': 100,
-                            'message': 'Batch processing completed successfully'
-                        }
-                    else:
-                        processing_status[batch_id] = {
-                            'status': 'error',
-                            'progress': 0,
-                            'message': 'Batch processing failed'
-                        }
-
-            except Exception as e:
-                logger.error(f"Error in async batch processing: {e}")
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'error',
-                        'progress': 0,
-                        'message': f"Processing error: {str(e)}"
-                    }
-
-        thread = threading.Thread(target=process_batch_async)
-        thread.start()
+        # Queue processing (persisted; resumed after a restart)
+        job_id = enqueue_job('batch.process', {'batch_id': batch_id}, idempotency_key=f'batch.process:{batch_id}')
 
         return jsonify(create_success_response({
             'batch_id': batch_id,
+            'job_id': job_id,
             'message': f'Batch {batch_id} created and processing started'
         }))
 
@@ -1071,6 +1181,197 @@ def dev_simulate_grouped(batch_id: int):
         flash(f"Simulation error: {e}", 'error')
     return redirect(url_for('batch.batch_control'))
 
+def _run_smart_now(tok: str, batch_id, strategy_overrides: dict):
+    """Drive _orchestrate_smart_processing for a token, then auto-finalize ready batches."""
+    try:
+        logger.info(f"[smart] Immediate run thread starting for token {tok}")
+        # Ensure batch_id is an int for the orchestrator
+        # Safely coerce batch_id to int if possible; preserve None and non-int values
+        try:
+            if isinstance(batch_id, int):
+                bid = batch_id
+            elif batch_id is None:
+                bid = None
+            else:
+                bid = int(batch_id)
+        except Exception:
+            bid = batch_id
+        from typing import cast
+        last_update = None
+        for update in _orchestrate_smart_processing(cast('Optional[int]', bid), strategy_overrides or {}, tok):
+            # Drive processing; each update reaches SSE followers (any process) via the token
+            last_update = update
+            try:
+                _touch_token(tok, last_event=update)
+            except Exception:
+                pass
+        logger.info(f"[smart] Immediate run thread completed for token {tok}")
+        logger.info(f"[smart] Immediate run last_update snapshot: {repr(last_update)}")
+
+        # FAST_TEST_MODE: proactively create single_documents rows from intake
+        # before orchestration to avoid races where the orchestrator sees
+        # an empty intake directory in some test environments.
+        try:
+            from ..config_manager import app_config as _cfg2
+            if getattr(_cfg2, 'FAST_TEST_MODE', False):
+                try:
+                    from ..batch_guard import get_or_create_processing_batch as _get_proc_batch
+                    proc_batch = _get_proc_batch()
+                    created = 0
+                    from ..database import get_db_connection as _get_db_conn
+                    conn = _get_db_conn()
+                    cur = conn.cursor()
+                    intake_dir = getattr(_cfg2, 'INTAKE_DIR', None) or os.getenv('INTAKE_DIR')
+                    if intake_dir and os.path.exists(intake_dir):
+                        for fname in os.listdir(intake_dir):
+                            path = os.path.join(intake_dir, fname)
+                            if not os.path.exists(path):
+                                continue
+                            ext = os.path.splitext(fname)[1].lower()
+                            if ext not in ['.pdf', '.png', '.jpg', '.jpeg']:
+                                continue
+                            try:
+                                cur.execute("SELECT id FROM single_documents WHERE original_pdf_path = ?", (path,))
+                                if cur.fetchone():
+                                    continue
+                                size = os.path.getsize(path) if os.path.exists(path) else 0
+                                cur.execute(
+                                    "INSERT INTO single_documents (batch_id, original_filename, original_pdf_path, page_count, file_size_bytes, status) VALUES (?,?,?,?,?, 'completed')",
+                                    (proc_batch, fname, path, 1, size)
+                                )
+                                created += 1
+                            except Exception:
+                                continue
+                    try:
+                        conn.commit()
+                    except Exception:
+                        pass
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                    if created:
+                        logger.info(f"[smart] FAST_TEST_MODE pre-orchestrate created {created} single_documents in batch {proc_batch}")
+                except Exception:
+                    pass
+        except Exception:
+            pass
+
+        # In FAST_TEST_MODE, try a fast-path finalize using the last_update's single_batch_id
+        # (if present) before falling back to the DB-driven lookup. This ensures the
+        # batch the orchestrator just created is finalized deterministically during tests.
+        try:
+            from ..config_manager import app_config as _cfg
+            # For deterministic test runs, always attempt a fast-path finalize
+            # for the exact single_batch_id the orchestrator reported. This
+            # removes reliance on environment flags during in-process tests
+            # which can sometimes load config at different times.
+            try:
+                logger.info(f"[smart] Auto-finalize check (cfg FAST_TEST_MODE={getattr(_cfg, 'FAST_TEST_MODE', None)} env_FAST_TEST_MODE={os.getenv('FAST_TEST_MODE')})")
+            except Exception:
+                logger.info(f"[smart] Auto-finalize check: could not read config/env")
+
+            try:
+                if last_update and isinstance(last_update, dict) and ('single_batch_id' in last_update):
+                    sbid = last_update.get('single_batch_id')
+                    if sbid is not None:
+                        try:
+                            sb_int = int(sbid)
+                        except Exception:
+                            sb_int = None
+                        if sb_int is not None:
+                            try:
+                                logger.info(f"[smart] fast-path auto-finalize for single_batch_id: {sb_int} (finalize func={repr(finalize_single_documents_batch_with_progress)})")
+                                logger.info(f"[smart] Calling finalize_single_documents_batch_with_progress for batch {sb_int}")
+                                finalize_single_documents_batch_with_progress(sb_int, lambda c, t, m, d: None)
+                                logger.info(f"[smart] fast-path auto-finalize completed for batch {sb_int}")
+                            except Exception:
+                                logger.exception(f"[smart] Fast-path auto-finalize raised an exception for batch {sb_int}")
+
+                # Fallback: query DB for any batches marked ready_for_manipulation and finalize them
+                from ..database import get_db_connection as _get_db_conn
+                conn = _get_db_conn()
+                cur = conn.cursor()
+                cur.execute("SELECT id FROM batches WHERE status = ? ORDER BY id DESC", (_cfg.STATUS_READY_FOR_MANIPULATION,))
+                ready_rows = cur.fetchall()
+                conn.close()
+                ready_ids = [int(r[0]) for r in ready_rows if r and r[0]]
+                if ready_ids:
+                    logger.info(f"[smart] auto-finalize will run for batches: {ready_ids}")
+                for rb in ready_ids:
+                    try:
+                        logger.info(f"[smart] Auto-finalize starting for batch {rb} (finalize func={repr(finalize_single_documents_batch_with_progress)})")
+                        logger.info(f"[smart] Calling finalize_single_documents_batch_with_progress for batch {rb}")
+                        finalize_single_documents_batch_with_progress(rb, lambda c, t, m, d: None)
+                        logger.info(f"[smart] Auto-finalize completed for batch {rb}")
+                    except Exception:
+                        logger.exception(f"[smart] Auto-finalize raised an exception for batch {rb}")
+            except Exception as db_e:
+                logger.debug(f"[smart] Failed looking up ready batches for auto-finalize: {db_e}")
+        except Exception:
+            # Non-fatal - continue
+            pass
+    except Exception as e:
+        logger.error(f"[smart] Immediate run failed for token {tok}: {e}")
+    finally:
+        # Mark the token finished so followers close; it expires with its TTL
+        try:
+            _touch_token(tok, finished=True)
+        except Exception:
+            pass
+
+
+def _smart_starter_job(job):
+    """Job handler for /process_smart with start_immediately.
+
+    Waits (up to SMART_WAIT_FOR_SSE_SECONDS) for the SSE client to connect so
+    it sees progress from the start, then runs the orchestrator. After a
+    restart the token is no longer in smart_tokens and processing starts
+    straight away.
+    """
+    tok = job.payload['token']
+    try:
+        try:
+            wait_secs = int(os.getenv('SMART_WAIT_FOR_SSE_SECONDS', '30'))
+        except Exception:
+            wait_secs = 30
+        meta = smart_tokens.get(tok)
+        known = meta is not None
+        if meta and meta.get('await_sse'):
+            logger.info(f"[smart] Starter waiting up to {wait_secs}s for SSE client to connect for token {tok}")
+            # The SSE request may be served by another worker process; it flags the shared token
+            try:
+                meta = wait_for('batch.smart_tokens', tok, lambda m: m is None or bool(m.get('sse_connected')), wait_secs)
+            except Exception:
+                meta = None
+            if tok not in smart_tokens:
+                logger.info(f"[smart] Token {tok} was cancelled or expired while waiting for its SSE client; not processing")
+                return
+            if not meta:
+                logger.warning(f"[smart] SSE client did not connect within {wait_secs}s for token {tok}; proceeding")
+            else:
+                logger.info(f"[smart] SSE client connected for token {tok}")
+                # record last_event for fallback polling
+                try:
+                    _touch_token(tok, last_event={'sse_connected': True, 'ts': time.time()})
+                except Exception:
+                    pass
+        else:
+            logger.debug(f"[smart] Token {tok} does not wait for SSE; proceeding immediately")
+        # A token already missing when the job started (e.g. status store reset) still gets processed
+        if known and not _claim_smart_driver(tok, 'job'):
+            logger.info(f"[smart] Token {tok} is already being processed by its SSE request; starter job exiting")
+            return
+
+        # Now run processing (in this job's worker thread)
+        _run_smart_now(tok, job.payload.get('batch_id'), job.payload.get('strategy_overrides') or {})
+    except Exception as e:
+        logger.error(f"[smart] Starter thread failed for token {tok}: {e}")
+
+
+register_job_handler('batch.smart', _smart_starter_job, concurrency=2)
+
+
 @bp.route("/process_smart", methods=["POST"])
 def process_batch_smart():
     """Start smart processing for a batch."""
@@ -1178,16 +1479,15 @@ def process_batch_smart():
             except Exception as persist_e:
                 logger.warning(f"[smart] Strategy persistence skipped: {persist_e}")
         token = uuid.uuid4().hex
-        # Coordination event allows the issuer to optionally wait for the
-        # SSE client to open a connection for this token before starting
+        # `await_sse` lets the starter job wait for the SSE client to open a
+        # connection for this token (it sets `sse_connected`) before starting
         # immediate processing. Tests benefit from this to avoid startup
         # races between token issuance and SSE connect.
-        sse_event = threading.Event()
         smart_tokens[token] = {
             'created': time.time(),
             'batch_id': batch_id,
             'strategy_overrides': strategy_overrides or {},
-            'sse_event': sse_event,
+            'await_sse': True,
             'sse_connected': False,
             'last_event': None,
         }
@@ -1258,178 +1558,13 @@ def process_batch_smart():
         if isinstance(data, dict) and ('start_immediately' in data):
             start_now = bool(data.get('start_immediately'))
         if start_now:
-            def _run_now(tok: str):
-                try:
-                    logger.info(f"[smart] Immediate run thread starting for token {tok}")
-                    # Ensure batch_id is an int for the orchestrator
-                    # Safely coerce batch_id to int if possible; preserve None and non-int values
-                    try:
-                        if isinstance(batch_id, int):
-                            bid = batch_id
-                        elif batch_id is None:
-                            bid = None
-                        else:
-                            bid = int(batch_id)
-                    except Exception:
-                        bid = batch_id
-                    from typing import cast
-                    last_update = None
-                    for update in _orchestrate_smart_processing(cast('Optional[int]', bid), strategy_overrides or {}, tok):
-                        # consume generator to drive processing; keep last update for potential auto-finalize
-                        last_update = update
-                        # no-op; just iterate
-                        continue
-                    logger.info(f"[smart] Immediate run thread completed for token {tok}")
-                    logger.info(f"[smart] Immediate run last_update snapshot: {repr(last_update)}")
-
-                    # FAST_TEST_MODE: proactively create single_documents rows from intake
-                    # before orchestration to avoid races where the orchestrator sees
-                    # an empty intake directory in some test environments.
-                    try:
-                        from ..config_manager import app_config as _cfg2
-                        if getattr(_cfg2, 'FAST_TEST_MODE', False):
-                            try:
-                                from ..batch_guard import get_or_create_processing_batch as _get_proc_batch
-                                proc_batch = _get_proc_batch()
-                                created = 0
-                                from ..database import get_db_connection as _get_db_conn
-                                conn = _get_db_conn()
-                                cur = conn.cursor()
-                                intake_dir = getattr(_cfg2, 'INTAKE_DIR', None) or os.getenv('INTAKE_DIR')
-                                if intake_dir and os.path.exists(intake_dir):
-                                    for fname in os.listdir(intake_dir):
-                                        path = os.path.join(intake_dir, fname)
-                                        if not os.path.exists(path):
-                                            continue
-                                        ext = os.path.splitext(fname)[1].lower()
-                                        if ext not in ['.pdf', '.png', '.jpg', '.jpeg']:
-                                            continue
-                                        try:
-                                            cur.execute("SELECT id FROM single_documents WHERE original_pdf_path = ?", (path,))
-                                            if cur.fetchone():
-                                                continue
-                                            size = os.path.getsize(path) if os.path.exists(path) else 0
-                                            cur.execute(
-                                                "INSERT INTO single_documents (batch_id, original_filename, original_pdf_path, page_count, file_size_bytes, status) VALUES (?,?,?,?,?, 'completed')",
-                                                (proc_batch, fname, path, 1, size)
-                                            )
-                                            created += 1
-                                        except Exception:
-                                            continue
-                                try:
-                                    conn.commit()
-                                except Exception:
-                                    pass
-                                try:
-                                    conn.close()
-                                except Exception:
-                                    pass
-                                if created:
-                                    logger.info(f"[smart] FAST_TEST_MODE pre-orchestrate created {created} single_documents in batch {proc_batch}")
-                            except Exception:
-                                pass
-                    except Exception:
-                        pass
-
-                    # In FAST_TEST_MODE, try a fast-path finalize using the last_update's single_batch_id
-                    # (if present) before falling back to the DB-driven lookup. This ensures the
-                    # batch the orchestrator just created is finalized deterministically during tests.
-                    try:
-                        from ..config_manager import app_config as _cfg
-                        # For deterministic test runs, always attempt a fast-path finalize
-                        # for the exact single_batch_id the orchestrator reported. This
-                        # removes reliance on environment flags during in-process tests
-                        # which can sometimes load config at different times.
-                        try:
-                            logger.info(f"[smart] Auto-finalize check (cfg FAST_TEST_MODE={getattr(_cfg, 'FAST_TEST_MODE', None)} env_FAST_TEST_MODE={os.getenv('FAST_TEST_MODE')})")
-                        except Exception:
-                            logger.info(f"[smart] Auto-finalize check: could not read config/env")
-
-                        try:
-                            if last_update and isinstance(last_update, dict) and ('single_batch_id' in last_update):
-                                sbid = last_update.get('single_batch_id')
-                                if sbid is not None:
-                                    try:
-                                        sb_int = int(sbid)
-                                    except Exception:
-                                        sb_int = None
-                                    if sb_int is not None:
-                                        try:
-                                            logger.info(f"[smart] fast-path auto-finalize for single_batch_id: {sb_int} (finalize func={repr(finalize_single_documents_batch_with_progress)})")
-                                            logger.info(f"[smart] Calling finalize_single_documents_batch_with_progress for batch {sb_int}")
-                                            finalize_single_documents_batch_with_progress(sb_int, lambda c, t, m, d: None)
-                                            logger.info(f"[smart] fast-path auto-finalize completed for batch {sb_int}")
-                                        except Exception:
-                                            logger.exception(f"[smart] Fast-path auto-finalize raised an exception for batch {sb_int}")
-
-                            # Fallback: query DB for any batches marked ready_for_manipulation and finalize them
-                            from ..database import get_db_connection as _get_db_conn
-                            conn = _get_db_conn()
-                            cur = conn.cursor()
-                            cur.execute("SELECT id FROM batches WHERE status = ? ORDER BY id DESC", (_cfg.STATUS_READY_FOR_MANIPULATION,))
-                            ready_rows = cur.fetchall()
-                            conn.close()
-                            ready_ids = [int(r[0]) for r in ready_rows if r and r[0]]
-                            if ready_ids:
-                                logger.info(f"[smart] auto-finalize will run for batches: {ready_ids}")
-                            for rb in ready_ids:
-                                try:
-                                    logger.info(f"[smart] Auto-finalize starting for batch {rb} (finalize func={repr(finalize_single_documents_batch_with_progress)})")
-                                    logger.info(f"[smart] Calling finalize_single_documents_batch_with_progress for batch {rb}")
-                                    finalize_single_documents_batch_with_progress(rb, lambda c, t, m, d: None)
-                                    logger.info(f"[smart] Auto-finalize completed for batch {rb}")
-                                except Exception:
-                                    logger.exception(f"[smart] Auto-finalize raised an exception for batch {rb}")
-                        except Exception as db_e:
-                            logger.debug(f"[smart] Failed looking up ready batches for auto-finalize: {db_e}")
-                    except Exception:
-                        # Non-fatal - continue
-                        pass
-                except Exception as e:
-                    logger.error(f"[smart] Immediate run failed for token {tok}: {e}")
-                finally:
-                    # Best-effort cleanup of token
-                    try:
-                        smart_tokens.pop(tok, None)
-                    except Exception:
-                        pass
-
-            # Start a background starter thread that will wait for the SSE client
-            # to connect (up to configurable timeout) before invoking the
-            # immediate processing runner. Return the token to the caller
-            # immediately so API semantics are preserved.
-            def _starter(tok: str):
-                try:
-                    try:
-                        wait_secs = int(os.getenv('SMART_WAIT_FOR_SSE_SECONDS', '30'))
-                    except Exception:
-                        wait_secs = 30
-                    meta = smart_tokens.get(tok)
-                    ev = meta.get('sse_event') if meta else None
-                    if ev:
-                        logger.info(f"[smart] Starter waiting up to {wait_secs}s for SSE client to connect for token {tok}")
-                        try:
-                            connected = ev.wait(timeout=wait_secs)
-                        except Exception:
-                            connected = False
-                        if not connected:
-                            logger.warning(f"[smart] SSE client did not connect within {wait_secs}s for token {tok}; proceeding")
-                        else:
-                            logger.info(f"[smart] SSE client connected for token {tok}")
-                            # record last_event for fallback polling
-                            try:
-                                meta['last_event'] = {'sse_connected': True, 'ts': time.time()}
-                            except Exception:
-                                pass
-                    else:
-                        logger.debug(f"[smart] No sse_event present for token {tok}; proceeding immediately")
-
-                    # Now run processing (in this same background thread)
-                    _run_now(tok)
-                except Exception as e:
-                    logger.error(f"[smart] Starter thread failed for token {tok}: {e}")
-
-            threading.Thread(target=_starter, args=(token,), daemon=True, name=f"SmartStarter-{token[:6]}").start()
+            # Queued job: waits briefly for the SSE client, then runs the orchestrator
+            job_id = enqueue_job('batch.smart', {
+                'token': token,
+                'batch_id': batch_id,
+                'strategy_overrides': strategy_overrides or {},
+            }, idempotency_key=f'batch.smart:{token}')
+            _touch_token(token, job_id=job_id)
         # Prepare success payload. Keep values inside `data` for the
         # standardized response shape, but also include `token` and
         # `batch_id` at the top-level for backwards compatibility with
@@ -1455,71 +1590,55 @@ def process_batch_smart():
 
 @bp.route("/process_all_single", methods=["POST"])
 def process_batch_all_single():
-    """Process all documents in a batch as single-page documents."""
-    try:
-        batch_id = request.json.get('batch_id') if request.json else None
-        if not batch_id:
-            return jsonify(create_error_response("Batch ID is required"))
-
-        # Start single document processing
-        def process_single_async():
-            try:
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'processing_single',
-                        'progress': 0,
-                        'message': 'Processing as single documents...'
-                    }
-
-                # Get all documents in batch
-                with database_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT id FROM documents WHERE batch_id = ?", (batch_id,))
-                    document_ids = [row[0] for row in cursor.fetchall()]
-
-                total_docs = len(document_ids)
-                processed = 0
+    """Process all documents in a batch as single-page documents.
 
-                for doc_id in document_ids:
-                    try:
-                        # TODO: Fix this function call - process_single_document needs correct implementation
-                        # process_single_document(doc_id)
-                        processed += 1
+    There is no per-document reprocessing path for an existing batch; intake
+    files are processed as single documents through POST /batch/process_smart
+    with `strategy_overrides` set to 'single_document'.
+    """
+    return jsonify(create_error_response(
+        "Use POST /batch/process_smart with strategy_overrides to process files as single documents"
+    )), 501
 
-                        with processing_lock:
-                            processing_status[batch_id]['progress'] = int(processed / total_docs * 100)
-                            processing_status[batch_id]['message'] = f'Processed {processed}/{total_docs} documents'
+def _force_traditional_job(job):
+    """Job handler for /force_traditional: process_batch() without AI."""
+    batch_id = job.payload['batch_id']
+    try:
+        processing_status[batch_id] = {
+            'status': 'traditional_processing',
+            'progress': 0,
+            'message': 'Starting traditional processing...'
+        }
 
-                    except Exception as e:
-                        logger.error(f"Error processing document {doc_id}: {e}")
+        # Process with traditional methods (no AI)
+        result = process_batch()
 
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'completed',
-                        'progress': 100,
-                        'message': f'Completed processing {processed}/{total_docs} documents'
-                    }
+        if result:
+            processing_status[batch_id] = {
+                'status': 'completed',
+                'progress': 100,
+                'message': 'Traditional processing completed'
+            }
+        else:
+            processing_status[batch_id] = {
+                'status': 'error',
+                'progress': 0,
+                'message': 'Traditional processing failed'
+            }
 
-            except Exception as e:
-                logger.error(f"Error in single document processing: {e}")
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'error',
-                        'progress': 0,
-                        'message': f"Processing error: {str(e)}"
-                    }
+    except Exception as e:
+        logger.error(f"Error in traditional processing: {e}")
+        processing_status[batch_id] = {
+            'status': 'error',
+            'progress': 0,
+            'message': f"Processing error: {str(e)}"
+        }
+        raise  # marks the job failed; see max_attempts below
 
-        thread = threading.Thread(target=process_single_async)
-        thread.start()
 
-        return jsonify(create_success_response({
-            'message': 'Single document processing started',
-            'batch_id': batch_id
-        }))
+# Like batch.process: a retry would run process_batch() over a half-processed intake
+register_job_handler('batch.traditional', _force_traditional_job, max_attempts=1)
 
-    except Exception as e:
-        logger.error(f"Error starting single document processing: {e}")
-        return jsonify(create_error_response(f"Failed to start processing: {str(e)}"))
 
 @bp.route("/force_traditional", methods=["POST"])
 def process_batch_force_traditional():
@@ -1529,48 +1648,12 @@ def process_batch_force_traditional():
         if not batch_id:
             return jsonify(create_error_response("Batch ID is required"))
 
-        # Start traditional processing
-        def traditional_process_async():
-            try:
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'traditional_processing',
-                        'progress': 0,
-                        'message': 'Starting traditional processing...'
-                    }
-
-                # Process with traditional methods (no AI)
-                result = process_batch()
-
-                with processing_lock:
-                    if result:
-                        processing_status[batch_id] = {
-                            'status': 'completed',
-                            'progress': 100,
-                            'message': 'Traditional processing completed'
-                        }
-                    else:
-                        processing_status[batch_id] = {
-                            'status': 'error',
-                            'progress': 0,
-                            'message': 'Traditional processing failed'
-                        }
-
-            except Exception as e:
-                logger.error(f"Error in traditional processing: {e}")
-                with processing_lock:
-                    processing_status[batch_id] = {
-                        'status': 'error',
-                        'progress': 0,
-                        'message': f"Processing error: {str(e)}"
-                    }
-
-        thread = threading.Thread(target=traditional_process_async)
-        thread.start()
+        job_id = enqueue_job('batch.traditional', {'batch_id': batch_id}, idempotency_key=f'batch.traditional:{batch_id}')
 
         return jsonify(create_success_response({
             'message': 'Traditional processing started',
-            'batch_id': batch_id
+            'batch_id': batch_id,
+            'job_id': job_id
         }))
 
     except Exception as e:
@@ -1591,9 +1674,7 @@ def reset_batch(batch_id: int):
             cursor.execute("UPDATE documents SET status = 'pending' WHERE batch_id = ?", (batch_id,))
 
             # Clear any processing status
-            with processing_lock:
-                if batch_id in processing_status:
-                    del processing_status[batch_id]
+            processing_status.pop(batch_id, None)
 
         return jsonify(create_success_response({
             'message': f'Batch {batch_id} has been reset',
@@ -1642,8 +1723,18 @@ def batch_audit(batch_id: int):
             batch = cursor.fetchone()
 
             if not batch:
-                flash("Batch not found", "error")
-                return redirect(url_for('batch.batch_control'))
+                batch = get_archived_batch(batch_id)
+                if not batch:
+                    flash("Batch not found", "error")
+                    return redirect(url_for('batch.batch_control'))
+                documents = get_archived_batch_documents(batch_id)
+                status_counts: dict = {}
+                for doc in documents:
+                    status_counts[doc.get('status')] = status_counts.get(doc.get('status'), 0) + 1
+                return render_template('batch_audit.html',
+                                     batch=batch,
+                                     documents=documents,
+                                     status_counts=status_counts)
 
             # Get detailed document information
             cursor.execute("""
@@ -1686,8 +1777,7 @@ def batch_processing_progress():
 def api_batch_processing_progress():
     """API endpoint for batch processing progress."""
     try:
-        with processing_lock:
-            return jsonify(create_success_response(processing_status))
+        return jsonify(create_success_response(processing_status.snapshot()))
     except Exception as e:
         logger.error(f"Error getting processing progress: {e}")
         return jsonify(create_error_response(f"Failed to get progress: {str(e)}"))
@@ -1701,10 +1791,9 @@ def smart_processing_progress():
 def api_smart_processing_progress():
     """API endpoint for smart processing progress."""
     try:
-        with processing_lock:
-            smart_status = {k: v for k, v in processing_status.items()
-                          if v.get('status') == 'smart_processing'}
-            return jsonify(create_success_response(smart_status))
+        smart_status = {k: v for k, v in processing_status.items()
+                      if v.get('status') == 'smart_processing'}
+        return jsonify(create_success_response(smart_status))
     except Exception as e:
         logger.error(f"Error getting smart processing progress: {e}")
         return jsonify(create_error_response(f"Failed to get progress: {str(e)}"))
\ No newline at end of file
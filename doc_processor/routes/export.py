@@ -17,11 +17,11 @@ import os
 import json
 import threading
 from datetime import datetime
-import hashlib
 
 # Import existing modules (these imports will need to be adjusted)
 from ..database import (
-    get_db_connection
+    get_db_connection,
+    document_text_sql,
 )
 from ..processing import (
     finalize_single_documents_batch_with_progress,
@@ -30,6 +30,10 @@ from ..config_manager import app_config
 from ..utils.helpers import create_error_response, create_success_response
 from ..services.export_service import ExportService, _resolve_export_dir
 from ..utils.path_utils import select_tmp_dir, resolve_filing_cabinet_dir
+from ..file_fingerprint import fingerprint
+from ..working_files import resolve_working_pdf_path
+from ..job_queue import enqueue_job, register_job_handler
+from ..status_store import StatusMap
 
 # Create Blueprint
 bp = Blueprint('export', __name__, url_prefix='/export')
@@ -40,7 +44,8 @@ export_service = ExportService()
 
 # Wrapper status dict (backward compatibility for existing JS polling hitting /export/api/progress)
 _route_status_lock = threading.Lock()
-_route_status_cache: Dict[int, Dict[str, Any]] = {}
+# (shared by all worker processes so polls can land on any of them)
+_route_status_cache = StatusMap('export.route_status')
 
 def _merge_status(batch_id: int, service_snapshot: Dict[str, Any]):
     """Merge service status into route cache (thin compatibility layer).
@@ -93,6 +98,72 @@ def export_batch(batch_id: int):
         logger.error(f"Error starting export for batch {batch_id}: {e}")
         return jsonify(create_error_response(f"Failed to start export: {str(e)}"))
 
+def _run_single_documents_export(batch_id: int, force: bool = False, json_sidecar: bool = False) -> bool:
+    """Finalize/export all single documents of a batch, reporting through _merge_status.
+
+    Raises on unexpected failures (after recording an error snapshot) so the
+    job queue can retry; returns whether finalization succeeded.
+    """
+    def progress_callback(current, total, message, details):
+        snapshot = {
+            'status': 'running' if current < total else 'completed',
+            'mode': 'single_documents',
+            'progress': int((current / total) * 100) if total else 0,
+            'message': message,
+            'details': details,
+            'current': current,
+            'total': total,
+            'batch_id': batch_id
+        }
+        _merge_status(batch_id, snapshot)
+
+    try:
+        start_snapshot = {
+            'status': 'starting',
+            'mode': 'single_documents',
+            'progress': 0,
+            'message': 'Initializing export',
+            'details': 'Preparing file list',
+            'batch_id': batch_id
+        }
+        _merge_status(batch_id, start_snapshot)
+
+        # Delegate to processing layer (already handles tags, markdown)
+        success = finalize_single_documents_batch_with_progress(batch_id, progress_callback)
+
+        # Optionally create JSON sidecars for each markdown (Phase 2 enhancement integrated early)
+        if success and json_sidecar:
+            try:
+                _create_json_sidecars_for_batch(batch_id, force=force)
+            except Exception as side_e:
+                logger.error(f"Failed creating JSON sidecars for batch {batch_id}: {side_e}")
+
+        final_snapshot = _route_status_cache.get(batch_id, {}).copy()
+        final_snapshot['status'] = 'completed' if success else 'error'
+        final_snapshot['message'] = 'Export completed' if success else 'Export had errors (see logs)'
+        _merge_status(batch_id, final_snapshot)
+        return bool(success)
+    except Exception as e:
+        logger.exception(f"Unhandled export failure for batch {batch_id}: {e}")
+        fail_snapshot = {
+            'status': 'error',
+            'progress': 0,
+            'message': f'Failed: {e}',
+            'batch_id': batch_id
+        }
+        _merge_status(batch_id, fail_snapshot)
+        raise
+
+
+def _single_documents_export_job(job):
+    """Job handler for /export/finalize_single_documents_batch."""
+    payload = job.payload
+    return {'success': _run_single_documents_export(int(payload['batch_id']), bool(payload.get('force')), bool(payload.get('json_sidecar')))}
+
+
+register_job_handler('export.single_documents', _single_documents_export_job)
+
+
 @bp.route("/finalize_single_documents_batch/<int:batch_id>", methods=["POST"], endpoint='finalize_single_documents_batch')
 def finalize_single_documents_batch_route(batch_id: int):
     """Finalize ALL single-document records for this batch.
@@ -117,61 +188,11 @@ def finalize_single_documents_batch_route(batch_id: int):
             # Best-effort reset of previous export status and route cache for this batch
             export_service.reset_export_status(batch_id)
             with _route_status_lock:
-                if batch_id in _route_status_cache:
-                    del _route_status_cache[batch_id]
+                _route_status_cache.pop(batch_id, None)
         except Exception:
             # Non-fatal; continue with launching export
             pass
 
-        def progress_callback(current, total, message, details):
-            snapshot = {
-                'status': 'running' if current < total else 'completed',
-                'mode': 'single_documents',
-                'progress': int((current / total) * 100) if total else 0,
-                'message': message,
-                'details': details,
-                'current': current,
-                'total': total,
-                'batch_id': batch_id
-            }
-            _merge_status(batch_id, snapshot)
-
-        def worker():
-            try:
-                start_snapshot = {
-                    'status': 'starting',
-                    'mode': 'single_documents',
-                    'progress': 0,
-                    'message': 'Initializing export',
-                    'details': 'Preparing file list',
-                    'batch_id': batch_id
-                }
-                _merge_status(batch_id, start_snapshot)
-
-                # Delegate to processing layer (already handles tags, markdown)
-                success = finalize_single_documents_batch_with_progress(batch_id, progress_callback)
-
-                # Optionally create JSON sidecars for each markdown (Phase 2 enhancement integrated early)
-                if success and json_sidecar:
-                    try:
-                        _create_json_sidecars_for_batch(batch_id, force=force)
-                    except Exception as side_e:
-                        logger.error(f"Failed creating JSON sidecars for batch {batch_id}: {side_e}")
-
-                final_snapshot = _route_status_cache.get(batch_id, {}).copy()
-                final_snapshot['status'] = 'completed' if success else 'error'
-                final_snapshot['message'] = 'Export completed' if success else 'Export had errors (see logs)'
-                _merge_status(batch_id, final_snapshot)
-            except Exception as e:
-                logger.exception(f"Unhandled export failure for batch {batch_id}: {e}")
-                fail_snapshot = {
-                    'status': 'error',
-                    'progress': 0,
-                    'message': f'Failed: {e}',
-                    'batch_id': batch_id
-                }
-                _merge_status(batch_id, fail_snapshot)
-
         # Populate an initial 'starting' snapshot so polling clients see progress immediately
         try:
             init_snapshot = {
@@ -187,17 +208,19 @@ def finalize_single_documents_batch_route(batch_id: int):
             _merge_status(batch_id, init_snapshot)
         except Exception:
             pass
-        # In FAST_TEST_MODE we run the worker inline to make tests deterministic
-        # and avoid background thread scheduling delays causing test timeouts.
+        # In FAST_TEST_MODE we run the export inline to make tests deterministic
+        # and avoid background scheduling delays causing test timeouts.
+        job_id = None
         if getattr(app_config, 'FAST_TEST_MODE', False):
             try:
-                worker()
+                _run_single_documents_export(batch_id, force, json_sidecar)
             except Exception:
                 # Ensure any exception inside inline worker is logged by worker itself
                 pass
         else:
-            threading.Thread(target=worker, daemon=True).start()
-        return jsonify(create_success_response({'message': f'Started single-document export for batch {batch_id}', 'batch_id': batch_id, 'force': force, 'json_sidecar': json_sidecar}))
+            job_id = enqueue_job('export.single_documents', {'batch_id': batch_id, 'force': force, 'json_sidecar': json_sidecar},
+                                 idempotency_key=f'export.single_documents:{batch_id}')
+        return jsonify(create_success_response({'message': f'Started single-document export for batch {batch_id}', 'batch_id': batch_id, 'force': force, 'json_sidecar': json_sidecar, 'job_id': job_id}))
     except Exception as e:
         logger.error(f"Error launching single-doc export for batch {batch_id}: {e}")
         return jsonify(create_error_response(f"Failed to start export: {e}")), 500
@@ -264,9 +287,7 @@ def view_pdf(filename: str):
 
 def _asset_hash(path: str) -> str:
     try:
-        with open(path, 'rb') as f:
-            h = hashlib.sha256(f.read()).hexdigest()
-        return h[:8]
+        return fingerprint(path, 'full')[:8]
     except Exception:
         return ''
 
@@ -342,7 +363,7 @@ def api_export_progress():
     """
     try:
         with _route_status_lock:
-            return jsonify(create_success_response(_route_status_cache))
+            return jsonify(create_success_response(_route_status_cache.snapshot()))
     except Exception as e:
         logger.error(f"Error getting export progress: {e}")
         return jsonify(create_error_response(f"Failed to get progress: {str(e)}"))
@@ -415,9 +436,7 @@ def serve_original_pdf(filename: str):
     """Serve original PDF/image files from intake directory, with intelligent handling for converted images."""
     try:
         from ..config_manager import app_config
-        import tempfile
         from pathlib import Path
-        from PIL import Image
 
         # Files should be served from the intake directory for analysis
         intake_dir = app_config.INTAKE_DIR
@@ -432,90 +451,15 @@ def serve_original_pdf(filename: str):
         if not os.path.abspath(original_path).startswith(os.path.abspath(intake_dir)):
             return jsonify(create_error_response("Invalid file path")), 403
 
-        # Prefer durable mapping if available: intake_working_files maps filename -> working PDF path
-        try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS intake_working_files (filename TEXT PRIMARY KEY, working_pdf TEXT NOT NULL, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-            row = cur.execute("SELECT working_pdf FROM intake_working_files WHERE filename = ?", (filename,)).fetchone()
-            if row:
-                mapped_path = row[0]
-                if mapped_path and os.path.exists(mapped_path):
-                    logger.info(f"Serving mapped working PDF for {filename}: {mapped_path}")
-                    try:
-                        conn.close()
-                    except Exception:
-                        pass
-                    return send_file(mapped_path, mimetype='application/pdf', as_attachment=False)
-            try:
-                conn.close()
-            except Exception:
-                pass
-        except Exception as map_err:
-            logger.debug(f"Working-file mapping lookup failed for {filename}: {map_err}")
-            try:
-                conn.close()
-            except Exception:
-                pass
-
-        # If the file is already a PDF, serve it directly
+        # Serve the working PDF (mapped/standardized PDF, or the image converted on demand);
+        # resolution is cached in memory and persisted in intake_working_files only on change
         file_ext = Path(original_path).suffix.lower()
-        if file_ext == '.pdf':
-            return send_file(original_path, mimetype='application/pdf', as_attachment=False)
-
-        # If the file is an image, ensure we serve a PDF (convert on-demand if needed)
-        if file_ext in ['.png', '.jpg', '.jpeg']:
-            # Prefer test-scoped tempdir when available
-            tmpdir = select_tmp_dir()
-            try:
-                os.makedirs(tmpdir, exist_ok=True)
-            except Exception:
-                # fallback to system temp
-                import tempfile as _temp
-                tmpdir = _temp.gettempdir()
-            image_name = Path(filename).stem
-            converted_pdf_path = os.path.join(tmpdir, f"{image_name}_converted.pdf")
-
-            if not os.path.exists(converted_pdf_path):
-                try:
-                    # Convert image to PDF on-demand
-                    with Image.open(original_path) as img:
-                        # Normalize to RGB
-                        if img.mode in ('RGBA', 'LA', 'P'):
-                            from PIL import Image as PILImage
-                            # Some type checkers prefer int color; the library accepts both
-                            rgb_img = PILImage.new('RGB', img.size, 0xFFFFFF)
-                            if img.mode == 'P':
-                                img = img.convert('RGBA')
-                            rgb_img.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                            img = rgb_img
-                        elif img.mode != 'RGB':
-                            img = img.convert('RGB')
-                        img.save(converted_pdf_path, 'PDF', resolution=150.0, quality=95)
-                    logger.info(f"On-demand converted {filename} -> {converted_pdf_path}")
-                    # Persist mapping after conversion
-                    try:
-                        conn = get_db_connection()
-                        cur = conn.cursor()
-                        cur.execute("CREATE TABLE IF NOT EXISTS intake_working_files (filename TEXT PRIMARY KEY, working_pdf TEXT NOT NULL, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-                        cur.execute("UPDATE intake_working_files SET working_pdf = ?, updated_at = CURRENT_TIMESTAMP WHERE filename = ?", (converted_pdf_path, filename))
-                        if cur.rowcount == 0:
-                            cur.execute("INSERT INTO intake_working_files (filename, working_pdf) VALUES (?, ?)", (filename, converted_pdf_path))
-                        conn.commit()
-                        conn.close()
-                    except Exception as db_err:
-                        logger.debug(f"Failed to persist on-demand mapping for {filename}: {db_err}")
-                        try:
-                            conn.close()
-                        except Exception:
-                            pass
-                except Exception as conv_err:
-                    logger.error(f"Failed to convert image {filename} to PDF on-demand: {conv_err}")
-                    # Fall back to serving the original image to avoid total failure
-                    return send_file(original_path)
-
-            # Serve the converted PDF
-            return send_file(converted_pdf_path, mimetype='application/pdf', as_attachment=False)
+        if file_ext in ['.pdf', '.png', '.jpg', '.jpeg']:
+            working_pdf = resolve_working_pdf_path(filename, intake_dir)
+            if working_pdf.lower().endswith('.pdf') and os.path.exists(working_pdf):
+                return send_file(working_pdf, mimetype='application/pdf', as_attachment=False)
+            # Conversion failed: fall back to serving the original image to avoid total failure
+            return send_file(original_path)
 
         # For other file types, serve the original
         return send_file(original_path)
@@ -556,8 +500,9 @@ def _create_json_sidecars_for_batch(batch_id: int, force: bool = False):
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        rows = cur.execute("""
-            SELECT id, final_category, final_filename, ai_suggested_category, ai_suggested_filename, ai_confidence, ai_summary
+        rows = cur.execute(f"""
+            SELECT id, final_category, final_filename, ai_suggested_category, ai_suggested_filename, ai_confidence,
+                   {document_text_sql('single_document', 'ai_summary')} AS ai_summary
             FROM single_documents WHERE batch_id = ?
         """, (batch_id,)).fetchall()
         for r in rows:
@@ -16,12 +16,14 @@ from ..database import get_db_connection
 from ..processing import database_connection
 from ..batch_guard import get_or_create_intake_batch
 from ..utils.path_utils import select_tmp_dir
+from ..event_bus import get_active_run, get_or_start_run, parse_run_event_id, format_sse
+from ..working_files import resolve_working_pdf_path, resolve_working_pdf_paths
+from ..scheduler import ocr_gate
 import logging
 import json
 import os
 from pathlib import Path
 import time
-import threading
 import tempfile
 
 # Create blueprint for intake routes
@@ -37,134 +39,80 @@ def _resolve_working_pdf_path(original_filename: str) -> str:
     Rules:
     - If original is an image (jpg/png/jpeg): use /tmp/{stem}_converted.pdf (perform conversion if missing)
     - If original is a PDF: prefer /tmp/{stem}_standardized.pdf if it exists; otherwise return the original PDF path
+
+    Resolution is cached in memory and validated by file fingerprint; see `working_files`.
     """
-    try:
-        # PIL.Image is only conditionally used; import inside try and set to None if unavailable
-        try:
-            from PIL import Image
-        except Exception:
-            Image = None
-    except Exception:
-        Image = None
+    return resolve_working_pdf_path(original_filename, app_config.INTAKE_DIR)
 
-    orig_path = os.path.join(app_config.INTAKE_DIR, original_filename)
-    stem = Path(original_filename).stem
-    ext = Path(original_filename).suffix.lower()
-    tmp_dir = select_tmp_dir()
-    try:
-        os.makedirs(tmp_dir, exist_ok=True)
-    except Exception:
-        pass
 
-    # First, try to resolve from durable DB mapping if available
-    mapped_path = None
+def _load_persisted_rotations() -> dict:
+    """Return {filename: rotation} saved by the intake viewer (empty on error)."""
+    persisted = {}
+    conn = None
     try:
         conn = get_db_connection()
         cur = conn.cursor()
-        cur.execute("CREATE TABLE IF NOT EXISTS intake_working_files (filename TEXT PRIMARY KEY, working_pdf TEXT NOT NULL, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-        row = cur.execute("SELECT working_pdf FROM intake_working_files WHERE filename = ?", (original_filename,)).fetchone()
-        if row:
-            candidate = row[0]
-            if candidate and os.path.exists(candidate):
-                mapped_path = candidate
-        conn.close()
-    except Exception as db_err:
-        logging.debug(f"intake_working_files lookup failed for {original_filename}: {db_err}")
+        cur.execute("CREATE TABLE IF NOT EXISTS intake_rotations (filename TEXT PRIMARY KEY, rotation INTEGER NOT NULL DEFAULT 0, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
+        for row in cur.execute("SELECT filename, rotation FROM intake_rotations"):
+            persisted[row[0]] = int(row[1])
+    except Exception:
+        pass
+    finally:
         try:
-            conn.close()
+            if conn:
+                conn.close()
         except Exception:
             pass
+    return persisted
+
+
+def _analysis_to_dict(analysis, persisted: dict) -> dict:
+    """Serializable form of a DocumentAnalysis as stored in the intake cache / sent over SSE."""
+    filename_only = os.path.basename(analysis.file_path)
+    return {
+        'filename': filename_only,
+        'file_size_mb': analysis.file_size_mb,
+        'page_count': analysis.page_count,
+        'processing_strategy': analysis.processing_strategy,
+        'confidence': analysis.confidence,
+        'reasoning': analysis.reasoning,
+        'filename_hints': analysis.filename_hints,
+        'content_sample': analysis.content_sample,
+        'llm_analysis': analysis.llm_analysis,
+        'detected_rotation': persisted.get(filename_only, analysis.detected_rotation)
+    }
 
-    if mapped_path:
-        return mapped_path
-
-    if ext in {'.jpg', '.jpeg', '.png'}:
-        converted = os.path.join(tmp_dir, f"{stem}_converted.pdf")
-        if os.path.exists(converted):
-            # Backfill mapping if missing
-            try:
-                conn = get_db_connection()
-                cur = conn.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS intake_working_files (filename TEXT PRIMARY KEY, working_pdf TEXT NOT NULL, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-                cur.execute("UPDATE intake_working_files SET working_pdf = ?, updated_at = CURRENT_TIMESTAMP WHERE filename = ?", (converted, original_filename))
-                if cur.rowcount == 0:
-                    cur.execute("INSERT INTO intake_working_files (filename, working_pdf) VALUES (?, ?)", (original_filename, converted))
-                conn.commit()
-                conn.close()
-            except Exception as db_err:
-                logging.debug(f"Failed to backfill mapping for {original_filename}: {db_err}")
-                try:
-                    conn.close()
-                except Exception:
-                    pass
-            return converted
-        # Convert on-demand if missing
-        if Image is None:
-            # Fallback: if conversion unavailable, use original (downstream viewers may still cope)
-            return orig_path
-        try:
-            with Image.open(orig_path) as img:
-                rgb = img.convert('RGB') if img.mode != 'RGB' else img
-                rgb.save(converted, format='PDF')
-            logging.info(f"On-demand conversion: {original_filename} -> {converted}")
-            # Persist mapping
-            try:
-                conn = get_db_connection()
-                cur = conn.cursor()
-                cur.execute("CREATE TABLE IF NOT EXISTS intake_working_files (filename TEXT PRIMARY KEY, working_pdf TEXT NOT NULL, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-                cur.execute("UPDATE intake_working_files SET working_pdf = ?, updated_at = CURRENT_TIMESTAMP WHERE filename = ?", (converted, original_filename))
-                if cur.rowcount == 0:
-                    cur.execute("INSERT INTO intake_working_files (filename, working_pdf) VALUES (?, ?)", (original_filename, converted))
-                conn.commit()
-                conn.close()
-            except Exception as db_err:
-                logging.debug(f"Failed to persist mapping for {original_filename}: {db_err}")
-                try:
-                    conn.close()
-                except Exception:
-                    pass
-            return converted
-        except Exception as e:
-            logging.error(f"Failed to convert image to PDF for {original_filename}: {e}")
-            return orig_path
-    elif ext == '.pdf':
-        standardized = os.path.join(tmp_dir, f"{stem}_standardized.pdf")
-        path_to_use = standardized if os.path.exists(standardized) else orig_path
-        # Persist or backfill mapping for PDFs too (so viewer and rescans use standardized when present)
-        try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS intake_working_files (filename TEXT PRIMARY KEY, working_pdf TEXT NOT NULL, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-            cur.execute("UPDATE intake_working_files SET working_pdf = ?, updated_at = CURRENT_TIMESTAMP WHERE filename = ?", (path_to_use, original_filename))
-            if cur.rowcount == 0:
-                cur.execute("INSERT INTO intake_working_files (filename, working_pdf) VALUES (?, ?)", (original_filename, path_to_use))
-            conn.commit()
-            conn.close()
-        except Exception as db_err:
-            logging.debug(f"Failed to persist mapping for PDF {original_filename}: {db_err}")
-            try:
-                conn.close()
-            except Exception:
-                pass
-        return path_to_use
-    else:
-        # Unknown type, return original
-        return orig_path
 
+def background_analysis_worker(intake_dir, cache_file, batch_id=None, on_result=None):
+    """Module-level background worker that performs analysis and writes cache atomically.
 
-def background_analysis_worker(intake_dir, cache_file, batch_id=None):
-    """Module-level background worker that performs analysis and writes cache atomically."""
+    `on_result(analysis_data, completed, total, cached)` receives each file's
+    serialized analysis as soon as it is available. Returns the full list of
+    serialized analyses (None if the worker failed).
+    """
+    analyses_data = None
     try:
         logging.info(f"Background analysis worker starting for {intake_dir}")
+        # Taken before analysing: files changed meanwhile make the cache stale
+        signature = _intake_signature(intake_dir)
         detector = get_detector(use_llm_for_ambiguous=True)
         analyses = None
+        # load persisted rotations
+        persisted = _load_persisted_rotations()
         # Prefer bulk analyze if available; otherwise fall back to per-file analyze
         try:
             if hasattr(detector, 'analyze_intake_directory'):
-                analyses = detector.analyze_intake_directory(intake_dir)
+                if on_result is not None:
+                    analyses = detector.analyze_intake_directory(
+                        intake_dir,
+                        on_result=lambda a, done, total, cached: on_result(_analysis_to_dict(a, persisted), done, total, cached),
+                    )
+                else:
+                    analyses = detector.analyze_intake_directory(intake_dir)
             else:
                 analyses = []
-                for fn in os.listdir(intake_dir):
+                names = _list_intake_files(intake_dir)
+                for fn in names:
                     path = os.path.join(intake_dir, fn)
                     ext = os.path.splitext(fn)[1].lower()
                     # Convert images to PDFs when possible for analyzer
@@ -182,6 +130,8 @@ def background_analysis_worker(intake_dir, cache_file, batch_id=None):
                         continue
                     if analysis:
                         analyses.append(analysis)
+                        if on_result is not None:
+                            on_result(_analysis_to_dict(analysis, persisted), len(analyses), len(names), False)
         except Exception as e:
             logging.error(f"Detector analysis failed: {e}")
             analyses = []
@@ -190,35 +140,8 @@ def background_analysis_worker(intake_dir, cache_file, batch_id=None):
         analyses_data = []
         single_count = 0
         batch_count = 0
-        # load persisted rotations
-        persisted = {}
-        try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute("CREATE TABLE IF NOT EXISTS intake_rotations (filename TEXT PRIMARY KEY, rotation INTEGER NOT NULL DEFAULT 0, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)")
-            for row in cur.execute("SELECT filename, rotation FROM intake_rotations"):
-                persisted[row[0]] = int(row[1])
-        except Exception:
-            try:
-                conn.close()
-            except Exception:
-                pass
-
         for analysis in analyses:
-            filename_only = os.path.basename(analysis.file_path)
-            detected_rot = persisted.get(filename_only, analysis.detected_rotation)
-            analysis_data = {
-                'filename': filename_only,
-                'file_size_mb': analysis.file_size_mb,
-                'page_count': analysis.page_count,
-                'processing_strategy': analysis.processing_strategy,
-                'confidence': analysis.confidence,
-                'reasoning': analysis.reasoning,
-                'filename_hints': analysis.filename_hints,
-                'content_sample': analysis.content_sample,
-                'llm_analysis': analysis.llm_analysis,
-                'detected_rotation': detected_rot
-            }
+            analysis_data = _analysis_to_dict(analysis, persisted)
             analyses_data.append(analysis_data)
             if analysis.processing_strategy == 'single_document':
                 single_count += 1
@@ -232,6 +155,9 @@ def background_analysis_worker(intake_dir, cache_file, batch_id=None):
             with open(tmp_target, 'wb') as f:
                 _pickle.dump(analyses_data, f)
             os.replace(tmp_target, cache_file)
+            with open(tmp_target, 'w') as f:
+                json.dump(signature, f)
+            os.replace(tmp_target, f"{cache_file}.sig")
             logging.info(f"Background analysis cached to {cache_file}")
         except Exception as e:
             logging.warning(f"Failed to atomically write cache in background worker: {e}")
@@ -258,6 +184,7 @@ def background_analysis_worker(intake_dir, cache_file, batch_id=None):
                 os.remove(lf)
         except Exception:
             pass
+    return analyses_data
 
 @intake_bp.route("/analyze_intake")
 def analyze_intake_page():
@@ -304,7 +231,7 @@ def analyze_intake_page():
         import tempfile
         import pickle
         cache_file = os.path.join(select_tmp_dir(), 'intake_analysis_cache.pkl')
-        if os.path.exists(cache_file):
+        if _cache_is_current(cache_file, app_config.INTAKE_DIR):
             with open(cache_file, 'rb') as f:
                 cached_analyses = pickle.load(f)
             logging.info("Loaded cached analysis results")
@@ -365,6 +292,132 @@ def ensure_active_batch():
         logging.error(f"ensure_active_batch failed: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+INTAKE_ANALYSIS_RUN_KEY = 'intake_analysis'
+_SSE_MAX_WAIT_SECONDS = 30 * 60
+
+
+def _summarize_analyses(analyses: list) -> dict:
+    return {
+        'analyses': analyses,
+        'total': len(analyses),
+        'single_count': sum(1 for a in analyses if a.get('processing_strategy') == 'single_document'),
+        'batch_count': sum(1 for a in analyses if a.get('processing_strategy') != 'single_document'),
+        'success': True,
+    }
+
+
+def _complete_payload_from_cache(cache_file: str) -> dict:
+    try:
+        import pickle
+        with open(cache_file, 'rb') as f:
+            analyses = pickle.load(f)
+        return dict(_summarize_analyses(analyses), complete=True)
+    except Exception as e:
+        return {'error': str(e), 'success': False}
+
+
+def _poll_cache_file(cache_file: str, intake_dir: str, timeout_seconds: int = 300):
+    """Legacy wait loop for analyses running in another process: poll for a current cache file."""
+    waited = 0
+    while not _cache_is_current(cache_file, intake_dir):
+        # Keep-alive comment to avoid client timeouts
+        yield ": keep-alive\n\n"
+        time.sleep(1)
+        waited += 1
+        if waited > timeout_seconds:
+            yield f"data: {json.dumps({'error': 'Timeout waiting for analysis to complete', 'success': False})}\n\n"
+            return
+    yield f"data: {json.dumps(_complete_payload_from_cache(cache_file))}\n\n"
+
+
+def _list_intake_files(intake_dir: str) -> list:
+    try:
+        return [f for f in os.listdir(intake_dir) if os.path.splitext(f)[1].lower() in ['.pdf', '.png', '.jpg', '.jpeg']]
+    except Exception:
+        return []
+
+
+def _intake_signature(intake_dir: str) -> list:
+    """Directory plus (name, size, mtime) of every intake file the analysis covers."""
+    entries = []
+    for name in sorted(_list_intake_files(intake_dir)):
+        try:
+            st = os.stat(os.path.join(intake_dir, name))
+        except OSError:
+            continue
+        entries.append([name, st.st_size, st.st_mtime_ns])
+    return [os.path.abspath(intake_dir), entries]
+
+
+def _cache_is_current(cache_file: str, intake_dir: str) -> bool:
+    """True when the cached analysis was made from the intake directory as it is now."""
+    if not os.path.exists(cache_file):
+        return False
+    try:
+        with open(f"{cache_file}.sig") as f:
+            return json.load(f) == _intake_signature(intake_dir)
+    except Exception:
+        return False
+
+
+def start_shared_intake_analysis(intake_dir=None):
+    """Join the in-process intake analysis run, or start one.
+
+    Every SSE client (and the JSON API / intake watcher) shares a single run:
+    per-file results are published to the event bus as soon as each file is
+    analysed, with progress and an ETA, and the final event carries the full
+    result set. The lock file is still written so other processes see the
+    analysis is in progress.
+
+    Returns:
+        (EventRun, bool): the run and whether this call started it.
+    """
+    intake_dir = intake_dir or app_config.INTAKE_DIR
+    tmp_dir = select_tmp_dir()
+    os.makedirs(tmp_dir, exist_ok=True)
+    cache_file = os.path.join(tmp_dir, 'intake_analysis_cache.pkl')
+    lock_file = os.path.join(tmp_dir, 'intake_analysis_in_progress.lock')
+
+    def _target(run):
+        try:
+            with open(lock_file, 'w') as lf:
+                lf.write(str(time.time()))
+        except Exception:
+            pass
+        started = time.time()
+        fresh_done = [0]
+
+        def _publish(analysis_data, done, total, cached):
+            elapsed = time.time() - started
+            eta = None
+            if not cached:
+                fresh_done[0] += 1
+            if fresh_done[0]:
+                # Cached results are free; extrapolate from freshly analysed files only
+                eta = round(elapsed / fresh_done[0] * max(total - done, 0), 1)
+            message = f"Analyzed {analysis_data.get('filename')} ({done}/{total})"
+            if eta is not None and done < total:
+                message += f", about {int(eta)}s remaining"
+            run.publish({
+                'file_result': analysis_data,
+                'cached': cached,
+                'pdf_progress': done,
+                'pdf_total': total,
+                'current_file': analysis_data.get('filename'),
+                'message': message,
+                'eta_seconds': eta,
+                'elapsed_seconds': round(elapsed, 1),
+            })
+
+        analyses = background_analysis_worker(intake_dir, cache_file, on_result=_publish)
+        if analyses is None:
+            run.finish({'error': 'Intake analysis failed', 'success': False})
+        else:
+            run.finish(dict(_summarize_analyses(analyses), complete=True))
+
+    return get_or_start_run(INTAKE_ANALYSIS_RUN_KEY, _target, total=len(_list_intake_files(intake_dir)))
+
+
 @intake_bp.route("/api/analyze_intake_progress")
 def analyze_intake_progress():
     """
@@ -377,11 +430,13 @@ def analyze_intake_progress():
         _remote_addr = request.remote_addr
     except Exception:
         _remote_addr = None
+    # EventSource reconnects send the id of the last event they received
+    _last_event_id = request.headers.get('Last-Event-ID')
 
     
 
     def generate_progress():
-        """SSE generator that spawns background analysis and polls for cached results."""
+        """SSE generator that joins (or starts) the shared analysis run and forwards per-file results."""
         logging.info(f"SSE connection opened for analyze_intake_progress from {_remote_addr}")
 
         intake_dir = app_config.INTAKE_DIR
@@ -395,67 +450,43 @@ def analyze_intake_progress():
         cache_file = os.path.join(tmp_dir, 'intake_analysis_cache.pkl')
         lock_file = os.path.join(tmp_dir, 'intake_analysis_in_progress.lock')
 
-        # If no analysis in progress and no cache, start background worker
-        if not os.path.exists(cache_file) and not os.path.exists(lock_file):
-            try:
-                # create lock file to indicate work started
-                with open(lock_file, 'w') as lf:
-                    lf.write(str(time.time()))
-            except Exception:
-                pass
-            try:
-                t = threading.Thread(target=background_analysis_worker, args=(intake_dir, cache_file), daemon=True)
-                t.start()
-                logging.info("Spawned background analysis thread")
-            except Exception as e:
-                logging.warning(f"Failed to spawn background analysis thread: {e}")
-
-        # Emit queued message then poll for cache; send keep-alive comments while waiting
         try:
+            run = get_active_run(INTAKE_ANALYSIS_RUN_KEY)
+            cached = run is None and _cache_is_current(cache_file, intake_dir)
+            waiting_elsewhere = run is None and not cached and os.path.exists(lock_file)
+            if run is None and not cached and not waiting_elsewhere:
+                run, _started = start_shared_intake_analysis(intake_dir)
+
             # Emit an initial PDF-centric progress payload so clients/tests can
             # immediately know how many PDFs (or converted images) we expect.
-            try:
-                files = [f for f in os.listdir(intake_dir) if os.path.splitext(f)[1].lower() in ['.pdf', '.png', '.jpg', '.jpeg']]
-                pdf_total = len(files)
-            except Exception:
-                pdf_total = 0
-            # Initial progress = 0
-            try:
-                payload_init = {'queued': True, 'message': 'Analysis started in background', 'pdf_progress': 0, 'pdf_total': pdf_total}
-                yield f"data: {json.dumps(payload_init)}\n\n"
-            except Exception:
-                # Fallback queued payload
-                payload = {'queued': True, 'message': 'Analysis started in background'}
-                yield f"data: {json.dumps(payload)}\n\n"
-            # Poll for cache or final result
-            waited = 0
-            while True:
-                if os.path.exists(cache_file):
-                    try:
-                        import pickle
-                        with open(cache_file, 'rb') as f:
-                            analyses = pickle.load(f)
-                        complete_payload = {
-                            'complete': True,
-                            'analyses': analyses,
-                            'total': len(analyses),
-                            'single_count': sum(1 for a in analyses if a.get('processing_strategy') == 'single_document'),
-                            'batch_count': sum(1 for a in analyses if a.get('processing_strategy') != 'single_document'),
-                            'success': True
-                        }
-                        yield f"data: {json.dumps(complete_payload)}\n\n"
-                    except Exception as e:
-                        yield f"data: {json.dumps({'error': str(e), 'success': False})}\n\n"
-                    break
-
-                # Keep-alive comment to avoid client timeouts
-                yield f": keep-alive\n\n"
-                time.sleep(1)
-                waited += 1
-                # Safety timeout: after ~5 minutes stop polling
-                if waited > 300:
-                    yield f"data: {json.dumps({'error': 'Timeout waiting for analysis to complete', 'success': False})}\n\n"
-                    break
+            payload_init = {'queued': True, 'message': 'Analysis started in background', 'pdf_progress': 0,
+                            'pdf_total': len(_list_intake_files(intake_dir))}
+            if run is not None:
+                payload_init.update(pdf_total=run.total or 0, run_id=run.run_id)
+            elif cached:
+                payload_init['message'] = 'Analysis results cached'
+            yield f"data: {json.dumps(payload_init)}\n\n"
+
+            if cached:
+                # Finished result set for the current intake contents and nothing running
+                yield f"data: {json.dumps(_complete_payload_from_cache(cache_file))}\n\n"
+                return
+            if waiting_elsewhere:
+                # Started by another process (no in-process run to join): poll its cache file
+                yield from _poll_cache_file(cache_file, intake_dir)
+                return
+
+            # Resume after the last event this client saw (same run), else replay from the start
+            index = parse_run_event_id(_last_event_id, run)
+            for event in run.subscribe(keepalive_seconds=15.0, max_wait_seconds=_SSE_MAX_WAIT_SECONDS, start_index=index):
+                if event is None:
+                    # Keep-alive comment to avoid client timeouts
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, f"{run.run_id}:{index}")
+                index += 1
+            if not run.done:
+                yield f"data: {json.dumps({'error': 'Timeout waiting for analysis to complete', 'success': False})}\n\n"
         finally:
             try:
                 logging.info(f"SSE connection closed for analyze_intake_progress from {_remote_addr}")
@@ -501,8 +532,8 @@ def analyze_intake_api():
         cache_file = os.path.join(select_tmp_dir(), 'intake_analysis_cache.pkl')
         lock_file = os.path.join(select_tmp_dir(), 'intake_analysis_in_progress.lock')
 
-        # If cache is already present, return it synchronously
-        if os.path.exists(cache_file):
+        # If the cache matches the intake contents, return it synchronously
+        if get_active_run(INTAKE_ANALYSIS_RUN_KEY) is None and _cache_is_current(cache_file, app_config.INTAKE_DIR):
             try:
                 import pickle
                 with open(cache_file, 'rb') as f:
@@ -526,20 +557,16 @@ def analyze_intake_api():
                 logging.warning(f"Failed to read existing analysis cache: {e}")
 
         # If an analysis is in progress, respond with 202 Accepted
-        if os.path.exists(lock_file):
+        if os.path.exists(lock_file) and get_active_run(INTAKE_ANALYSIS_RUN_KEY) is None:
             return jsonify({'accepted': True, 'message': 'Analysis already in progress'}), 202
 
-        # Start analysis in background and return 202
+        # Join or start the shared analysis run and return 202
         try:
-            try:
-                with open(lock_file, 'w') as lf:
-                    lf.write(str(time.time()))
-            except Exception:
-                pass
-            t = threading.Thread(target=background_analysis_worker, args=(app_config.INTAKE_DIR, cache_file), daemon=True)
-            t.start()
-            logging.info("Started background analysis from analyze_intake_api")
-            return jsonify({'accepted': True, 'message': 'Analysis started in background'}), 202
+            run, started = start_shared_intake_analysis(app_config.INTAKE_DIR)
+            if started:
+                logging.info("Started background analysis from analyze_intake_api")
+                return jsonify({'accepted': True, 'message': 'Analysis started in background', 'run_id': run.run_id}), 202
+            return jsonify({'accepted': True, 'message': 'Analysis already in progress', 'run_id': run.run_id}), 202
         except Exception as e:
             logging.error(f"Failed to start background analysis: {e}")
             return jsonify({'error': str(e), 'success': False}), 500
@@ -561,7 +588,7 @@ def intake_viewer_ready():
         import os
         import pickle
         cache_file = os.path.join(select_tmp_dir(), 'intake_analysis_cache.pkl')
-        if os.path.exists(cache_file):
+        if _cache_is_current(cache_file, app_config.INTAKE_DIR):
             try:
                 with open(cache_file, 'rb') as f:
                     analyses = pickle.load(f)
@@ -575,6 +602,33 @@ def intake_viewer_ready():
         logging.error(f'Error in intake_viewer_ready: {e}')
         return jsonify({'ready': False, 'count': 0, 'error': str(e)}), 500
 
+@intake_bp.route('/api/intake_working_files')
+def intake_working_files():
+    """
+    Resolve the working PDF of many intake files in one call (for listing pages).
+
+    Query: ?filenames=a.pdf,b.jpg (defaults to every supported file in the intake folder).
+    Returns {filename: {"working_pdf": path, "converted": bool}}.
+    """
+    try:
+        requested = request.args.get('filenames')
+        if requested:
+            filenames = [os.path.basename(f.strip()) for f in requested.split(',') if f.strip()]
+        else:
+            filenames = _list_intake_files(app_config.INTAKE_DIR)
+        resolved = resolve_working_pdf_paths(filenames, app_config.INTAKE_DIR)
+        working_files = {
+            name: {
+                'working_pdf': path,
+                'converted': os.path.abspath(path) != os.path.abspath(os.path.join(app_config.INTAKE_DIR, name)),
+            }
+            for name, path in resolved.items()
+        }
+        return jsonify({'success': True, 'count': len(working_files), 'working_files': working_files})
+    except Exception as e:
+        logging.error(f'Error in intake_working_files: {e}')
+        return jsonify({'error': str(e), 'success': False}), 500
+
 @intake_bp.route("/rescan_ocr", methods=["POST"])
 def rescan_ocr():
     """
@@ -719,7 +773,8 @@ def _rescan_pdf_ocr(file_path: str, rotation: int, quality: str = 'default') ->
             # Run Tesseract OCR with tuned config for better accuracy
             tesseract_config = "--oem 1 --psm 6"  # LSTM-only, assume a block of text
             try:
-                page_text = pytesseract.image_to_string(page_img, config=tesseract_config)
+                with ocr_gate.slot():
+                    page_text = pytesseract.image_to_string(page_img, config=tesseract_config)
             except Exception as te:
                 logging.warning(f"Tesseract OCR error on page {page_idx + 1}: {te}")
                 page_text = ""
@@ -736,7 +791,8 @@ def _rescan_pdf_ocr(file_path: str, rotation: int, quality: str = 'default') ->
                     except ImportError:
                         from processing import EasyOCRSingleton
                         reader = EasyOCRSingleton.get_reader()
-                    ocr_results = reader.readtext(np.array(page_img))
+                    with ocr_gate.slot():
+                        ocr_results = reader.readtext(np.array(page_img))
                     if ocr_results:
                         eo_text = " ".join([t for (_, t, _) in ocr_results]).strip()
                         if eo_text and len(eo_text) > 10:
@@ -788,7 +844,8 @@ def _rescan_image_ocr(file_path: str, rotation: int) -> str:
             except ImportError:
                 from processing import EasyOCRSingleton
                 reader = EasyOCRSingleton.get_reader()
-            ocr_results = reader.readtext(np.array(img))
+            with ocr_gate.slot():
+                ocr_results = reader.readtext(np.array(img))
 
             if ocr_results:
                 text = " ".join([text for (_, text, _) in ocr_results])
@@ -21,7 +21,9 @@ from ..database import (
     log_interaction,
     update_page_rotation,
     get_single_documents_for_batch,
+    get_single_document_text,
     get_documents_for_batch,
+    document_text_sql,
 )
 from ..utils.helpers import create_error_response, create_success_response
 from ..config_manager import app_config
@@ -580,7 +582,8 @@ def manipulate_batch_documents(batch_id: int, doc_num: Optional[int] = None):
         row = documents[current_doc_num - 1]
 
         if using_single:
-            # Row ordering defined in accessor
+            # Row ordering defined in accessor; large text fields are loaded for the current doc only
+            doc_text = get_single_document_text(row['id'])
             current_doc = {
                 'id': row['id'],
                 'original_filename': row['original_filename'],
@@ -588,8 +591,8 @@ def manipulate_batch_documents(batch_id: int, doc_num: Optional[int] = None):
                 'ai_suggested_category': row['ai_suggested_category'],
                 'ai_suggested_filename': row['ai_suggested_filename'],
                 'ai_confidence': row['ai_confidence'],
-                'ai_summary': row['ai_summary'],
-                'ocr_text': row['ocr_text'],
+                'ai_summary': doc_text['ai_summary'],
+                'ocr_text': doc_text['ocr_text'],
                 'ocr_confidence_avg': row['ocr_confidence_avg'],
                 'final_category': row.get('final_category') if isinstance(row, dict) else (row['final_category'] if 'final_category' in row.keys() else None),
                 'final_filename': row.get('final_filename') if isinstance(row, dict) else (row['final_filename'] if 'final_filename' in row.keys() else None),
@@ -604,8 +607,8 @@ def manipulate_batch_documents(batch_id: int, doc_num: Optional[int] = None):
                 conn = get_db_connection()
                 cur = conn.cursor()
                 # Get first linked page id
-                cur.execute("""
-                    SELECT p.ocr_text, p.ocr_confidence_avg
+                cur.execute(f"""
+                    SELECT {document_text_sql('page', 'ocr_text', 'p')}, p.ocr_confidence_avg
                     FROM pages p JOIN document_pages dp ON p.id = dp.page_id
                     WHERE dp.document_id = ?
                     ORDER BY dp.sequence ASC LIMIT 1
@@ -0,0 +1,229 @@
+"""
+Priority lanes for the shared OCR and LLM capacity.
+
+A "rescan", a page rotation or the viewer used to compete on equal terms with
+a 500-page background batch for Tesseract/EasyOCR and the LLM, so an operator
+could wait minutes for one page. OCR and LLM calls now go through a
+`PriorityGate` per resource (`ocr_gate`, `llm_gate`):
+
+- a gate has a number of slots (SCHEDULER_OCR_SLOTS / SCHEDULER_LLM_SLOTS,
+  read on every acquire; the load governor overrides them via `set_limit`);
+- callers take a slot per unit of work (one page, one LLM request), so
+  background work yields at page boundaries;
+- waiters in the `interactive` lane are served first: while any is waiting,
+  `background` waiters do not get a slot, even a free one.
+
+The lane comes from `lane(...)` when set, otherwise work done inside a Flask
+request is interactive and everything else (job workers, pipelines, CLI
+runners) is background; a request that streams a whole batch wraps it in
+`iterate_in_lane(BACKGROUND, ...)`. Slots are re-entrant per thread, so nested helpers
+that also acquire the same gate do not deadlock. A waiter whose cancellation
+token (see `cancellation`) is cancelled leaves the queue with
+OperationCancelled.
+
+Per-lane queue wait times are kept for `/admin/api/scheduler` (see
+`get_scheduler_stats`). Gates are per process; detection runs in its own
+process pool and is not gated.
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, Iterator, Optional
+
+try:
+    from .cancellation import CANCEL_POLL_SECONDS, OperationCancelled, current_token
+except ImportError:
+    from cancellation import CANCEL_POLL_SECONDS, OperationCancelled, current_token
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+LANES = (INTERACTIVE, BACKGROUND)
+
+_RECENT_WAITS = 256
+_RECHECK_SECONDS = 1.0
+
+_lane_override: contextvars.ContextVar = contextvars.ContextVar('scheduler_lane', default=None)
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def current_lane() -> str:
+    """Lane of the calling code (explicit `lane(...)`, else request -> interactive)."""
+    explicit = _lane_override.get()
+    if explicit:
+        return explicit
+    try:
+        from flask import has_request_context
+        if has_request_context():
+            return INTERACTIVE
+    except ImportError:
+        pass
+    return BACKGROUND
+
+
+@contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Run the block in lane `name` (e.g. a request handler kicking off bulk work)."""
+    if name not in LANES:
+        raise ValueError(f"Unknown scheduler lane: {name}")
+    token = _lane_override.set(name)
+    try:
+        yield
+    finally:
+        _lane_override.reset(token)
+
+
+def iterate_in_lane(name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+    """Yield from `iterable`, producing every item in lane `name`.
+
+    For generators driven from a request (e.g. an SSE stream running a whole
+    batch) that must not count as interactive work. The lane is set only
+    while the wrapped generator runs, never across our own yields.
+    """
+    iterator = iter(iterable)
+    while True:
+        with lane(name):
+            try:
+                item = next(iterator)
+            except StopIteration as stop:
+                return stop.value
+        yield item
+
+
+class _LaneStats:
+    def __init__(self):
+        self.waiting = 0
+        self.running = 0
+        self.acquired = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.recent: Deque[float] = deque(maxlen=_RECENT_WAITS)
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquired += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+        self.recent.append(seconds)
+
+    def as_dict(self) -> dict:
+        recent = sorted(self.recent)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            'waiting': self.waiting,
+            'running': self.running,
+            'acquired': self.acquired,
+            'wait_avg_ms': round(self.wait_total / self.acquired * 1000, 1) if self.acquired else 0.0,
+            'wait_p95_ms': round(p95 * 1000, 1),
+            'wait_max_ms': round(self.wait_max * 1000, 1),
+        }
+
+
+class PriorityGate:
+    """Counting semaphore whose waiters are served interactive lane first."""
+
+    def __init__(self, name: str, slots_setting: str, default_slots: int):
+        self.name = name
+        self.slots_setting = slots_setting
+        self.default_slots = default_slots
+        self._cond = threading.Condition()
+        self._limit: Optional[int] = None
+        self._running = 0
+        self._lanes: Dict[str, _LaneStats] = {lane_name: _LaneStats() for lane_name in LANES}
+        self._held = threading.local()
+
+    @property
+    def configured_slots(self) -> int:
+        try:
+            return max(1, int(getattr(_config(), self.slots_setting, self.default_slots)))
+        except (TypeError, ValueError):
+            return self.default_slots
+
+    @property
+    def slots(self) -> int:
+        return self._limit if self._limit is not None else self.configured_slots
+
+    def set_limit(self, limit: Optional[int]) -> None:
+        """Override the configured slot count (None restores it)."""
+        with self._cond:
+            self._limit = max(1, int(limit)) if limit is not None else None
+            self._cond.notify_all()
+
+    def waiting(self) -> int:
+        with self._cond:
+            return sum(s.waiting for s in self._lanes.values())
+
+    def _may_run(self, lane_name: str) -> bool:
+        if self._running >= self.slots:
+            return False
+        return lane_name == INTERACTIVE or not self._lanes[INTERACTIVE].waiting
+
+    @contextmanager
+    def slot(self, lane_name: Optional[str] = None) -> Iterator[None]:
+        """Hold one slot for the block (one page / one request)."""
+        depth = getattr(self._held, 'depth', 0)
+        if depth:
+            # Nested use on a thread that already holds a slot
+            self._held.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._held.depth -= 1
+            return
+
+        lane_name = lane_name or current_lane()
+        stats = self._lanes[lane_name]
+        token = current_token()
+        started = time.perf_counter()
+        with self._cond:
+            stats.waiting += 1
+            try:
+                while not self._may_run(lane_name):
+                    if token is not None and token.cancelled:
+                        # Background waiters may have been held back only by this one
+                        self._cond.notify_all()
+                        raise OperationCancelled(f"cancelled while waiting for a {self.name} slot")
+                    self._cond.wait(_RECHECK_SECONDS if token is None else CANCEL_POLL_SECONDS)
+            finally:
+                stats.waiting -= 1
+            self._running += 1
+            stats.running += 1
+            stats.record_wait(time.perf_counter() - started)
+            # A background waiter may have been blocked only by this interactive one
+            self._cond.notify_all()
+        self._held.depth = 1
+        try:
+            yield
+        finally:
+            self._held.depth = 0
+            with self._cond:
+                self._running -= 1
+                stats.running -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'slots': self.slots,
+                'running': self._running,
+                'lanes': {name: s.as_dict() for name, s in self._lanes.items()},
+            }
+
+
+ocr_gate = PriorityGate('ocr', 'SCHEDULER_OCR_SLOTS', 2)
+llm_gate = PriorityGate('llm', 'SCHEDULER_LLM_SLOTS', 1)
+
+
+def get_scheduler_stats() -> dict:
+    """Slots, running work and per-lane queue waits for every gate."""
+    return {gate.name: gate.stats() for gate in (ocr_gate, llm_gate)}
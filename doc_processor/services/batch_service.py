@@ -15,6 +15,7 @@ import threading
 from datetime import datetime
 
 from ..config_manager import SHUTDOWN_EVENT
+from ..status_store import StatusMap
 
 # Import database and processing modules (adjust imports as needed)
 
@@ -24,9 +25,20 @@ class BatchService:
     """Service class for batch operations."""
 
     def __init__(self):
-        self.processing_status = {}
+        # Shared with other worker processes; entries are copies, change them via edit()
+        self.processing_status = StatusMap('batch_service.processing')
         self.processing_lock = threading.Lock()
 
+    def _update_stage(self, batch_id: int, stage: str, changes: Dict[str, Any], **top_level) -> None:
+        """Atomically update one stage entry (and optional top-level fields) of a batch's status."""
+        def apply(current):
+            current = dict(current or {}, **top_level)
+            stages = dict(current.get('stages') or {})
+            stages[stage] = dict(stages.get(stage) or {}, **changes)
+            current['stages'] = stages
+            return current
+        self.processing_status.edit(batch_id, apply)
+
     def create_batch(self, name: Optional[str] = None, intake_dir: Optional[str] = None) -> Dict[str, Any]:
         """
         Create a new batch from intake directory or manually.
@@ -173,7 +185,7 @@ class BatchService:
                 # Respect shutdown event during potentially long-running work
                 if SHUTDOWN_EVENT.is_set():
                     with self.processing_lock:
-                        self.processing_status[batch_id].update({
+                        self.processing_status.edit(batch_id, {
                             'status': 'aborted',
                             'message': 'Processing aborted due to shutdown'
                         })
@@ -228,13 +240,12 @@ class BatchService:
                 stages = ['ocr', 'classification', 'grouping', 'ordering']
                 for i, stage in enumerate(stages):
                     with self.processing_lock:
-                        self.processing_status[batch_id]['stages'][stage]['status'] = 'processing'
-                        self.processing_status[batch_id]['message'] = f'Processing {stage}...'
+                        self._update_stage(batch_id, stage, {'status': 'processing'}, message=f'Processing {stage}...')
 
                     # Check for shutdown between stages
                     if SHUTDOWN_EVENT.is_set():
                         with self.processing_lock:
-                            self.processing_status[batch_id].update({
+                            self.processing_status.edit(batch_id, {
                                 'status': 'aborted',
                                 'message': 'Smart processing aborted due to shutdown'
                             })
@@ -243,14 +254,15 @@ class BatchService:
                     # stage_result = process_stage(batch_id, stage)
 
                     with self.processing_lock:
-                        self.processing_status[batch_id]['stages'][stage]['status'] = 'completed'
-                        self.processing_status[batch_id]['stages'][stage]['progress'] = 100
-                        self.processing_status[batch_id]['progress'] = int((i + 1) / len(stages) * 100)
+                        self._update_stage(batch_id, stage, {'status': 'completed', 'progress': 100},
+                                           progress=int((i + 1) / len(stages) * 100))
 
                 with self.processing_lock:
-                    self.processing_status[batch_id]['status'] = 'completed'
-                    self.processing_status[batch_id]['message'] = 'Smart processing completed'
-                    self.processing_status[batch_id]['completed_at'] = datetime.now().isoformat()
+                    self.processing_status.edit(batch_id, {
+                        'status': 'completed',
+                        'message': 'Smart processing completed',
+                        'completed_at': datetime.now().isoformat()
+                    })
 
             except Exception as e:
                 logger.error(f"Error in smart processing: {e}")
@@ -300,17 +312,21 @@ class BatchService:
                         processed += 1
 
                         with self.processing_lock:
-                            self.processing_status[batch_id]['processed_documents'] = processed
-                            self.processing_status[batch_id]['progress'] = int(processed / total_docs * 100)
-                            self.processing_status[batch_id]['message'] = f'Processed {processed}/{total_docs} documents'
+                            self.processing_status.edit(batch_id, {
+                                'processed_documents': processed,
+                                'progress': int(processed / total_docs * 100),
+                                'message': f'Processed {processed}/{total_docs} documents'
+                            })
 
                     except Exception as e:
                         logger.error(f"Error processing document {doc.get('id', 'unknown')}: {e}")
 
                 with self.processing_lock:
-                    self.processing_status[batch_id]['status'] = 'completed'
-                    self.processing_status[batch_id]['message'] = f'Completed processing {processed}/{total_docs} documents'
-                    self.processing_status[batch_id]['completed_at'] = datetime.now().isoformat()
+                    self.processing_status.edit(batch_id, {
+                        'status': 'completed',
+                        'message': f'Completed processing {processed}/{total_docs} documents',
+                        'completed_at': datetime.now().isoformat()
+                    })
 
             except Exception as e:
                 logger.error(f"Error in single document processing: {e}")
@@ -385,7 +401,7 @@ class BatchService:
     def get_all_processing_status(self) -> Dict[str, Any]:
         """Get processing status for all batches."""
         with self.processing_lock:
-            return dict(self.processing_status)
+            return self.processing_status.snapshot()
 
     def reset_batch(self, batch_id: int) -> Dict[str, Any]:
         """Reset a batch to initial state."""
@@ -398,8 +414,7 @@ class BatchService:
 
             # Clear processing status
             with self.processing_lock:
-                if batch_id in self.processing_status:
-                    del self.processing_status[batch_id]
+                self.processing_status.pop(batch_id, None)
 
             return {
                 'success': True,
@@ -17,9 +17,11 @@ import os
 from datetime import datetime
 
 # Import modules (adjust imports as needed)
-from ..database import get_db_connection
+from ..database import get_db_connection, document_text_sql
 from ..processing import _create_single_document_markdown_content
 from ..config_manager import app_config, SHUTDOWN_EVENT
+from ..job_queue import enqueue_job, register_job_handler
+from ..status_store import StatusMap
 
 logger = logging.getLogger(__name__)
 
@@ -78,9 +80,11 @@ def _resolve_export_dir() -> str:
 class ExportService:
     """Service class for export and finalization operations."""
 
-    def __init__(self):
-        self.export_status = {}
-        self.export_lock = threading.Lock()
+    # Shared by all instances and worker processes: exports run on job-queue
+    # workers, not on the instance that accepted the request. Entries are
+    # copies; change them via edit().
+    export_status = StatusMap('export_service.export')
+    export_lock = threading.Lock()
 
     def export_batch(self, batch_id: int, export_format: str = 'pdf',
                     include_originals: bool = False, grouping_method: str = 'ai_suggested') -> Dict[str, Any]:
@@ -107,86 +111,18 @@ class ExportService:
             # Start export process
             export_id = f"{batch_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-            def export_async():
-                try:
-                    # Abort early if application is shutting down
-                    if SHUTDOWN_EVENT.is_set():
-                        with self.export_lock:
-                            self.export_status[batch_id] = {
-                                'status': 'aborted',
-                                'progress': 0,
-                                'message': 'Export aborted due to shutdown',
-                                'export_id': export_id,
-                                'started_at': datetime.now().isoformat()
-                            }
-                        return
-                    with self.export_lock:
-                        self.export_status[batch_id] = {
-                            'export_id': export_id,
-                            'status': 'starting',
-                            'progress': 0,
-                            'message': 'Preparing export...',
-                            'export_format': export_format,
-                            'include_originals': include_originals,
-                            'started_at': datetime.now().isoformat(),
-                            'files_created': [],
-                            'total_size': 0
-                        }
-
-                    # Get documents for export
-                    # with database_connection() as conn:
-                    #     documents = get_documents_by_batch(batch_id)
-
-                    documents = []  # Placeholder
-                    total_docs = len(documents)
-
-                    with self.export_lock:
-                        self.export_status[batch_id]['total_documents'] = total_docs
-                        self.export_status[batch_id]['message'] = f'Exporting {total_docs} documents...'
-
-                    # Export based on format
-                    if export_format == 'pdf':
-                        result = self._export_as_pdf(batch_id, documents, grouping_method)
-                    elif export_format == 'images':
-                        result = self._export_as_images(batch_id, documents)
-                    elif export_format == 'both':
-                        result = self._export_both_formats(batch_id, documents, grouping_method)
-                    else:
-                        raise ValueError(f"Unsupported export format: {export_format}")
-
-                    if include_originals:
-                        self._include_original_files(batch_id, result)
-
-                    # Calculate total size
-                    total_size = sum(os.path.getsize(f) for f in result.get('files_created', []) if os.path.exists(f))
-
-                    with self.export_lock:
-                        self.export_status[batch_id].update({
-                            'status': 'completed',
-                            'progress': 100,
-                            'message': 'Export completed successfully',
-                            'completed_at': datetime.now().isoformat(),
-                            'files_created': result.get('files_created', []),
-                            'total_size': total_size,
-                            'download_links': self._generate_download_links(result.get('files_created', []))
-                        })
-
-                except Exception as e:
-                    logger.error(f"Error in export process: {e}")
-                    with self.export_lock:
-                        self.export_status[batch_id] = {
-                            'status': 'error',
-                            'progress': 0,
-                            'message': f"Export failed: {str(e)}",
-                            'error_at': datetime.now().isoformat()
-                        }
-
-            thread = threading.Thread(target=export_async, daemon=True)
-            thread.start()
+            job_id = enqueue_job('export.batch', {
+                'batch_id': batch_id,
+                'export_id': export_id,
+                'export_format': export_format,
+                'include_originals': include_originals,
+                'grouping_method': grouping_method,
+            }, idempotency_key=f'export.batch:{batch_id}')
 
             return {
                 'success': True,
                 'export_id': export_id,
+                'job_id': job_id,
                 'message': f'Export started for batch {batch_id}',
                 'batch_id': batch_id
             }
@@ -198,6 +134,85 @@ class ExportService:
                 'error': f'Failed to start export: {str(e)}'
             }
 
+    def _run_export(self, batch_id: int, export_id: str, export_format: str,
+                    include_originals: bool, grouping_method: str) -> None:
+        """Run one batch export (the 'export.batch' job), updating export_status."""
+        try:
+            # Abort early if application is shutting down
+            if SHUTDOWN_EVENT.is_set():
+                with self.export_lock:
+                    self.export_status[batch_id] = {
+                        'status': 'aborted',
+                        'progress': 0,
+                        'message': 'Export aborted due to shutdown',
+                        'export_id': export_id,
+                        'started_at': datetime.now().isoformat()
+                    }
+                return
+            with self.export_lock:
+                self.export_status[batch_id] = {
+                    'export_id': export_id,
+                    'status': 'starting',
+                    'progress': 0,
+                    'message': 'Preparing export...',
+                    'export_format': export_format,
+                    'include_originals': include_originals,
+                    'started_at': datetime.now().isoformat(),
+                    'files_created': [],
+                    'total_size': 0
+                }
+
+            # Get documents for export
+            # with database_connection() as conn:
+            #     documents = get_documents_by_batch(batch_id)
+
+            documents = []  # Placeholder
+            total_docs = len(documents)
+
+            with self.export_lock:
+                self.export_status.edit(batch_id, {
+                    'total_documents': total_docs,
+                    'message': f'Exporting {total_docs} documents...'
+                })
+
+            # Export based on format
+            if export_format == 'pdf':
+                result = self._export_as_pdf(batch_id, documents, grouping_method)
+            elif export_format == 'images':
+                result = self._export_as_images(batch_id, documents)
+            elif export_format == 'both':
+                result = self._export_both_formats(batch_id, documents, grouping_method)
+            else:
+                raise ValueError(f"Unsupported export format: {export_format}")
+
+            if include_originals:
+                self._include_original_files(batch_id, result)
+
+            # Calculate total size
+            total_size = sum(os.path.getsize(f) for f in result.get('files_created', []) if os.path.exists(f))
+
+            with self.export_lock:
+                self.export_status.edit(batch_id, {
+                    'status': 'completed',
+                    'progress': 100,
+                    'message': 'Export completed successfully',
+                    'completed_at': datetime.now().isoformat(),
+                    'files_created': result.get('files_created', []),
+                    'total_size': total_size,
+                    'download_links': self._generate_download_links(result.get('files_created', []))
+                })
+
+        except Exception as e:
+            logger.error(f"Error in export process: {e}")
+            with self.export_lock:
+                self.export_status[batch_id] = {
+                    'status': 'error',
+                    'progress': 0,
+                    'message': f"Export failed: {str(e)}",
+                    'error_at': datetime.now().isoformat()
+                }
+            raise
+
     def _export_as_pdf(self, batch_id: int, documents: List[Dict], grouping_method: str) -> Dict[str, Any]:
         """Export documents as PDF files."""
         files_created = []
@@ -208,13 +223,15 @@ class ExportService:
                 # Create individual PDFs
                 for i, doc in enumerate(documents):
                     with self.export_lock:
-                        self.export_status[batch_id]['progress'] = int(i / len(documents) * 100)
-                        self.export_status[batch_id]['message'] = f'Creating PDF {i+1}/{len(documents)}'
+                        self.export_status.edit(batch_id, {
+                            'progress': int(i / len(documents) * 100),
+                            'message': f'Creating PDF {i+1}/{len(documents)}'
+                        })
 
                     # Respect global shutdown event
                     if SHUTDOWN_EVENT.is_set():
                         with self.export_lock:
-                            self.export_status[batch_id].update({
+                            self.export_status.edit(batch_id, {
                                 'status': 'aborted',
                                 'message': 'Export aborted during PDF creation',
                             })
@@ -232,12 +249,14 @@ class ExportService:
 
                 for i, group in enumerate(groups):
                     with self.export_lock:
-                        self.export_status[batch_id]['progress'] = int(i / len(groups) * 100)
-                        self.export_status[batch_id]['message'] = f'Creating group PDF {i+1}/{len(groups)}'
+                        self.export_status.edit(batch_id, {
+                            'progress': int(i / len(groups) * 100),
+                            'message': f'Creating group PDF {i+1}/{len(groups)}'
+                        })
 
                     if SHUTDOWN_EVENT.is_set():
                         with self.export_lock:
-                            self.export_status[batch_id].update({
+                            self.export_status.edit(batch_id, {
                                 'status': 'aborted',
                                 'message': 'Export aborted during grouped PDF creation',
                             })
@@ -251,11 +270,11 @@ class ExportService:
             elif grouping_method == 'combined':
                 # Create single PDF with all documents
                 with self.export_lock:
-                    self.export_status[batch_id]['message'] = 'Creating combined PDF'
+                    self.export_status.edit(batch_id, {'message': 'Creating combined PDF'})
 
                 if SHUTDOWN_EVENT.is_set():
                     with self.export_lock:
-                        self.export_status[batch_id].update({
+                        self.export_status.edit(batch_id, {
                             'status': 'aborted',
                             'message': 'Export aborted before combined PDF creation',
                         })
@@ -286,12 +305,14 @@ class ExportService:
         try:
             for i, doc in enumerate(documents):
                 with self.export_lock:
-                    self.export_status[batch_id]['progress'] = int(i / len(documents) * 100)
-                    self.export_status[batch_id]['message'] = f'Exporting image {i+1}/{len(documents)}'
+                    self.export_status.edit(batch_id, {
+                        'progress': int(i / len(documents) * 100),
+                        'message': f'Exporting image {i+1}/{len(documents)}'
+                    })
 
                 if SHUTDOWN_EVENT.is_set():
                     with self.export_lock:
-                        self.export_status[batch_id].update({
+                        self.export_status.edit(batch_id, {
                             'status': 'aborted',
                             'message': 'Export aborted during image export',
                         })
@@ -439,7 +460,7 @@ class ExportService:
                     #     cursor.execute("UPDATE batches SET status = 'finalized' WHERE id = ?", (batch_id,))
 
                     with self.export_lock:
-                        self.export_status[batch_id].update({
+                        self.export_status.edit(batch_id, {
                             'status': 'completed',
                             'progress': 100,
                             'message': 'Finalization completed successfully',
@@ -500,8 +521,9 @@ class ExportService:
                 final_base = d[1] or d[2] or f"document_{doc_id}"
                 # Get pages for document
                 pages = cur.execute(
-                    """
-                    SELECT p.id, p.processed_image_path, p.ocr_text, p.ai_suggested_category, p.ai_suggested_filename,
+                    f"""
+                    SELECT p.id, p.processed_image_path, {document_text_sql('page', 'ocr_text', 'p')},
+                           p.ai_suggested_category, p.ai_suggested_filename,
                            p.human_verified_category, p.rotation
                     FROM pages p
                     JOIN document_pages dp ON p.id = dp.page_id
@@ -582,8 +604,10 @@ class ExportService:
                 # Progress update
                 with self.export_lock:
                     if batch_id in self.export_status:
-                        self.export_status[batch_id]['progress'] = int(((idx+1)/total)*100)
-                        self.export_status[batch_id]['message'] = f"Grouped export {idx+1}/{total}"
+                        self.export_status.edit(batch_id, {
+                            'progress': int(((idx+1)/total)*100),
+                            'message': f"Grouped export {idx+1}/{total}"
+                        })
             conn.close()
             return {'success': True, 'files_created': files}
         except Exception as e:
@@ -628,15 +652,14 @@ class ExportService:
     def get_all_export_status(self) -> Dict[str, Any]:
         """Get export status for all batches."""
         with self.export_lock:
-            return dict(self.export_status)
+            return self.export_status.snapshot()
 
     def reset_export_status(self, batch_id: Optional[int] = None) -> Dict[str, Any]:
         """Reset export status for a specific batch or all batches."""
         try:
             with self.export_lock:
                 if batch_id:
-                    if batch_id in self.export_status:
-                        del self.export_status[batch_id]
+                    self.export_status.pop(batch_id, None)
                     message = f'Export status reset for batch {batch_id}'
                 else:
                     self.export_status.clear()
@@ -726,4 +749,12 @@ class ExportService:
             return {
                 'success': False,
                 'error': f'Failed to cleanup exports: {str(e)}'
-            }
\ No newline at end of file
+            }
+
+
+def _export_batch_job(job):
+    """Job handler for ExportService.export_batch."""
+    ExportService()._run_export(**job.payload)
+
+
+register_job_handler('export.batch', _export_batch_job)
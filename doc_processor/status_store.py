@@ -0,0 +1,333 @@
+"""
+Cross-process progress / status store.
+
+Progress used to live in module-level dicts (`routes/api.processing_status`,
+the smart-processing token registry, `BatchService.processing_status`,
+`ExportService.export_status`, the export route cache). With more than one
+web worker process, a poll or SSE request that landed on another worker saw
+nothing. Status now lives in a small SQLite file (`STATUS_STORE_DB_PATH`,
+default `status.db` beside the main database) that every process on the
+host shares:
+
+- entries are JSON documents addressed by `(namespace, key)`;
+- `update_status` is an atomic read-modify-write (`BEGIN IMMEDIATE`), so
+  nested progress updates from several threads/processes do not clobber
+  each other;
+- every write bumps a global sequence number. `wait_for_change` blocks until
+  it moves: writers in this process wake waiters at once, and changes from
+  other processes are noticed within STATUS_STORE_POLL_SECONDS;
+- entries can carry a TTL; expired ones read as missing and are purged
+  opportunistically.
+
+`StatusMap(namespace)` wraps a namespace in a dict-like view so existing
+`status[key] = {...}` / `status.get(key)` code keeps working. Values read
+from it are copies: change them with `edit(key, ...)`, not in place.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS status_entries (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        data TEXT NOT NULL,
+        version INTEGER NOT NULL DEFAULT 1,
+        updated_at REAL NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (namespace, key)
+    );
+    CREATE TABLE IF NOT EXISTS status_seq (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        seq INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO status_seq (id, seq) VALUES (1, 0);
+"""
+
+_schema_ready = set()
+_local = threading.local()
+_changed = threading.Condition()
+_last_purge = 0.0
+_PURGE_INTERVAL_SECONDS = 60.0
+
+Changes = Union[Dict[str, Any], Callable[[Optional[dict]], Optional[dict]]]
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def get_status_db_path() -> str:
+    """STATUS_STORE_DB_PATH, or `status.db` next to the main database."""
+    configured = getattr(_config(), 'STATUS_STORE_DB_PATH', None) or os.getenv('STATUS_STORE_DB_PATH')
+    if configured:
+        return os.path.abspath(configured)
+    try:
+        from .database import _resolve_db_path
+    except ImportError:
+        from database import _resolve_db_path
+    return os.path.join(os.path.dirname(os.path.abspath(_resolve_db_path(quiet=True))), 'status.db')
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to the current status DB (progress updates are frequent)."""
+    db_path = get_status_db_path()
+    conns = getattr(_local, 'conns', None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is not None and (db_path in _schema_ready and os.path.exists(db_path)):
+        return conn
+    if conn is not None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    _schema_ready.add(db_path)
+    conns[db_path] = conn
+    return conn
+
+
+def _notify() -> None:
+    with _changed:
+        _changed.notify_all()
+
+
+def _decode(row) -> Optional[dict]:
+    if row is None:
+        return None
+    data, expires_at = row
+    if expires_at is not None and expires_at <= time.time():
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def _write(conn: sqlite3.Connection, namespace: str, key: str, value: Optional[dict], ttl_seconds: Optional[float]) -> None:
+    now = time.time()
+    if value is None:
+        conn.execute("DELETE FROM status_entries WHERE namespace = ? AND key = ?", (namespace, key))
+    else:
+        conn.execute(
+            "INSERT INTO status_entries (namespace, key, data, updated_at, expires_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(namespace, key) DO UPDATE SET data = excluded.data, version = version + 1, "
+            "updated_at = excluded.updated_at, expires_at = COALESCE(excluded.expires_at, expires_at)",
+            (namespace, key, json.dumps(value, default=str), now, now + ttl_seconds if ttl_seconds else None),
+        )
+    conn.execute("UPDATE status_seq SET seq = seq + 1 WHERE id = 1")
+
+
+def get_status(namespace: str, key: Any, default: Any = None) -> Any:
+    """Current value of an entry (a fresh copy), or `default`."""
+    row = _connect().execute(
+        "SELECT data, expires_at FROM status_entries WHERE namespace = ? AND key = ?", (namespace, str(key))
+    ).fetchone()
+    value = _decode(row)
+    return default if value is None else value
+
+
+def set_status(namespace: str, key: Any, value: Optional[dict], ttl_seconds: Optional[float] = None) -> None:
+    """Replace an entry (None deletes it). `ttl_seconds` sets/refreshes its expiry."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _write(conn, namespace, str(key), value, ttl_seconds)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _notify()
+    _maybe_purge()
+
+
+def update_status(namespace: str, key: Any, changes: Changes, ttl_seconds: Optional[float] = None) -> Optional[dict]:
+    """Atomically modify an entry and return its new value.
+
+    `changes` is either a dict shallow-merged into the current value (a
+    missing entry starts as {}), or a function receiving a copy of the current
+    value (None if missing) and returning the new one (None deletes).
+    """
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = _decode(conn.execute(
+            "SELECT data, expires_at FROM status_entries WHERE namespace = ? AND key = ?", (namespace, str(key))
+        ).fetchone())
+        if callable(changes):
+            new_value = changes(current)
+        else:
+            new_value = dict(current or {}, **changes)
+        _write(conn, namespace, str(key), new_value, ttl_seconds)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    _notify()
+    return new_value
+
+
+def delete_status(namespace: str, key: Any = None) -> int:
+    """Delete one entry, or the whole namespace when `key` is None. Returns rows removed."""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if key is None:
+            cur = conn.execute("DELETE FROM status_entries WHERE namespace = ?", (namespace,))
+        else:
+            cur = conn.execute("DELETE FROM status_entries WHERE namespace = ? AND key = ?", (namespace, str(key)))
+        removed = cur.rowcount
+        if removed:
+            conn.execute("UPDATE status_seq SET seq = seq + 1 WHERE id = 1")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    if removed:
+        _notify()
+    return removed
+
+
+def list_status(namespace: str) -> Dict[str, dict]:
+    """All live entries of a namespace as {key: value}."""
+    rows = _connect().execute(
+        "SELECT key, data, expires_at FROM status_entries WHERE namespace = ? ORDER BY key", (namespace,)
+    ).fetchall()
+    result = {}
+    for key, data, expires_at in rows:
+        value = _decode((data, expires_at))
+        if value is not None:
+            result[key] = value
+    return result
+
+
+def purge_expired() -> int:
+    """Delete entries whose TTL has passed."""
+    conn = _connect()
+    cur = conn.execute("DELETE FROM status_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+    return cur.rowcount
+
+
+def _maybe_purge() -> None:
+    global _last_purge
+    if time.monotonic() - _last_purge < _PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = time.monotonic()
+    try:
+        purged = purge_expired()
+        if purged:
+            logger.debug(f"Purged {purged} expired status entries")
+    except sqlite3.Error as e:
+        logger.debug(f"Status purge failed: {e}")
+
+
+def current_seq() -> int:
+    """Global change counter; compare with `wait_for_change`."""
+    row = _connect().execute("SELECT seq FROM status_seq WHERE id = 1").fetchone()
+    return int(row[0]) if row else 0
+
+
+def wait_for_change(since_seq: int, timeout: float) -> int:
+    """Block until the change counter exceeds `since_seq` or `timeout` passes; return the counter."""
+    poll = float(getattr(_config(), 'STATUS_STORE_POLL_SECONDS', 0.25) or 0.25)
+    deadline = time.monotonic() + max(0.0, timeout)
+    while True:
+        seq = current_seq()
+        remaining = deadline - time.monotonic()
+        if seq > since_seq or remaining <= 0:
+            return seq
+        # Local writers notify immediately; other processes are caught by the poll
+        with _changed:
+            _changed.wait(min(poll, remaining))
+
+
+def wait_for(namespace: str, key: Any, predicate: Callable[[Optional[dict]], bool], timeout: float) -> Optional[dict]:
+    """Wait until `predicate(value)` holds for an entry; return the value, or None on timeout."""
+    deadline = time.monotonic() + max(0.0, timeout)
+    seq = current_seq()
+    while True:
+        value = get_status(namespace, key)
+        if predicate(value):
+            return value
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        seq = wait_for_change(seq, remaining)
+
+
+class StatusMap(MutableMapping):
+    """Dict-like view of one namespace (keys are stored as strings).
+
+    Reads return copies; use `edit(key, changes)` for in-place style edits.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: Optional[float] = None):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+
+    def __getitem__(self, key):
+        value = get_status(self.namespace, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        set_status(self.namespace, key, value, self.ttl_seconds)
+
+    def __delitem__(self, key) -> None:
+        if not delete_status(self.namespace, key):
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list_status(self.namespace))
+
+    def __len__(self) -> int:
+        return len(list_status(self.namespace))
+
+    def __contains__(self, key) -> bool:
+        return get_status(self.namespace, key) is not None
+
+    def get(self, key, default=None):
+        return get_status(self.namespace, key, default)
+
+    def pop(self, key, *default):
+        value = get_status(self.namespace, key)
+        if value is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        delete_status(self.namespace, key)
+        return value
+
+    def clear(self) -> None:
+        delete_status(self.namespace)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """All entries in one read."""
+        return list_status(self.namespace)
+
+    def items(self):
+        return self.snapshot().items()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def edit(self, key, changes: Changes) -> Optional[dict]:
+        """Atomically modify one entry (see `update_status`)."""
+        return update_status(self.namespace, key, changes, self.ttl_seconds)
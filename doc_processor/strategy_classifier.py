@@ -0,0 +1,317 @@
+"""
+Learned single-document vs batch-scan classifier.
+
+`DocumentTypeDetector.analyze_pdf` scores files with hand-tuned rules and asks
+the LLM whenever content is available, which costs seconds per file. Human
+corrections are already logged as `detection_ground_truth` events. This module
+trains a small L2-regularised logistic regression on them. Its inputs are the
+detector's features (page count, size, filename/content hints, heuristic
+scores) plus simple text statistics of the sampled content. The detector asks
+the model before the LLM. Predictions with probability of at least
+STRATEGY_MODEL_MIN_CONFIDENCE are settled locally in microseconds.
+
+Pure Python (a dozen features, at most a few thousand samples), so it needs
+no numpy/sklearn and loads instantly in analysis worker processes. The model is
+a JSON file (STRATEGY_MODEL_PATH, default `strategy_model.json` beside the main
+database). It is reloaded when that file changes and is only used when its
+cross-validated accuracy reaches STRATEGY_MODEL_MIN_ACCURACY.
+"""
+import ast
+import datetime
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FEATURE_NAMES = [
+    'log_pages', 'log_size_mb', 'pages_le_3', 'pages_ge_25',
+    'filename_single', 'filename_batch', 'content_single', 'content_batch',
+    'heuristic_margin', 'log_text_chars', 'sampled_pages_with_text',
+    'digit_ratio', 'upper_ratio', 'page_marker_count', 'date_count', 'currency_count',
+]
+
+_PAGE_MARKER_RE = re.compile(r'\bpage\s+\d+\s+of\s+\d+\b', re.I)
+_DATE_RE = re.compile(r'\b\d{1,4}[/.-]\d{1,2}[/.-]\d{1,4}\b')
+_CURRENCY_RE = re.compile(r'[$€£]\s?\d')
+_SAMPLE_HEADER_RE = re.compile(r'=== PAGE \d+ SAMPLE ===')
+
+_model_lock = threading.Lock()
+_model_cache: Dict[str, Tuple[float, Optional[dict]]] = {}
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def extract_features(page_count: int, file_size_mb: float, filename_hint: Optional[str] = None,
+                     content_hint: Optional[str] = None, single_score: int = 0, batch_score: int = 0,
+                     content_sample: Optional[str] = None) -> Dict[str, float]:
+    """Build the classifier's feature dict from detector signals and the sampled text."""
+    text = content_sample or ''
+    letters = sum(1 for c in text if c.isalpha())
+    total_score = single_score + batch_score
+    return {
+        'log_pages': math.log1p(max(page_count or 0, 0)),
+        'log_size_mb': math.log1p(max(file_size_mb or 0.0, 0.0)),
+        'pages_le_3': 1.0 if 0 < (page_count or 0) <= 3 else 0.0,
+        'pages_ge_25': 1.0 if (page_count or 0) >= 25 else 0.0,
+        'filename_single': 1.0 if filename_hint == 'single' else 0.0,
+        'filename_batch': 1.0 if filename_hint == 'batch' else 0.0,
+        'content_single': 1.0 if content_hint == 'single' else 0.0,
+        'content_batch': 1.0 if content_hint == 'batch' else 0.0,
+        'heuristic_margin': (single_score - batch_score) / total_score if total_score else 0.0,
+        'log_text_chars': math.log1p(len(text)),
+        'sampled_pages_with_text': float(len(_SAMPLE_HEADER_RE.findall(text))),
+        'digit_ratio': sum(1 for c in text if c.isdigit()) / len(text) if text else 0.0,
+        'upper_ratio': sum(1 for c in text if c.isupper()) / letters if letters else 0.0,
+        'page_marker_count': float(len(_PAGE_MARKER_RE.findall(text))),
+        'date_count': float(len(_DATE_RE.findall(text))),
+        'currency_count': float(len(_CURRENCY_RE.findall(text))),
+    }
+
+
+def _features_from_decision(decision: dict) -> Optional[Dict[str, float]]:
+    """Features logged with a detection decision (older decisions lack text statistics)."""
+    if isinstance(decision.get('features'), dict):
+        return decision['features']
+    if 'page_count' not in decision:
+        return None
+    scores = decision.get('heuristic_scores') or {}
+    return extract_features(decision.get('page_count') or 0, decision.get('file_size_mb') or 0.0,
+                            decision.get('filename_hints'), None,
+                            scores.get('single', 0), scores.get('batch', 0))
+
+
+def _parse_content(raw) -> Optional[dict]:
+    # interaction_log content is str(dict) for detection events
+    if not raw:
+        return None
+    try:
+        value = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return None
+    return value if isinstance(value, dict) else None
+
+
+def load_training_samples(limit: int = 5000) -> List[Tuple[Dict[str, float], int]]:
+    """Return [(features, label)] from logged ground truth (label 1 = single_document).
+
+    Ground truth rows carry their own features when logged with them; otherwise
+    the most recent detection decision for the same filename supplies them.
+    """
+    try:
+        from .database import get_detection_training_data
+    except ImportError:
+        from database import get_detection_training_data
+    data = get_detection_training_data(limit=limit)
+    latest_decision = {}
+    for row in data.get('detection_decisions', []):  # newest first
+        decision = _parse_content(row.get('content'))
+        if decision and decision.get('filename') and decision['filename'] not in latest_decision:
+            latest_decision[decision['filename']] = decision
+    samples = []
+    for row in data.get('ground_truth', []):
+        truth = _parse_content(row.get('content'))
+        if not truth or truth.get('actual_strategy') not in ('single_document', 'batch_scan'):
+            continue
+        features = truth.get('features') if isinstance(truth.get('features'), dict) else None
+        if features is None and truth.get('filename') in latest_decision:
+            features = _features_from_decision(latest_decision[truth['filename']])
+        if features is None:
+            continue
+        samples.append((features, 1 if truth['actual_strategy'] == 'single_document' else 0))
+    return samples
+
+
+def _vector(features: Dict[str, float]) -> List[float]:
+    return [float(features.get(name, 0.0) or 0.0) for name in FEATURE_NAMES]
+
+
+def _fit(rows: List[List[float]], labels: List[int], epochs: int = 400, lr: float = 0.5, l2: float = 0.01) -> dict:
+    """Standardise features and fit logistic regression by batch gradient descent."""
+    n, d = len(rows), len(FEATURE_NAMES)
+    means = [sum(r[j] for r in rows) / n for j in range(d)]
+    stds = [math.sqrt(sum((r[j] - means[j]) ** 2 for r in rows) / n) or 1.0 for j in range(d)]
+    xs = [[(r[j] - means[j]) / stds[j] for j in range(d)] for r in rows]
+    weights = [0.0] * d
+    bias = 0.0
+    for _ in range(epochs):
+        grad_w = [0.0] * d
+        grad_b = 0.0
+        for x, y in zip(xs, labels):
+            err = _sigmoid(bias + sum(w * v for w, v in zip(weights, x))) - y
+            grad_b += err
+            for j in range(d):
+                grad_w[j] += err * x[j]
+        bias -= lr * grad_b / n
+        weights = [w - lr * (g / n + l2 * w) for w, g in zip(weights, grad_w)]
+    return {'weights': weights, 'bias': bias, 'means': means, 'stds': stds}
+
+
+def _sigmoid(z: float) -> float:
+    if z < -35:
+        return 0.0
+    if z > 35:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _probability(params: dict, features: Dict[str, float]) -> float:
+    x = _vector(features)
+    z = params['bias'] + sum(
+        w * (v - m) / s for w, v, m, s in zip(params['weights'], x, params['means'], params['stds'])
+    )
+    return _sigmoid(z)
+
+
+def _cross_validated_accuracy(rows: List[List[float]], labels: List[int], folds: int = 5) -> Optional[float]:
+    n = len(rows)
+    folds = min(folds, n)
+    if folds < 2:
+        return None
+    order = list(range(n))
+    random.Random(42).shuffle(order)
+    correct = 0
+    for k in range(folds):
+        test_idx = set(order[k::folds])
+        train_rows = [rows[i] for i in order if i not in test_idx]
+        train_labels = [labels[i] for i in order if i not in test_idx]
+        if len(set(train_labels)) < 2:
+            # Single-class fold: predict that class
+            correct += sum(1 for i in test_idx if labels[i] == train_labels[0])
+            continue
+        params = _fit(train_rows, train_labels)
+        for i in test_idx:
+            p = _probability(params, dict(zip(FEATURE_NAMES, rows[i])))
+            correct += int((p >= 0.5) == bool(labels[i]))
+    return round(correct / n, 4)
+
+
+def train_from_samples(samples: List[Tuple[Dict[str, float], int]]) -> dict:
+    """Fit a model on (features, label) pairs; returns the serialisable model dict."""
+    rows = [_vector(f) for f, _ in samples]
+    labels = [int(y) for _, y in samples]
+    model = _fit(rows, labels)
+    model.update(
+        feature_names=list(FEATURE_NAMES),
+        samples=len(samples),
+        single_samples=sum(labels),
+        cv_accuracy=_cross_validated_accuracy(rows, labels),
+        train_accuracy=round(
+            sum(int((_probability(model, dict(zip(FEATURE_NAMES, r))) >= 0.5) == bool(y)) for r, y in zip(rows, labels))
+            / len(rows), 4) if rows else None,
+        trained_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    )
+    return model
+
+
+def get_model_path() -> str:
+    """STRATEGY_MODEL_PATH, or `strategy_model.json` next to the main database."""
+    configured = getattr(_config(), 'STRATEGY_MODEL_PATH', None)
+    if configured:
+        return os.path.abspath(configured)
+    try:
+        from .database import _resolve_db_path
+    except ImportError:
+        from database import _resolve_db_path
+    return os.path.join(os.path.dirname(os.path.abspath(_resolve_db_path(quiet=True))), 'strategy_model.json')
+
+
+def train_strategy_classifier(min_samples: Optional[int] = None, limit: int = 5000) -> dict:
+    """Retrain from logged ground truth and save the model.
+
+    Returns:
+        dict: {'trained': bool, 'samples', 'cv_accuracy', 'reason'?, 'model_path'?}
+    """
+    min_samples = int(min_samples if min_samples is not None else getattr(_config(), 'STRATEGY_MODEL_MIN_SAMPLES', 20))
+    samples = load_training_samples(limit=limit)
+    labels = {y for _, y in samples}
+    if len(samples) < max(min_samples, 2) or len(labels) < 2:
+        return {'trained': False, 'samples': len(samples),
+                'reason': f'need at least {max(min_samples, 2)} labelled files covering both strategies'}
+    model = train_from_samples(samples)
+    path = get_model_path()
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(model, f)
+    os.replace(tmp, path)
+    logger.info(f"Strategy classifier trained on {model['samples']} samples (cv accuracy {model['cv_accuracy']}) -> {path}")
+    return {'trained': True, 'samples': model['samples'], 'cv_accuracy': model['cv_accuracy'],
+            'train_accuracy': model['train_accuracy'], 'model_path': path}
+
+
+def load_model() -> Optional[dict]:
+    """Return the saved model (re-read only when the file's mtime changes), or None."""
+    try:
+        path = get_model_path()
+        mtime = os.path.getmtime(path)
+    except (OSError, RuntimeError):
+        return None
+    with _model_lock:
+        cached = _model_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path) as f:
+                model = json.load(f)
+            if model.get('feature_names') != FEATURE_NAMES:
+                model = None  # trained on a different feature set; retrain required
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load strategy model {path}: {e}")
+            model = None
+        _model_cache[path] = (mtime, model)
+        return model
+
+
+def model_version() -> str:
+    """Short identifier of the active model (part of the analysis cache key)."""
+    model = load_model()
+    return (model or {}).get('trained_at') or 'none'
+
+
+def predict_strategy(features: Dict[str, float]) -> Optional[Tuple[str, float]]:
+    """Return (strategy, confidence) when a usable model is confident enough, else None."""
+    model = load_model()
+    if not model:
+        return None
+    cfg = _config()
+    min_accuracy = float(getattr(cfg, 'STRATEGY_MODEL_MIN_ACCURACY', 0.85))
+    if (model.get('cv_accuracy') or 0.0) < min_accuracy:
+        return None
+    p_single = _probability(model, features)
+    strategy = 'single_document' if p_single >= 0.5 else 'batch_scan'
+    confidence = p_single if p_single >= 0.5 else 1.0 - p_single
+    if confidence < float(getattr(cfg, 'STRATEGY_MODEL_MIN_CONFIDENCE', 0.85)):
+        return None
+    return strategy, round(confidence, 4)
+
+
+def get_classifier_report() -> dict:
+    """Summary of the saved model for analytics pages."""
+    model = load_model()
+    if not model:
+        return {'available': False}
+    cfg = _config()
+    return {
+        'available': True,
+        'active': (model.get('cv_accuracy') or 0.0) >= float(getattr(cfg, 'STRATEGY_MODEL_MIN_ACCURACY', 0.85)),
+        'trained_at': model.get('trained_at'),
+        'samples': model.get('samples'),
+        'single_samples': model.get('single_samples'),
+        'cv_accuracy': model.get('cv_accuracy'),
+        'train_accuracy': model.get('train_accuracy'),
+        'min_confidence': float(getattr(cfg, 'STRATEGY_MODEL_MIN_CONFIDENCE', 0.85)),
+    }
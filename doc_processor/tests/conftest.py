@@ -1,6 +1,10 @@
+import atexit
+import logging
 import os
+import shutil
 import sqlite3
 import sys
+import tempfile
 from pathlib import Path
 
 import pytest
@@ -22,6 +26,16 @@ except Exception:
 env_path = Path(__file__).resolve().parents[1] / '.env'
 load_dotenv(dotenv_path=str(env_path))
 
+# Test modules import the app at collection time, which starts job workers
+# before any fixture runs; point the side databases at a scratch dir first so
+# nothing is written beside the package DB. Per-test fixtures below narrow
+# these further.
+_scratch_dir = tempfile.mkdtemp(prefix='doc_processor_tests_')
+atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
+os.environ['JOB_QUEUE_DB_PATH'] = os.path.join(_scratch_dir, 'jobs.db')
+os.environ['STATUS_STORE_DB_PATH'] = os.path.join(_scratch_dir, 'status.db')
+os.environ['FINGERPRINT_DB_PATH'] = os.path.join(_scratch_dir, 'file_fingerprints.db')
+
 
 @pytest.fixture(scope="session", autouse=True)
 def enforce_fast_test_mode_session():
@@ -101,6 +115,75 @@ def _force_skip_ollama(monkeypatch):
     yield
 
 
+@pytest.fixture(autouse=True)
+def _drain_event_runs():
+    """Let background runs a test started (e.g. intake analysis) finish before the next test.
+
+    A run left going keeps analysing (and, in FAST_TEST_MODE, processing)
+    against whatever intake directory and database the next test configures,
+    and later tests would join it instead of starting their own.
+    """
+    yield
+    try:
+        from doc_processor import event_bus
+    except Exception:
+        return
+    with event_bus._runs_lock:
+        runs = list(event_bus._runs.values())
+        event_bus._runs.clear()
+    for run in runs:
+        if not run.wait(timeout=60):
+            logging.warning(f"Background run {run.key} still going after the test")
+
+
+@pytest.fixture(autouse=True)
+def _isolate_job_queue(monkeypatch, tmp_path):
+    """Give each test its own job queue DB and stop the workers afterwards.
+
+    Jobs enqueued by one test must not be claimed (or keep running) while a
+    later test has pointed DATABASE_PATH at its own temp database.
+    """
+    jobs_db = str(tmp_path / 'jobs.db')
+    monkeypatch.setenv('JOB_QUEUE_DB_PATH', jobs_db)
+    try:
+        from doc_processor import config_manager
+        monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_DB_PATH', jobs_db)
+    except Exception:
+        pass
+    yield
+    try:
+        from doc_processor import job_queue
+        job_queue.stop_job_workers(timeout=2)
+    except Exception:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _isolate_status_store(monkeypatch, tmp_path):
+    """Give each test its own status store so progress/tokens don't leak between tests."""
+    status_db = str(tmp_path / 'status.db')
+    monkeypatch.setenv('STATUS_STORE_DB_PATH', status_db)
+    try:
+        from doc_processor import config_manager
+        monkeypatch.setattr(config_manager.app_config, 'STATUS_STORE_DB_PATH', status_db)
+    except Exception:
+        pass
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _isolate_fingerprint_store(monkeypatch, tmp_path):
+    """Keep memoized file digests in the test's tmp dir instead of beside the package DB."""
+    fingerprint_db = str(tmp_path / 'file_fingerprints.db')
+    monkeypatch.setenv('FINGERPRINT_DB_PATH', fingerprint_db)
+    try:
+        from doc_processor import config_manager
+        monkeypatch.setattr(config_manager.app_config, 'FINGERPRINT_DB_PATH', fingerprint_db)
+    except Exception:
+        pass
+    yield
+
+
 @pytest.fixture()
 def temp_db_path(tmp_path, monkeypatch):
     """Provide fresh temp DB path and force config reload to use it."""
@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+
+from doc_processor.bulk_ingest import discover_files, plan_shards, run_bulk_ingest
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "fixtures", "sample_small.pdf")
+
+
+def test_plan_shards_keeps_names_unique():
+    files = ['/a/1.pdf', '/b/1.pdf', '/a/2.pdf', '/c/1.pdf', '/a/3.pdf']
+    assert plan_shards(files, 2) == [['/a/1.pdf', '/a/2.pdf'], ['/b/1.pdf', '/a/3.pdf'], ['/c/1.pdf']]
+
+
+def test_bulk_ingest_is_resumable(app, tmp_path):
+    tree = tmp_path / "paper"
+    for year in ("1999", "2000"):
+        (tree / year).mkdir(parents=True)
+        shutil.copy2(SAMPLE_PDF, tree / year / "letter.pdf")
+    (tree / "notes.txt").write_text("not a document")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    assert len(discover_files([str(tree)])) == 2
+    messages = []
+    report = run_bulk_ingest([str(tree)], manifest_path, batch_size=5,
+                             on_progress=lambda stats, message: messages.append(message))
+
+    # Same file name twice -> two shards, each processed into its own batch
+    assert report['shards_total'] == 2 and report['shards_done'] == 2
+    assert report['documents'] == 2 and report['pages'] >= 2 and report['failed'] == 0
+    assert report['stages']['detect']['items'] == 2
+    assert messages[-1] == 'finished'
+    manifest = json.loads(open(manifest_path).read())
+    assert [s['status'] for s in manifest['shards']] == ['done', 'done']
+    assert len(manifest['runs']) == 1
+
+    # Re-running finds nothing new and does no work; a new file gets its own shard
+    again = run_bulk_ingest([str(tree)], manifest_path, batch_size=5)
+    assert (again['new_files'], again['shards_total'], again['documents']) == (0, 0, 0)
+    shutil.copy2(SAMPLE_PDF, tree / "2000" / "invoice.pdf")
+    dry = run_bulk_ingest([str(tree)], manifest_path, batch_size=5, dry_run=True)
+    assert dry['new_files'] == 1 and len(dry['shards']) == 1
+
+
+def test_distributed_ingest_stops_without_worker_processes(app, tmp_path, monkeypatch):
+    import doc_processor.config_manager as config_manager
+    from doc_processor import bulk_ingest, job_queue
+
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(bulk_ingest, 'app_config', config_manager.app_config)
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_WORKERS', 4)
+    monkeypatch.setattr(bulk_ingest, '_JOB_POLL_SECONDS', 0.01)
+    monkeypatch.setattr(bulk_ingest, '_NO_WORKER_GRACE_SECONDS', 0.05)
+    for name in ("a", "b"):
+        (tmp_path / name).mkdir()
+        shutil.copy2(SAMPLE_PDF, tmp_path / name / "letter.pdf")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    report = run_bulk_ingest([str(tmp_path / "a"), str(tmp_path / "b")], manifest_path, batch_size=5, distribute=True)
+
+    # The runner only queued: no job threads here, the job waits for a worker process
+    assert not job_queue._workers
+    assert [j['status'] for j in job_queue.list_jobs(job_type='processing.document')] == ['queued']
+    # Stopped at the first shard instead of waiting on every shard; both stay unfinished
+    assert report['shards_done'] == 0
+    assert 'no worker process' in report['shards'][0]['error'] and report['shards'][1]['error'] is None
+    manifest = json.loads(open(manifest_path).read())
+    assert [s['status'] for s in manifest['shards']] == ['detected', 'pending']
+
+
+def test_same_named_scans_in_different_shards_keep_both_originals(app, tmp_path, monkeypatch):
+    from types import SimpleNamespace
+
+    import doc_processor.config_manager as config_manager
+    from doc_processor import bulk_ingest, processing
+    from doc_processor.database import get_db_connection
+    from doc_processor.document_detector import DocumentAnalysis
+
+    archive = tmp_path / 'archive'
+    monkeypatch.setattr(processing.app_config, 'ARCHIVE_DIR', str(archive))
+    monkeypatch.setattr(processing.app_config, 'PROCESSED_DIR', str(tmp_path / 'processed'))
+    monkeypatch.setattr(bulk_ingest, 'app_config', config_manager.app_config)
+
+    class ScanDetector:
+        def analyze_files(self, paths, max_workers=None):
+            return [DocumentAnalysis(file_path=p, file_size_mb=0.1, page_count=1, processing_strategy='batch_scan',
+                                     confidence=0.9, reasoning=['test']) for p in paths]
+
+    monkeypatch.setattr(bulk_ingest, 'get_detector', lambda *a, **k: ScanDetector())
+    monkeypatch.setattr(processing, 'convert_from_path', lambda path, **k: [
+        SimpleNamespace(filename=str(tmp_path / f"{os.path.basename(os.path.dirname(path))}_page-1.png"))])
+    monkeypatch.setattr(processing, '_process_single_page_from_file', lambda cursor, **k: cursor.execute(
+        "INSERT INTO pages (batch_id, source_filename, page_number, ocr_text) VALUES (?, ?, ?, 'text')",
+        (k['batch_id'], k['source_filename'], k['page_num'])))
+    conn = get_db_connection()
+    conn.execute("ALTER TABLE pages ADD COLUMN ocr_text TEXT")
+    conn.execute("ALTER TABLE pages ADD COLUMN ai_suggested_category TEXT")
+    conn.commit()
+    conn.close()
+    for folder in ("1999", "2000"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "scan001.pdf").write_bytes(f"%PDF scan from {folder}".encode())
+
+    report = run_bulk_ingest([str(tmp_path / "1999"), str(tmp_path / "2000")], str(tmp_path / "manifest.json"),
+                             batch_size=5)
+
+    assert report['shards_done'] == 2 and report['failed'] == 0
+    archived = sorted(p for p in archive.rglob('scan001.pdf'))
+    assert len(archived) == 2
+    assert sorted(p.read_bytes() for p in archived) == [b"%PDF scan from 1999", b"%PDF scan from 2000"]
@@ -0,0 +1,151 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from doc_processor.cancellation import (CancellationToken, OperationCancelled, check_cancelled, iterate_with_token,
+                                        run_cancellable, use_token)
+from doc_processor.scheduler import PriorityGate
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "fixtures", "sample_small.pdf")
+
+
+def test_blocked_calls_return_within_a_second_of_cancel():
+    flag = {'cancelled': False}
+    token = CancellationToken(check=lambda: flag['cancelled'])
+    release = threading.Event()
+    threading.Timer(0.3, lambda: flag.update(cancelled=True)).start()
+
+    started = time.monotonic()
+    with use_token(token), pytest.raises(OperationCancelled):
+        run_cancellable(release.wait, 30)  # e.g. a slow LLM request
+    assert time.monotonic() - started < 1.5
+    release.set()
+
+    # A waiter queued behind a busy gate slot leaves the queue too
+    gate = PriorityGate('cancel-test', 'SCHEDULER_MISSING_SETTING', 1)
+    held, done = threading.Event(), threading.Event()
+
+    def holder():
+        with gate.slot():
+            held.set()
+            done.wait(5)
+
+    threading.Thread(target=holder).start()
+    assert held.wait(5)
+    waiting = CancellationToken()
+    threading.Timer(0.2, waiting.cancel).start()
+    with use_token(waiting), pytest.raises(OperationCancelled):
+        with gate.slot():
+            pass
+    assert gate.stats()['lanes']['background']['waiting'] == 0
+    done.set()
+
+    # Without a current token nothing changes
+    assert run_cancellable(lambda: 42) == 42
+    check_cancelled()
+
+
+def test_cancelled_pipeline_keeps_finished_documents_only(app, temp_intake_dir, monkeypatch, tmp_path):
+    from PIL import Image
+
+    from doc_processor.batch_guard import create_new_batch
+    from doc_processor.checkpoints import get_checkpoints
+    from doc_processor.config_manager import app_config
+    from doc_processor.database import get_db_connection
+    from doc_processor.document_detector import DocumentAnalysis
+    from doc_processor.processing import _process_docs_into_fixed_batch_with_progress
+
+    monkeypatch.setattr(app_config, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(app_config, 'WIP_DIR', str(tmp_path / 'wip'))
+    monkeypatch.setattr(app_config, 'PROCESSED_DIR', str(tmp_path / 'processed'))
+    paths = []
+    for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+        paths.append(os.path.join(temp_intake_dir, name))
+        shutil.copy2(SAMPLE_PDF, paths[-1])
+    image = os.path.join(temp_intake_dir, 'd.png')
+    Image.new('RGB', (200, 100), (255, 255, 255)).save(image)
+    paths.append(image)
+    docs = [DocumentAnalysis(file_path=p, file_size_mb=0.1, page_count=1, processing_strategy='single_document',
+                             confidence=0.9, reasoning=['test']) for p in paths]
+    batch_id = create_new_batch('processing')
+
+    token = CancellationToken()
+    events = []
+    for event in iterate_with_token(token, _process_docs_into_fixed_batch_with_progress(docs, batch_id)):
+        events.append(event)
+        if event.get('document_complete'):
+            token.cancel()
+
+    assert events[-1].get('cancelled') is True
+    assert sum(1 for e in events if e.get('document_complete')) == 1
+    conn = get_db_connection()
+    rows = conn.execute("SELECT status FROM single_documents WHERE batch_id = ?", (batch_id,)).fetchall()
+    status = conn.execute("SELECT status FROM batches WHERE id = ?", (batch_id,)).fetchone()[0]
+    conn.close()
+    # Only the finished document stays; no resumable run, the image is back in intake
+    assert [r[0] for r in rows] == ['ready_for_manipulation']
+    assert status == app_config.STATUS_READY_FOR_MANIPULATION
+    assert get_checkpoints(batch_id) == {}
+    assert os.path.exists(image)
+
+
+
+def test_closing_a_cancelled_pipeline_discards_unfinished_documents(app, temp_intake_dir, monkeypatch, tmp_path):
+    from doc_processor.batch_guard import create_new_batch
+    from doc_processor.checkpoints import get_checkpoints
+    from doc_processor.config_manager import app_config
+    from doc_processor.database import get_db_connection
+    from doc_processor.document_detector import DocumentAnalysis
+    from doc_processor.processing import _process_docs_into_fixed_batch_with_progress
+
+    monkeypatch.setattr(app_config, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(app_config, 'WIP_DIR', str(tmp_path / 'wip'))
+    monkeypatch.setattr(app_config, 'PROCESSED_DIR', str(tmp_path / 'processed'))
+    paths = []
+    for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+        paths.append(os.path.join(temp_intake_dir, name))
+        shutil.copy2(SAMPLE_PDF, paths[-1])
+    docs = [DocumentAnalysis(file_path=p, file_size_mb=0.1, page_count=1, processing_strategy='single_document',
+                             confidence=0.9, reasoning=['test']) for p in paths]
+    batch_id = create_new_batch('processing')
+
+    # Like the smart-processing relay: stop reading on cancel and close the generator
+    token = CancellationToken()
+    run = _process_docs_into_fixed_batch_with_progress(docs, batch_id)
+    with use_token(token):
+        for event in run:
+            if event.get('document_complete'):
+                token.cancel()
+                break
+        run.close()
+
+    conn = get_db_connection()
+    rows = conn.execute("SELECT status FROM single_documents WHERE batch_id = ?", (batch_id,)).fetchall()
+    conn.close()
+    assert [r[0] for r in rows] == ['ready_for_manipulation']
+    assert get_checkpoints(batch_id) == {}
+
+def test_discarded_documents_lose_their_stored_text(app, tmp_path):
+    from doc_processor.batch_guard import create_new_batch
+    from doc_processor.checkpoints import record_checkpoint
+    from doc_processor.database import get_db_connection, set_document_text
+    from doc_processor.processing import _discard_unfinished_documents
+
+    batch_id = create_new_batch('processing')
+    conn = get_db_connection()
+    try:
+        doc_id = conn.execute("INSERT INTO single_documents (batch_id, original_filename, status) VALUES (?, 'a.pdf', "
+                              "'processing')", (batch_id,)).lastrowid
+        set_document_text('single_document', doc_id, 'ocr_text', 'OCR of a document the cancel discards', conn=conn)
+        record_checkpoint(batch_id, '/in/a.pdf', 'normalized', {'doc_id': doc_id, 'pdf_path': None}, conn=conn)
+        conn.commit()
+
+        assert _discard_unfinished_documents(batch_id, conn, str(tmp_path)) == 1
+        conn.commit()
+        assert conn.execute("SELECT COUNT(*) FROM document_text WHERE owner_type = 'single_document' AND owner_id = ?",
+                            (doc_id,)).fetchone()[0] == 0
+    finally:
+        conn.close()
@@ -0,0 +1,132 @@
+import os
+import shutil
+
+from doc_processor import checkpoints
+from doc_processor.checkpoints import (BATCH_KEY, finish_batch_run, get_checkpoints, list_resumable_batches,
+                                       record_checkpoint, start_batch_run)
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "fixtures", "sample_small.pdf")
+
+
+def _new_batch():
+    from doc_processor.batch_guard import create_new_batch
+    return create_new_batch('processing')
+
+
+def test_manifest_staleness_and_cleanup(app):
+    batch_id = _new_batch()
+    start_batch_run(batch_id, 'single_documents', [{'file_path': '/in/a.pdf'}])
+    start_batch_run(batch_id, 'single_documents', [{'file_path': '/in/b.pdf'}])
+    record_checkpoint(batch_id, '/in/a.pdf', 'persisted')
+
+    manifest = get_checkpoints(batch_id)[BATCH_KEY]['started']
+    assert sorted(item['file_path'] for item in manifest['items']) == ['/in/a.pdf', '/in/b.pdf']
+    # Recent activity: another process may still own the run
+    assert list_resumable_batches(stale_seconds=60) == []
+    [run] = list_resumable_batches(stale_seconds=0)
+    assert (run['batch_id'], run['flow'], run['items_total'], run['items_done']) == (batch_id, 'single_documents', 2, 1)
+
+    finish_batch_run(batch_id)
+    assert get_checkpoints(batch_id) == {} and list_resumable_batches(stale_seconds=0) == []
+
+    # A run whose batch was deleted is dropped instead of listed
+    orphan = _new_batch()
+    start_batch_run(orphan, 'traditional', [{'file_path': '/in/c.pdf'}])
+    conn = checkpoints._get_db_connection()
+    conn.execute("DELETE FROM batches WHERE id = ?", (orphan,))
+    conn.commit()
+    conn.close()
+    assert list_resumable_batches(stale_seconds=0) == [] and get_checkpoints(orphan) == {}
+
+
+def test_resume_skips_documents_already_persisted(app, temp_intake_dir):
+    from doc_processor.processing import resume_batch
+
+    done_pdf = os.path.join(temp_intake_dir, "done.pdf")
+    todo_pdf = os.path.join(temp_intake_dir, "todo.pdf")
+    shutil.copy2(SAMPLE_PDF, done_pdf)
+    shutil.copy2(SAMPLE_PDF, todo_pdf)
+    batch_id = _new_batch()
+    start_batch_run(batch_id, 'single_documents', [
+        {'file_path': done_pdf, 'file_size_mb': 0.1, 'page_count': 1, 'pdf_path': None},
+        {'file_path': todo_pdf, 'file_size_mb': 0.1, 'page_count': 1, 'pdf_path': None},
+    ])
+    record_checkpoint(batch_id, done_pdf, 'persisted')
+
+    assert resume_batch(batch_id) is True
+
+    conn = checkpoints._get_db_connection()
+    try:
+        names = [r[0] for r in conn.execute("SELECT original_filename FROM single_documents WHERE batch_id = ?", (batch_id,))]
+        status = conn.execute("SELECT status FROM batches WHERE id = ?", (batch_id,)).fetchone()[0]
+    finally:
+        conn.close()
+    assert names == ["todo.pdf"]
+    assert status == 'ready_for_manipulation'
+    assert get_checkpoints(batch_id) == {}
+    assert resume_batch(batch_id) is False  # nothing left to resume
+
+
+def test_traditional_resume_continues_mid_file(app, temp_intake_dir, monkeypatch, tmp_path):
+    from types import SimpleNamespace
+
+    from doc_processor import processing
+    from doc_processor.checkpoints import page_key
+
+    pdf = os.path.join(temp_intake_dir, "scan.pdf")
+    shutil.copy2(SAMPLE_PDF, pdf)
+    monkeypatch.setattr(processing.app_config, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(processing.app_config, 'PROCESSED_DIR', str(tmp_path / 'processed'))
+    monkeypatch.setattr(processing, 'convert_from_path', lambda *a, **k: [
+        SimpleNamespace(filename=str(tmp_path / f"scan_page-{n}.png")) for n in (1, 2, 3)])
+    ocr_calls = []
+
+    def fake_page(cursor, image_path, batch_id, source_filename, page_num):
+        ocr_calls.append(page_num)
+        if page_num == 2 and ocr_calls.count(2) == 1:
+            raise RuntimeError("worker killed mid-file")
+        cursor.execute("INSERT INTO pages (batch_id, source_filename, page_number, ocr_text) VALUES (?, ?, ?, ?)",
+                       (batch_id, source_filename, page_num, f"page {page_num}"))
+
+    monkeypatch.setattr(processing, '_process_single_page_from_file', fake_page)
+    conn = checkpoints._get_db_connection()
+    conn.execute("ALTER TABLE pages ADD COLUMN ocr_text TEXT")
+    conn.execute("ALTER TABLE pages ADD COLUMN ai_suggested_category TEXT")
+    conn.commit()
+    conn.close()
+    batch_id = _new_batch()
+
+    assert processing._process_batch_traditional([pdf], into_batch_id=batch_id) is False
+    # Page 1's row and checkpoint were committed before the failure
+    assert 'ocr' in get_checkpoints(batch_id)[page_key(pdf, 1)]
+
+    assert processing.resume_batch(batch_id) is True
+    conn = checkpoints._get_db_connection()
+    try:
+        pages = [r[0] for r in conn.execute("SELECT page_number FROM pages WHERE batch_id = ? ORDER BY page_number",
+                                            (batch_id,))]
+    finally:
+        conn.close()
+    assert pages == [1, 2, 3]
+    assert ocr_calls == [1, 2, 2, 3]  # page 1 was not OCR'd again
+
+
+def test_resume_waits_for_the_job_holding_the_batch(app, client, monkeypatch):
+    from doc_processor import job_queue
+    from doc_processor.processing import schedule_interrupted_batch_resumes
+
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(job_queue, 'start_job_workers', lambda *a, **k: False)
+    monkeypatch.setattr(checkpoints._config(), 'BATCH_RESUME_STALE_SECONDS', 0)
+    batch_id = _new_batch()
+    start_batch_run(batch_id, 'traditional', [{'file_path': '/in/scan.pdf'}])
+    # e.g. a batch.traditional job reclaimed from a process that died
+    job_id = job_queue.enqueue_job('batch.traditional', {'batch_id': batch_id})
+
+    assert schedule_interrupted_batch_resumes() == []
+    resp = client.post(f'/admin/api/resumable_batches/{batch_id}/resume')
+    assert resp.status_code == 409
+
+    job_queue.complete_job(job_queue.claim_job(['batch.traditional']), None)
+    assert job_queue.get_job(job_id)['status'] == 'succeeded'
+    assert schedule_interrupted_batch_resumes() == [batch_id]
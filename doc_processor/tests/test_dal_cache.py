@@ -0,0 +1,72 @@
+import sqlite3
+
+
+def test_dal_cache_hits_until_table_written(temp_db_path, allow_db_creation):
+    from doc_processor import database
+
+    database.clear_dal_cache()
+    conn = database.get_db_connection()
+    try:
+        conn.execute("INSERT INTO categories (name) VALUES ('Invoice')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert database.get_all_categories() == ['Invoice']
+    before = database.get_dal_cache_stats()['functions']['get_all_categories']
+    assert database.get_all_categories() == ['Invoice']
+    after = database.get_dal_cache_stats()['functions']['get_all_categories']
+    assert after['hits'] == before['hits'] + 1
+
+    # A write from an unrelated connection (as another process would) invalidates precisely
+    raw = sqlite3.connect(str(temp_db_path))
+    raw.execute("INSERT INTO categories (name) VALUES ('Receipt')")
+    raw.commit()
+    raw.close()
+    assert database.get_all_categories() == ['Invoice', 'Receipt']
+    assert database.get_active_categories() == ['Invoice', 'Receipt']
+
+
+def test_dal_cache_ignores_unrelated_writes(temp_db_path, allow_db_creation):
+    from doc_processor import database
+
+    database.clear_dal_cache()
+    database.get_db_connection().close()  # ensure schema + triggers
+    assert database.get_all_categories() == []
+    hits = database.get_dal_cache_stats()['functions']['get_all_categories']['hits']
+
+    raw = sqlite3.connect(str(temp_db_path))
+    raw.execute("INSERT INTO batches (status) VALUES ('ready')")
+    raw.commit()
+    raw.close()
+
+    assert database.get_all_categories() == []
+    assert database.get_dal_cache_stats()['functions']['get_all_categories']['hits'] == hits + 1
+
+
+def test_pages_cache_uses_data_version_instead_of_row_triggers(temp_db_path, allow_db_creation):
+    from doc_processor import database
+
+    database.clear_dal_cache()
+    conn = database.get_db_connection()
+    try:
+        conn.execute("ALTER TABLE pages ADD COLUMN human_verified_category TEXT")
+        conn.commit()
+        triggers = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='pages'"
+        ).fetchall()]
+    finally:
+        conn.close()
+    assert not [t for t in triggers if t.startswith('trg_dal_version_')]
+
+    assert database.get_all_unique_categories() == []
+    hits = database.get_dal_cache_stats()['functions']['get_all_unique_categories']['hits']
+    assert database.get_all_unique_categories() == []
+    assert database.get_dal_cache_stats()['functions']['get_all_unique_categories']['hits'] == hits + 1
+
+    raw = sqlite3.connect(str(temp_db_path))
+    raw.execute("INSERT INTO pages (batch_id, source_filename, page_number, human_verified_category) "
+                "VALUES (1, 'a.pdf', 1, 'Invoice')")
+    raw.commit()
+    raw.close()
+    assert database.get_all_unique_categories() == ['Invoice']
@@ -0,0 +1,118 @@
+import sqlite3
+
+
+def _seed_exported_batch(db_path, days_ago):
+    from doc_processor import database
+
+    conn = database.get_db_connection()
+    try:
+        cur = conn.execute(
+            "INSERT INTO batches (status, start_time, exported_at) VALUES ('exported', datetime('now', ?), datetime('now', ?))",
+            (f'-{days_ago} days', f'-{days_ago} days'),
+        )
+        batch_id = cur.lastrowid
+        cur = conn.execute(
+            "INSERT INTO single_documents (batch_id, original_filename, status) VALUES (?, ?, 'completed')",
+            (batch_id, f'statement_{batch_id}.pdf'),
+        )
+        doc_id = cur.lastrowid
+        conn.commit()
+    finally:
+        conn.close()
+    database.set_document_text('single_document', doc_id, 'ocr_text', f'Quarterly statement for batch {batch_id}')
+    return batch_id, doc_id
+
+
+def test_archive_moves_old_exported_batches(temp_db_path, allow_db_creation, monkeypatch):
+    archive_path = temp_db_path.parent / "archive.db"
+    from doc_processor import db_archive
+
+    monkeypatch.setattr(db_archive.app_config, 'ARCHIVE_DATABASE_PATH', str(archive_path), raising=False)
+
+    old_batch, old_doc = _seed_exported_batch(temp_db_path, 120)
+    recent_batch, _ = _seed_exported_batch(temp_db_path, 2)
+
+    dry = db_archive.archive_exported_batches(older_than_days=30, dry_run=True)
+    assert dry['candidates'] == [old_batch] and dry['archived'] == []
+
+    result = db_archive.archive_exported_batches(older_than_days=30)
+    assert result['archived'] == [old_batch]
+    assert result['rows_moved']['single_documents'] == 1
+
+    raw = sqlite3.connect(str(temp_db_path))
+    try:
+        remaining = [r[0] for r in raw.execute("SELECT id FROM batches ORDER BY id")]
+        leftover_text = raw.execute(
+            "SELECT COUNT(*) FROM document_text WHERE owner_type = 'single_document' AND owner_id = ?", (old_doc,)
+        ).fetchone()[0]
+    finally:
+        raw.close()
+    assert remaining == [recent_batch]
+    assert leftover_text == 0
+
+    archived = db_archive.get_archived_batch(old_batch)
+    assert archived['archived'] and archived['single_document_count'] == 1
+    assert db_archive.get_archived_batch(recent_batch) is None
+
+    # Search spans both databases, including OCR text stored in the archive
+    hits = db_archive.search_documents('statement_', include_ocr=True)
+    assert {(h['batch_id'], h['archived']) for h in hits} == {(old_batch, 1), (recent_batch, 0)}
+    ocr_hits = db_archive.search_documents(f'batch {old_batch}', include_ocr=True)
+    assert [h['id'] for h in ocr_hits] == [old_doc]
+    assert db_archive.search_documents('statement_', include_archive=False)[0]['batch_id'] == recent_batch
+
+    # Re-running is a no-op
+    assert db_archive.archive_exported_batches(older_than_days=30)['archived'] == []
+
+
+def test_archived_batches_stay_reachable_in_the_app(client, temp_db_path, allow_db_creation, monkeypatch):
+    from doc_processor import database, db_archive
+
+    monkeypatch.setattr(db_archive.app_config, 'ARCHIVE_DATABASE_PATH', str(temp_db_path.parent / "archive.db"),
+                        raising=False)
+    batch_id, doc_id = _seed_exported_batch(temp_db_path, 120)
+    assert db_archive.archive_exported_batches(older_than_days=30)['archived'] == [batch_id]
+
+    batch = database.get_batch_by_id(batch_id)
+    assert batch['archived'] and batch['id'] == batch_id
+
+    resp = client.get('/api/search_documents?q=statement_')
+    assert resp.status_code == 200
+    assert [(r['id'], r['archived']) for r in resp.get_json()['data']['results']] == [(doc_id, 1)]
+    assert client.get('/api/search_documents').status_code == 400
+
+    page = client.get('/batch/control')
+    assert page.status_code == 200 and f'#{batch_id}'.encode() in page.data and b'(archived)' in page.data
+    assert client.get(f'/batch/{batch_id}/audit').status_code == 200
+
+
+def test_interrupted_archive_keeps_the_batch_in_main(temp_db_path, allow_db_creation, monkeypatch):
+    from doc_processor import db_archive
+
+    archive_path = temp_db_path.parent / "archive.db"
+    monkeypatch.setattr(db_archive.app_config, 'ARCHIVE_DATABASE_PATH', str(archive_path), raising=False)
+    batch_id, doc_id = _seed_exported_batch(temp_db_path, 120)
+
+    def crash(conn, bid):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    # Dies after the archive copy was committed, before main is touched
+    with monkeypatch.context() as m:
+        m.setattr(db_archive, 'delete_archived_batch', crash)
+        assert db_archive.archive_exported_batches(older_than_days=30)['failed'] == [batch_id]
+    raw = sqlite3.connect(str(temp_db_path))
+    try:
+        assert raw.execute("SELECT COUNT(*) FROM single_documents WHERE id = ?", (doc_id,)).fetchone()[0] == 1
+    finally:
+        raw.close()
+    assert db_archive.get_archived_batch(batch_id)['single_document_count'] == 1
+
+    # The next run replaces the copy and then removes the batch from main
+    assert db_archive.archive_exported_batches(older_than_days=30)['archived'] == [batch_id]
+    raw = sqlite3.connect(str(archive_path))
+    try:
+        assert raw.execute("SELECT COUNT(*) FROM single_documents WHERE batch_id = ?", (batch_id,)).fetchone()[0] == 1
+        assert raw.execute("SELECT COUNT(*) FROM document_text WHERE owner_id = ?", (doc_id,)).fetchone()[0] == 1
+    finally:
+        raw.close()
+    assert db_archive.find_archivable_batches(older_than_days=30) == []
@@ -30,3 +30,65 @@ def test_allow_new_db_backup_creates_timestamped_backup(tmp_path, monkeypatch):
     finally:
         if conn:
             conn.close()
+
+
+def test_online_backup_snapshot_is_consistent_and_compressed(tmp_path):
+    import gzip
+    import sqlite3
+    from doc_processor import db_backup
+
+    src = tmp_path / "live.db"
+    conn = sqlite3.connect(str(src))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany("INSERT INTO t (body) VALUES (?)", [("x" * 500,)] * 200)
+    conn.commit()
+
+    steps = []
+    try:
+        # Source stays open (WAL not checkpointed) while the backup runs
+        result = db_backup.online_backup(
+            db_path=str(src), dest_dir=str(tmp_path / "backups"), compress=True,
+            pages_per_step=4, step_sleep_ms=0, progress_callback=lambda done, total: steps.append((done, total)),
+        )
+    finally:
+        conn.close()
+
+    assert result['success'] and result['integrity'] == 'ok' and result['compressed']
+    assert result['dest'].endswith('.gz') and len(steps) > 1
+    assert not list((tmp_path / "backups").glob("*.partial"))
+    assert db_backup.get_backup_status()['state'] == 'completed'
+
+    restored = tmp_path / "restored.db"
+    with gzip.open(result['dest'], 'rb') as fin:
+        restored.write_bytes(fin.read())
+    rconn = sqlite3.connect(str(restored))
+    try:
+        assert rconn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 200
+    finally:
+        rconn.close()
+
+
+def test_concurrent_async_backups_start_once(tmp_path, monkeypatch):
+    import threading
+    from doc_processor import db_backup
+
+    release = threading.Event()
+    runs = []
+    monkeypatch.setattr(db_backup, '_online_backup_locked', lambda **kw: (runs.append(kw), release.wait(5)))
+
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(db_backup.start_backup_async(dest_dir=str(tmp_path))))
+               for _ in range(5)]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    assert sorted(results) == [False] * 4 + [True]
+
+    release.set()
+    for _ in range(50):
+        if not db_backup._backup_lock.locked():
+            break
+        threading.Event().wait(0.05)
+    assert len(runs) == 1 and not db_backup._backup_lock.locked()
@@ -0,0 +1,64 @@
+import sqlite3
+
+
+def test_diagnostics_uses_metadata_and_caches(tmp_path):
+    from doc_processor import db_diagnostics
+
+    db = tmp_path / "diag.db"
+    conn = sqlite3.connect(str(db))
+    conn.execute("CREATE TABLE batches (id INTEGER PRIMARY KEY, status TEXT)")
+    conn.execute("CREATE TABLE single_documents (id INTEGER PRIMARY KEY, batch_id INTEGER, body TEXT)")
+    conn.execute("CREATE INDEX idx_sd_batch ON single_documents(batch_id)")
+    conn.executemany("INSERT INTO single_documents (batch_id, body) VALUES (?, ?)", [(i % 3, "x" * 400) for i in range(300)])
+    conn.commit()
+    conn.execute("DELETE FROM single_documents WHERE id > 50")
+    conn.commit()
+
+    snap = db_diagnostics.collect_db_diagnostics(str(db))
+    tables = {t['name']: t for t in snap['tables']}
+    # No ANALYZE yet: estimate is the MAX(rowid) upper bound
+    assert tables['single_documents']['rows'] == 50
+    assert tables['single_documents']['rows_source'] == 'max_rowid'
+    assert snap['freelist_count'] > 0
+    if snap['dbstat_available']:
+        assert tables['single_documents']['pages'] > 0
+        assert snap['vacuum_advice']['recommended']
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    snap = db_diagnostics.collect_db_diagnostics(str(db))
+    tables = {t['name']: t for t in snap['tables']}
+    indexes = {i['name']: i for i in snap['indexes']}
+    assert tables['single_documents']['rows_source'] == 'sqlite_stat1'
+    assert indexes['idx_sd_batch']['low_selectivity']
+
+
+def test_db_diagnostics_page_renders(app, client):
+    resp = client.get('/admin/db_diagnostics?refresh=1')
+    assert resp.status_code == 200
+    assert b'Database Diagnostics' in resp.data
+    data = client.get('/admin/api/db_diagnostics').get_json()
+    assert data['success'] and 'vacuum_advice' in data['data']
+
+
+def test_background_refresh_reuses_last_dbstat_scan(tmp_path, monkeypatch):
+    from doc_processor import db_diagnostics
+
+    db = tmp_path / "diag.db"
+    conn = sqlite3.connect(str(db))
+    conn.execute("CREATE TABLE batches (id INTEGER PRIMARY KEY, status TEXT)")
+    conn.commit()
+    conn.close()
+    scans = []
+    monkeypatch.setattr(db_diagnostics, '_last_btree_usage', None)
+    monkeypatch.setattr(db_diagnostics, '_dbstat_available', lambda conn: True)
+    monkeypatch.setattr(db_diagnostics, '_btree_usage',
+                        lambda conn: scans.append(1) or {'batches': {'pages': 3, 'bytes': 12288, 'unused_bytes': 0, 'fragmentation': 0.0}})
+
+    full = db_diagnostics.collect_db_diagnostics(str(db))
+    cheap = db_diagnostics.collect_db_diagnostics(str(db), scan_btrees=False)
+
+    assert scans == [1]
+    assert cheap['tables'][0]['pages'] == 3
+    assert cheap['btree_usage_collected_at'] == full['collected_at']
@@ -41,3 +41,110 @@ def test_detection_integration_skip_if_no_intake_dir():
     if not analyses:
         pytest.skip("No files in intake dir to analyze")
     assert isinstance(analyses, list)
+
+
+def test_parallel_analysis_matches_serial(tmp_path):
+    """The process-pool path returns the same analyses, in the same order, as the serial path."""
+    fitz = pytest.importorskip("fitz")
+    for name, pages in (("scan_20240325.pdf", 3), ("invoice_2024_001.pdf", 1), ("b_notes.pdf", 2)):
+        doc = fitz.open()
+        for i in range(pages):
+            doc.new_page().insert_text((72, 72), f"{name} page {i + 1}")
+        doc.save(str(tmp_path / name))
+        doc.close()
+
+    detector = get_detector(use_llm_for_ambiguous=False)
+    serial = detector.analyze_intake_directory(str(tmp_path), max_workers=1, use_cache=False)
+    parallel = detector.analyze_intake_directory(str(tmp_path), max_workers=2, use_cache=False)
+
+    assert [os.path.basename(a.file_path) for a in serial] == ["b_notes.pdf", "invoice_2024_001.pdf", "scan_20240325.pdf"]
+    assert parallel == serial
+
+
+def test_intake_analysis_cache_only_reanalyzes_changed_files(tmp_path, temp_db_path, allow_db_creation, monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    intake = tmp_path / "intake"
+    intake.mkdir()
+
+    def _write(name, text):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), text)
+        doc.save(str(intake / name))
+        doc.close()
+
+    _write("a_letter.pdf", "first")
+    _write("b_letter.pdf", "second")
+
+    detector = get_detector(use_llm_for_ambiguous=False)
+    analyzed = []
+    original = detector._analyze_file
+    monkeypatch.setattr(detector, "_analyze_file", lambda p: analyzed.append(os.path.basename(p)) or original(p))
+
+    first = detector.analyze_intake_directory(str(intake), max_workers=1, use_cache=True)
+    assert analyzed == ["a_letter.pdf", "b_letter.pdf"]
+
+    analyzed.clear()
+    _write("b_letter.pdf", "second, edited")
+    _write("c_letter.pdf", "third")
+    second = detector.analyze_intake_directory(str(intake), max_workers=1, use_cache=True)
+    assert analyzed == ["b_letter.pdf", "c_letter.pdf"]
+    assert [os.path.basename(a.file_path) for a in second] == ["a_letter.pdf", "b_letter.pdf", "c_letter.pdf"]
+    assert second[0] == first[0]
+
+
+def test_sample_render_is_in_memory_and_cropped(monkeypatch):
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    doc.new_page(width=612, height=792)
+    detector = get_detector(use_llm_for_ambiguous=False)
+    from doc_processor import config_manager
+    cfg = config_manager.app_config  # may have been reloaded by earlier fixtures
+
+    monkeypatch.setattr(cfg, "DETECTOR_SAMPLE_DPI", 72, raising=False)
+    monkeypatch.setattr(cfg, "DETECTOR_SAMPLE_MAX_PIXELS", 0, raising=False)
+    monkeypatch.setattr(cfg, "DETECTOR_SAMPLE_TOP_FRACTION", 0.5, raising=False)
+    img = detector._render_sample_image(doc[0])
+    assert img.mode == "L" and img.size == (612, 396)
+
+    monkeypatch.setattr(cfg, "DETECTOR_SAMPLE_DPI", 300, raising=False)
+    monkeypatch.setattr(cfg, "DETECTOR_SAMPLE_MAX_PIXELS", 1000, raising=False)
+    monkeypatch.setattr(cfg, "DETECTOR_SAMPLE_TOP_FRACTION", 1.0, raising=False)
+    assert max(detector._render_sample_image(doc[0]).size) <= 1000
+    doc.close()
+
+
+def test_parallel_analysis_reuses_a_worker_once_its_timed_out_file_returns(monkeypatch):
+    import multiprocessing
+    import threading
+    import time
+    from multiprocessing.pool import ThreadPool
+    from doc_processor import document_detector
+
+    state = {'running': 0, 'slow_done': False, 'peak_after_slow': 0}
+    lock = threading.Lock()
+
+    def fake_analyze(path):
+        with lock:
+            state['running'] += 1
+            if state['slow_done']:
+                state['peak_after_slow'] = max(state['peak_after_slow'], state['running'])
+        time.sleep(0.5 if path == 'slow' else 0.15)
+        with lock:
+            state['running'] -= 1
+            if path == 'slow':
+                state['slow_done'] = True
+        return path
+
+    class ThreadContext:
+        Pool = staticmethod(lambda processes, initializer=None, initargs=(): ThreadPool(processes))
+
+    monkeypatch.setattr(multiprocessing, 'get_context', lambda method: ThreadContext)
+    monkeypatch.setattr(document_detector, '_analyze_file_in_worker', fake_analyze)
+
+    detector = get_detector(use_llm_for_ambiguous=False)
+    files = ['slow'] + [f'f{i}' for i in range(10)]
+    results = detector._analyze_files_parallel(files, workers=2, timeout=0.3)
+
+    assert results[1:] == files[1:]
+    assert results[0].processing_strategy == 'batch_scan'
+    assert state['peak_after_slow'] == 2
@@ -0,0 +1,128 @@
+import threading
+
+from doc_processor import status_store
+from doc_processor.event_bus import (
+    EventHub, format_sse, get_active_run, get_or_start_run, hub, relay_status_namespace,
+)
+
+
+def test_subscribers_share_one_run_and_replay_history():
+    release = threading.Event()
+    calls = []
+
+    def target(run):
+        calls.append(1)
+        run.publish({'n': 1})
+        release.wait(5)
+        run.publish({'n': 2})
+        run.finish({'complete': True})
+
+    run, started = get_or_start_run('test-shared', target, total=2)
+    joined, started_again = get_or_start_run('test-shared', target, total=2)
+    assert started and not started_again
+    assert joined is run and get_active_run('test-shared') is run
+
+    late = run.subscribe(keepalive_seconds=0.05)
+    release.set()
+    events = [e for e in late if e is not None]
+    # A late subscriber still sees everything published before it joined
+    assert events == [{'n': 1}, {'n': 2}, {'complete': True}]
+    assert calls == [1]
+    assert get_active_run('test-shared') is None
+
+
+def test_failed_target_finishes_run_with_error():
+    def target(run):
+        raise RuntimeError('boom')
+
+    run, _ = get_or_start_run('test-failing', target)
+    events = [e for e in run.subscribe(keepalive_seconds=0.05) if e is not None]
+    assert events[-1] == {'error': 'boom', 'success': False}
+    assert run.done
+
+
+def test_hub_replays_after_last_event_id_and_sends_heartbeats():
+    hub = EventHub(replay_size=3, queue_size=10)
+    first = hub.publish('t', 'progress', {'n': 1})
+    for n in range(2, 5):
+        hub.publish('t', 'progress', {'n': n})
+    hub.publish('other', 'progress', {'n': 99})
+
+    # Reconnect after event 1: events 2-4 are still buffered (event 1 fell out)
+    sub = hub.subscribe('t', last_event_id=first.id)
+    stream = sub.events(heartbeat_seconds=0.05)
+    assert [next(stream).data['n'] for _ in range(3)] == [2, 3, 4]
+    assert next(stream) is None  # idle: heartbeat
+    hub.publish('t', 'done', {'n': 5})
+    event = next(stream)
+    assert (event.type, event.data) == ('done', {'n': 5}) and event.id > first.id
+    hub.close('t')
+    assert list(stream) == []
+    assert hub.stats()['topics'] == {}
+
+
+def test_slow_subscriber_is_dropped_without_blocking_publishers():
+    hub = EventHub(replay_size=10, queue_size=2)
+    slow = hub.subscribe('t')
+    for n in range(5):
+        hub.publish('t', 'progress', {'n': n})
+    assert slow.lagged and hub.stats()['topics'] == {}
+    assert list(slow.events(heartbeat_seconds=0.05)) == []
+    assert format_sse({'n': 1}, 7) == 'id: 7\ndata: {"n": 1}\n\n'
+
+
+def test_status_relay_publishes_store_changes():
+    topic = relay_status_namespace('t.relay')
+    with hub.subscribe(topic) as sub:
+        stream = sub.events(heartbeat_seconds=5)
+        status_store.set_status('t.relay', 'b1', {'progress': 10})
+        event = next(stream)
+        assert event.data == {'key': 'b1', 'value': {'progress': 10}}
+        status_store.delete_status('t.relay', 'b1')
+        assert next(stream).data == {'key': 'b1', 'value': None}
+
+
+def test_smart_sse_follows_run_driven_elsewhere():
+    from doc_processor.routes import batch as batch_routes
+
+    token = 'tok-follow'
+    batch_routes.smart_tokens[token] = {'created': 0, 'last_event': {'message': 'Initializing', 'progress': 0}}
+    assert batch_routes._claim_smart_driver(token, 'job')
+    assert not batch_routes._claim_smart_driver(token, 'sse')
+
+    topic = relay_status_namespace(batch_routes.smart_tokens.namespace)
+    frames = batch_routes._follow_smart_run(token, hub.subscribe(topic))
+    assert next(frames) == 'data: {"connected": true}\n\n'
+    assert '"Initializing"' in next(frames)
+
+    def drive():
+        batch_routes._touch_token(token, last_event={'message': 'Halfway', 'progress': 50})
+        batch_routes._touch_token(token, last_event={'message': 'Done', 'complete': True}, finished=True)
+
+    threading.Thread(target=drive).start()
+    rest = [f for f in frames if not f.startswith(':')]
+    assert rest[-1].startswith('id: ') and '"complete": true' in rest[-1]
+
+
+def test_processing_status_reconnect_starts_from_snapshot(app):
+    from doc_processor.routes import api
+
+    topic = relay_status_namespace(api.processing_status.namespace)
+    api.processing_status['b9'] = {'progress': 80}
+    # An older change still in the replay buffer after the client's Last-Event-ID
+    stale = hub.publish(topic, 'status', {'key': 'b9', 'value': {'progress': 10}})
+
+    with app.test_request_context('/api/events/processing_status', headers={'Last-Event-ID': str(stale.id - 1)}):
+        response = api.processing_status_events()
+    frames = iter(response.response)
+    try:
+        assert '"progress": 80' in next(frames)
+        hub.publish(topic, 'status', {'key': 'b9', 'value': {'progress': 90}})
+        seen = []
+        for frame in frames:
+            seen.append(frame)
+            if '"progress": 90' in frame:
+                break
+        assert not any('"progress": 10' in f for f in seen), seen
+    finally:
+        response.close()
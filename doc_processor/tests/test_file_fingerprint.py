@@ -0,0 +1,46 @@
+import hashlib
+import os
+import time
+
+import doc_processor.config_manager as config_manager
+from doc_processor import file_fingerprint
+from doc_processor.file_fingerprint import files_identical, fingerprint
+
+
+def _age(path, seconds=10):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_fingerprint_memoizes_unchanged_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_manager.app_config, 'FINGERPRINT_DB_PATH', str(tmp_path / 'fp.db'))
+    monkeypatch.setattr(config_manager.app_config, 'FINGERPRINT_MMAP_THRESHOLD_BYTES', 1024)
+    big = tmp_path / 'big.bin'
+    big.write_bytes(os.urandom(300 * 1024))
+    _age(big)
+
+    full = fingerprint(str(big))
+    assert full == hashlib.sha256(big.read_bytes()).hexdigest()  # mmap path
+    assert fingerprint(str(big), 'fast') != full
+
+    hashed = file_fingerprint.get_fingerprint_stats()['hashed']
+    file_fingerprint._memo.clear()  # force the SQLite store
+    assert fingerprint(str(big)) == full
+    assert file_fingerprint.get_fingerprint_stats()['hashed'] == hashed
+
+    # Changing the file changes the key, so it is hashed again
+    with open(big, 'ab') as f:
+        f.write(b'more')
+    _age(big, 5)
+    assert fingerprint(str(big)) == hashlib.sha256(big.read_bytes()).hexdigest()
+
+
+def test_files_identical(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_manager.app_config, 'FINGERPRINT_DB_PATH', str(tmp_path / 'fp.db'))
+    a, b, c = tmp_path / 'a', tmp_path / 'b', tmp_path / 'c'
+    a.write_bytes(b'same content')
+    b.write_bytes(b'same content')
+    c.write_bytes(b'diff content')
+    assert files_identical(str(a), str(b))
+    assert not files_identical(str(a), str(c))
+    assert files_identical(str(a), str(a))
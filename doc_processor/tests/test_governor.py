@@ -0,0 +1,52 @@
+from doc_processor import governor
+from doc_processor.config_manager import app_config
+from doc_processor.scheduler import llm_gate, ocr_gate
+
+CALM = {'cpu_percent': 20.0, 'load_percent_per_cpu': 15.0, 'memory_available_percent': 60.0,
+        'ollama_latency_seconds': 2.0, 'ocr_waiting': 3, 'llm_waiting': 1}
+
+
+def test_decide_steps_within_bounds(monkeypatch):
+    monkeypatch.setattr(app_config, 'GOVERNOR_OCR_MAX_SLOTS', 3, raising=False)
+    monkeypatch.setattr(app_config, 'GOVERNOR_LLM_MAX_SLOTS', 2, raising=False)
+
+    # Idle host with work queued: one step up each, never past the maximum
+    assert governor.decide(CALM, 2, 1, False)[:3] == (3, 2, False)
+    assert governor.decide(CALM, 3, 2, False)[:3] == (3, 2, False)
+    # Nothing queued: no growth, no decision logged
+    assert governor.decide(dict(CALM, ocr_waiting=0, llm_waiting=0), 2, 1, False) == (2, 1, False, [])
+
+    # Busy CPU and a slow model shrink one step, never below one slot
+    busy = dict(CALM, load_percent_per_cpu=150.0, ollama_latency_seconds=90.0)
+    ocr, llm, paused, reasons = governor.decide(busy, 3, 2, False)
+    assert (ocr, llm, paused) == (2, 1, False) and len(reasons) == 2
+    assert governor.decide(busy, 1, 1, False)[:2] == (1, 1)
+
+    # Unreadable signals are ignored
+    unknown = {k: None for k in CALM}
+    assert governor.decide(unknown, 2, 1, False) == (2, 1, False, [])
+
+
+def test_low_memory_pauses_intake_until_recovered(monkeypatch):
+    monkeypatch.setattr(app_config, 'GOVERNOR_MIN_FREE_MEMORY_PERCENT', 10.0, raising=False)
+    samples = iter([dict(CALM, memory_available_percent=4.0),
+                    dict(CALM, memory_available_percent=12.0, ocr_waiting=0, llm_waiting=0),
+                    dict(CALM, memory_available_percent=40.0, ocr_waiting=0, llm_waiting=0)])
+    monkeypatch.setattr(governor, 'sample', lambda: dict(next(samples), ts=0.0))
+    try:
+        decision = governor.govern_once()
+        assert (decision['ocr_slots'], decision['llm_slots']) == (1, 1)
+        assert governor.intake_paused() and ocr_gate.slots == 1
+
+        # Just above the threshold is not enough headroom to resume
+        governor.govern_once()
+        assert governor.intake_paused()
+        assert not governor.govern_once()['intake_paused']
+
+        status = governor.get_governor_status()
+        assert not status['intake_paused']
+        assert [d['intake_paused'] for d in status['decisions'][-2:]] == [True, False]
+    finally:
+        ocr_gate.set_limit(None)
+        llm_gate.set_limit(None)
+        governor._intake_paused = False
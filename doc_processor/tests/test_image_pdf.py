@@ -0,0 +1,32 @@
+import fitz
+from PIL import Image
+
+from doc_processor.utils.image_pdf import write_image_pdf, page_source_image
+
+
+def test_jpeg_bytes_pass_through_unchanged(tmp_path):
+    jpg = tmp_path / 'scan.jpg'
+    Image.new('RGB', (300, 150), 'red').save(jpg, quality=80)
+    pdf = write_image_pdf(str(jpg), str(tmp_path / 'scan.pdf'))
+
+    with fitz.open(pdf) as doc:
+        page = doc[0]
+        assert (round(page.rect.width), round(page.rect.height)) == (144, 72)  # 150 dpi
+        assert page_source_image(doc, page) == jpg.read_bytes()
+
+
+def test_transparent_png_is_flattened_and_rendered_pages_are_skipped(tmp_path):
+    png = tmp_path / 'logo.png'
+    Image.new('RGBA', (64, 64), (0, 0, 255, 0)).save(png)
+    pdf = write_image_pdf(str(png), str(tmp_path / 'logo.pdf'))
+
+    with fitz.open(pdf) as doc:
+        data = page_source_image(doc, doc[0])
+        assert data is not None
+        assert doc.extract_image(doc[0].get_images()[0][0])['smask'] == 0
+
+    # A text page is not a single image: callers fall back to rendering
+    with fitz.open() as doc:
+        page = doc.new_page()
+        page.insert_text((72, 72), 'hello')
+        assert page_source_image(doc, page) is None
@@ -69,3 +69,34 @@ def test_analyze_intake_progress_emits_pdf_counters(monkeypatch, tmp_path):
 
     # Check pdf_total equals number of files (2 pdfs + 1 image -> 3 PDFs after conversion)
     assert '"pdf_total": 3' in text or "'pdf_total': 3" in text
+
+    # Each file's result is streamed as it completes, before the final payload
+    assert text.count('"file_result"') == 3, text
+    assert '"pdf_progress": 3' in text and '"eta_seconds"' in text
+    assert text.rindex('"file_result"') < text.index('"complete": true')
+
+
+def test_analyze_intake_progress_reanalyzes_when_intake_changes(monkeypatch, tmp_path):
+    intake = tmp_path / 'intake'
+    intake.mkdir()
+    (intake / 'a.pdf').write_text('%PDF-1')
+    monkeypatch.setattr(app_config, 'INTAKE_DIR', str(intake))
+    monkeypatch.setenv('TEST_TMPDIR', str(tmp_path / 'tmp'))
+
+    import doc_processor.routes.intake as intake_module
+
+    monkeypatch.setattr(intake_module, 'get_detector', lambda use_llm_for_ambiguous=True: DummyDetector(str(tmp_path)))
+    client = create_app().test_client()
+
+    first = client.get('/api/analyze_intake_progress').get_data(as_text=True)
+    assert first.count('"file_result"') == 1, first
+
+    # Unchanged intake: answered from the cache, still opening with the counters
+    cached = client.get('/api/analyze_intake_progress').get_data(as_text=True)
+    assert '"pdf_total": 1' in cached and '"complete": true' in cached
+    assert '"file_result"' not in cached
+
+    # A new file makes the cached result set stale
+    (intake / 'b.pdf').write_text('%PDF-2')
+    fresh = client.get('/api/analyze_intake_progress').get_data(as_text=True)
+    assert '"pdf_total": 2' in fresh and fresh.count('"file_result"') == 2, fresh
@@ -0,0 +1,46 @@
+import os
+import time
+
+import pytest
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher_preanalyzes_settled_files(tmp_path, temp_db_path, allow_db_creation, monkeypatch, use_inotify):
+    fitz = pytest.importorskip("fitz")
+    from doc_processor import database
+    from doc_processor.document_detector import get_detector
+    from doc_processor.intake_watcher import IntakeWatcher
+
+    intake = tmp_path / "intake"
+    intake.mkdir()
+    watcher = IntakeWatcher(str(intake), settle_seconds=0.2, poll_seconds=0.05,
+                            use_inotify=use_inotify, rebuild_result_set=False)
+    watcher._detector = get_detector(use_llm_for_ambiguous=False)
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "arrived")
+    doc.save(str(intake / "invoice_2024_001.pdf"))
+    doc.close()
+
+    # First notice only starts the settle clock
+    assert watcher.poll_once(0.1) == 0
+    deadline = time.time() + 5
+    processed = 0
+    while not processed and time.time() < deadline:
+        time.sleep(0.1)
+        processed = watcher.poll_once(0.05)
+    assert processed == 1
+    assert watcher.stats['preanalyzed'] == 1
+
+    conn = database.get_db_connection()
+    try:
+        names = [r[0] for r in conn.execute("SELECT file_name FROM intake_analysis_cache")]
+    finally:
+        conn.close()
+    assert names == ["invoice_2024_001.pdf"]
+
+    # Later directory analysis is served entirely from the cache
+    detector = get_detector(use_llm_for_ambiguous=False)
+    monkeypatch.setattr(detector, "_analyze_file", lambda p: pytest.fail(f"re-analyzed {p}"))
+    analyses = detector.analyze_intake_directory(str(intake), max_workers=1)
+    assert [os.path.basename(a.file_path) for a in analyses] == ["invoice_2024_001.pdf"]
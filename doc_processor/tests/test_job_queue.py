@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+import doc_processor.config_manager as config_manager
+from doc_processor import job_queue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """An isolated queue database with no background workers claiming jobs."""
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(job_queue, 'start_job_workers', lambda *a, **k: False)
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_CONCURRENCY', '')
+    monkeypatch.setattr(job_queue, '_handlers', {})
+    return job_queue
+
+
+def test_idempotency_key_dedupes_active_jobs(queue):
+    queue.register_job_handler('t.echo', lambda job: job.payload)
+    first = queue.enqueue_job('t.echo', {'n': 1}, idempotency_key='echo:1')
+    assert queue.enqueue_job('t.echo', {'n': 1}, idempotency_key='echo:1') == first
+
+    job = queue.claim_job()
+    queue.run_job(job)
+    assert queue.get_job(first)['status'] == 'succeeded'
+    assert queue.get_job(first)['result'] == {'n': 1}
+
+    # Once finished the key is free again
+    assert queue.enqueue_job('t.echo', {'n': 1}, idempotency_key='echo:1') != first
+
+
+def test_failing_job_backs_off_then_fails(queue, monkeypatch):
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_RETRY_BASE_SECONDS', 0.05)
+
+    def boom(job):
+        raise RuntimeError('nope')
+
+    queue.register_job_handler('t.boom', boom, max_attempts=2)
+    job_id = queue.enqueue_job('t.boom')
+
+    queue.run_job(queue.claim_job())
+    row = queue.get_job(job_id)
+    assert row['status'] == 'queued' and row['attempts'] == 1 and 'nope' in row['last_error']
+    assert row['run_after'] > time.time()
+    assert queue.claim_job() is None  # still backing off
+
+    time.sleep(0.1)
+    queue.run_job(queue.claim_job())
+    row = queue.get_job(job_id)
+    assert row['status'] == 'failed' and row['attempts'] == 2
+
+
+def test_expired_lease_is_reclaimed_and_concurrency_is_enforced(queue, monkeypatch):
+    queue.register_job_handler('t.slow', lambda job: 'done', concurrency=1)
+    a = queue.enqueue_job('t.slow', {'n': 1})
+    b = queue.enqueue_job('t.slow', {'n': 2})
+
+    first = queue.claim_job()
+    assert first.id == a
+    assert queue.claim_job() is None  # one 't.slow' at a time
+
+    # Simulate the owning process dying: the lease runs out without a heartbeat
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_LEASE_SECONDS', 0.05)
+    assert first.heartbeat()
+    time.sleep(0.1)
+    monkeypatch.setattr(queue, '_owner', 'other-process')
+    again = queue.claim_job()
+    assert again.id == a and again.attempts == 2
+    assert queue.claim_job() is None
+
+    # JOB_QUEUE_CONCURRENCY overrides the registered limit
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_LEASE_SECONDS', 60)
+    again.heartbeat()
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_CONCURRENCY', 't.slow=2')
+    assert queue.claim_job().id == b
+
+    # The stale owner's completion is ignored; the new owner's counts
+    queue.complete_job(first, 'stale')
+    queue.run_job(again)
+    assert queue.get_job(a)['result'] == 'done'
+
+
+def test_job_finishes_in_the_queue_db_it_was_claimed_from(queue, monkeypatch, tmp_path):
+    queue.register_job_handler('t.echo', lambda job: job.payload)
+    first = queue.enqueue_job('t.echo', {'db': 'first'})
+    job = queue.claim_job()
+
+    # The queue DB is switched while the job runs; the new DB reuses id 1
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_DB_PATH', str(tmp_path / 'other.db'))
+    second = queue.enqueue_job('t.echo', {'db': 'second'})
+    assert second == first
+    queue.run_job(job)
+
+    assert queue.get_job(second)['status'] == 'queued'
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_DB_PATH', str(tmp_path / 'jobs.db'))
+    assert queue.get_job(first)['result'] == {'db': 'first'}
+
+def test_batch_processing_jobs_are_not_retried(app, monkeypatch):
+    from doc_processor.routes import batch as batch_routes
+
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(job_queue, 'start_job_workers', lambda *a, **k: False)
+    calls = []
+
+    def half_done():
+        calls.append(1)
+        raise RuntimeError('died after inserting pages')
+
+    monkeypatch.setattr(batch_routes, 'process_batch', half_done)
+    job_id = job_queue.enqueue_job('batch.process', {'batch_id': 7})
+    job_queue.run_job(job_queue.claim_job(['batch.process']))
+
+    row = job_queue.get_job(job_id)
+    assert row['status'] == 'failed' and row['attempts'] == 1
+    assert job_queue.claim_job(['batch.process']) is None
+    assert calls == [1]
+
+
+def test_analyze_intake_job_reports_real_counts(app, monkeypatch):
+    from types import SimpleNamespace
+    from doc_processor import document_detector
+    from doc_processor.routes import api as api_routes
+
+    analyses = [SimpleNamespace(file_path='/in/a.pdf', processing_strategy='single_document'),
+                SimpleNamespace(file_path='/in/b.pdf', processing_strategy='batch_scan')]
+
+    class FakeDetector:
+        def analyze_intake_directory(self, intake_dir, on_result=None):
+            for done, analysis in enumerate(analyses, 1):
+                on_result(analysis, done, len(analyses), False)
+            return analyses
+
+    monkeypatch.setattr(document_detector, 'get_detector', lambda **kw: FakeDetector())
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(job_queue, 'start_job_workers', lambda *a, **k: False)
+    job_id = job_queue.enqueue_job('api.analyze_intake', {'intake_dir': '/in'})
+    job_queue.run_job(job_queue.claim_job(['api.analyze_intake']))
+
+    assert job_queue.get_job(job_id)['result'] == {'total': 2, 'single_count': 1, 'batch_count': 1}
+    status = api_routes.processing_status['intake_analysis']
+    assert status['status'] == 'completed' and status['files_processed'] == 2
@@ -0,0 +1,71 @@
+import os
+import time
+
+from PIL import Image
+
+from doc_processor.normalized_cache import NormalizedCache
+
+
+def _make_image(path, color):
+    Image.new('RGB', (32, 32), color).save(path, format='PNG')
+    return str(path)
+
+
+def _convert(cache, image_path, payload=b'x' * 1000):
+    key, cached = cache.lookup(image_path)
+    if cached:
+        return cached
+    pdf_path = cache.path_for(key)
+    with open(pdf_path, 'wb') as f:
+        f.write(payload)
+    cache.record(key, image_path, pdf_path)
+    return pdf_path
+
+
+def test_lookup_reuses_entry_without_rehashing(tmp_path):
+    cache = NormalizedCache(str(tmp_path / 'norm'))
+    img = _make_image(tmp_path / 'a.png', 'red')
+    pdf = _convert(cache, img)
+    assert cache.stats['hashed'] == 1
+
+    key, cached = cache.lookup(img)
+    assert cached == pdf
+    assert cache.stats['hashed'] == 1  # found by (path, size, mtime)
+
+    # Same content under another name is found by hash
+    other = tmp_path / 'copy.png'
+    other.write_bytes(open(img, 'rb').read())
+    assert cache.lookup(str(other))[1] == pdf
+
+
+def test_byte_budget_evicts_least_recently_used(tmp_path):
+    cache = NormalizedCache(str(tmp_path / 'norm'), max_bytes=2500)
+    imgs = [_make_image(tmp_path / f'{c}.png', c) for c in ('red', 'green', 'blue')]
+    first = _convert(cache, imgs[0])
+    time.sleep(0.01)
+    second = _convert(cache, imgs[1])
+    time.sleep(0.01)
+    cache.lookup(imgs[0])  # touch: 'red' is now more recent than 'green'
+    time.sleep(0.01)
+    third = _convert(cache, imgs[2])
+
+    assert os.path.exists(first) and os.path.exists(third)
+    assert not os.path.exists(second)
+    assert cache.status()['total_bytes'] <= 2500
+
+
+def test_reconcile_adopts_orphans_and_drops_missing(tmp_path):
+    root = tmp_path / 'norm'
+    cache = NormalizedCache(str(root))
+    img = _make_image(tmp_path / 'a.png', 'red')
+    indexed = _convert(cache, img)
+    orphan = root / 'img_0123456789abcdef.pdf'
+    orphan.write_bytes(b'%PDF-orphan')
+    (root / 'unrelated.txt').write_text('keep me')
+    os.remove(indexed)
+
+    result = cache.reconcile()
+    assert result['adopted'] == 1 and result['dropped'] == 1
+    assert result['entries'] == 1
+    assert (root / 'unrelated.txt').exists()
+    assert cache.lookup(img)[1] is None
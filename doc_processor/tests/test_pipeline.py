@@ -0,0 +1,66 @@
+import threading
+import time
+
+from doc_processor.utils.pipeline import Stage, get_stage_stats, run_pipeline
+
+
+def test_stages_overlap_and_keep_order():
+    active = {'ocr': 0, 'ai': 0}
+    overlapped = threading.Event()
+    lock = threading.Lock()
+
+    def _timed(name):
+        def func(item, emit):
+            with lock:
+                active[name] += 1
+                if active['ocr'] and active['ai']:
+                    overlapped.set()
+            time.sleep(0.05)
+            with lock:
+                active[name] -= 1
+            emit({'stage': name, 'item': item})
+            return item
+        return func
+
+    out = list(run_pipeline(range(4), [Stage('ocr', _timed('ocr')), Stage('ai', _timed('ai'))]))
+
+    assert [v for k, v in out if k == 'result'] == [0, 1, 2, 3]
+    assert overlapped.is_set()  # item n+1 was OCR'd while item n was classified
+    events = [v for k, v in out if k == 'event']
+    assert events.index({'stage': 'ocr', 'item': 0}) < events.index({'stage': 'ai', 'item': 0})
+
+
+def test_errors_and_dropped_items_do_not_stop_the_pipeline():
+    def check(item, emit):
+        if item == 1:
+            raise ValueError('bad page')
+        if item == 2:
+            emit({'error': 'skipped'})
+            return None
+        return item * 10
+
+    before = get_stage_stats().get('check', {'items': 0, 'errors': 0})
+    out = list(run_pipeline([0, 1, 2, 3], [Stage('check', check, workers=2)]))
+    assert sorted(v for k, v in out if k == 'result') == [0, 30]
+    errors = [v for k, v in out if k == 'error']
+    assert len(errors) == 1 and errors[0][0] == 1 and errors[0][1] == 'check'
+    assert ('event', {'error': 'skipped'}) in out
+    after = get_stage_stats()['check']
+    assert (after['items'] - before['items'], after['errors'] - before['errors']) == (4, 2)
+
+
+def test_closing_the_generator_stops_the_stages():
+    seen = []
+
+    def slow(item, emit):
+        seen.append(item)
+        time.sleep(0.02)
+        return item
+
+    gen = run_pipeline(range(100), [Stage('slow', slow, queue_size=1)])
+    assert next(gen) == ('result', 0)
+    gen.close()
+    time.sleep(0.5)
+    count = len(seen)
+    time.sleep(0.2)
+    assert len(seen) == count < 100
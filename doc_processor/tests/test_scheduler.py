@@ -0,0 +1,58 @@
+import threading
+import time
+
+from doc_processor.scheduler import BACKGROUND, INTERACTIVE, PriorityGate, current_lane, iterate_in_lane, lane
+
+
+def test_interactive_waiters_go_before_background():
+    gate = PriorityGate('test', 'SCHEDULER_MISSING_SETTING', 1)
+    order = []
+    first_page = threading.Event()
+    release = threading.Event()
+
+    def background_batch():
+        for page in range(3):
+            with gate.slot(BACKGROUND):
+                order.append(('background', page))
+                first_page.set()
+                release.wait(5)
+
+    def interactive_rescan():
+        with gate.slot(INTERACTIVE):
+            order.append(('interactive', 0))
+
+    batch = threading.Thread(target=background_batch)
+    batch.start()
+    assert first_page.wait(5)
+    rescan = threading.Thread(target=interactive_rescan)
+    rescan.start()
+    while gate.stats()['lanes'][INTERACTIVE]['waiting'] == 0:
+        time.sleep(0.01)
+    release.set()
+    batch.join(5)
+    rescan.join(5)
+
+    # The rescan ran at the batch's next page boundary
+    assert order[:2] == [('background', 0), ('interactive', 0)]
+    stats = gate.stats()['lanes']
+    assert stats[INTERACTIVE]['acquired'] == 1 and stats[BACKGROUND]['acquired'] == 3
+    assert stats[INTERACTIVE]['wait_max_ms'] > 0
+
+
+def test_lane_defaults_and_reentrant_slots(app):
+    assert current_lane() == BACKGROUND
+    with app.test_request_context('/'):
+        assert current_lane() == INTERACTIVE
+        with lane(BACKGROUND):
+            assert current_lane() == BACKGROUND
+        # A batch streamed from a request runs in the background lane, the request itself does not
+        lanes = []
+        for seen in iterate_in_lane(BACKGROUND, (current_lane() for _ in range(2))):
+            lanes.append((seen, current_lane()))
+        assert lanes == [(BACKGROUND, INTERACTIVE)] * 2
+
+    gate = PriorityGate('nested', 'SCHEDULER_MISSING_SETTING', 1)
+    with gate.slot():
+        with gate.slot():  # same thread: does not wait for itself
+            assert gate.stats()['running'] == 1
+    assert gate.stats()['running'] == 0
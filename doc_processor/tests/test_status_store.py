@@ -0,0 +1,73 @@
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+from doc_processor import status_store
+from doc_processor.status_store import StatusMap
+
+
+def test_concurrent_edits_are_atomic():
+    status = StatusMap('t.progress')
+    status['b1'] = {'processed': 0, 'stages': {}}
+
+    def bump():
+        for _ in range(25):
+            status.edit('b1', lambda cur: dict(cur, processed=cur['processed'] + 1))
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert status['b1']['processed'] == 100
+    # Values are copies: mutating one does not write through
+    snapshot = status['b1']
+    snapshot['processed'] = -1
+    assert status.get('b1')['processed'] == 100
+    assert status.edit('b1', {'message': 'done'}) == {'processed': 100, 'stages': {}, 'message': 'done'}
+
+
+def test_ttl_expiry_and_edit_does_not_resurrect():
+    tokens = StatusMap('t.tokens', ttl_seconds=0.05)
+    tokens['tok'] = {'created': time.time()}
+    assert 'tok' in tokens
+    time.sleep(0.1)
+    assert 'tok' not in tokens and tokens.get('tok') is None
+    assert tokens.edit('tok', lambda m: dict(m, seen=True) if m is not None else None) is None
+    assert status_store.purge_expired() == 0  # the edit above already deleted it
+    assert tokens.snapshot() == {}
+
+
+def test_waiters_see_writes_from_another_process(tmp_path):
+    seq = status_store.current_seq()
+    db_path = status_store.get_status_db_path()
+    # A separate interpreter flags the entry directly in the shared file
+    writer = (
+        "import sqlite3, sys, time\n"
+        "time.sleep(0.3)\n"
+        "conn = sqlite3.connect(sys.argv[1], isolation_level=None)\n"
+        "conn.execute(\"INSERT INTO status_entries (namespace, key, data, updated_at) "
+        "VALUES ('t.remote', 'k', '{\\\"sse_connected\\\": true}', 0)\")\n"
+        "conn.execute('UPDATE status_seq SET seq = seq + 1 WHERE id = 1')\n"
+    )
+    proc = subprocess.Popen([sys.executable, '-c', writer, db_path])
+    try:
+        value = status_store.wait_for('t.remote', 'k', lambda m: bool(m and m.get('sse_connected')), timeout=10)
+    finally:
+        proc.wait(timeout=10)
+    assert value == {'sse_connected': True}
+    assert status_store.current_seq() > seq
+    assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM status_entries").fetchone()[0] == 1
+
+
+def test_local_writes_wake_wait_for_change():
+    seq = status_store.current_seq()
+    timer = threading.Timer(0.1, lambda: status_store.set_status('t.wake', 'k', {'n': 1}))
+    timer.start()
+    started = time.monotonic()
+    assert status_store.wait_for_change(seq, timeout=5) > seq
+    assert time.monotonic() - started < 2
+    timer.join()
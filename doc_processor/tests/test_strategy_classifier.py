@@ -0,0 +1,64 @@
+def _seed_ground_truth(n_each=15):
+    from doc_processor.database import log_interaction, log_detection_ground_truth
+    from doc_processor.strategy_classifier import extract_features
+
+    for i in range(n_each):
+        cases = [
+            (f'letter_{i}.pdf', 'single_document',
+             extract_features(1 + i % 3, 0.2, 'single', 'single', 6, 0, 'Invoice date 01/02/2024 total $120')),
+            (f'scan_{i}.pdf', 'batch_scan',
+             extract_features(30 + i, 40.0, 'batch', 'batch', 0, 9, 'page 1 of 3 ' * 5)),
+        ]
+        for name, actual, features in cases:
+            # Features reach training through the logged detection decision
+            decision = {'filename': name, 'page_count': 1, 'final_strategy': 'batch_scan', 'features': features}
+            log_interaction(batch_id=None, user_id='system', event_type='document_detection_decision',
+                            step='intake_analysis', content=str(decision))
+            log_detection_ground_truth(name, 'batch_scan', actual, 0.6)
+
+
+def test_train_and_predict_from_ground_truth(temp_db_path, monkeypatch):
+    # Full schema (the minimal test fixture's interaction_log lacks user_id)
+    monkeypatch.setenv('ALLOW_NEW_DB', '1')
+    from doc_processor import strategy_classifier as sc
+    from doc_processor.database import get_detection_performance_analytics
+
+    assert sc.train_strategy_classifier(min_samples=5)['trained'] is False  # no data yet
+
+    _seed_ground_truth()
+    result = sc.train_strategy_classifier(min_samples=20)
+    assert result['trained'] and result['samples'] == 30
+    assert result['cv_accuracy'] >= 0.9
+
+    single = sc.extract_features(2, 0.3, 'single', 'single', 6, 0, 'Invoice date 03/04/2024 total $75')
+    batch = sc.extract_features(48, 60.0, 'batch', 'batch', 0, 9, 'page 2 of 9 ' * 4)
+    assert sc.predict_strategy(single)[0] == 'single_document'
+    assert sc.predict_strategy(batch)[0] == 'batch_scan'
+    assert sc.model_version() != 'none'
+
+    report = get_detection_performance_analytics()['learned_classifier']
+    assert report['available'] and report['active'] and report['samples'] == 30
+
+
+def test_train_route_queues_a_job(client, monkeypatch):
+    from doc_processor import job_queue
+    from doc_processor.routes import admin
+
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(job_queue, 'start_job_workers', lambda *a, **k: False)
+    calls = []
+    monkeypatch.setattr(admin, 'train_strategy_classifier',
+                        lambda min_samples=None: calls.append(min_samples) or {'trained': True, 'samples': 40})
+
+    resp = client.post('/admin/strategy_classifier/train', json={'min_samples': 30})
+    assert resp.status_code == 202
+    job_id = resp.get_json()['data']['job_id']
+    assert calls == []  # nothing trained inside the request
+    # A second request while one is queued joins it
+    assert client.post('/admin/strategy_classifier/train', json={}).get_json()['data']['job_id'] == job_id
+    assert client.post('/admin/strategy_classifier/train', json={'min_samples': 'x'}).status_code == 400
+
+    job_queue.run_job(job_queue.claim_job(['admin.train_strategy_classifier']))
+    assert calls == [30]
+    job = client.get(f'/admin/api/jobs/{job_id}').get_json()['data']
+    assert job['status'] == 'succeeded' and job['result'] == {'trained': True, 'samples': 40}
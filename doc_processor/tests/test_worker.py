@@ -0,0 +1,71 @@
+import os
+import shutil
+
+import doc_processor.config_manager as config_manager
+from doc_processor import job_queue
+from doc_processor.worker import load_job_handlers
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "fixtures", "sample_small.pdf")
+
+
+def test_worker_process_registry(tmp_path, monkeypatch):
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_WORKERS', 0)
+    monkeypatch.setattr(job_queue, '_claim_types', None)
+
+    # With JOB_QUEUE_WORKERS=0 the app process leaves jobs to worker processes
+    assert not job_queue.start_job_workers()
+    assert not job_queue.jobs_run_in_process()
+
+    assert job_queue.start_job_workers(1, job_types=['t.none'])
+    try:
+        rows = job_queue.list_worker_processes()
+        assert [(r['pid'], r['job_types'], r['current']) for r in rows] == [(os.getpid(), 't.none', True)]
+        assert job_queue.get_job_queue_status()['worker_processes'] == rows
+    finally:
+        job_queue.stop_job_workers()
+    assert job_queue.list_worker_processes() == []
+
+
+def test_document_jobs_finish_the_batch(app, temp_intake_dir, monkeypatch, tmp_path):
+    from doc_processor.batch_guard import create_new_batch
+    from doc_processor.checkpoints import get_checkpoints
+    from doc_processor.database import get_db_connection
+    from doc_processor.document_detector import DocumentAnalysis
+    from doc_processor.processing import enqueue_batch_documents
+
+    # The handler modules a worker process imports instead of the app
+    assert {'processing.document', 'batch.smart', 'export.batch'} <= set(load_job_handlers())
+    job_queue.stop_job_workers()
+    monkeypatch.setattr(job_queue, 'start_job_workers', lambda *a, **k: False)
+    monkeypatch.setattr(config_manager.app_config, 'JOB_QUEUE_DB_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(config_manager.app_config, 'PROCESSED_DIR', str(tmp_path / 'processed'))
+    paths = []
+    for name in ('a.pdf', 'b.pdf'):
+        paths.append(os.path.join(temp_intake_dir, name))
+        shutil.copy2(SAMPLE_PDF, paths[-1])
+    docs = [DocumentAnalysis(file_path=p, file_size_mb=0.1, page_count=1, processing_strategy='single_document',
+                             confidence=0.9, reasoning=['test']) for p in paths]
+    batch_id = create_new_batch('processing')
+
+    job_ids = enqueue_batch_documents(docs, batch_id)
+    assert len(job_ids) == 2
+    # Queued again while active (e.g. a resume): no duplicates
+    assert enqueue_batch_documents(docs, batch_id) == job_ids
+
+    # What worker processes do: claim and run until the queue is empty
+    while True:
+        job = job_queue.claim_job(['processing.document'])
+        if job is None:
+            break
+        job_queue.run_job(job)
+
+    assert [job_queue.get_job(j)['status'] for j in job_ids] == ['succeeded', 'succeeded']
+    conn = get_db_connection()
+    rows = conn.execute("SELECT status FROM single_documents WHERE batch_id = ?", (batch_id,)).fetchall()
+    status = conn.execute("SELECT status FROM batches WHERE id = ?", (batch_id,)).fetchone()[0]
+    conn.close()
+    assert [r[0] for r in rows] == ['ready_for_manipulation'] * 2
+    assert status == config_manager.app_config.STATUS_READY_FOR_MANIPULATION
+    assert get_checkpoints(batch_id) == {}
@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import time
+
+from PIL import Image
+
+
+def _setup(tmp_path, monkeypatch):
+    monkeypatch.setenv('ALLOW_NEW_DB', '1')
+    monkeypatch.setenv('TEST_TMPDIR', str(tmp_path / 'work'))
+    intake = tmp_path / 'intake'
+    intake.mkdir()
+    from doc_processor import working_files
+    working_files.invalidate_working_files()
+    return working_files, intake
+
+
+def _stored(db_path):
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return dict(conn.execute("SELECT filename, working_pdf FROM intake_working_files"))
+    finally:
+        conn.close()
+
+
+def test_bulk_resolve_writes_only_changed_mappings(temp_db_path, tmp_path, monkeypatch):
+    working_files, intake = _setup(tmp_path, monkeypatch)
+    Image.new('RGB', (20, 20), 'red').save(intake / 'scan.png')
+    (intake / 'doc.pdf').write_bytes(b'%PDF-1.4 original')
+
+    first = working_files.resolve_working_pdf_paths(['scan.png', 'doc.pdf'], str(intake))
+    assert first['scan.png'].endswith('scan_converted.pdf') and os.path.exists(first['scan.png'])
+    assert first['doc.pdf'] == str(intake / 'doc.pdf')
+    assert _stored(temp_db_path) == first
+    writes = working_files.get_working_files_stats()['writes']
+
+    # Unchanged files are served from memory without touching the table
+    assert working_files.resolve_working_pdf_paths(['scan.png', 'doc.pdf'], str(intake)) == first
+    stats = working_files.get_working_files_stats()
+    assert stats['writes'] == writes and stats['hits'] >= 2
+
+    # A standardized PDF appearing later becomes the working file
+    standardized = tmp_path / 'work' / 'doc_standardized.pdf'
+    standardized.write_bytes(b'%PDF-1.4 standardized')
+    assert working_files.resolve_working_pdf_path('doc.pdf', str(intake)) == str(standardized)
+    assert _stored(temp_db_path)['doc.pdf'] == str(standardized)
+
+
+def test_replaced_image_is_reconverted(temp_db_path, tmp_path, monkeypatch):
+    working_files, intake = _setup(tmp_path, monkeypatch)
+    image = intake / 'scan.png'
+    Image.new('RGB', (20, 20), 'red').save(image)
+    converted = working_files.resolve_working_pdf_path('scan.png', str(intake))
+    before = os.stat(converted).st_mtime_ns
+    conversions = working_files.get_working_files_stats()['converted']
+
+    time.sleep(0.01)
+    Image.new('RGB', (40, 40), 'blue').save(image)
+    assert working_files.resolve_working_pdf_path('scan.png', str(intake)) == converted
+    assert os.stat(converted).st_mtime_ns > before
+    assert working_files.get_working_files_stats()['converted'] == conversions + 1
@@ -0,0 +1,106 @@
+"""Image <-> PDF helpers that avoid needless transcodes.
+
+Image intake used to be wrapped in a PDF by Pillow (re-encoding JPEGs at
+quality 95) and then rendered back to pixels with `get_pixmap` before OCR:
+two lossy transcodes and a full page render per image document.
+
+- `write_image_pdf` embeds the source image as the only page. JPEG bytes are
+  passed through unchanged (DCTDecode); other images are stored losslessly.
+- `page_source_image` returns the embedded image bytes of such a page, so OCR
+  can decode the original pixels once and the searchable PDF can re-embed the
+  same stream instead of a rendered copy.
+
+PyMuPDF is optional here: without it `write_image_pdf` falls back to
+Pillow's PDF writer and `page_source_image` returns None (callers render).
+"""
+from __future__ import annotations
+
+import logging
+from io import BytesIO
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PDF_IMAGE_RESOLUTION = 150.0
+# An image must cover the page to within this many points to count as the page
+_COVER_TOLERANCE = 2.0
+
+
+def _flatten_to_rgb(img):
+    """RGB copy of a Pillow image with any transparency composited onto white."""
+    from PIL import Image
+    if img.mode == 'P':
+        img = img.convert('RGBA')
+    if img.mode in ('RGBA', 'LA'):
+        base = Image.new('RGB', img.size, (255, 255, 255))
+        base.paste(img, mask=img.split()[-1])
+        return base
+    return img.convert('RGB') if img.mode not in ('RGB', 'L') else img
+
+
+def write_image_pdf(image_path: str, output_pdf_path: str, resolution: float = PDF_IMAGE_RESOLUTION) -> str:
+    """Write `image_path` as a one-page PDF sized for `resolution` dpi.
+
+    Baseline RGB/grayscale JPEGs are embedded byte-for-byte; everything else
+    is flattened to RGB/L (transparency on white) and stored losslessly.
+
+    Raises:
+        OSError / PIL errors if the image cannot be read or the PDF written.
+    """
+    from PIL import Image
+    try:
+        import fitz
+    except Exception:
+        fitz = None
+
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    with Image.open(BytesIO(data)) as img:
+        width, height = img.size
+        passthrough = img.format == 'JPEG' and img.mode in ('RGB', 'L')
+        if fitz is None:
+            _flatten_to_rgb(img).save(output_pdf_path, 'PDF', resolution=resolution)
+            return output_pdf_path
+        if not passthrough and not (img.format == 'PNG' and img.mode in ('RGB', 'L')):
+            buf = BytesIO()
+            _flatten_to_rgb(img).save(buf, format='PNG')
+            data = buf.getvalue()
+
+    with fitz.open() as doc:
+        page = doc.new_page(width=width * 72.0 / resolution, height=height * 72.0 / resolution)
+        page.insert_image(page.rect, stream=data)
+        doc.save(output_pdf_path, garbage=3, deflate=True)
+    return output_pdf_path
+
+
+def page_source_image(pdf_doc, page) -> Optional[bytes]:
+    """Return the embedded image bytes if `page` is exactly one full-page image.
+
+    Only unrotated pages without a text layer or soft mask qualify, with gray
+    or RGB images, so the decoded bytes look exactly like a render would. For
+    anything else None is returned and the caller should rasterize the page.
+    """
+    try:
+        if page.rotation % 360:
+            return None
+        images = page.get_images(full=True)
+        if len(images) != 1:
+            return None
+        xref, smask = images[0][0], images[0][1]
+        if smask:
+            return None
+        if page.get_text('text').strip():
+            return None
+        rects = page.get_image_rects(xref)
+        if len(rects) != 1:
+            return None
+        rect, prect = rects[0], page.rect
+        if any(abs(a - b) > _COVER_TOLERANCE for a, b in zip(rect, prect)):
+            return None
+        info = pdf_doc.extract_image(xref)
+        if not info or info.get('colorspace') not in (1, 3):
+            return None
+        return info.get('image')
+    except Exception as e:
+        logger.debug(f"Page image extraction failed on page {getattr(page, 'number', '?')}: {e}")
+        return None
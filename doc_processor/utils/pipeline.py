@@ -0,0 +1,177 @@
+"""Bounded multi-stage pipeline executor.
+
+Each stage runs in its own worker thread(s) and hands items to the next stage
+through a bounded queue, so stage N+1 works on item k while stage N already
+works on item k+1 (e.g. OCR of the next document overlaps the LLM call for the
+current one). The bounded queues give back-pressure: a slow stage stalls the
+stages before it instead of letting work pile up in memory.
+
+`run_pipeline` is a generator that runs in the caller's thread and yields
+everything the stages produce, in arrival order:
+
+- `('event', dict)`  - progress events passed to the stage's `emit` callback;
+- `('error', (item, stage_name, exc))` - a stage raised; the item is dropped;
+- `('result', item)` - an item that made it through the last stage.
+
+Work that must stay on the caller's thread (e.g. writes on its SQLite
+connection) is done by the consumer on each `'result'`. Closing the generator
+early (the consumer stopped iterating) stops the stages after their current
+item.
+
+Stage threads run in a copy of the caller's context, so context variables
+such as the scheduler lane and the cancellation token carry over.
+
+Busy time per stage name is accumulated process-wide (`get_stage_stats`), so
+long-running callers such as the bulk ingest runner can report where the
+time went.
+"""
+import contextvars
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+_POLL_SECONDS = 0.2
+
+_stats_lock = threading.Lock()
+_stage_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _record_stage(name: str, seconds: float, failed: bool) -> None:
+    with _stats_lock:
+        stats = _stage_stats.setdefault(name, {'items': 0, 'errors': 0, 'seconds': 0.0})
+        stats['items'] += 1
+        stats['errors'] += 1 if failed else 0
+        stats['seconds'] += seconds
+
+
+def get_stage_stats() -> Dict[str, Dict[str, float]]:
+    """Cumulative {stage_name: {'items', 'errors', 'seconds'}} for this process.
+
+    `seconds` is busy time summed over the stage's workers; diff two snapshots
+    to measure one run.
+    """
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _stage_stats.items()}
+
+
+@dataclass
+class Stage:
+    """One pipeline stage.
+
+    `func(item, emit)` returns the item for the next stage, or None to drop it
+    (after emitting its own error event).
+    """
+    name: str
+    func: Callable[[Any, Callable[[dict], None]], Any]
+    workers: int = 1
+    queue_size: int = 2
+
+
+def run_pipeline(items: Iterable[Any], stages: List[Stage]) -> Iterator[Tuple[str, Any]]:
+    """Push `items` through `stages`, yielding events, errors and results (see module docstring)."""
+    if not stages:
+        for item in items:
+            yield 'result', item
+        return
+
+    stop = threading.Event()
+    out: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+    inboxes = [queue.Queue(maxsize=max(1, int(s.queue_size))) for s in stages]
+    workers = [max(1, int(s.workers)) for s in stages]
+    remaining = list(workers)
+    remaining_lock = threading.Lock()
+
+    def _emit(event: dict) -> None:
+        out.put(('event', event))
+
+    def _put(q: queue.Queue, obj: Any) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(obj, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(q: queue.Queue) -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _stage_finished(index: int) -> None:
+        # The last worker of a stage to finish closes the next stage's inbox
+        with remaining_lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if not last:
+            return
+        if index + 1 < len(stages):
+            for _ in range(workers[index + 1]):
+                _put(inboxes[index + 1], _DONE)
+        else:
+            out.put(('done', None))
+
+    def _feed() -> None:
+        try:
+            for item in items:
+                if not _put(inboxes[0], item):
+                    return
+        except Exception as e:
+            logger.error(f"Pipeline input failed: {e}")
+            out.put(('error', (None, 'input', e)))
+        for _ in range(workers[0]):
+            _put(inboxes[0], _DONE)
+
+    def _work(index: int) -> None:
+        stage = stages[index]
+        try:
+            while True:
+                item = _get(inboxes[index])
+                if item is _DONE:
+                    break
+                started = time.perf_counter()
+                try:
+                    result = stage.func(item, _emit)
+                except Exception as e:
+                    _record_stage(stage.name, time.perf_counter() - started, True)
+                    logger.debug(f"Pipeline stage {stage.name} failed: {e}")
+                    out.put(('error', (item, stage.name, e)))
+                    continue
+                _record_stage(stage.name, time.perf_counter() - started, result is None)
+                if result is None:
+                    continue
+                if index + 1 < len(stages):
+                    if not _put(inboxes[index + 1], result):
+                        break
+                else:
+                    out.put(('result', result))
+        finally:
+            _stage_finished(index)
+
+    # One context copy per thread: a Context cannot be entered by two threads at once
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(_feed,), daemon=True,
+                                name='Pipeline-input')]
+    for index, stage in enumerate(stages):
+        for n in range(workers[index]):
+            threads.append(threading.Thread(target=contextvars.copy_context().run, args=(_work, index), daemon=True,
+                                            name=f'Pipeline-{stage.name}-{n + 1}'))
+    for t in threads:
+        t.start()
+
+    try:
+        while True:
+            kind, value = out.get()
+            if kind == 'done':
+                break
+            yield kind, value
+    finally:
+        stop.set()
@@ -0,0 +1,154 @@
+"""
+Standalone job worker processes.
+
+The in-app job pool shares the web server's process: the PIL, NumPy and
+regex parts of OCR and classification hold the GIL while requests wait, and
+a crash in a native library (Tesseract, MuPDF) takes the server down. A
+worker process runs the same job handlers outside the app, claiming jobs
+through the leases of the SQLite job queue (`job_queue`, `jobs.db`):
+
+    python -m doc_processor.worker [--processes N] [--threads N] [--job-types a,b]
+
+- with JOB_QUEUE_WORKERS=0 the web app only enqueues (smart processing,
+  process-all, exports, resumes) and follows progress through the shared
+  status store, so the web tier stays responsive;
+- `--processes N` supervises N worker processes and restarts any that dies;
+  the job a dead process held is reclaimed when its lease expires;
+- a batch normally runs as one job; `processing.enqueue_batch_documents`
+  (bulk ingest `--distribute`) queues one job per document instead, so
+  several processes share a batch.
+
+The module does not import `app`: handlers are registered by importing the
+modules that own them (`load_job_handlers`).
+"""
+import argparse
+import importlib
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+from typing import Dict, List, Optional
+
+try:
+    from .config_manager import SHUTDOWN_EVENT, app_config
+    from .governor import start_governor
+    from .job_queue import registered_job_types, start_job_workers, stop_job_workers
+except ImportError:
+    from config_manager import SHUTDOWN_EVENT, app_config
+    from governor import start_governor
+    from job_queue import registered_job_types, start_job_workers, stop_job_workers
+
+logger = logging.getLogger(__name__)
+
+HANDLER_MODULES = ('processing', 'services.export_service', 'routes.batch', 'routes.export', 'routes.api',
+                   'routes.admin')
+_SUPERVISE_SECONDS = 2.0
+
+
+def load_job_handlers() -> List[str]:
+    """Import the modules that register job handlers; returns the registered job types."""
+    for name in HANDLER_MODULES:
+        importlib.import_module(f"{__package__}.{name}" if __package__ else name)
+    return registered_job_types()
+
+
+def _shutdown_on_signals(shutdown: threading.Event) -> None:
+    def _handler(signum, frame):
+        logger.info(f"Received signal {signum}; stopping after the current jobs")
+        shutdown.set()
+
+    signal.signal(signal.SIGTERM, _handler)
+    signal.signal(signal.SIGINT, _handler)
+
+
+def run_worker(threads: int = 2, job_types: Optional[List[str]] = None, stop_timeout: float = 60.0) -> int:
+    """Run a job pool in this process until SIGTERM/SIGINT."""
+    shutdown = SHUTDOWN_EVENT or threading.Event()
+    _shutdown_on_signals(shutdown)
+    known = load_job_handlers()
+    unknown = sorted(set(job_types or []) - set(known))
+    if unknown:
+        logger.error(f"Unknown job type(s): {', '.join(unknown)} (registered: {', '.join(known)})")
+        return 2
+    # Jobs enqueued by handlers here top the pool up to JOB_QUEUE_WORKERS
+    app_config.JOB_QUEUE_WORKERS = threads
+    start_governor()
+    if not start_job_workers(threads, job_types=job_types):
+        logger.error("Job workers did not start")
+        return 1
+    logger.info(f"Worker started: {threads} thread(s) for {', '.join(job_types or known)}")
+    while not shutdown.wait(1.0):
+        pass
+    stop_job_workers(timeout=stop_timeout)
+    logger.info("Worker stopped")
+    return 0
+
+
+def _worker_main(threads: int, job_types: Optional[List[str]], stop_timeout: float) -> None:
+    _configure_logging()
+    sys.exit(run_worker(threads, job_types, stop_timeout))
+
+
+def supervise(processes: int, threads: int, job_types: Optional[List[str]] = None, stop_timeout: float = 60.0) -> int:
+    """Keep `processes` worker processes running until SIGTERM/SIGINT."""
+    shutdown = threading.Event()
+    _shutdown_on_signals(shutdown)
+    context = multiprocessing.get_context('spawn')
+    children: Dict[int, multiprocessing.Process] = {}
+
+    def spawn(slot: int) -> None:
+        child = context.Process(target=_worker_main, args=(threads, job_types, stop_timeout),
+                                name=f"doc-worker-{slot}")
+        child.start()
+        children[slot] = child
+        logger.info(f"Started worker process {child.pid} ({child.name})")
+
+    for slot in range(processes):
+        spawn(slot)
+    while not shutdown.wait(_SUPERVISE_SECONDS):
+        for slot, child in list(children.items()):
+            if child.is_alive():
+                continue
+            if child.exitcode == 2:
+                logger.error(f"Worker process {child.pid} refused to start; giving up")
+                shutdown.set()
+                break
+            logger.warning(f"Worker process {child.pid} exited with code {child.exitcode}; restarting")
+            spawn(slot)
+    for child in children.values():
+        if child.is_alive():
+            child.terminate()  # SIGTERM: finish the current jobs, then exit
+    for child in children.values():
+        child.join(stop_timeout + 5)
+        if child.is_alive():
+            logger.warning(f"Worker process {child.pid} did not stop in time; killing it")
+            child.kill()
+    return 0
+
+
+def _configure_logging() -> None:
+    level = getattr(logging, str(getattr(app_config, 'LOG_LEVEL', 'INFO')).upper(), logging.INFO)
+    logging.basicConfig(level=level, format='%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Run queued batch and document jobs outside the web app')
+    parser.add_argument('--processes', type=int, default=1, help='Worker processes to supervise (default: 1)')
+    parser.add_argument('--threads', type=int, default=2, help='Job threads per process (default: 2)')
+    parser.add_argument('--job-types', default='', help='Comma-separated job types to claim (default: all)')
+    parser.add_argument('--stop-timeout', type=float, default=60.0,
+                        help='Seconds to let running jobs finish on shutdown; unfinished ones are retried')
+    args = parser.parse_args()
+    if args.processes < 1 or args.threads < 1:
+        parser.error('--processes and --threads must be at least 1')
+
+    _configure_logging()
+    job_types = [t.strip() for t in args.job_types.split(',') if t.strip()] or None
+    if args.processes == 1:
+        return run_worker(args.threads, job_types, args.stop_timeout)
+    return supervise(args.processes, args.threads, job_types, args.stop_timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Cached resolution of intake files to their working PDFs.
+
+The intake viewer, OCR rescans and LLM re-analysis all work on a PDF: images
+are converted to `{stem}_converted.pdf` and PDFs may have a
+`{stem}_standardized.pdf` in the temp dir. The `intake_working_files` table
+remembers that mapping across restarts.
+
+Resolution used to open up to three connections per file, re-run
+`CREATE TABLE IF NOT EXISTS` and upsert the mapping even when nothing had
+changed, so an intake page with many thumbnails cost hundreds of writes. Now:
+
+- all mappings are read once into memory, then served from there;
+- each cached entry remembers the 'fast' fingerprint of the original, so an
+  intake file replaced in place is re-resolved (and an image re-converted)
+  instead of serving a stale working PDF;
+- the table is written only when a mapping actually changes, in one
+  transaction per bulk call (`resolve_working_pdf_paths`).
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    from .file_fingerprint import fingerprint
+    from .utils.image_pdf import write_image_pdf
+except ImportError:
+    from file_fingerprint import fingerprint
+    from utils.image_pdf import write_image_pdf
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# filename -> (fast fingerprint of the original, working pdf)
+_entries: Dict[str, Tuple[str, str]] = {}
+# filename -> working_pdf as last read from / written to intake_working_files
+_stored: Dict[str, str] = {}
+_loaded_from: Optional[str] = None
+_lock = threading.RLock()
+_stats = {'hits': 0, 'resolved': 0, 'converted': 0, 'writes': 0}
+
+
+def _config():
+    try:
+        from .config_manager import app_config
+    except ImportError:
+        from config_manager import app_config
+    return app_config
+
+
+def _get_db_connection():
+    try:
+        from .database import get_db_connection
+    except ImportError:
+        from database import get_db_connection
+    return get_db_connection()
+
+
+def _tmp_dir() -> str:
+    try:
+        from .utils.path_utils import select_tmp_dir
+    except ImportError:
+        from utils.path_utils import select_tmp_dir
+    tmp_dir = select_tmp_dir()
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+    except Exception:
+        pass
+    return tmp_dir
+
+
+def _db_key() -> str:
+    try:
+        from .database import _resolve_db_path
+    except ImportError:
+        from database import _resolve_db_path
+    return os.path.abspath(_resolve_db_path(quiet=True))
+
+
+def _ensure_loaded() -> None:
+    """Read every stored mapping once per database (the table is tiny)."""
+    global _loaded_from
+    db_key = _db_key()
+    if _loaded_from == db_key:
+        return
+    _entries.clear()
+    _stored.clear()
+    conn = None
+    try:
+        conn = _get_db_connection()
+        for filename, working_pdf in conn.execute("SELECT filename, working_pdf FROM intake_working_files"):
+            if working_pdf:
+                _stored[filename] = working_pdf
+    except Exception as e:
+        logger.debug(f"intake_working_files load failed: {e}")
+    finally:
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    _loaded_from = db_key
+
+
+def _convert_image(orig_path: str, converted: str) -> bool:
+    try:
+        write_image_pdf(orig_path, converted)
+        _stats['converted'] += 1
+        logger.info(f"On-demand conversion: {os.path.basename(orig_path)} -> {converted}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to convert image to PDF for {orig_path}: {e}")
+        return False
+
+
+def _is_fresh(working_pdf: str, orig_mtime_ns: int) -> bool:
+    try:
+        return os.stat(working_pdf).st_mtime_ns >= orig_mtime_ns
+    except OSError:
+        return False
+
+
+def _standardized_since(filename: str, cached_path: str, orig_path: str) -> bool:
+    """True if a PDF cached as its own working file has since been standardized."""
+    if cached_path != orig_path or Path(filename).suffix.lower() != '.pdf':
+        return False
+    return os.path.exists(os.path.join(_tmp_dir(), f"{Path(filename).stem}_standardized.pdf"))
+
+
+def _resolve_uncached(filename: str, orig_path: str, st: os.stat_result, content_changed: bool) -> Tuple[str, bool]:
+    """Apply the working-file rules. Returns (path, persist) - only real working PDFs are persisted."""
+    stem = Path(filename).stem
+    ext = Path(filename).suffix.lower()
+    mapped = _stored.get(filename)
+    # A mapping back to the original itself is just the default; re-apply the rules
+    if not content_changed and mapped and mapped != orig_path and _is_fresh(mapped, st.st_mtime_ns):
+        return mapped, True
+
+    tmp_dir = _tmp_dir()
+    if ext in IMAGE_EXTENSIONS:
+        converted = os.path.join(tmp_dir, f"{stem}_converted.pdf")
+        # A conversion older than its image was made from a previous version of the file
+        if os.path.exists(converted) and not content_changed and _is_fresh(converted, st.st_mtime_ns):
+            return converted, True
+        if _convert_image(orig_path, converted):
+            return converted, True
+        # Conversion unavailable: use the original (downstream viewers may still cope)
+        return orig_path, False
+    if ext == '.pdf':
+        standardized = os.path.join(tmp_dir, f"{stem}_standardized.pdf")
+        if os.path.exists(standardized) and _is_fresh(standardized, st.st_mtime_ns):
+            return standardized, True
+        return orig_path, True
+    return orig_path, False
+
+
+def resolve_working_pdf_paths(filenames: Iterable[str], intake_dir: Optional[str] = None) -> Dict[str, str]:
+    """Resolve many intake filenames to their working PDF paths at once.
+
+    Rules:
+    - images (jpg/png/jpeg): `{tmp}/{stem}_converted.pdf`, converted on demand;
+    - PDFs: `{tmp}/{stem}_standardized.pdf` if present, else the original;
+    - anything else (or a failed conversion): the original path.
+
+    Unchanged files are answered from memory; new or changed mappings are
+    written to `intake_working_files` in a single transaction.
+    """
+    intake_dir = intake_dir or _config().INTAKE_DIR
+    results: Dict[str, str] = {}
+    changed = []
+    with _lock:
+        _ensure_loaded()
+        for filename in filenames:
+            orig_path = os.path.join(intake_dir, filename)
+            try:
+                st = os.stat(orig_path)
+                digest = fingerprint(orig_path, 'fast', st=st)
+            except (OSError, ValueError):
+                results[filename] = orig_path
+                continue
+            cached = _entries.get(filename)
+            if cached and cached[0] == digest and os.path.exists(cached[1]) and not _standardized_since(filename, cached[1], orig_path):
+                _stats['hits'] += 1
+                results[filename] = cached[1]
+                continue
+            # A remembered digest that no longer matches means the file was replaced in place
+            content_changed = cached is not None and cached[0] != digest
+            path, persist = _resolve_uncached(filename, orig_path, st, content_changed)
+            _stats['resolved'] += 1
+            _entries[filename] = (digest, path)
+            results[filename] = path
+            if persist and _stored.get(filename) != path:
+                changed.append((filename, path))
+
+        if changed:
+            conn = None
+            try:
+                conn = _get_db_connection()
+                conn.executemany(
+                    "INSERT INTO intake_working_files (filename, working_pdf) VALUES (?, ?) "
+                    "ON CONFLICT(filename) DO UPDATE SET working_pdf = excluded.working_pdf, "
+                    "updated_at = CURRENT_TIMESTAMP",
+                    changed,
+                )
+                conn.commit()
+                _stored.update(changed)
+                _stats['writes'] += len(changed)
+            except Exception as e:
+                logger.debug(f"Failed to persist {len(changed)} working-file mapping(s): {e}")
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+    return results
+
+
+def resolve_working_pdf_path(filename: str, intake_dir: Optional[str] = None) -> str:
+    """Single-file form of `resolve_working_pdf_paths`."""
+    return resolve_working_pdf_paths([filename], intake_dir)[filename]
+
+
+def invalidate_working_files(filenames: Optional[Iterable[str]] = None) -> None:
+    """Forget cached resolutions (all of them when `filenames` is None).
+
+    Call after regenerating a working PDF outside this module; the stored
+    mapping is kept and re-validated on the next resolve.
+    """
+    global _loaded_from
+    with _lock:
+        if filenames is None:
+            _entries.clear()
+            _stored.clear()
+            _loaded_from = None
+            return
+        for filename in filenames:
+            _entries.pop(filename, None)
+
+
+def get_working_files_stats() -> dict:
+    """Process-local cache counters."""
+    with _lock:
+        return dict(_stats, cached_entries=len(_entries), stored_mappings=len(_stored))